@@ -1,17 +1,34 @@
 """
 Simple Chart Cleanup Command
 
-Clean up chart file entries for missing files.
+Clean up chart file entries for missing files and superseded hashed charts.
 """
 
 from django.core.management.base import BaseCommand
+from apps.chart_management.manifest import get_chart_manifest
 from apps.chart_management.services import get_chart_service
 
 
 class Command(BaseCommand):
     """Clean up chart entries for missing files"""
 
-    help = "Remove chart entries for files that no longer exist"
+    help = (
+        "Remove chart entries for files that no longer exist and delete "
+        "superseded content-hashed chart versions"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep superseded chart versions for this many hours",
+        )
+        parser.add_argument(
+            "--publish",
+            action="store_true",
+            help="Publish current charts under hashed names before cleaning up",
+        )
 
     def handle(self, *args, **options):
         self.stdout.write("Cleaning up missing chart files...")
@@ -22,3 +39,15 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.SUCCESS(f"Removed {deleted_count} entries for missing files")
         )
+
+        manifest = get_chart_manifest()
+        if options["publish"]:
+            published = manifest.publish_all()
+            self.stdout.write(f"Published {published} charts under new hashes")
+
+        removed = manifest.collect_garbage(
+            grace_seconds=int(options["grace_hours"] * 60 * 60)
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Removed {len(removed)} superseded chart versions")
+        )
@@ -0,0 +1,352 @@
+"""
+Chart Manifest
+
+Publishes chart files under content-hashed names so they can be cached
+forever. Processors keep writing charts to their fixed names
+(``religion_pie_chart.png``); publishing copies each file to
+``religion_pie_chart.<hash>.png`` and records the mapping in
+``images/charts/manifest.json``:
+
+    {
+        "files": {"religion_pie_chart.png": "religion_pie_chart.3fa2c1d9e0ab.png"},
+        "charts": {"demographics_religion_pie": "religion_pie_chart.3fa2c1d9e0ab.png"},
+        "sources": {"religion_pie_chart.png": [size, mtime_ns]},
+        "retired": {"religion_pie_chart.0b1c2d3e4f5a.png": 1718000000.0}
+    }
+
+``files`` is keyed by the fixed file name and used by ``{% static %}``,
+``charts`` by ``ChartFile.chart_key``. Superseded versions are listed in
+``retired`` until ``collect_garbage()`` removes them.
+
+Server workers publish into the same manifest, so every read-modify-write
+holds the manifest's ``single_flight()`` lock and the file is replaced
+atomically.
+
+Every municipality has its own chart directory and manifest, see
+``apps.core.tenancy``.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Optional
+
+from django.conf import settings
+
+from apps.core.singleflight import atomic_write, single_flight
+
+CHARTS_PREFIX = "images/charts/"
+MANIFEST_NAME = "manifest.json"
+CHART_EXTENSIONS = (".png", ".svg")
+HASH_LENGTH = 12
+
+HASHED_NAME_RE = re.compile(
+    r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$" % HASH_LENGTH
+)
+
+
+def get_charts_namespace() -> str:
+    """Chart subdirectory of the active municipality ("" for the root)"""
+    from apps.core.tenancy import get_current_municipality
+
+    return get_current_municipality().charts_namespace
+
+
+def get_charts_dir() -> Path:
+    """Chart directory of the active municipality, matching ChartFile.full_path"""
+    if getattr(settings, "STATICFILES_DIRS", None):
+        charts_dir = Path(settings.STATICFILES_DIRS[0]) / "images" / "charts"
+    else:
+        charts_dir = Path(settings.STATIC_ROOT) / "images" / "charts"
+    namespace = get_charts_namespace()
+    return charts_dir / namespace if namespace else charts_dir
+
+
+def get_charts_prefix() -> str:
+    """Static path prefix of the active municipality's charts"""
+    namespace = get_charts_namespace()
+    return f"{CHARTS_PREFIX}{namespace}/" if namespace else CHARTS_PREFIX
+
+
+def chart_url(name: str) -> str:
+    """Static URL of a chart's fixed file name, bypassing the manifest"""
+    return f"{settings.STATIC_URL}{get_charts_prefix()}{name}"
+
+
+def is_hashed_name(name: str) -> bool:
+    return bool(HASHED_NAME_RE.match(Path(name).name))
+
+
+class ChartManifest:
+    """Content-hashed chart files and their manifest"""
+
+    def __init__(self, charts_dir=None):
+        self.charts_dir = Path(charts_dir) if charts_dir else get_charts_dir()
+        self._lock = threading.RLock()
+        self._cached = None
+        self._cached_mtime = None
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.charts_dir / MANIFEST_NAME
+
+    def load(self) -> dict:
+        """Read the manifest, re-reading only when the file changed"""
+        try:
+            mtime = self.manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {"files": {}, "charts": {}, "sources": {}, "retired": {}}
+
+        if self._cached is None or mtime != self._cached_mtime:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            for section in ("files", "charts", "sources", "retired"):
+                manifest.setdefault(section, {})
+            self._cached = manifest
+            self._cached_mtime = mtime
+        return self._cached
+
+    def save(self, manifest: dict):
+        """Write the manifest atomically"""
+        with atomic_write(self.manifest_path) as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        self._cached = manifest
+        self._cached_mtime = self.manifest_path.stat().st_mtime_ns
+
+    @contextmanager
+    def _locked(self):
+        """Hold the manifest lock of this process and of every other worker
+
+        Yields the manifest as currently on disk, since another process may
+        have rewritten it since it was cached.
+        """
+        with self._lock:
+            with single_flight(f"chart-manifest:{self.manifest_path.resolve()}"):
+                self._cached = None
+                yield self.load()
+
+    def hashed_name(self, name: str) -> Optional[str]:
+        """Hashed file name for a fixed chart file name"""
+        return self.load()["files"].get(name)
+
+    def hashed_name_for_key(self, chart_key: str) -> Optional[str]:
+        """Hashed file name for a ChartFile.chart_key"""
+        return self.load()["charts"].get(chart_key)
+
+    def publish(self, name: str, chart_key: Optional[str] = None) -> Optional[str]:
+        """Publish one chart file and return its hashed name"""
+        with self._locked() as current:
+            manifest = self._copy(current)
+            hashed = self._publish(manifest, name)
+            if hashed and chart_key:
+                manifest["charts"][chart_key] = hashed
+            if manifest != current:
+                self.save(manifest)
+            return hashed
+
+    def publish_all(
+        self, chart_keys: Optional[dict] = None, names: Optional[Iterable] = None
+    ) -> int:
+        """Publish every chart file in the directory
+
+        Args:
+            chart_keys: Optional {chart_key: file name} to record in the
+                manifest (defaults to the ChartFile records)
+            names: Optional fixed file names to publish instead of scanning
+                the whole directory
+
+        Returns:
+            Number of files published under a new hash
+        """
+        if not self.charts_dir.exists():
+            return 0
+        if chart_keys is None:
+            chart_keys = self._get_chart_keys()
+
+        if names is None:
+            paths = sorted(self.charts_dir.iterdir())
+        else:
+            paths = [self.charts_dir / name for name in sorted(set(names))]
+
+        with self._locked() as current:
+            manifest = self._copy(current)
+            published = 0
+            for path in paths:
+                if (
+                    path.is_file()
+                    and path.suffix in CHART_EXTENSIONS
+                    and not is_hashed_name(path.name)
+                ):
+                    previous = manifest["files"].get(path.name)
+                    if self._publish(manifest, path.name) != previous:
+                        published += 1
+
+            for chart_key, name in chart_keys.items():
+                hashed = manifest["files"].get(name)
+                if hashed:
+                    manifest["charts"][chart_key] = hashed
+
+            if manifest != current:
+                self.save(manifest)
+            return published
+
+    def collect_garbage(self, grace_seconds: int = 24 * 60 * 60) -> list:
+        """Delete superseded hashed files older than the grace period
+
+        Retired versions are kept for ``grace_seconds`` after they were
+        superseded so pages and PDFs rendered just before stay valid. Hashed
+        files missing from the manifest use their modification time instead.
+        """
+        now = time.time()
+        removed = []
+        with self._locked() as current:
+            manifest = self._copy(current)
+            live = set(manifest["files"].values()) | set(manifest["charts"].values())
+
+            for path in sorted(self.charts_dir.glob("*")):
+                if not path.is_file() or not is_hashed_name(path.name):
+                    continue
+                if path.name in live:
+                    continue
+                retired_at = manifest["retired"].get(path.name, path.stat().st_mtime)
+                if now - retired_at >= grace_seconds:
+                    path.unlink()
+                    manifest["retired"].pop(path.name, None)
+                    removed.append(path.name)
+
+            # Forget retired entries whose file is already gone
+            for name in list(manifest["retired"]):
+                if not (self.charts_dir / name).exists():
+                    del manifest["retired"][name]
+
+            if manifest != current:
+                self.save(manifest)
+        return removed
+
+    def retire_versions(self, pattern: str, keep: str) -> list:
+        """Delete superseded versions of a fingerprinted chart
+
+        Charts whose file name carries a fingerprint of their data
+        (``age_gender_projection_<fingerprint>.png``) get a new file whenever
+        the data changes. Every unhashed file matching ``pattern`` but
+        ``keep`` is deleted and its published copy retired, so
+        ``collect_garbage()`` removes it after the grace period.
+
+        Returns:
+            Names of the deleted files
+        """
+        removed = []
+        with self._locked() as current:
+            manifest = self._copy(current)
+            now = time.time()
+            for path in sorted(self.charts_dir.glob(pattern)):
+                if path.name == keep or is_hashed_name(path.name):
+                    continue
+                path.unlink(missing_ok=True)
+                removed.append(path.name)
+
+                manifest["sources"].pop(path.name, None)
+                hashed = manifest["files"].pop(path.name, None)
+                if hashed:
+                    manifest["retired"][hashed] = now
+                    for chart_key, name in list(manifest["charts"].items()):
+                        if name == hashed:
+                            del manifest["charts"][chart_key]
+
+            if manifest != current:
+                self.save(manifest)
+        return removed
+
+    def _publish(self, manifest: dict, name: str) -> Optional[str]:
+        source = self.charts_dir / name
+        if not source.is_file():
+            return manifest["files"].get(name)
+
+        stat = source.stat()
+        signature = [stat.st_size, stat.st_mtime_ns]
+        hashed = manifest["files"].get(name)
+        if (
+            hashed
+            and manifest["sources"].get(name) == signature
+            and (self.charts_dir / hashed).exists()
+        ):
+            return hashed
+
+        digest = self._file_hash(source)
+        new_hashed = f"{source.stem}.{digest}{source.suffix}"
+        target = self.charts_dir / new_hashed
+        if not target.exists():
+            tmp_target = target.with_name(f".{new_hashed}.tmp")
+            shutil.copy2(source, tmp_target)
+            os.replace(tmp_target, target)
+
+        if hashed and hashed != new_hashed:
+            manifest["retired"][hashed] = time.time()
+        manifest["retired"].pop(new_hashed, None)
+        manifest["files"][name] = new_hashed
+        manifest["sources"][name] = signature
+        return new_hashed
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:HASH_LENGTH]
+
+    @staticmethod
+    def _copy(manifest: dict) -> dict:
+        return {
+            section: dict(manifest.get(section, {}))
+            for section in ("files", "charts", "sources", "retired")
+        }
+
+    @staticmethod
+    def _get_chart_keys() -> dict:
+        from .models import ChartFile
+
+        return dict(ChartFile.objects.values_list("chart_key", "file_path"))
+
+
+_manifests = {}
+
+
+def get_chart_manifest() -> ChartManifest:
+    """Manifest of the active municipality's chart directory"""
+    charts_dir = get_charts_dir()
+    manifest = _manifests.get(charts_dir)
+    if manifest is None:
+        manifest = _manifests.setdefault(charts_dir, ChartManifest(charts_dir))
+    return manifest
+
+
+def publish_charts(names: Optional[Iterable] = None) -> int:
+    """Publish the charts of the active municipality's chart directory
+
+    Args:
+        names: Optional fixed file names to publish (defaults to all)
+    """
+    return get_chart_manifest().publish_all(names=names)
+
+
+def chart_file_names(charts) -> set:
+    """Chart file names referenced by a processor's (nested) charts mapping"""
+    names = set()
+    pending = [charts]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        elif isinstance(value, str) and value.endswith(CHART_EXTENSIONS):
+            # Static paths, URLs, file system paths or bare file names
+            names.add(Path(value).name)
+    return names
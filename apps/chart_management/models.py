@@ -4,11 +4,12 @@ Simple Chart File Tracker
 Minimal system to track chart files based on file existence only.
 """
 
-from pathlib import Path
 from django.db import models
-from django.conf import settings
+from django.templatetags.static import static
 from apps.core.models import BaseModel
 
+from .manifest import get_charts_dir
+
 
 class ChartFile(BaseModel):
     """Simple chart file tracker - based on file existence only"""
@@ -35,21 +36,14 @@ class ChartFile(BaseModel):
     def full_path(self):
         """Get full filesystem path"""
         # Use same directory structure as chart service
-        if hasattr(settings, "STATICFILES_DIRS") and settings.STATICFILES_DIRS:
-            return (
-                Path(settings.STATICFILES_DIRS[0])
-                / "images"
-                / "charts"
-                / self.file_path
-            )
-        else:
-            return Path(settings.STATIC_ROOT) / "images" / "charts" / self.file_path
+        return get_charts_dir() / self.file_path
 
     @property
     def url(self):
         """Get URL for the file"""
         if self.exists():
-            return f"{settings.STATIC_URL}images/charts/{self.file_path}"
+            # Resolved through the chart manifest to the content-hashed copy
+            return static(f"images/charts/{self.file_path}")
         return None
 
     def exists(self):
@@ -4,9 +4,8 @@ Simple Chart File Service
 Basic service for tracking chart files based on file existence only.
 """
 
-from pathlib import Path
 from typing import Optional
-from django.conf import settings
+from .manifest import get_chart_manifest, get_charts_dir
 from .models import ChartFile
 
 
@@ -14,7 +13,7 @@ class SimpleChartService:
     """Simple chart file tracking service - file existence based"""
 
     def __init__(self):
-        self.charts_dir = Path(settings.STATICFILES_DIRS[0]) / "images" / "charts"
+        self.charts_dir = get_charts_dir()
         self.charts_dir.mkdir(parents=True, exist_ok=True)
 
     def track_chart(
@@ -44,6 +43,7 @@ class SimpleChartService:
             # If file exists, return URL
             if chart_file.exists():
                 print(f"✓ Chart already exists: {chart_file.file_path}")
+                self.publish_chart(chart_file)
                 return chart_file.url
             else:
                 # File doesn't exist, update with new path
@@ -55,6 +55,7 @@ class SimpleChartService:
                 # Return URL only if file actually exists
                 if chart_file.exists():
                     print(f"✓ Updated chart file: {chart_file.file_path}")
+                    self.publish_chart(chart_file)
                     return chart_file.url
                 else:
                     print(f"⚠ Chart file not found: {chart_file.file_path}")
@@ -72,11 +73,18 @@ class SimpleChartService:
             # Return URL only if file actually exists
             if chart_file.exists():
                 print(f"✓ Tracked new chart: {chart_file.file_path}")
+                self.publish_chart(chart_file)
                 return chart_file.url
             else:
                 print(f"⚠ Chart file not found: {chart_file.file_path}")
                 return None
 
+    def publish_chart(self, chart_file: ChartFile) -> Optional[str]:
+        """Publish a tracked chart under its content-hashed name"""
+        return get_chart_manifest().publish(
+            chart_file.file_path, chart_key=chart_file.chart_key
+        )
+
     def chart_exists(self, chart_key: str) -> bool:
         """Check if chart exists (both in database and file system)"""
         try:
@@ -0,0 +1,24 @@
+"""
+Chart Static Files Storage
+
+Static files storage resolving chart files through the chart manifest, so
+existing ``{% static 'images/charts/<name>.png' %}`` references point at the
+active municipality's content-hashed copy once it has been published.
+"""
+
+from django.contrib.staticfiles.storage import StaticFilesStorage
+
+from .manifest import CHARTS_PREFIX, get_chart_manifest, get_charts_prefix
+
+
+class ChartManifestStaticFilesStorage(StaticFilesStorage):
+    """StaticFilesStorage serving published charts under hashed names"""
+
+    def url(self, name):
+        if name and name.startswith(CHARTS_PREFIX):
+            chart_name = name[len(CHARTS_PREFIX) :]
+            if "/" not in chart_name:
+                # Resolved in the active municipality's chart directory
+                hashed = get_chart_manifest().hashed_name(chart_name)
+                name = f"{get_charts_prefix()}{hashed or chart_name}"
+        return super().url(name)
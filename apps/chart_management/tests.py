@@ -4,9 +4,22 @@ Simple Chart Management Tests
 Basic tests for the chart file tracking system.
 """
 
-from django.test import TestCase
+import tempfile
+import threading
+from pathlib import Path
+
+from django.templatetags.static import static
+from django.test import TestCase, override_settings
+from apps.chart_management.manifest import (
+    ChartManifest,
+    chart_file_names,
+    get_chart_manifest,
+    get_charts_dir,
+    is_hashed_name,
+)
 from apps.chart_management.models import ChartFile
 from apps.chart_management.services import get_chart_service
+from apps.core.tenancy import use_municipality
 
 
 class ChartFileTestCase(TestCase):
@@ -69,3 +82,134 @@ class SimpleChartServiceTestCase(TestCase):
         # Should need generation
         needs_gen = self.chart_service.needs_generation("test_chart")
         self.assertTrue(needs_gen)
+
+
+class ChartManifestTestCase(TestCase):
+    """Test content-hashed chart publishing"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.static_dir = Path(self.tmp_dir.name)
+        self.charts_dir = self.static_dir / "images" / "charts"
+        self.charts_dir.mkdir(parents=True)
+        self.manifest = ChartManifest(self.charts_dir)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_chart(self, content):
+        (self.charts_dir / "religion_pie_chart.svg").write_text(content)
+
+    def test_publish_and_resolve(self):
+        """Published charts resolve to hashed names through {% static %}"""
+        self.write_chart("<svg>1</svg>")
+        published = self.manifest.publish_all(
+            chart_keys={"demographics_religion_pie": "religion_pie_chart.svg"}
+        )
+
+        hashed = self.manifest.hashed_name("religion_pie_chart.svg")
+        self.assertEqual(published, 1)
+        self.assertTrue(is_hashed_name(hashed))
+        self.assertTrue((self.charts_dir / hashed).exists())
+        self.assertEqual(
+            self.manifest.hashed_name_for_key("demographics_religion_pie"), hashed
+        )
+
+        with override_settings(STATICFILES_DIRS=[str(self.static_dir)]):
+            self.assertEqual(
+                static("images/charts/religion_pie_chart.svg"),
+                f"/static/images/charts/{hashed}",
+            )
+
+        # Unchanged files are not republished
+        self.assertEqual(self.manifest.publish_all(chart_keys={}), 0)
+
+    def test_municipality_namespace(self):
+        """Charts resolve in the active municipality's own directory"""
+        municipalities = {
+            "gadhawa": {"name": "गढवा", "name_english": "Gadhawa"},
+            "lamahi": {"name": "लमही", "name_english": "Lamahi"},
+        }
+        with override_settings(
+            STATICFILES_DIRS=[str(self.static_dir)],
+            REPORT_MUNICIPALITIES=municipalities,
+            REPORT_DEFAULT_MUNICIPALITY="gadhawa",
+        ), use_municipality("lamahi"):
+            charts_dir = get_charts_dir()
+            self.assertEqual(charts_dir, self.charts_dir / "lamahi")
+            self.assertEqual(
+                static("images/charts/religion_pie_chart.svg"),
+                "/static/images/charts/lamahi/religion_pie_chart.svg",
+            )
+
+            charts_dir.mkdir()
+            (charts_dir / "religion_pie_chart.svg").write_text("<svg>1</svg>")
+            get_chart_manifest().publish_all(chart_keys={})
+            hashed = get_chart_manifest().hashed_name("religion_pie_chart.svg")
+            self.assertEqual(
+                static("images/charts/religion_pie_chart.svg"),
+                f"/static/images/charts/lamahi/{hashed}",
+            )
+
+    def test_changed_chart_gets_new_hash_and_old_is_collected(self):
+        self.write_chart("<svg>1</svg>")
+        old = self.manifest.publish("religion_pie_chart.svg")
+        self.write_chart("<svg>2</svg>")
+        new = self.manifest.publish("religion_pie_chart.svg")
+
+        self.assertNotEqual(old, new)
+        self.assertEqual(self.manifest.collect_garbage(grace_seconds=3600), [])
+        self.assertEqual(self.manifest.collect_garbage(grace_seconds=0), [old])
+        self.assertFalse((self.charts_dir / old).exists())
+        self.assertTrue((self.charts_dir / new).exists())
+
+    def test_concurrent_publishers_keep_every_entry(self):
+        """Separate manifests on one directory, as in separate workers"""
+        names = [f"chart_{index}.svg" for index in range(8)]
+        for name in names:
+            (self.charts_dir / name).write_text(f"<svg>{name}</svg>")
+
+        with override_settings(REPORT_LOCK_DIR=self.tmp_dir.name):
+            threads = [
+                threading.Thread(
+                    target=ChartManifest(self.charts_dir).publish, args=(name,)
+                )
+                for name in names
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        files = ChartManifest(self.charts_dir).load()["files"]
+        self.assertEqual(sorted(files), sorted(names))
+
+    def test_retire_versions(self):
+        """Older fingerprinted charts are deleted and their copies retired"""
+        old_name = "age_gender_projection_aaaaaaaaaaaa.png"
+        new_name = "age_gender_projection_bbbbbbbbbbbb.png"
+        (self.charts_dir / old_name).write_text("old")
+        old_hashed = self.manifest.publish(old_name, "age_gender_projection")
+        (self.charts_dir / new_name).write_text("new")
+
+        removed = self.manifest.retire_versions(
+            "age_gender_projection_*.png", new_name
+        )
+
+        self.assertEqual(removed, [old_name])
+        self.assertTrue((self.charts_dir / new_name).exists())
+        self.assertIsNone(self.manifest.hashed_name(old_name))
+        self.assertIsNone(self.manifest.hashed_name_for_key("age_gender_projection"))
+        self.assertEqual(self.manifest.collect_garbage(grace_seconds=0), [old_hashed])
+
+    def test_publish_named_charts(self):
+        """Only the charts a processor references are published"""
+        self.write_chart("<svg>1</svg>")
+        (self.charts_dir / "other_chart.svg").write_text("<svg>2</svg>")
+        names = chart_file_names(
+            {"religion": {"pie_chart_svg": "images/charts/religion_pie_chart.svg"}}
+        )
+
+        self.assertEqual(self.manifest.publish_all({}, names=names), 1)
+        self.assertIsNotNone(self.manifest.hashed_name("religion_pie_chart.svg"))
+        self.assertIsNone(self.manifest.hashed_name("other_chart.svg"))
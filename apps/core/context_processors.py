@@ -0,0 +1,10 @@
+"""
+Core context processors
+"""
+
+from .tenancy import get_current_municipality
+
+
+def municipality(request):
+    """The active municipality as ``municipality``"""
+    return {"municipality": get_current_municipality()}
@@ -0,0 +1,33 @@
+"""
+Core middleware
+
+Activates the municipality serving the request's host name, see
+apps.core.tenancy.
+"""
+
+from .tenancy import get_municipality_for_host, use_municipality
+
+
+class MunicipalityMiddleware:
+    """Run each request in the municipality configured for its host"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        municipality = get_municipality_for_host(request.get_host())
+        request.municipality = municipality
+        with use_municipality(municipality):
+            response = self.get_response(request)
+
+        if response.streaming:
+            # Streamed content is produced after this call returns
+            response.streaming_content = self.stream_in(
+                municipality, response.streaming_content
+            )
+        return response
+
+    @staticmethod
+    def stream_in(municipality, content):
+        with use_municipality(municipality):
+            yield from content
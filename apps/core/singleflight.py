@@ -0,0 +1,171 @@
+"""
+Single-flight artifact builds
+
+Charts and reports are written to fixed paths, and several server workers
+may want to build the same one at the same time. ``single_flight(key)``
+lets only one of them build an artifact: the others block until it is done
+and then find the finished file. Keys name the artifact, e.g. its path or a
+fingerprint of the data it is built from.
+
+Locks are file locks in ``REPORT_LOCK_DIR`` (shared by the processes and
+threads of one host) unless ``REPORT_LOCK_BACKEND = "redis"``, which uses
+locks in the default django-redis cache server, shared by every host.
+
+Writes go through ``atomic_path()`` / ``atomic_write()``: the file is
+written under a temporary name next to its target and renamed over it, so
+readers never see a partially written file.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 300
+POLL_INTERVAL = 0.05
+
+
+def get_lock_dir():
+    lock_dir = getattr(settings, "REPORT_LOCK_DIR", None)
+    if lock_dir:
+        return Path(lock_dir)
+    return Path(tempfile.gettempdir()) / "gadhawa_report_locks"
+
+
+def _try_lock(f):
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _file_lock(name, timeout):
+    lock_dir = get_lock_dir()
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    with open(lock_dir / f"{name}.lock", "a+b") as f:
+        deadline = time.monotonic() + timeout
+        acquired = _try_lock(f)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            acquired = _try_lock(f)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                _unlock(f)
+
+
+@contextmanager
+def _redis_lock(name, timeout):
+    from django_redis import get_redis_connection
+    from redis.exceptions import LockError
+
+    lock = get_redis_connection("default").lock(
+        f"report-lock:{name}", timeout=timeout, blocking_timeout=timeout
+    )
+    acquired = lock.acquire()
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                lock.release()
+            except LockError:
+                # Held longer than its timeout and already expired
+                pass
+
+
+@contextmanager
+def single_flight(key, timeout=None):
+    """Hold the build lock of an artifact for the duration of the block
+
+    Re-check whether the artifact exists once inside: a concurrent builder
+    may have finished it while this one waited. If the lock is not acquired
+    within ``timeout`` seconds the block runs anyway, building the artifact
+    a second time rather than failing.
+    """
+    if timeout is None:
+        timeout = getattr(settings, "REPORT_LOCK_TIMEOUT", DEFAULT_TIMEOUT)
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    if getattr(settings, "REPORT_LOCK_BACKEND", "file") == "redis":
+        lock = _redis_lock(name, timeout)
+    else:
+        lock = _file_lock(name, timeout)
+
+    with lock as acquired:
+        if not acquired:
+            logger.warning("Building %s without its lock after %ss", key, timeout)
+        yield acquired
+
+
+def build_once(key, is_built, build, timeout=None):
+    """Run ``build()`` unless ``is_built()``; concurrent callers wait for it
+
+    Returns:
+        True if this caller built the artifact
+    """
+    if is_built():
+        return False
+    with single_flight(key, timeout):
+        if is_built():
+            return False
+        build()
+        return True
+
+
+@contextmanager
+def atomic_path(path):
+    """Temporary path that is renamed to ``path`` when the block succeeds
+
+    The temporary file lives in a hidden directory next to ``path`` (same
+    file system, so the rename is atomic) under the same file name, so
+    tools choosing the output format by extension work unchanged. Nothing
+    is renamed if the block raises or leaves no file behind.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=path.parent))
+    try:
+        tmp_path = tmp_dir / path.name
+        yield tmp_path
+        if tmp_path.exists():
+            os.replace(tmp_path, path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+@contextmanager
+def atomic_write(path, mode="w", encoding=None):
+    """Open a file for writing that replaces ``path`` once closed"""
+    if "b" not in mode and encoding is None:
+        encoding = "utf-8"
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
@@ -0,0 +1,156 @@
+"""
+Municipality tenancy
+
+One deployment serves every municipality configured in
+``settings.REPORT_MUNICIPALITIES``. Each municipality has its own:
+
+- database alias, selected for every query by ``MunicipalityRouter``
+- cache key namespace, see ``make_cache_key()``
+- chart directory, ``images/charts/<charts_namespace>/``
+- ward count, see ``ward_numbers()``
+
+The active municipality lives in a context variable. ``MunicipalityMiddleware``
+activates it per request from the host name, batch jobs activate it with
+``use_municipality()``, and code running outside either sees the default
+municipality. Worker threads started with ``contextvars.copy_context()`` (the
+processor scheduler does) inherit it.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# Used when REPORT_MUNICIPALITIES is not configured
+DEFAULT_MUNICIPALITIES = {
+    "gadhawa": {
+        "name": "गढवा गाउँपालिका",
+        "name_english": "Gadhawa Rural Municipality",
+        "ward_count": 8,
+        "charts_namespace": "",
+    },
+}
+
+
+@dataclass(frozen=True)
+class Municipality:
+    """A municipality served by this deployment"""
+
+    code: str
+    name: str
+    name_english: str
+    ward_count: int = 8
+    database: str = "default"
+    hosts: tuple = ()
+    charts_namespace: str = ""
+
+    @property
+    def ward_numbers(self):
+        return range(1, self.ward_count + 1)
+
+
+@lru_cache(maxsize=None)
+def get_municipalities():
+    """{code: Municipality} of every configured municipality, in order"""
+    config = getattr(settings, "REPORT_MUNICIPALITIES", None) or DEFAULT_MUNICIPALITIES
+    municipalities = {}
+    for code, options in config.items():
+        options = dict(options)
+        # Charts of every municipality but an explicitly unnamespaced one
+        # live in their own directory
+        options.setdefault("charts_namespace", code)
+        options["hosts"] = tuple(host.lower() for host in options.get("hosts", ()))
+        municipality = Municipality(code=code, **options)
+
+        if municipality.database not in settings.DATABASES:
+            raise ImproperlyConfigured(
+                f"Municipality {code!r} uses unknown database "
+                f"{municipality.database!r}"
+            )
+        if municipality.ward_count < 1:
+            raise ImproperlyConfigured(f"Municipality {code!r} has no wards")
+        municipalities[code] = municipality
+    return municipalities
+
+
+def get_municipality(code):
+    """Configured municipality by code; raises LookupError if unknown"""
+    try:
+        return get_municipalities()[code]
+    except KeyError:
+        raise LookupError(f"Unknown municipality {code!r}") from None
+
+
+def get_default_municipality():
+    """REPORT_DEFAULT_MUNICIPALITY, or the first configured municipality"""
+    code = getattr(settings, "REPORT_DEFAULT_MUNICIPALITY", None)
+    if code is None:
+        return next(iter(get_municipalities().values()))
+    try:
+        return get_municipality(code)
+    except LookupError:
+        raise ImproperlyConfigured(
+            f"REPORT_DEFAULT_MUNICIPALITY {code!r} is not configured"
+        ) from None
+
+
+def get_municipality_for_host(host):
+    """Municipality serving a host name, falling back to the default one"""
+    host = host.split(":", 1)[0].lower()
+    for municipality in get_municipalities().values():
+        if host in municipality.hosts:
+            return municipality
+    return get_default_municipality()
+
+
+_current = contextvars.ContextVar("municipality", default=None)
+
+
+def get_current_municipality():
+    """The active municipality"""
+    return _current.get() or get_default_municipality()
+
+
+@contextmanager
+def use_municipality(municipality):
+    """Activate a municipality (or its code) for the duration of the block"""
+    if isinstance(municipality, str):
+        municipality = get_municipality(municipality)
+    token = _current.set(municipality)
+    try:
+        yield municipality
+    finally:
+        _current.reset(token)
+
+
+def ward_numbers():
+    """Ward numbers of the active municipality"""
+    return get_current_municipality().ward_numbers
+
+
+def make_cache_key(key, key_prefix, version):
+    """Cache KEY_FUNCTION keeping every municipality's cache entries apart"""
+    return f"{key_prefix}:{version}:{get_current_municipality().code}:{key}"
+
+
+class MunicipalityRouter:
+    """Route queries to the active municipality's database"""
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return get_current_municipality().database
+
+    db_for_write = db_for_read
+
+
+@receiver(setting_changed)
+def reset_municipalities(setting, **kwargs):
+    if setting in ("REPORT_MUNICIPALITIES", "DATABASES"):
+        get_municipalities.cache_clear()
@@ -0,0 +1,161 @@
+"""
+Core Tests
+
+Tests for municipality tenancy and single-flight builds.
+"""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.base import ModelState
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from apps.core.middleware import MunicipalityMiddleware
+from apps.core.singleflight import atomic_path, atomic_write, build_once
+from apps.core.tenancy import (
+    MunicipalityRouter,
+    get_current_municipality,
+    get_municipalities,
+    make_cache_key,
+    use_municipality,
+    ward_numbers,
+)
+
+MUNICIPALITIES = {
+    "gadhawa": {
+        "name": "गढवा गाउँपालिका",
+        "name_english": "Gadhawa Rural Municipality",
+        "ward_count": 8,
+        "charts_namespace": "",
+    },
+    "lamahi": {
+        "name": "लमही नगरपालिका",
+        "name_english": "Lamahi Municipality",
+        "ward_count": 9,
+        "hosts": ["lamahi.example.org"],
+    },
+}
+
+
+@override_settings(
+    REPORT_MUNICIPALITIES=MUNICIPALITIES, REPORT_DEFAULT_MUNICIPALITY="gadhawa"
+)
+class MunicipalityTenancyTestCase(SimpleTestCase):
+    """Test municipality configuration and activation"""
+
+    def test_configuration(self):
+        lamahi = get_municipalities()["lamahi"]
+        self.assertEqual(lamahi.charts_namespace, "lamahi")
+        self.assertEqual(lamahi.database, "default")
+        self.assertEqual(list(lamahi.ward_numbers), list(range(1, 10)))
+        self.assertEqual(get_municipalities()["gadhawa"].charts_namespace, "")
+
+    def test_activation(self):
+        self.assertEqual(get_current_municipality().code, "gadhawa")
+        self.assertEqual(len(ward_numbers()), 8)
+        with use_municipality("lamahi"):
+            self.assertEqual(get_current_municipality().code, "lamahi")
+            self.assertEqual(len(ward_numbers()), 9)
+            with use_municipality("gadhawa"):
+                self.assertEqual(get_current_municipality().code, "gadhawa")
+            self.assertEqual(get_current_municipality().code, "lamahi")
+        self.assertEqual(get_current_municipality().code, "gadhawa")
+
+        with self.assertRaises(LookupError):
+            with use_municipality("unknown"):
+                pass
+
+    def test_cache_keys_are_scoped(self):
+        default_key = make_cache_key("report", "", 1)
+        with use_municipality("lamahi"):
+            self.assertNotEqual(make_cache_key("report", "", 1), default_key)
+
+    def test_unknown_database(self):
+        config = {"other": {**MUNICIPALITIES["lamahi"], "database": "missing"}}
+        with override_settings(REPORT_MUNICIPALITIES=config):
+            with self.assertRaises(ImproperlyConfigured):
+                get_municipalities()
+
+    def test_router(self):
+        router = MunicipalityRouter()
+        self.assertEqual(router.db_for_read(None), "default")
+
+        # Loaded instances are saved back to the database they came from
+        instance = SimpleNamespace(_state=ModelState())
+        instance._state.db = "archive"
+        self.assertEqual(router.db_for_write(None, instance=instance), "archive")
+
+    def test_middleware(self):
+        seen = []
+
+        def view(request):
+            seen.append((request.municipality.code, get_current_municipality().code))
+            return HttpResponse()
+
+        middleware = MunicipalityMiddleware(view)
+        factory = RequestFactory()
+        with self.settings(ALLOWED_HOSTS=["*"]):
+            middleware(factory.get("/", HTTP_HOST="lamahi.example.org:8000"))
+            middleware(factory.get("/", HTTP_HOST="gadhawa.example.org"))
+
+        self.assertEqual(seen, [("lamahi", "lamahi"), ("gadhawa", "gadhawa")])
+        self.assertEqual(get_current_municipality().code, "gadhawa")
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    """Test single-flight builds and atomic writes"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        settings = override_settings(REPORT_LOCK_DIR=self.tmp / "locks")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_concurrent_builds_run_once(self):
+        target = self.tmp / "chart.png"
+        builds = []
+
+        def build():
+            builds.append(threading.current_thread().name)
+            time.sleep(0.05)
+            with atomic_write(target, "wb") as f:
+                f.write(b"png")
+
+        threads = [
+            threading.Thread(
+                target=build_once, args=("chart", target.exists, build)
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(target.read_bytes(), b"png")
+
+    def test_atomic_path(self):
+        target = self.tmp / "report.svg"
+        target.write_text("old")
+
+        with self.assertRaises(RuntimeError):
+            with atomic_write(target) as f:
+                f.write("partial")
+                raise RuntimeError
+        self.assertEqual(target.read_text(), "old")
+
+        with atomic_path(target) as tmp_path:
+            # Same file name, so tools picking formats by extension work
+            self.assertEqual(tmp_path.name, target.name)
+            tmp_path.write_text("new")
+            self.assertEqual(target.read_text(), "old")
+        self.assertEqual(target.read_text(), "new")
+        self.assertEqual([path.name for path in self.tmp.iterdir()], ["report.svg"])
@@ -10,6 +10,8 @@ from django.conf import settings
 from django.utils import timezone
 import sys
 
+from .tenancy import get_current_municipality
+
 
 class HealthCheckView(APIView):
     """
@@ -20,12 +22,13 @@ class HealthCheckView(APIView):
 
     def get(self, request):
         """Return system health status"""
+        municipality = get_current_municipality()
         return Response(
             {
                 "status": "healthy",
                 "timestamp": timezone.now(),
-                "municipality": "गढवा गाउँपालिका",
-                "municipality_english": "GadhawaRural Municipality",
+                "municipality": municipality.name,
+                "municipality_english": municipality.name_english,
                 "system": "Digital Profile Report System",
                 "version": "1.0.0",
             }
@@ -41,6 +44,7 @@ class SystemInfoView(APIView):
 
     def get(self, request):
         """Return system information"""
+        municipality = get_current_municipality()
         return Response(
             {
                 "django_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
@@ -48,13 +52,13 @@ class SystemInfoView(APIView):
                 "time_zone": settings.TIME_ZONE,
                 "language_code": settings.LANGUAGE_CODE,
                 "municipality": {
-                    "name_nepali": "गढवा गाउँपालिका",
-                    "name_english": "GadhawaRural Municipality",
+                    "name_nepali": municipality.name,
+                    "name_english": municipality.name_english,
                     "district": "कपिलवस्तु",
                     "district_english": "Kapilvastu",
                     "province": "लुम्बिनी प्रदेश",
                     "province_english": "Lumbini Province",
-                    "total_wards": 8,
+                    "total_wards": municipality.ward_count,
                 },
             }
         )
@@ -69,23 +73,24 @@ class MunicipalityInfoView(APIView):
 
     def get(self, request):
         """Return municipality information"""
+        municipality = get_current_municipality()
         return Response(
             {
                 "municipality": {
-                    "name_nepali": "गढवा गाउँपालिका",
-                    "name_english": "GadhawaRural Municipality",
+                    "name_nepali": municipality.name,
+                    "name_english": municipality.name_english,
                     "district_nepali": "कपिलवस्तु",
                     "district_english": "Kapilvastu",
                     "province_nepali": "लुम्बिनी प्रदेश",
                     "province_english": "Lumbini Province",
-                    "total_wards": 8,
+                    "total_wards": municipality.ward_count,
                     "established_date": "2017-05-10",  # BS: 2074/01/27
                     "website": "https://gadhawamun.gov.np",
                     "contact": {
                         "phone": "+977-76-550123",
                         "email": "info@gadhawamun.gov.np",
-                        "address_nepali": "गढवा गाउँपालिका, कपिलवस्तु",
-                        "address_english": "GadhawaRural Municipality, Kapilvastu",
+                        "address_nepali": f"{municipality.name}, कपिलवस्तु",
+                        "address_english": f"{municipality.name_english}, Kapilvastu",
                     },
                     "coordinates": {"latitude": 27.5833, "longitude": 82.9167},
                 }
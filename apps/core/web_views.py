@@ -10,6 +10,8 @@ from django.contrib.auth.views import (
 )
 from django.urls import reverse_lazy
 
+from .tenancy import get_current_municipality
+
 
 class DashboardView(LoginRequiredMixin, TemplateView):
     """
@@ -22,8 +24,8 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         context.update(
             {
-                "municipality_name": "गढवा गाउँपालिका",
-                "municipality_english": "gadhawa Rural Municipality",
+                "municipality_name": get_current_municipality().name,
+                "municipality_english": get_current_municipality().name_english,
                 "page_title": "मुख्य ड्यासबोर्ड",  # Main Dashboard
                 "user": self.request.user,
             }
@@ -43,8 +45,8 @@ class LoginView(DjangoLoginView):
         context = super().get_context_data(**kwargs)
         context.update(
             {
-                "municipality_name": "गढवा गाउँपालिका",
-                "municipality_english": "GadhawaRural Municipality",
+                "municipality_name": get_current_municipality().name,
+                "municipality_english": get_current_municipality().name_english,
                 "page_title": "लगइन",  # Login
             }
         )
@@ -70,8 +72,8 @@ class ProfileView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         context.update(
             {
-                "municipality_name": "गढवा गाउँपालिका",
-                "municipality_english": "GadhawaRural Municipality",
+                "municipality_name": get_current_municipality().name,
+                "municipality_english": get_current_municipality().name_english,
                 "page_title": "प्रोफाइल",  # Profile
                 "user": self.request.user,
             }
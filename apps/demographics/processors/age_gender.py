@@ -4,15 +4,26 @@ Age-Gender Demographics Processor
 Handles age-gender demographic data processing, population pyramid chart generation, and detailed report formatting.
 """
 
-from pathlib import Path
+import logging
+
 from .base import BaseDemographicsProcessor, BaseReportFormatter
 from ..models import WardAgeWisePopulation, AgeGroupChoice, GenderChoice
+from ..utils.projection import get_population_projection
 from ..utils.svg_chart_generator import DEFAULT_COLORS
 from apps.reports.utils.nepali_numbers import (
     format_nepali_number,
     format_nepali_percentage,
 )
+from apps.reports.utils.view_models import ward_blocks
 from apps.chart_management.processors import SimpleChartProcessor
+from apps.chart_management.manifest import (
+    chart_url,
+    get_chart_manifest,
+    get_charts_dir,
+)
+from apps.core.tenancy import get_current_municipality, ward_numbers
+
+logger = logging.getLogger(__name__)
 
 
 class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
@@ -23,14 +34,7 @@ class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
         SimpleChartProcessor.__init__(self)
 
         # Ensure we use the same directory as the chart service
-        from django.conf import settings
-
-        if hasattr(settings, "STATICFILES_DIRS") and settings.STATICFILES_DIRS:
-            self.static_charts_dir = (
-                Path(settings.STATICFILES_DIRS[0]) / "images" / "charts"
-            )
-        else:
-            self.static_charts_dir = Path("static/images/charts")
+        self.static_charts_dir = get_charts_dir()
 
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
 
@@ -79,8 +83,8 @@ class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
                 "other_percentage": 0.0,
             }
 
-        # Initialize ward data for wards 1-8 (dynamic for new data)
-        for ward_num in range(1, 9):
+        # Initialize ward data for every ward of the municipality
+        for ward_num in ward_numbers():
             ward_data[str(ward_num)] = {
                 "male": 0,
                 "female": 0,
@@ -189,8 +193,17 @@ class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
             ),
             "dependency_ratios": dependency_ratios,
             "demographic_indicators": demographic_indicators,
+            "population_projection": self._get_population_projection(),
         }
 
+    def _get_population_projection(self):
+        """Cohort-component projection of the ward populations"""
+        try:
+            return get_population_projection()
+        except Exception:
+            logger.exception("Error projecting population")
+            return None
+
     def _calculate_dependency_ratios(self, age_gender_data):
         """Calculate various dependency ratios"""
         # Child dependency ratio (0-14 years)
@@ -338,9 +351,7 @@ class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
 
                 if png_path and png_path.exists():
                     charts["pyramid_chart_png"] = f"images/charts/{png_path.name}"
-                    charts["pyramid_chart_url"] = (
-                        f"/static/images/charts/{png_path.name}"
-                    )
+                    charts["pyramid_chart_url"] = chart_url(png_path.name)
                     print(f"  ✅ Generated population pyramid PNG chart")
                 else:
                     print(f"  ❌ Failed to generate population pyramid PNG chart")
@@ -351,9 +362,14 @@ class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
             png_path = self.static_charts_dir / f"{self.get_chart_key()}_pyramid.png"
             if png_path.exists():
                 charts["pyramid_chart_png"] = f"images/charts/{png_path.name}"
-                charts["pyramid_chart_url"] = f"/static/images/charts/{png_path.name}"
+                charts["pyramid_chart_url"] = chart_url(png_path.name)
             print(f"  ♻️  Using existing population pyramid PNG chart")
 
+        charts.update(
+            self.generate_projection_pyramid(data.get("population_projection"))
+        )
+        charts.update(self.generate_ward_pyramids(data))
+
         # Check and generate bar chart only if needed
         if self.needs_generation("bar"):
             try:
@@ -368,9 +384,7 @@ class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
                     png_path = self.convert_svg_to_png(bar_path)
                     if png_path:
                         charts["bar_chart_png"] = f"images/charts/{png_path.name}"
-                        charts["bar_chart_url"] = (
-                            f"/static/images/charts/{png_path.name}"
-                        )
+                        charts["bar_chart_url"] = chart_url(png_path.name)
                         print(f"  ✅ Generated ward-wise gender bar PNG chart")
                     else:
                         print(
@@ -384,11 +398,111 @@ class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
             png_path = self.static_charts_dir / f"{self.get_chart_key()}_bar.png"
             if png_path.exists():
                 charts["bar_chart_png"] = f"images/charts/{png_path.name}"
-                charts["bar_chart_url"] = f"/static/images/charts/{png_path.name}"
+                charts["bar_chart_url"] = chart_url(png_path.name)
             print(f"  ♻️  Using existing ward-wise gender bar PNG chart")
 
         return charts
 
+    def generate_projection_pyramid(self, projection, scenario=None):
+        """Population pyramid of a scenario at the furthest projection horizon
+
+        The file name carries the projection fingerprint, so the chart is only
+        redrawn when the projection inputs change; older versions are deleted
+        once it has been.
+        """
+        if not projection or not projection.get("scenarios"):
+            return {}
+
+        scenario = projection["scenarios"].get(scenario) or next(
+            iter(projection["scenarios"].values())
+        )
+        horizon = max(scenario["horizons"])
+        pyramid_filename = (
+            f"{self.get_chart_key()}_projection_{projection['fingerprint'][:12]}.png"
+        )
+        pyramid_path = self.static_charts_dir / pyramid_filename
+
+        if not pyramid_path.exists():
+            try:
+                from ..utils.population_pyramid_generator import (
+                    PopulationPyramidGenerator,
+                )
+
+                title = (
+                    f"{format_nepali_number(horizon)} वर्षपछिको प्रक्षेपित "
+                    f"जनसंख्या पिरामिड ({scenario['name_nepali']})"
+                )
+                png_path = PopulationPyramidGenerator().save_pyramid_to_png(
+                    scenario["horizons"][horizon]["age_gender_data"],
+                    pyramid_path,
+                    width=self.pyramid_chart_width,
+                    height=self.pyramid_chart_height,
+                    title_nepali=title,
+                    title_english=f"Projected Population Pyramid (+{horizon} years)",
+                    dpi=300,
+                )
+                if not (png_path and png_path.exists()):
+                    logger.warning("Failed to generate projection pyramid chart")
+                    return {}
+            except Exception:
+                logger.exception("Error generating projection pyramid chart")
+                return {}
+
+            get_chart_manifest().retire_versions(
+                f"{self.get_chart_key()}_projection_*.png", pyramid_filename
+            )
+
+        return {
+            "projection_pyramid_png": f"images/charts/{pyramid_filename}",
+            "projection_pyramid_url": chart_url(pyramid_filename),
+        }
+
+    def generate_ward_pyramids(self, data):
+        """Every ward's pyramid, after the municipality's, in one figure
+
+        The wards share one scale and are drawn and rasterized together; the
+        file name carries the fingerprint of the ward data, so the figure is
+        only redrawn when a ward's population changes. Older versions are
+        deleted once it has been.
+        """
+        from ..utils.population_pyramid_generator import PopulationPyramidGenerator
+
+        panels = [
+            (f"वडा नं. {format_nepali_number(ward_num)}", ward_info["age_groups"])
+            for ward_num, ward_info in data["ward_data"].items()
+        ]
+        if not any(ward_info["total"] for ward_info in data["ward_data"].values()):
+            return {}
+        overview = (get_current_municipality().name, data["age_gender_data"])
+
+        generator = PopulationPyramidGenerator()
+        fingerprint = generator.pyramid_fingerprint(panels, overview)
+        pyramid_filename = (
+            f"{self.get_chart_key()}_ward_pyramids_{fingerprint[:12]}.png"
+        )
+        pyramid_path = self.static_charts_dir / pyramid_filename
+
+        if not pyramid_path.exists():
+            try:
+                png_path = generator.save_pyramid_grid_to_png(
+                    panels, pyramid_path, overview=overview, dpi=150
+                )
+                if not (png_path and png_path.exists()):
+                    logger.warning("Failed to generate ward pyramids chart")
+                    return {}
+            except Exception:
+                logger.exception("Error generating ward pyramids chart")
+                return {}
+
+            get_chart_manifest().retire_versions(
+                f"{self.get_chart_key()}_ward_pyramids_*.png", pyramid_filename
+            )
+
+        return {
+            "ward_pyramids_png": f"images/charts/{pyramid_filename}",
+            "ward_pyramids_url": chart_url(pyramid_filename),
+        }
+
     def generate_and_save_charts(self, data):
         """Legacy method - calls new chart management method"""
         return self.generate_and_track_charts(data)
@@ -404,16 +518,11 @@ class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
         # Generate charts only if needed
         charts = self.generate_and_track_charts(data)
 
-        # Create template-friendly ward table data
-        ward_table_data = self._create_ward_table_data(
-            data["ward_data"], data["age_gender_data"]
-        )
-
         return {
             "data": data,
             "age_gender_data": data["age_gender_data"],
             "ward_data": data["ward_data"],
-            "ward_table_data": ward_table_data,  # New flattened structure for templates
+            "view_model": self.build_view_model(data),
             "report_content": report_content,
             "coherent_analysis": report_content,
             "charts": charts,
@@ -426,59 +535,29 @@ class AgeGenderProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
             "other_percentage": data["other_percentage"],
             "dependency_ratios": data["dependency_ratios"],
             "demographic_indicators": data["demographic_indicators"],
+            "population_projection": data["population_projection"],
             "section_title": self.get_section_title(),
             "section_number": self.get_section_number(),
         }
 
-    def _create_ward_table_data(self, ward_data, age_gender_data):
-        """Create a flattened data structure for easy template access"""
-        ward_table_rows = []
-
-        for ward_num_str, ward_info in ward_data.items():
-            ward_num = int(ward_num_str)
-
-            # Add ward header row
-            ward_table_rows.append(
-                {
-                    "type": "ward_header",
-                    "ward_number": ward_num,
-                    "ward_number_nepali": ward_num_str,
-                    "colspan": 5,
-                }
-            )
-
-            # Add age group rows for this ward
-            for age_group_code, age_group_info in age_gender_data.items():
-                age_group_data = ward_info["age_groups"].get(
-                    age_group_code, {"male": 0, "female": 0, "other": 0, "total": 0}
-                )
-
-                ward_table_rows.append(
-                    {
-                        "type": "age_group",
-                        "ward_number": ward_num,
-                        "age_group_code": age_group_code,
-                        "age_group_name": age_group_info["name_nepali"],
-                        "male": age_group_data["male"],
-                        "female": age_group_data["female"],
-                        "other": age_group_data["other"],
-                        "total": age_group_data["total"],
-                    }
-                )
+    def build_view_model(self, data):
+        """Localized ward table rows: one block of age groups per ward"""
+        empty = {"male": 0, "female": 0, "total": 0}
+        age_groups = [
+            (code, info["name_nepali"])
+            for code, info in data["age_gender_data"].items()
+        ]
 
-            # Add ward total row
-            ward_table_rows.append(
-                {
-                    "type": "ward_total",
-                    "ward_number": ward_num,
-                    "male": ward_info["male"],
-                    "female": ward_info["female"],
-                    "other": ward_info["other"],
-                    "total": ward_info["total"],
-                }
-            )
+        wards = []
+        for ward_num, ward_info in data["ward_data"].items():
+            rows = []
+            for code, name in age_groups:
+                group = ward_info["age_groups"].get(code, empty)
+                rows.append((name, group["male"], group["female"], group["total"]))
+            total = (ward_info["male"], ward_info["female"], ward_info["total"])
+            wards.append((int(ward_num), rows, total))
 
-        return ward_table_rows
+        return {"ward_table": ward_blocks(wards)}
 
     class AgeGenderReportFormatter(BaseReportFormatter):
         """Age-gender specific report formatter with detailed analysis"""
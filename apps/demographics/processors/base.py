@@ -7,24 +7,22 @@ Common functionality for processing demographic data across all categories.
 from abc import ABC, abstractmethod
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from pathlib import Path
+from apps.demographics.utils.chart_series import ChartMatrix, ChartSeries
 from apps.demographics.utils.svg_chart_generator import SVGChartGenerator
+from apps.chart_management.manifest import get_charts_dir
+from apps.core.tenancy import get_current_municipality
 
 
 class BaseDemographicsProcessor(ABC):
     """Base class for all demographic data processors"""
 
-    def __init__(self):
-        # Use proper static directory path
-        from django.conf import settings
+    # Processors that must run before this one ("category" or
+    # "domain.category"), see apps.reports.utils.scheduler
+    depends_on = ()
 
-        # Use staticfiles directory if available, fallback to STATIC_ROOT
-        if hasattr(settings, "STATICFILES_DIRS") and settings.STATICFILES_DIRS:
-            self.static_charts_dir = (
-                Path(settings.STATICFILES_DIRS[0]) / "images" / "charts"
-            )
-        else:
-            self.static_charts_dir = Path(settings.STATIC_ROOT) / "images" / "charts"
+    def __init__(self):
+        # Chart directory of the active municipality
+        self.static_charts_dir = get_charts_dir()
 
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
 
@@ -100,10 +98,19 @@ class BaseDemographicsProcessor(ABC):
             "report_content": report_content,
             "charts": charts,
             "total_population": total_population,
+            "view_model": self.build_view_model(data),
             "section_title": self.get_section_title(),
             "section_number": self.get_section_number(),
         }
 
+    def build_view_model(self, data):
+        """Optional display-ready table rows for the report template
+
+        Processors with large tables return localized rows built with
+        apps.reports.utils.view_models; templates iterate them directly.
+        """
+        return None
+
     def generate_and_save_charts(self, data):
         """Generate charts using SVGChartGenerator and save them as PNG files"""
         charts = {}
@@ -116,8 +123,8 @@ class BaseDemographicsProcessor(ABC):
             and "ward_data" in data
         ):
             # Househead format with both municipality and ward data
-            pie_data = data["municipality_data"]
-            bar_data = data["ward_data"]
+            pie_data = ChartSeries.from_mapping(data["municipality_data"])
+            bar_data = ChartMatrix.from_ward_mapping(data["ward_data"])
         else:
             # Simple format - use the data as is for pie chart
             pie_data = data
@@ -163,7 +170,7 @@ class BaseReportFormatter(ABC):
     """Base report formatter with common functionality"""
 
     def __init__(self):
-        self.municipality_name = "गढवा गाउँपालिका"
+        self.municipality_name = get_current_municipality().name
 
     @abstractmethod
     def generate_formal_report(self, data):
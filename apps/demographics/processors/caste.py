@@ -13,6 +13,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_percentage,
 )
 from apps.chart_management.processors import SimpleChartProcessor
+from apps.chart_management.manifest import get_charts_dir
 
 
 class CasteProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
@@ -23,16 +24,7 @@ class CasteProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
         SimpleChartProcessor.__init__(self)
 
         # Ensure we use the same directory as the chart service
-        from django.conf import settings
-
-        if hasattr(settings, "STATICFILES_DIRS") and settings.STATICFILES_DIRS:
-            # Use same directory as chart management service
-            self.static_charts_dir = (
-                Path(settings.STATICFILES_DIRS[0]) / "images" / "charts"
-            )
-        else:
-            # Fallback to STATIC_ROOT
-            self.static_charts_dir = Path(settings.STATIC_ROOT) / "images" / "charts"
+        self.static_charts_dir = get_charts_dir()
 
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
 
@@ -4,11 +4,11 @@ Death Cause Demographics Processor
 Handles death cause demographic data processing, chart generation, and report formatting.
 """
 
-from pathlib import Path
 from .base import BaseDemographicsProcessor, BaseReportFormatter
 from ..models import WardWiseDeathCause, DeathCauseChoice
 from collections import defaultdict
 from apps.chart_management.processors import SimpleChartProcessor
+from apps.chart_management.manifest import get_charts_dir
 from ..utils.svg_chart_generator import (
     CASTE_COLORS,
 )  # Use a color palette or define DEATH_CAUSE_COLORS if needed
@@ -20,14 +20,7 @@ class DeathCauseProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
     def __init__(self):
         super().__init__()
         SimpleChartProcessor.__init__(self)
-        from django.conf import settings
-
-        if hasattr(settings, "STATICFILES_DIRS") and settings.STATICFILES_DIRS:
-            self.static_charts_dir = (
-                Path(settings.STATICFILES_DIRS[0]) / "images" / "charts"
-            )
-        else:
-            self.static_charts_dir = Path(settings.STATIC_ROOT) / "images" / "charts"
+        self.static_charts_dir = get_charts_dir()
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
         self.pie_chart_width = 900
         self.pie_chart_height = 450
@@ -4,7 +4,6 @@ Death Registration Demographics Processor
 Handles age-gender death registration data processing, population pyramid chart generation, and detailed report formatting.
 """
 
-from pathlib import Path
 from .base import BaseDemographicsProcessor, BaseReportFormatter
 from ..models import WardAgeGenderWiseDeceasedPopulation, AgeGroupChoice, GenderChoice
 from ..utils.svg_chart_generator import DEFAULT_COLORS
@@ -12,7 +11,10 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_number,
     format_nepali_percentage,
 )
+from apps.reports.utils.view_models import ward_blocks
 from apps.chart_management.processors import SimpleChartProcessor
+from apps.chart_management.manifest import get_charts_dir
+from apps.core.tenancy import ward_numbers
 
 
 class DeathRegistrationProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
@@ -23,14 +25,7 @@ class DeathRegistrationProcessor(BaseDemographicsProcessor, SimpleChartProcessor
         SimpleChartProcessor.__init__(self)
 
         # Ensure we use the same directory as the chart service
-        from django.conf import settings
-
-        if hasattr(settings, "STATICFILES_DIRS") and settings.STATICFILES_DIRS:
-            self.static_charts_dir = (
-                Path(settings.STATICFILES_DIRS[0]) / "images" / "charts"
-            )
-        else:
-            self.static_charts_dir = Path(settings.STATIC_ROOT) / "images" / "charts"
+        self.static_charts_dir = get_charts_dir()
 
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
 
@@ -76,8 +71,8 @@ class DeathRegistrationProcessor(BaseDemographicsProcessor, SimpleChartProcessor
                 "total_percentage": 0.0,
             }
 
-        # Initialize ward data for wards 1-8 (dynamic for new data)
-        for ward_num in range(1, 9):
+        # Initialize ward data for every ward of the municipality
+        for ward_num in ward_numbers():
             ward_data[ward_num] = {
                 "ward_number": ward_num,
                 "age_groups": {},
@@ -259,59 +254,45 @@ class DeathRegistrationProcessor(BaseDemographicsProcessor, SimpleChartProcessor
     def generate_and_save_charts(self, data):
         return self.generate_and_track_charts(data)
 
-    def _create_ward_table_data(self, ward_data, age_gender_data):
-        """Create a flattened data structure for easy template access (ward headers, age group rows, totals)"""
-        ward_table_rows = []
-        for ward_num, ward_info in ward_data.items():
-            # Add ward header row
-            ward_table_rows.append(
-                {
-                    "type": "ward_header",
-                    "ward_number": ward_num,
-                    "colspan": 5,
-                }
-            )
-            # Add age group rows for this ward
-            for age_group_code, age_group_info in age_gender_data.items():
-                ward_age_group = ward_info.get(age_group_code, {})
-                ward_table_rows.append(
-                    {
-                        "type": "age_group",
-                        "ward_number": ward_num,
-                        "age_group_code": age_group_code,
-                        "age_group_name": age_group_info.get(
-                            "name_nepali", age_group_code
-                        ),
-                        "male": ward_age_group.get("MALE", 0),
-                        "female": ward_age_group.get("FEMALE", 0),
-                        "total": ward_age_group.get("TOTAL", 0),
-                    }
+    def build_view_model(self, data):
+        """Localized ward table rows: one block of age groups per ward"""
+        age_groups = [
+            (code, info.get("name_nepali", code))
+            for code, info in data["age_gender_data"].items()
+        ]
+
+        wards = []
+        for ward_num, ward_info in data["ward_data"].items():
+            rows = []
+            for code, name in age_groups:
+                group = ward_info.get(code, {})
+                rows.append(
+                    (
+                        name,
+                        group.get("MALE", 0),
+                        group.get("FEMALE", 0),
+                        group.get("TOTAL", 0),
+                    )
                 )
-            # Add ward total row
-            ward_table_rows.append(
-                {
-                    "type": "ward_total",
-                    "ward_number": ward_num,
-                    "male": ward_info.get("MALE", 0),
-                    "female": ward_info.get("FEMALE", 0),
-                    "total": ward_info.get("TOTAL", 0),
-                }
+            total = (
+                ward_info.get("MALE", 0),
+                ward_info.get("FEMALE", 0),
+                ward_info.get("TOTAL", 0),
             )
-        return ward_table_rows
+            wards.append((ward_num, rows, total))
+
+        return {"ward_table": ward_blocks(wards)}
 
     def process_for_pdf(self):
         data = self.get_data()
         report_content = self.generate_report_content(data)
         charts = self.generate_and_track_charts(data)
-        ward_table_data = self._create_ward_table_data(
-            data["ward_data"], data["age_gender_data"]
-        )
         total_population = data.get("total_population", 0)
         return {
             "data": data,
             "death_registration_data": data["age_gender_data"],
             "ward_data": data["ward_data"],
-            "ward_table_data": ward_table_data,
+            "view_model": self.build_view_model(data),
             "report_content": report_content,
             "coherent_analysis": report_content,
             "charts": charts,
@@ -14,6 +14,8 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_percentage,
 )
 from apps.chart_management.processors import SimpleChartProcessor
+from apps.chart_management.manifest import get_charts_dir
+from apps.core.tenancy import ward_numbers
 
 
 class DisabilityCauseProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
@@ -24,16 +26,7 @@ class DisabilityCauseProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
         SimpleChartProcessor.__init__(self)
 
         # Ensure we use the same directory as the chart service
-        from django.conf import settings
-
-        if hasattr(settings, "STATICFILES_DIRS") and settings.STATICFILES_DIRS:
-            # Use same directory as chart management service
-            self.static_charts_dir = (
-                Path(settings.STATICFILES_DIRS[0]) / "images" / "charts"
-            )
-        else:
-            # Fallback to STATIC_ROOT
-            self.static_charts_dir = Path(settings.STATIC_ROOT) / "images" / "charts"
+        self.static_charts_dir = get_charts_dir()
 
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
 
@@ -87,7 +80,7 @@ class DisabilityCauseProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
 
         # Ward-wise data for bar chart and detailed table
         ward_data = {}
-        for ward_num in range(1, 9):  # Wards 1-8
+        for ward_num in ward_numbers():
             ward_data[ward_num] = {
                 "ward_name": f"वडा नं. {ward_num}",
                 "demographics": {},
@@ -13,27 +13,30 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_number,
     format_nepali_percentage,
 )
+from apps.reports.utils.view_models import localize, localize_row, percentage
 from apps.chart_management.processors import SimpleChartProcessor
+from apps.chart_management.manifest import get_charts_dir
 
 
 class FemalePropertyOwnershipProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
     """Processor for female property ownership demographics"""
 
+    # Ward table column order
+    PROPERTY_TYPE_COLUMNS = (
+        "HOUSE_ONLY",
+        "LAND_ONLY",
+        "BOTH_HOUSE_AND_LAND",
+        "NEITHER_HOUSE_NOR_LAND",
+    )
+    # Property types counted as owning property
+    OWNER_TYPES = ("HOUSE_ONLY", "LAND_ONLY", "BOTH_HOUSE_AND_LAND")
+
     def __init__(self):
         super().__init__()
         SimpleChartProcessor.__init__(self)
 
         # Ensure we use the same directory as the chart service
-        from django.conf import settings
-
-        if hasattr(settings, "STATICFILES_DIRS") and settings.STATICFILES_DIRS:
-            # Use same directory as chart management service
-            self.static_charts_dir = (
-                Path(settings.STATICFILES_DIRS[0]) / "images" / "charts"
-            )
-        else:
-            # Fallback to STATIC_ROOT
-            self.static_charts_dir = Path(settings.STATIC_ROOT) / "images" / "charts"
+        self.static_charts_dir = get_charts_dir()
 
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
 
@@ -161,6 +164,61 @@ class FemalePropertyOwnershipProcessor(BaseDemographicsProcessor, SimpleChartPro
             "total_population": total_population,
         }
 
+    def build_view_model(self, data):
+        """Localized summary and ward table rows with ownership rates"""
+        totals = data["municipality_totals"]
+        total_population = data["total_population"]
+
+        summary_rows = [
+            localize_row(
+                (
+                    data["property_type_names"][code],
+                    population,
+                    data["municipality_percentages"][code],
+                ),
+                digits={2: 1},
+            )
+            for code, population in totals.items()
+            if population > 0
+        ]
+
+        ward_rows = []
+        for ward_num, ward_info in sorted(data["ward_data"].items()):
+            ward_total = ward_info["total_population"]
+            if ward_total <= 0:
+                continue
+            populations = [
+                ward_info["property_types"][code]["population"]
+                for code in self.PROPERTY_TYPE_COLUMNS
+            ]
+            owners = sum(
+                ward_info["property_types"][code]["population"]
+                for code in self.OWNER_TYPES
+            )
+            rate = percentage(owners, ward_total)
+            ward_rows.append(
+                localize_row(
+                    (ward_num, *populations, ward_total, rate), digits={6: 1}
+                )
+            )
+
+        owners = sum(totals.get(code, 0) for code in self.OWNER_TYPES)
+        ward_totals = localize_row(
+            (
+                *(totals.get(code, 0) for code in self.PROPERTY_TYPE_COLUMNS),
+                total_population,
+                percentage(owners, total_population),
+            ),
+            digits={5: 1},
+        )
+
+        return {
+            "summary_rows": summary_rows,
+            "total_population": localize(total_population),
+            "ward_rows": ward_rows,
+            "ward_totals": ward_totals,
+        }
+
     def generate_report_content(self, data):
         """Generate female property ownership-specific report content"""
         formatter = self.FemalePropertyOwnershipReportFormatter()
@@ -382,6 +440,7 @@ class FemalePropertyOwnershipProcessor(BaseDemographicsProcessor, SimpleChartPro
             "report_content": report_content,
             "charts": charts,
             "total_population": total_population,
+            "view_model": self.build_view_model(data),
             "section_title": self.get_section_title(),
             "section_number": self.get_section_number(),
         }
@@ -13,6 +13,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_percentage,
 )
 from apps.chart_management.processors import SimpleChartProcessor
+from apps.core.tenancy import ward_numbers
 
 
 class HouseheadProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
@@ -59,7 +60,7 @@ class HouseheadProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
 
         # Ward-wise data for bar chart and detailed table
         ward_data = {}
-        for ward_num in range(1, 9):  # Wards 1-8
+        for ward_num in ward_numbers():
             ward_data[ward_num] = {
                 "ward_name": f"वडा नं. {ward_num}",
                 "demographics": {},
@@ -4,6 +4,8 @@ Demographics Manager
 Coordinates all demographic processors and provides unified interface for PDF generation.
 """
 
+from apps.reports.utils.profiling import instrument_processors, timed
+from apps.reports.utils.scheduler import run_processors
 from .religion import ReligionProcessor
 from .language import LanguageProcessor
 from .caste import CasteProcessor
@@ -40,17 +42,16 @@ class DemographicsManager:
             "death_registration": DeathRegistrationProcessor(),
             "death_cause": DeathCauseProcessor(),
         }
+        instrument_processors(self.processors, "demographics")
 
     def get_processor(self, category):
         """Get processor for specific category"""
         return self.processors.get(category)
 
+    @timed("demographics.process_all_for_pdf")
     def process_all_for_pdf(self):
         """Process all demographic categories for PDF generation with charts"""
-        results = {}
-        for category, processor in self.processors.items():
-            results[category] = processor.process_for_pdf()
-        return results
+        return run_processors("demographics", self.processors)
 
     def process_category_for_pdf(self, category):
         """Process specific category for PDF with charts"""
@@ -59,6 +60,7 @@ class DemographicsManager:
             return processor.process_for_pdf()
         return None
 
+    @timed("demographics.generate_all_charts")
     def generate_all_charts(self):
         """Generate and save charts only if they don't exist using simple chart management"""
         chart_urls = {}
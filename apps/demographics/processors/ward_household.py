@@ -6,6 +6,8 @@ This covers section ३.१.२ घरपरिवारको विवरण (
 """
 
 from pathlib import Path
+
+import numpy as np
 from django.db import models
 from .base import BaseDemographicsProcessor, BaseReportFormatter
 from ..models import WardTimeSeriesPopulation
@@ -15,6 +17,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_percentage,
 )
 from apps.chart_management.processors import SimpleChartProcessor
+from apps.reports.utils.time_series import WardTimeSeries, safe_divide
 
 
 class WardHouseholdProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
@@ -65,15 +68,47 @@ class WardHouseholdProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
         """Return unique chart key for this processor"""
         return "demographics_ward_household"
 
+    # Numeric fields loaded into the (year, ward, metric) time series
+    TIME_SERIES_METRICS = (
+        "total_population",
+        "male_population",
+        "female_population",
+        "other_population",
+        "total_households",
+        "average_household_size",
+        "area_sq_km",
+        "growth_rate",
+        "literacy_rate",
+        "male_literacy_rate",
+        "female_literacy_rate",
+        "population_0_to_14",
+        "population_15_to_59",
+        "population_60_and_above",
+    )
+
+    # Metrics reported as integers, the others as floats
+    INTEGER_METRICS = {
+        "total_population",
+        "male_population",
+        "female_population",
+        "other_population",
+        "total_households",
+        "population_0_to_14",
+        "population_15_to_59",
+        "population_60_and_above",
+    }
+
     def get_data(self):
         """Get ward-wise household population data with time series analysis"""
 
         # Get all ward time series data, ordered by year and ward
-        all_data = WardTimeSeriesPopulation.objects.all().order_by(
-            "year", "ward_number"
+        records = list(
+            WardTimeSeriesPopulation.objects.order_by("year", "ward_number").values(
+                "year", "ward_number", "ward_name", *self.TIME_SERIES_METRICS
+            )
         )
 
-        if not all_data.exists():
+        if not records:
             return {
                 "ward_data": {},
                 "time_series_data": {},
@@ -82,68 +117,66 @@ class WardHouseholdProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
                 "comparison_years": [],
             }
 
+        series = WardTimeSeries.from_rows(
+            (
+                (record["year"], record["ward_number"])
+                + tuple(record[metric] for metric in self.TIME_SERIES_METRICS)
+                for record in records
+            ),
+            self.TIME_SERIES_METRICS,
+        )
+
+        # Derived metrics for every year and ward at once (missing values count as 0)
+        # Sex ratio: males per 100 females; density rounded to whole persons
+        sex_ratios = self._row_ratio(
+            series, "male_population", "female_population", 100
+        )
+        densities = np.rint(
+            self._row_ratio(series, "total_population", "area_sq_km")
+        ).astype(int).tolist()
+        metric_values = np.nan_to_num(series.row_values(series.values)).tolist()
+
         # Organize data by year and ward
         time_series_data = {}
         ward_data = {}
-        years = set()
-
-        for record in all_data:
-            year = record.year
-            ward_num = record.ward_number
-            years.add(year)
-
-            if year not in time_series_data:
-                time_series_data[year] = {}
-
-            # Calculate sex ratio (males per 100 females)
-            sex_ratio = 0
-            if record.female_population and record.female_population > 0:
-                sex_ratio = (
-                    (record.male_population or 0) / record.female_population * 100
-                )
-
-            # Calculate population density (rounded to nearest integer)
-            density = 0
-            if record.area_sq_km and record.area_sq_km > 0:
-                density = round(
-                    (record.total_population or 0) / float(record.area_sq_km)
-                )
+        for record, values, sex_ratio, density in zip(
+            records, metric_values, sex_ratios, densities
+        ):
+            year = record["year"]
+            ward_num = record["ward_number"]
 
             ward_info = {
                 "ward_number": ward_num,
-                "ward_name": record.ward_name or f"वडा नं. {ward_num}",
+                "ward_name": record["ward_name"] or f"वडा नं. {ward_num}",
                 "year": year,
-                "total_population": record.total_population or 0,
-                "male_population": record.male_population or 0,
-                "female_population": record.female_population or 0,
-                "other_population": record.other_population or 0,
-                "total_households": record.total_households or 0,
-                "average_household_size": float(record.average_household_size or 0),
-                "area_sq_km": float(record.area_sq_km or 0),
-                "population_density": density,
-                "sex_ratio": sex_ratio,
-                "growth_rate": float(record.growth_rate or 0),
-                "literacy_rate": float(record.literacy_rate or 0),
-                "male_literacy_rate": float(record.male_literacy_rate or 0),
-                "female_literacy_rate": float(record.female_literacy_rate or 0),
-                "population_0_to_14": record.population_0_to_14 or 0,
-                "population_15_to_59": record.population_15_to_59 or 0,
-                "population_60_and_above": record.population_60_and_above or 0,
             }
+            for metric, value in zip(self.TIME_SERIES_METRICS, values):
+                ward_info[metric] = (
+                    int(value) if metric in self.INTEGER_METRICS else value
+                )
+            ward_info["population_density"] = density
+            ward_info["sex_ratio"] = sex_ratio
 
-            time_series_data[year][ward_num] = ward_info
+            time_series_data.setdefault(year, {})[ward_num] = ward_info
 
-            # Keep latest data in ward_data for easy access
-            if ward_num not in ward_data or year > ward_data[ward_num]["year"]:
-                ward_data[ward_num] = ward_info
+            # Keep latest data in ward_data for easy access (rows are ordered by year)
+            ward_data[ward_num] = ward_info
 
-        # Get latest year
-        latest_year = max(years) if years else None
-        comparison_years = sorted(years, reverse=True)
+        latest_year = series.latest_year
+        comparison_years = sorted(time_series_data, reverse=True)
+
+        # Population change, growth, CAGR and rank of every ward in the latest year
+        trends = series.ward_trends("total_population")
+        for ward_num, ward_info in time_series_data[latest_year].items():
+            trend = trends[ward_num]
+            ward_info["population_change"] = trend["change"]
+            ward_info["population_growth_rate"] = trend["growth_rate"]
+            ward_info["population_cagr"] = trend["cagr"]
+            ward_info["population_rank"] = trend["rank"]
 
         # Calculate summary statistics
         summary_stats = self._calculate_summary_stats(
-            ward_data, time_series_data, latest_year
+            series, time_series_data, latest_year
         )
 
         return {
@@ -154,71 +187,83 @@ class WardHouseholdProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
             "comparison_years": comparison_years,
         }
 
-    def _calculate_summary_stats(self, ward_data, time_series_data, latest_year):
+    @staticmethod
+    def _ratio(series, numerator, denominator, scale=1.0):
+        return safe_divide(
+            np.nan_to_num(series.series(numerator)),
+            series.series(denominator),
+            scale,
+        )
+
+    def _row_ratio(self, series, numerator, denominator, scale=1.0):
+        return series.row_values(
+            self._ratio(series, numerator, denominator, scale)
+        ).tolist()
+
+    def _calculate_summary_stats(self, series, time_series_data, latest_year):
         """Calculate summary statistics for analysis"""
-        if not ward_data or not latest_year:
+        if not series or not latest_year:
             return {}
 
         # Get latest year data for calculations
         latest_data = time_series_data.get(latest_year, {})
 
         # Population statistics
-        total_population = sum(
-            w.get("total_population", 0) for w in latest_data.values()
-        )
-        total_households = sum(
-            w.get("total_households", 0) for w in latest_data.values()
-        )
-
-        # Find ward with highest/lowest population
-        max_pop_ward = max(
-            latest_data.values(), key=lambda x: x.get("total_population", 0), default={}
-        )
-        min_pop_ward = min(
-            latest_data.values(), key=lambda x: x.get("total_population", 0), default={}
-        )
-
-        # Find ward with highest/lowest density
-        max_density_ward = max(
-            latest_data.values(),
-            key=lambda x: x.get("population_density", 0),
-            default={},
-        )
-        min_density_ward = min(
-            latest_data.values(),
-            key=lambda x: x.get("population_density", 0),
-            default={},
+        totals = {
+            metric: int(np.nan_to_num(series.totals(metric)[-1]))
+            for metric in ("total_population", "total_households")
+        }
+        total_male = int(np.nan_to_num(series.totals("male_population")[-1]))
+        total_female = int(np.nan_to_num(series.totals("female_population")[-1]))
+
+        # Find ward with highest/lowest population and density
+        present = series.observed[-1]
+        populations = np.nan_to_num(series.at_year("total_population"))
+        densities = np.rint(self._ratio(series, "total_population", "area_sq_km")[-1])
+        max_pop, min_pop = series.extremes(np.where(present, populations, np.nan))
+        max_density, min_density = series.extremes(
+            np.where(present, densities, np.nan)
         )
 
-        # Calculate average household size
-        total_avg_household_size = 0
-        ward_count = 0
-        for ward in latest_data.values():
-            if ward.get("average_household_size", 0) > 0:
-                total_avg_household_size += ward.get("average_household_size", 0)
-                ward_count += 1
-
+        # Calculate average household size over wards reporting one
+        household_sizes = series.at_year("average_household_size")
+        household_sizes = household_sizes[household_sizes > 0]
         overall_avg_household_size = (
-            total_avg_household_size / ward_count if ward_count > 0 else 0
+            float(household_sizes.mean()) if household_sizes.size else 0
         )
 
-        # Gender distribution
-        total_male = sum(w.get("male_population", 0) for w in latest_data.values())
-        total_female = sum(w.get("female_population", 0) for w in latest_data.values())
-        overall_sex_ratio = (total_male / total_female * 100) if total_female > 0 else 0
+        # Municipality-wide growth between the two latest years and over the period
+        population_totals = series.totals("total_population")
+        growth_rates = series.total_growth_rates("total_population")
+        population_growth_rate = (
+            float(growth_rates[-1])
+            if growth_rates.size and np.isfinite(growth_rates[-1])
+            else None
+        )
+        period = int(series.years[-1] - series.years[0])
+        population_cagr = None
+        if period > 0 and population_totals[0] > 0:
+            population_cagr = float(
+                ((population_totals[-1] / population_totals[0]) ** (1 / period) - 1)
+                * 100
+            )
 
         return {
-            "total_population": total_population,
-            "total_households": total_households,
+            "total_population": totals["total_population"],
+            "total_households": totals["total_households"],
             "overall_avg_household_size": overall_avg_household_size,
             "total_male": total_male,
             "total_female": total_female,
-            "overall_sex_ratio": overall_sex_ratio,
-            "max_pop_ward": max_pop_ward,
-            "min_pop_ward": min_pop_ward,
-            "max_density_ward": max_density_ward,
-            "min_density_ward": min_density_ward,
+            "overall_sex_ratio": (
+                (total_male / total_female * 100) if total_female > 0 else 0
+            ),
+            "max_pop_ward": latest_data.get(max_pop, {}),
+            "min_pop_ward": latest_data.get(min_pop, {}),
+            "max_density_ward": latest_data.get(max_density, {}),
+            "min_density_ward": latest_data.get(min_density, {}),
             "ward_count": len(latest_data),
+            "population_growth_rate": population_growth_rate,
+            "population_cagr": population_cagr,
         }
 
     def generate_report_content(self, data):
@@ -500,26 +545,14 @@ class WardHouseholdProcessor(BaseDemographicsProcessor, SimpleChartProcessor):
                 )
 
             # Growth and development trends (if time series data available)
-            time_series_data = data.get("time_series_data", {})
             comparison_years = data.get("comparison_years", [])
-            if len(comparison_years) >= 2:
+            growth_rate = summary_stats.get("population_growth_rate")
+            if len(comparison_years) >= 2 and growth_rate is not None:
                 latest_year = comparison_years[0]
                 previous_year = comparison_years[1]
-                latest_total = sum(
-                    w.get("total_population", 0)
-                    for w in time_series_data.get(latest_year, {}).values()
-                )
-                previous_total = sum(
-                    w.get("total_population", 0)
-                    for w in time_series_data.get(previous_year, {}).values()
+                analysis_parts.append(
+                    f"वर्ष {format_nepali_number(previous_year)} देखि {format_nepali_number(latest_year)} सम्म जनसंख्या वृद्धि दर {format_nepali_number(round(growth_rate, 2))}% रहेको छ।"
                 )
-                if previous_total > 0:
-                    growth_rate = (
-                        (latest_total - previous_total) / previous_total
-                    ) * 100
-                    analysis_parts.append(
-                        f"वर्ष {format_nepali_number(previous_year)} देखि {format_nepali_number(latest_year)} सम्म जनसंख्या वृद्धि दर {format_nepali_number(round(growth_rate, 2))}% रहेको छ।"
-                    )
 
             analysis_parts.append(
                 f"समग्रमा, गढवा गाउँपालिकाको वडागत घरपरिवार र जनसंख्या संरचनाले स्थानीय विकास, सेवा प्रवाह र योजना निर्माणमा महत्वपूर्ण आधार प्रदान गर्दछ। विस्तृत विवरण तलको तालिका र चित्रमा प्रस्तुत गरिएको छ।"
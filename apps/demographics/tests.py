@@ -0,0 +1,257 @@
+"""
+Demographics Tests
+
+Tests for the cohort-component population projection, chart inputs and report
+view models.
+"""
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from apps.demographics.models import (
+    WardAgeWisePopulation,
+    WardWiseFemalePropertyOwnership,
+)
+from apps.demographics.processors.female_property_ownership import (
+    FemalePropertyOwnershipProcessor,
+)
+from apps.demographics.utils.chart_series import ChartMatrix, ChartSeries
+from apps.demographics.utils.death_pyramid_generator import DeathPyramidGenerator
+from apps.demographics.utils.population_pyramid_generator import (
+    PopulationPyramidGenerator,
+)
+from apps.demographics.utils.projection import (
+    AGE_GROUPS,
+    FEMALE,
+    GENDERS,
+    Scenario,
+    get_population_projection,
+    project,
+)
+from apps.demographics.utils.svg_chart_generator import SVGChartGenerator
+
+
+class PopulationProjectionTestCase(SimpleTestCase):
+    """Test the projection engine"""
+
+    def setUp(self):
+        # Two wards, 100 people in every age group and gender
+        self.population = np.full((2, len(AGE_GROUPS), len(GENDERS)), 100.0)
+        self.no_deaths = np.zeros((len(AGE_GROUPS), len(GENDERS)))
+
+    def test_cohorts_age_without_births_or_deaths(self):
+        """Cohorts move up one age group per five-year step"""
+        scenario = Scenario("still", total_fertility_rate=0, mortality_multiplier=0)
+        result = project(self.population, self.no_deaths, [scenario], (5,))[5][0]
+
+        self.assertTrue(np.allclose(result[:, 0], 0))
+        self.assertTrue(np.allclose(result[:, 1:-1], 100))
+        # The open 75+ group keeps its members and gains the 70-74 cohort
+        self.assertTrue(np.allclose(result[:, -1], 200))
+
+    def test_scenarios_are_projected_together(self):
+        scenarios = [
+            Scenario("low", total_fertility_rate=1.5),
+            Scenario("high", total_fertility_rate=3.0),
+            Scenario("out", total_fertility_rate=1.5, net_migration_rate=-0.02),
+        ]
+        results = project(self.population, self.no_deaths, scenarios, (5, 10))
+
+        self.assertEqual(sorted(results), [5, 10])
+        self.assertEqual(results[10].shape, (3,) + self.population.shape)
+        totals = results[10].sum(axis=(1, 2, 3))
+        self.assertGreater(totals[1], totals[0])
+        self.assertGreater(totals[0], totals[2])
+        # Births are split between boys and girls only
+        self.assertTrue(np.allclose(results[5][:, :, 0, 2], 0))
+        self.assertTrue(np.all(results[5][:, :, 0, FEMALE] > 0))
+
+    def test_horizons_must_be_multiples_of_five(self):
+        with self.assertRaises(ValueError):
+            project(self.population, self.no_deaths, [Scenario("x")], (7,))
+
+
+class PopulationProjectionCacheTestCase(TestCase):
+    """Test projections of the stored ward data"""
+
+    def test_fingerprint_follows_data(self):
+        self.assertIsNone(get_population_projection())
+
+        WardAgeWisePopulation.objects.create(
+            ward_number=1, age_group="AGE_20_24", gender="FEMALE", population=50
+        )
+        first = get_population_projection(horizons=(5,))
+        self.assertEqual(first["base_population"], 50)
+        self.assertEqual(list(first["scenarios"]), ["medium", "high", "low"])
+
+        WardAgeWisePopulation.objects.create(
+            ward_number=2, age_group="AGE_20_24", gender="MALE", population=50
+        )
+        second = get_population_projection(horizons=(5,))
+        self.assertNotEqual(first["fingerprint"], second["fingerprint"])
+        self.assertEqual(second["wards"], [1, 2])
+
+
+class ChartSeriesTestCase(SimpleTestCase):
+    """Test the typed chart inputs"""
+
+    def test_series_keeps_positive_entries(self):
+        series = ChartSeries.from_mapping(
+            {
+                "HINDU": {"name_nepali": "हिन्दु", "population": 5},
+                "BUDDHIST": {"name_nepali": "बौद्ध", "population": 0},
+                "OTHER": 3,
+                "UNKNOWN": {"population": None},
+            }
+        )
+
+        self.assertEqual(series.keys, ["HINDU", "OTHER"])
+        self.assertEqual(series.names, ["हिन्दु", "OTHER"])
+        self.assertEqual(list(series.values), [5.0, 3.0])
+
+    def test_series_value_fields(self):
+        series = ChartSeries.from_mapping(
+            {"FLUSH": {"population": 0, "households": 4}},
+            value_fields=("population", "households"),
+        )
+
+        self.assertEqual(list(series.values), [4.0])
+
+    def test_matrix_rows_and_columns(self):
+        matrix = ChartMatrix.from_ward_mapping(
+            {
+                10: {"demographics": {"b": {"population": 4, "name_nepali": "ख"}}},
+                2: {
+                    "ward_name": "वडा नं. २",
+                    "total_population": 9,
+                    "a": {"population": 5},
+                    "c": {"population": 0},
+                },
+            }
+        )
+
+        self.assertEqual(matrix.rows, ["2", "10"])
+        self.assertEqual(matrix.columns, ["a", "b", "c"])
+        self.assertEqual(matrix.names, [None, "ख", None])
+        self.assertEqual(list(matrix.row(0)), [5.0, 0.0, 0.0])
+        self.assertEqual(matrix.row_totals(), [5.0, 4.0])
+
+        active = matrix.active()
+        self.assertEqual(active.columns, ["a", "b"])
+        self.assertEqual(list(active.values), [5.0, 0.0, 0.0, 4.0])
+
+    def test_generators_accept_dicts_and_series_alike(self):
+        generator = SVGChartGenerator()
+        pie_data = {
+            "MALE": {"name_nepali": "पुरुष", "population": 12},
+            "FEMALE": {"name_nepali": "महिला", "population": 10},
+        }
+        ward_data = {
+            ward: {"demographics": pie_data, "total_population": 22}
+            for ward in ("1", "2")
+        }
+
+        self.assertEqual(
+            generator.generate_pie_chart_svg(ChartSeries.from_mapping(pie_data)),
+            generator.generate_pie_chart_svg(pie_data),
+        )
+        self.assertEqual(
+            generator.generate_bar_chart_svg(ChartMatrix.from_ward_mapping(ward_data)),
+            generator.generate_bar_chart_svg(ward_data),
+        )
+        svg = generator.generate_pie_chart_svg(pie_data)
+        self.assertIn("पुरुष (१२)", svg)
+        self.assertIsNone(generator.generate_bar_chart_svg({"1": {"a": 0}}))
+
+
+class PyramidGridTestCase(SimpleTestCase):
+    """Test the per-ward small-multiple pyramids"""
+
+    def ward(self, scale):
+        return {
+            age_group: {"male": scale * (i + 1), "female": scale * (i + 2)}
+            for i, age_group in enumerate(PopulationPyramidGenerator.age_groups_ordered)
+        }
+
+    def test_grid_shares_defs_and_scale(self):
+        generator = PopulationPyramidGenerator()
+        panels = [("वडा नं. १", self.ward(1)), ("वडा नं. २", self.ward(2))]
+        svg = generator.generate_pyramid_grid_svg(
+            panels, overview=("नगरपालिका", self.ward(10))
+        )
+
+        self.assertEqual(svg.count("<defs>"), 1)
+        self.assertEqual(svg.count("@import"), 1)
+        self.assertEqual(svg.count('href="#pyramid-grid"'), 2)
+        self.assertEqual(svg.count('href="#pyramid-axis"'), 2)
+        self.assertEqual(svg.count("translate("), 3)
+        # Ward 2's largest bar spans the shared scale, the overview its own
+        self.assertIn('width="280.0"', svg)
+        self.assertEqual(svg.count("<svg"), 1)
+
+    def test_fingerprint_follows_ward_data(self):
+        generator = PopulationPyramidGenerator()
+        panels = [("वडा नं. १", self.ward(1))]
+        changed = [("वडा नं. १", self.ward(2))]
+
+        self.assertEqual(
+            generator.pyramid_fingerprint(panels),
+            generator.pyramid_fingerprint([("वडा नं. १", self.ward(1))]),
+        )
+        self.assertNotEqual(
+            generator.pyramid_fingerprint(panels),
+            generator.pyramid_fingerprint(changed),
+        )
+
+    def test_death_pyramid_keeps_plain_bars(self):
+        svg = DeathPyramidGenerator().generate_pyramid_svg(
+            {"AGE_BELOW_15": {"MALE": 3, "FEMALE": 1}}
+        )
+
+        self.assertIn("१५ वर्ष मुनि", svg)
+        self.assertEqual(svg.count('opacity="0.85"'), 2)
+        self.assertNotIn('fill="white"', svg)
+
+
+class FemalePropertyOwnershipViewModelTestCase(TestCase):
+    """Test the pre-formatted female property ownership tables"""
+
+    def test_rows_are_localized_with_ownership_rates(self):
+        populations = {
+            "HOUSE_ONLY": 12,
+            "LAND_ONLY": 0,
+            "BOTH_HOUSE_AND_LAND": 1,
+            "NEITHER_HOUSE_NOR_LAND": 7,
+        }
+        for ward in (2, 1):
+            WardWiseFemalePropertyOwnership.objects.bulk_create(
+                WardWiseFemalePropertyOwnership(
+                    ward_number=ward,
+                    property_type=property_type,
+                    count=population,
+                    population=population,
+                )
+                for property_type, population in populations.items()
+            )
+
+        processor = FemalePropertyOwnershipProcessor()
+        view_model = processor.build_view_model(processor.get_data())
+
+        # Empty property types are left out of the summary
+        self.assertEqual(
+            [row[:2] for row in view_model["summary_rows"]],
+            [
+                ("घर मात्र", "२४"),
+                ("घर र जग्गा दुवै", "२"),
+                ("घर र जग्गा कुनै पनि छैन", "१४"),
+            ],
+        )
+        self.assertEqual(view_model["summary_rows"][0][2], "६०.०")
+        self.assertEqual(view_model["total_population"], "४०")
+        self.assertEqual(
+            view_model["ward_rows"][0], ("१", "१२", "०", "१", "७", "२०", "६५.०")
+        )
+        self.assertEqual([row[0] for row in view_model["ward_rows"]], ["१", "२"])
+        self.assertEqual(
+            view_model["ward_totals"], ("२४", "०", "२", "१४", "४०", "६५.०")
+        )
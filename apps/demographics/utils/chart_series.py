@@ -0,0 +1,197 @@
+"""
+Chart Series
+
+Typed, columnar inputs for ``SVGChartGenerator``:
+
+- ``ChartSeries``: one value per item (pie charts), as parallel ``keys``,
+  ``names`` and ``colors`` lists and an ``array("d")`` of values
+- ``ChartMatrix``: one value per ward and category (stacked bar charts), as
+  ``rows`` (wards), ``columns`` (categories) and a row-major ``array("d")``
+
+Processors build them once from their data; the generators read the arrays
+directly instead of probing nested dicts for every slice and bar segment.
+The ``from_mapping()`` / ``from_ward_mapping()`` constructors accept the
+legacy ``{key: {"name_nepali": ..., "population": ...}}`` shapes, so
+generators still take plain dicts from processors not converted yet.
+"""
+
+from array import array
+from numbers import Real
+
+# Keys of a ward entry describing the ward rather than a category
+WARD_FIELDS = ("ward_name", "total_population")
+
+
+def cell_value(value, fields=("population",)):
+    """Numeric value of a data entry: a number or a dict holding ``fields``
+
+    The first non-zero field wins. Missing or non-numeric values count as 0.
+    """
+    if isinstance(value, dict):
+        for field in fields:
+            number = value.get(field)
+            if isinstance(number, Real) and not isinstance(number, bool) and number:
+                return float(number)
+        return 0.0
+    if isinstance(value, Real) and not isinstance(value, bool):
+        return float(value)
+    return 0.0
+
+
+def as_number(value):
+    """``value`` as an int when it is whole, for display"""
+    return int(value) if float(value).is_integer() else value
+
+
+def _ward_sort_key(ward):
+    return int(ward) if ward.isdigit() else float("inf")
+
+
+class ChartSeries:
+    """Labelled values of a single-series chart"""
+
+    __slots__ = ("keys", "names", "values", "colors")
+
+    def __init__(self, keys=(), names=(), values=(), colors=None):
+        """
+        Args:
+            keys: Item keys (color lookup, fallback labels)
+            names: Nepali display names, None to show the key
+            values: Item values
+            colors: Item colors; None for the generator's palette
+        """
+        self.keys = list(keys)
+        self.names = list(names) or [None] * len(self.keys)
+        self.values = array("d", values)
+        self.colors = list(colors) if colors is not None else None
+
+    @classmethod
+    def from_mapping(cls, data, value_fields=("population",)):
+        """Series of the positive entries of ``{key: number or dict}``"""
+        series = cls()
+        for key, value in (data or {}).items():
+            number = cell_value(value, value_fields)
+            if number > 0:
+                name = value.get("name_nepali") if isinstance(value, dict) else None
+                series.append(key, number, name or str(key))
+        return series
+
+    @classmethod
+    def coerce(cls, data):
+        return data if isinstance(data, cls) else cls.from_mapping(data)
+
+    def append(self, key, value, name=None):
+        self.keys.append(key)
+        self.names.append(name)
+        self.values.append(value)
+
+    def total(self):
+        return sum(self.values)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __repr__(self):
+        return f"<ChartSeries {dict(zip(self.keys, self.values))}>"
+
+
+class ChartMatrix:
+    """Values by ward (row) and category (column) of a stacked bar chart"""
+
+    __slots__ = ("rows", "columns", "names", "values", "colors")
+
+    def __init__(self, rows=(), columns=(), names=(), values=None, colors=None):
+        """
+        Args:
+            rows: Ward numbers as strings
+            columns: Category keys
+            names: Nepali category names, None to show the key
+            values: Row-major values, ``len(rows) * len(columns)`` of them
+            colors: Category colors; None for the generator's palette
+        """
+        self.rows = list(rows)
+        self.columns = list(columns)
+        self.names = list(names) or [None] * len(self.columns)
+        if values is None:
+            values = [0.0] * (len(self.rows) * len(self.columns))
+        self.values = array("d", values)
+        self.colors = list(colors) if colors is not None else None
+
+    @classmethod
+    def from_ward_mapping(cls, ward_data, value_fields=("population",)):
+        """Matrix of ``{ward: {category: number or dict}}``
+
+        A ward entry may hold its categories under ``"demographics"``; other
+        entries are categories except ``WARD_FIELDS``. Rows are sorted by
+        ward number and columns by key. Category names come from the first
+        ward listing the category.
+        """
+        cells = {}
+        names = {}
+        for ward, ward_info in (ward_data or {}).items():
+            row = str(int(ward)) if isinstance(ward, Real) else str(ward)
+            row_cells = cells.setdefault(row, {})
+            if not isinstance(ward_info, dict):
+                continue
+            breakdown = ward_info.get("demographics")
+            if breakdown is None:
+                breakdown = {
+                    key: value
+                    for key, value in ward_info.items()
+                    if key not in WARD_FIELDS
+                }
+            for category, value in breakdown.items():
+                column = str(category)
+                row_cells[column] = cell_value(value, value_fields)
+                if column not in names:
+                    names[column] = (
+                        value.get("name_nepali") if isinstance(value, dict) else None
+                    )
+
+        rows = sorted(cells, key=_ward_sort_key)
+        columns = sorted(names)
+        matrix = cls(rows, columns, [names[column] for column in columns])
+        width = len(columns)
+        for i, row in enumerate(rows):
+            for j, column in enumerate(columns):
+                matrix.values[i * width + j] = cells[row].get(column, 0.0)
+        return matrix
+
+    @classmethod
+    def coerce(cls, data):
+        return data if isinstance(data, cls) else cls.from_ward_mapping(data)
+
+    def row(self, index):
+        width = len(self.columns)
+        return self.values[index * width : (index + 1) * width]
+
+    def row_totals(self):
+        return [sum(self.row(i)) for i in range(len(self.rows))]
+
+    def column_totals(self):
+        width = len(self.columns)
+        return [sum(self.values[j::width]) for j in range(width)]
+
+    def active(self):
+        """Matrix of the columns with a positive total"""
+        keep = [j for j, total in enumerate(self.column_totals()) if total > 0]
+        if len(keep) == len(self.columns):
+            return self
+        width = len(self.columns)
+        values = array(
+            "d",
+            (self.values[i * width + j] for i in range(len(self.rows)) for j in keep),
+        )
+        return ChartMatrix(
+            self.rows,
+            [self.columns[j] for j in keep],
+            [self.names[j] for j in keep],
+            values,
+            [self.colors[j] for j in keep] if self.colors is not None else None,
+        )
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"<ChartMatrix {len(self.rows)}x{len(self.columns)}>"
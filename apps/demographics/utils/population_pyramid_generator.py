@@ -4,15 +4,72 @@ Population Pyramid Generator
 This module generates beautiful population pyramid charts for age-gender demographic data.
 """
 
+import hashlib
+import json
 import xml.etree.ElementTree as ET
 from pathlib import Path
 import subprocess
 import os
 
+from apps.core.singleflight import atomic_path, atomic_write
+
+# Small-multiple (per ward) pyramid grid
+GRID_COLUMNS = 3
+GRID_PANEL_WIDTH = 800
+GRID_PANEL_HEIGHT = 560
+
+
+class PyramidLayout:
+    """Plot area of a pyramid: margins, center line and age group rows"""
+
+    margin_top = 80
+    margin_bottom = 60
+    margin_left = 100
+    margin_right = 100
+
+    def __init__(self, width, height, rows):
+        self.chart_width = width - self.margin_left - self.margin_right
+        self.chart_height = height - self.margin_top - self.margin_bottom
+        # Center line position
+        self.center_x = self.margin_left + self.chart_width / 2
+        self.row_height = self.chart_height / rows
+        self.bar_height = self.row_height - 4
+
+    def row_y(self, index):
+        return self.margin_top + index * self.row_height
+
+    def scale_factor(self, max_population):
+        """Bar width per person (half of chart width for each side)"""
+        return (
+            (self.chart_width / 2 - 20) / max_population if max_population > 0 else 1
+        )
+
 
 class PopulationPyramidGenerator:
     """Generates population pyramid SVG charts"""
 
+    # Age groups from oldest to youngest (top to bottom)
+    age_groups_ordered = (
+        "AGE_75_AND_ABOVE",
+        "AGE_70_74",
+        "AGE_65_69",
+        "AGE_60_64",
+        "AGE_55_59",
+        "AGE_50_54",
+        "AGE_45_49",
+        "AGE_40_44",
+        "AGE_35_39",
+        "AGE_30_34",
+        "AGE_25_29",
+        "AGE_20_24",
+        "AGE_15_19",
+        "AGE_10_14",
+        "AGE_5_9",
+        "AGE_0_4",
+    )
+    male_key = "male"
+    female_key = "female"
+
     def __init__(self):
         self.font_family = "Noto Sans Devanagari, Arial, sans-serif"
         self.font_size_title = 20
@@ -62,12 +119,8 @@ class PopulationPyramidGenerator:
         }
         return age_group_labels.get(age_group_code, age_group_code)
 
-    def generate_pyramid_svg(
-        self, age_gender_data, width=1200, height=800, title_nepali="", title_english=""
-    ):
-        """Generate a beautiful population pyramid SVG"""
-
-        # Create SVG element
+    def _create_svg(self, width, height):
+        """SVG root with the pyramid stylesheet; returns (svg, defs)"""
         svg = ET.Element(
             "svg",
             {
@@ -87,96 +140,142 @@ class PopulationPyramidGenerator:
         .pyramid-label { font-family: 'Noto Sans Devanagari', Arial, sans-serif; font-weight: 400; }
         .pyramid-axis { font-family: 'Noto Sans Devanagari', Arial, sans-serif; font-weight: 400; }
         """
+        return svg, defs
 
-        # Calculate dimensions and margins
-        margin_top = 80
-        margin_bottom = 60
-        margin_left = 100
-        margin_right = 100
-        chart_width = width - margin_left - margin_right
-        chart_height = height - margin_top - margin_bottom
-
-        # Center line position
-        center_x = margin_left + chart_width / 2
-
-        # Order age groups from oldest to youngest (top to bottom)
-        age_groups_ordered = [
-            "AGE_75_AND_ABOVE",
-            "AGE_70_74",
-            "AGE_65_69",
-            "AGE_60_64",
-            "AGE_55_59",
-            "AGE_50_54",
-            "AGE_45_49",
-            "AGE_40_44",
-            "AGE_35_39",
-            "AGE_30_34",
-            "AGE_25_29",
-            "AGE_20_24",
-            "AGE_15_19",
-            "AGE_10_14",
-            "AGE_5_9",
-            "AGE_0_4",
-        ]
-
-        # Find maximum population for scaling
+    def get_max_population(self, age_gender_data):
+        """Largest male or female count of any age group"""
         max_population = 0
-        for age_group in age_groups_ordered:
+        for age_group in self.age_groups_ordered:
             if age_group in age_gender_data:
-                male_pop = age_gender_data[age_group]["male"]
-                female_pop = age_gender_data[age_group]["female"]
+                male_pop = age_gender_data[age_group][self.male_key]
+                female_pop = age_gender_data[age_group][self.female_key]
                 max_population = max(max_population, male_pop, female_pop)
+        return max_population
+
+    def generate_pyramid_svg(
+        self, age_gender_data, width=1200, height=800, title_nepali="", title_english=""
+    ):
+        """Generate a beautiful population pyramid SVG"""
+        svg, _ = self._create_svg(width, height)
+        layout = PyramidLayout(width, height, len(self.age_groups_ordered))
+        max_population = self.get_max_population(age_gender_data)
+        scale_factor = layout.scale_factor(max_population)
+
+        self._draw_grid(svg, layout)
+        self._draw_bars(svg, layout, age_gender_data, scale_factor)
+        self._draw_axis(svg, layout, max_population, scale_factor)
+        self._draw_legend(svg, width)
 
-        # Scale factor for bar width (half of chart width for each side)
-        scale_factor = (
-            (chart_width / 2 - 20) / max_population if max_population > 0 else 1
+        # Convert to string
+        return ET.tostring(svg, encoding="unicode", method="xml")
+
+    def generate_pyramid_grid_svg(
+        self,
+        panels,
+        overview=None,
+        columns=GRID_COLUMNS,
+        panel_width=GRID_PANEL_WIDTH,
+        panel_height=GRID_PANEL_HEIGHT,
+    ):
+        """Small-multiple pyramids in one SVG, e.g. one per ward
+
+        Args:
+            panels: (title, age_gender_data) of each pyramid, in reading order
+            overview: (title, age_gender_data) of a first pyramid with its own
+                scale, e.g. the whole municipality
+
+        The panels share one scale, so their grid lines, age labels and axis
+        are identical: they are defined once under ``<defs>`` and placed in
+        every panel with ``<use>``, which only adds its bars and title.
+        """
+        cells = len(panels) + (1 if overview else 0)
+        rows = max(1, -(-cells // columns))
+        width = columns * panel_width
+        svg, defs = self._create_svg(width, rows * panel_height)
+        layout = PyramidLayout(panel_width, panel_height, len(self.age_groups_ordered))
+
+        max_population = max(
+            (self.get_max_population(data) for _, data in panels), default=0
+        )
+        scale_factor = layout.scale_factor(max_population)
+        self._draw_grid(ET.SubElement(defs, "g", {"id": "pyramid-grid"}), layout)
+        self._draw_axis(
+            ET.SubElement(defs, "g", {"id": "pyramid-axis"}),
+            layout,
+            max_population,
+            scale_factor,
         )
 
-        # Bar height
-        bar_height = chart_height / len(age_groups_ordered) - 4
-
-        # Add title
-        # if title_nepali:
-        #     title_element = ET.SubElement(
-        #         svg,
-        #         "text",
-        #         {
-        #             "x": str(width / 2),
-        #             "y": "40",
-        #             "text-anchor": "middle",
-        #             "class": "pyramid-title",
-        #             "font-size": str(self.font_size_title),
-        #             "fill": self.text_color,
-        #         },
-        #     )
-        #     title_element.text = title_nepali
+        def add_panel(index, title):
+            x = (index % columns) * panel_width
+            y = (index // columns) * panel_height
+            panel = ET.SubElement(svg, "g", {"transform": f"translate({x},{y})"})
+            title_text = ET.SubElement(
+                panel,
+                "text",
+                {
+                    "x": str(panel_width / 2),
+                    "y": "45",
+                    "text-anchor": "middle",
+                    "class": "pyramid-title",
+                    "font-size": str(self.font_size_labels + 2),
+                    "fill": self.text_color,
+                },
+            )
+            title_text.text = title
+            return panel
+
+        index = 0
+        if overview:
+            title, data = overview
+            panel = add_panel(index, title)
+            overview_max = self.get_max_population(data)
+            overview_scale = layout.scale_factor(overview_max)
+            self._draw_grid(panel, layout)
+            self._draw_bars(panel, layout, data, overview_scale)
+            self._draw_axis(panel, layout, overview_max, overview_scale)
+            index += 1
+
+        for title, data in panels:
+            panel = add_panel(index, title)
+            ET.SubElement(panel, "use", {"href": "#pyramid-grid"})
+            self._draw_bars(panel, layout, data, scale_factor)
+            ET.SubElement(panel, "use", {"href": "#pyramid-axis"})
+            index += 1
+
+        self._draw_legend(svg, width)
+        return ET.tostring(svg, encoding="unicode", method="xml")
+
+    def _draw_grid(self, parent, layout):
+        """Center line, horizontal grid lines and age group labels"""
+        center_x = layout.center_x
 
         # Add center line
-        center_line = ET.SubElement(
-            svg,
+        ET.SubElement(
+            parent,
             "line",
             {
                 "x1": str(center_x),
-                "y1": str(margin_top),
+                "y1": str(layout.margin_top),
                 "x2": str(center_x),
-                "y2": str(margin_top + chart_height),
+                "y2": str(layout.margin_top + layout.chart_height),
                 "stroke": self.text_color,
                 "stroke-width": "2",
             },
         )
 
         # Add horizontal grid lines and age group labels
-        for i, age_group in enumerate(age_groups_ordered):
-            y_pos = margin_top + i * (chart_height / len(age_groups_ordered))
+        for i, age_group in enumerate(self.age_groups_ordered):
+            y_pos = layout.row_y(i)
 
             # Grid line
-            grid_line = ET.SubElement(
-                svg,
+            ET.SubElement(
+                parent,
                 "line",
                 {
-                    "x1": str(margin_left),
+                    "x1": str(layout.margin_left),
                     "y1": str(y_pos),
-                    "x2": str(margin_left + chart_width),
+                    "x2": str(layout.margin_left + layout.chart_width),
                     "y2": str(y_pos),
                     "stroke": self.grid_color,
                     "stroke-width": "1",
@@ -185,10 +284,10 @@ class PopulationPyramidGenerator:
 
             # Age group label in center (main, as before)
             age_label = self._get_age_group_label(age_group)
-            text_y = y_pos + bar_height / 2 + 5
+            text_y = y_pos + layout.bar_height / 2 + 5
 
             age_text = ET.SubElement(
-                svg,
+                parent,
                 "text",
                 {
                     "x": str(center_x),
@@ -204,10 +303,10 @@ class PopulationPyramidGenerator:
 
             # Add y-axis label on the left side for each age group
             age_text_left = ET.SubElement(
-                svg,
+                parent,
                 "text",
                 {
-                    "x": str(margin_left - 10),
+                    "x": str(layout.margin_left - 10),
                     "y": str(text_y),
                     "text-anchor": "end",
                     "class": "pyramid-label",
@@ -217,83 +316,84 @@ class PopulationPyramidGenerator:
             )
             age_text_left.text = age_label
 
-        # Add bars for each age group
-        for i, age_group in enumerate(age_groups_ordered):
+    def _draw_bars(self, parent, layout, age_gender_data, scale_factor):
+        """Male (left) and female (right) bars of each age group"""
+        center_x = layout.center_x
+        for i, age_group in enumerate(self.age_groups_ordered):
             if age_group not in age_gender_data:
                 continue
 
-            y_pos = margin_top + i * (chart_height / len(age_groups_ordered)) + 2
+            y_pos = layout.row_y(i) + 2
 
-            male_pop = age_gender_data[age_group]["male"]
-            female_pop = age_gender_data[age_group]["female"]
+            male_pop = age_gender_data[age_group][self.male_key]
+            female_pop = age_gender_data[age_group][self.female_key]
 
             # Male bar (left side)
             if male_pop > 0:
                 male_width = male_pop * scale_factor
-                male_rect = ET.SubElement(
-                    svg,
-                    "rect",
-                    {
-                        "x": str(center_x - male_width),
-                        "y": str(y_pos),
-                        "width": str(male_width),
-                        "height": str(bar_height),
-                        "fill": self.male_color,
-                        "stroke": "#2980b9",
-                        "stroke-width": "1",
-                    },
+                self._draw_bar(
+                    parent,
+                    center_x - male_width,
+                    y_pos,
+                    male_width,
+                    layout.bar_height,
+                    self.male_color,
+                    "#2980b9",
+                    center_x - male_width / 2,
+                    male_pop,
                 )
 
-                # Male population label
-                if male_width > 30:  # Only show label if bar is wide enough
-                    male_text = ET.SubElement(
-                        svg,
-                        "text",
-                        {
-                            "x": str(center_x - male_width / 2),
-                            "y": str(y_pos + bar_height / 2 + 4),
-                            "text-anchor": "middle",
-                            "class": "pyramid-label",
-                            "font-size": str(self.font_size_axis),
-                            "fill": "white",
-                            "font-weight": "bold",
-                        },
-                    )
-                    male_text.text = self._convert_number_to_nepali(male_pop)
-
             # Female bar (right side)
             if female_pop > 0:
                 female_width = female_pop * scale_factor
-                female_rect = ET.SubElement(
-                    svg,
-                    "rect",
-                    {
-                        "x": str(center_x),
-                        "y": str(y_pos),
-                        "width": str(female_width),
-                        "height": str(bar_height),
-                        "fill": self.female_color,
-                        "stroke": "#c0392b",
-                        "stroke-width": "1",
-                    },
+                self._draw_bar(
+                    parent,
+                    center_x,
+                    y_pos,
+                    female_width,
+                    layout.bar_height,
+                    self.female_color,
+                    "#c0392b",
+                    center_x + female_width / 2,
+                    female_pop,
                 )
 
-                # Female population label
-                if female_width > 30:  # Only show label if bar is wide enough
-                    female_text = ET.SubElement(
-                        svg,
-                        "text",
-                        {
-                            "x": str(center_x + female_width / 2),
-                            "y": str(y_pos + bar_height / 2 + 4),
-                            "text-anchor": "middle",
-                            "class": "pyramid-label",
-                            "font-size": str(self.font_size_axis),
-                            "fill": "white",
-                            "font-weight": "bold",
-                        },
-                    )
-                    female_text.text = self._convert_number_to_nepali(female_pop)
+    def _draw_bar(self, parent, x, y, width, height, fill, stroke, label_x, value):
+        ET.SubElement(
+            parent,
+            "rect",
+            {
+                "x": str(x),
+                "y": str(y),
+                "width": str(width),
+                "height": str(height),
+                "fill": fill,
+                "stroke": stroke,
+                "stroke-width": "1",
+            },
+        )
+
+        # Population label
+        if width > 30:  # Only show label if bar is wide enough
+            text = ET.SubElement(
+                parent,
+                "text",
+                {
+                    "x": str(label_x),
+                    "y": str(y + height / 2 + 4),
+                    "text-anchor": "middle",
+                    "class": "pyramid-label",
+                    "font-size": str(self.font_size_axis),
+                    "fill": "white",
+                    "font-weight": "bold",
+                },
+            )
+            text.text = self._convert_number_to_nepali(value)
+
+    def _draw_axis(self, parent, layout, max_population, scale_factor):
+        """Scale labels and ticks on the x-axis and the gender labels"""
+        center_x = layout.center_x
+        axis_y = layout.margin_top + layout.chart_height
 
         # Add scale labels on x-axis
         scale_steps = 5
@@ -304,11 +404,11 @@ class PopulationPyramidGenerator:
             # Left side (male) scale
             scale_x_left = center_x - scale_width
             scale_text_left = ET.SubElement(
-                svg,
+                parent,
                 "text",
                 {
                     "x": str(scale_x_left),
-                    "y": str(margin_top + chart_height + 25),
+                    "y": str(axis_y + 25),
                     "text-anchor": "middle",
                     "class": "pyramid-axis",
                     "font-size": str(self.font_size_axis),
@@ -318,14 +418,14 @@ class PopulationPyramidGenerator:
             scale_text_left.text = self._convert_number_to_nepali(scale_value)
 
             # Scale tick
-            tick_left = ET.SubElement(
-                svg,
+            ET.SubElement(
+                parent,
                 "line",
                 {
                     "x1": str(scale_x_left),
-                    "y1": str(margin_top + chart_height),
+                    "y1": str(axis_y),
                     "x2": str(scale_x_left),
-                    "y2": str(margin_top + chart_height + 5),
+                    "y2": str(axis_y + 5),
                     "stroke": self.text_color,
                     "stroke-width": "1",
                 },
@@ -335,11 +435,11 @@ class PopulationPyramidGenerator:
             if i > 0:  # Skip 0 for right side to avoid duplication
                 scale_x_right = center_x + scale_width
                 scale_text_right = ET.SubElement(
-                    svg,
+                    parent,
                     "text",
                     {
                         "x": str(scale_x_right),
-                        "y": str(margin_top + chart_height + 25),
+                        "y": str(axis_y + 25),
                         "text-anchor": "middle",
                         "class": "pyramid-axis",
                         "font-size": str(self.font_size_axis),
@@ -349,14 +449,14 @@ class PopulationPyramidGenerator:
                 scale_text_right.text = self._convert_number_to_nepali(scale_value)
 
                 # Scale tick
-                tick_right = ET.SubElement(
-                    svg,
+                ET.SubElement(
+                    parent,
                     "line",
                     {
                         "x1": str(scale_x_right),
-                        "y1": str(margin_top + chart_height),
+                        "y1": str(axis_y),
                         "x2": str(scale_x_right),
-                        "y2": str(margin_top + chart_height + 5),
+                        "y2": str(axis_y + 5),
                         "stroke": self.text_color,
                         "stroke-width": "1",
                     },
@@ -364,11 +464,11 @@ class PopulationPyramidGenerator:
 
         # Add gender labels
         male_label = ET.SubElement(
-            svg,
+            parent,
             "text",
             {
-                "x": str(center_x - chart_width / 4),
-                "y": str(margin_top + chart_height + 50),
+                "x": str(center_x - layout.chart_width / 4),
+                "y": str(axis_y + 50),
                 "text-anchor": "middle",
                 "class": "pyramid-label",
                 "font-size": str(self.font_size_labels),
@@ -379,11 +479,11 @@ class PopulationPyramidGenerator:
         male_label.text = "पुरुष"
 
         female_label = ET.SubElement(
-            svg,
+            parent,
             "text",
             {
-                "x": str(center_x + chart_width / 4),
-                "y": str(margin_top + chart_height + 50),
+                "x": str(center_x + layout.chart_width / 4),
+                "y": str(axis_y + 50),
                 "text-anchor": "middle",
                 "class": "pyramid-label",
                 "font-size": str(self.font_size_labels),
@@ -393,13 +493,13 @@ class PopulationPyramidGenerator:
         )
         female_label.text = "महिला"
 
-        # Add legend
+    def _draw_legend(self, parent, width):
         legend_y = 60
         legend_box_size = 15
 
         # Male legend
-        male_legend_rect = ET.SubElement(
-            svg,
+        ET.SubElement(
+            parent,
             "rect",
             {
                 "x": str(width - 200),
@@ -413,7 +513,7 @@ class PopulationPyramidGenerator:
         )
 
         male_legend_text = ET.SubElement(
-            svg,
+            parent,
             "text",
             {
                 "x": str(width - 200 + legend_box_size + 8),
@@ -426,8 +526,8 @@ class PopulationPyramidGenerator:
         male_legend_text.text = "पुरुष"
 
         # Female legend
-        female_legend_rect = ET.SubElement(
-            svg,
+        ET.SubElement(
+            parent,
             "rect",
             {
                 "x": str(width - 120),
@@ -441,7 +541,7 @@ class PopulationPyramidGenerator:
         )
 
         female_legend_text = ET.SubElement(
-            svg,
+            parent,
             "text",
             {
                 "x": str(width - 120 + legend_box_size + 8),
@@ -453,9 +553,6 @@ class PopulationPyramidGenerator:
         )
         female_legend_text.text = "महिला"
 
-        # Convert to string
-        return ET.tostring(svg, encoding="unicode", method="xml")
-
     def save_pyramid_to_file(
         self,
         age_gender_data,
@@ -473,7 +570,7 @@ class PopulationPyramidGenerator:
         filepath = Path(filename)
         filepath.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(filepath, "w", encoding="utf-8") as f:
+        with atomic_write(filepath) as f:
             f.write(svg_content)
 
         return filepath
@@ -485,15 +582,18 @@ class PopulationPyramidGenerator:
 
         try:
             # Use Inkscape to convert SVG to PNG
-            cmd = [
-                "inkscape",
-                "--export-type=png",
-                f"--export-filename={png_path}",
-                f"--export-dpi={dpi}",
-                str(svg_path),
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            # Export under a temporary name, renamed once complete
+            with atomic_path(png_path) as tmp_png:
+                cmd = [
+                    "inkscape",
+                    "--export-type=png",
+                    f"--export-filename={tmp_png}",
+                    f"--export-dpi={dpi}",
+                    str(svg_path),
+                ]
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+                if result.returncode != 0:
+                    tmp_png.unlink(missing_ok=True)
 
             if result.returncode == 0 and png_path.exists():
                 print(f"✅ Successfully converted {svg_path.name} to PNG")
@@ -512,22 +612,13 @@ class PopulationPyramidGenerator:
             print(f"❌ Error during SVG to PNG conversion: {e}")
             return None
 
-    def save_pyramid_to_png(
-        self,
-        age_gender_data,
-        filename,
-        width=1200,
-        height=800,
-        title_nepali="",
-        title_english="",
-        dpi=300,
-    ):
-        """Save population pyramid directly to PNG file"""
-        # First create SVG
-        svg_filename = Path(filename).with_suffix(".svg")
-        svg_path = self.save_pyramid_to_file(
-            age_gender_data, svg_filename, width, height, title_nepali, title_english
-        )
+    def save_svg_to_png(self, svg_content, filename, dpi=300):
+        """Rasterize SVG markup to a PNG file through a temporary SVG"""
+        # First write the SVG
+        svg_path = Path(filename).with_suffix(".svg")
+        svg_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(svg_path) as f:
+            f.write(svg_content)
 
         # Then convert to PNG
         png_path = Path(filename).with_suffix(".png")
@@ -541,3 +632,35 @@ class PopulationPyramidGenerator:
                 pass  # Ignore errors when cleaning up
 
         return converted_png
+
+    def save_pyramid_to_png(
+        self,
+        age_gender_data,
+        filename,
+        width=1200,
+        height=800,
+        title_nepali="",
+        title_english="",
+        dpi=300,
+    ):
+        """Save population pyramid directly to PNG file"""
+        svg_content = self.generate_pyramid_svg(
+            age_gender_data, width, height, title_nepali, title_english
+        )
+        return self.save_svg_to_png(svg_content, filename, dpi)
+
+    def save_pyramid_grid_to_png(self, panels, filename, overview=None, dpi=150):
+        """Save a pyramid grid (see generate_pyramid_grid_svg) as one PNG"""
+        svg_content = self.generate_pyramid_grid_svg(panels, overview)
+        return self.save_svg_to_png(svg_content, filename, dpi)
+
+    def pyramid_fingerprint(self, panels, overview=None):
+        """Changes with the data, titles or layout of a pyramid grid"""
+        key = {
+            "generator": type(self).__name__,
+            "layout": [GRID_COLUMNS, GRID_PANEL_WIDTH, GRID_PANEL_HEIGHT],
+            "panels": [[title, data] for title, data in panels],
+            "overview": list(overview) if overview else None,
+        }
+        payload = json.dumps(key, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,351 @@
+"""
+Population Projection
+
+Cohort-component projection of ward populations by five-year age group and
+gender. Every projection step is a handful of NumPy operations on a
+(scenario, ward, age group, gender) array, so all wards and all scenarios of
+a sweep are projected together:
+
+1. Survival: each cohort moves up one age group with its five-year survival
+   ratio; the open 75+ group keeps its own survivors.
+2. Fertility: births are age-specific fertility rates times women aged
+   15-49, split by the sex ratio at birth and survived into age 0-4.
+3. Migration: the annual net migration rate, weighted by an age profile
+   concentrated on working ages, is applied to the survivors.
+
+Mortality rates come from the registered deaths by age and gender, pooled
+over all wards (ward death counts are too small for stable rates). When no
+deaths are registered a default schedule is used. OTHER gender cohorts age
+with the average of male and female survival and receive no births.
+
+Results are cached per input fingerprint, so repeated report builds and
+scenario sweeps over unchanged data do not recompute.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import AgeGroupChoice, GenderChoice
+
+AGE_GROUPS = tuple(AgeGroupChoice.values)
+GENDERS = tuple(GenderChoice.values)
+STEP_YEARS = 5
+DEFAULT_HORIZONS = (5, 10, 20)
+DEFAULT_CACHE_TIMEOUT = 24 * 60 * 60
+
+MALE, FEMALE, OTHER = (GENDERS.index(gender) for gender in ("MALE", "FEMALE", "OTHER"))
+
+# Women of reproductive age: AGE_15_19 .. AGE_45_49
+FERTILE_AGES = slice(AGE_GROUPS.index("AGE_15_19"), AGE_GROUPS.index("AGE_50_54"))
+
+# Share of the total fertility rate born to each reproductive age group
+FERTILITY_SCHEDULE = np.array([0.09, 0.30, 0.28, 0.18, 0.10, 0.04, 0.01])
+
+# Annual mortality rates per age group used when no deaths are registered
+DEFAULT_MORTALITY = np.array(
+    [0.007, 0.0006, 0.0005, 0.0008, 0.0011, 0.0013, 0.0016, 0.0021]
+    + [0.0029, 0.0041, 0.006, 0.009, 0.014, 0.022, 0.035, 0.09]
+)
+
+# Relative weight of net migration per age group (working ages migrate most)
+MIGRATION_PROFILE = np.array(
+    [0.6, 0.4, 0.4, 1.2, 2.2, 2.2, 1.6, 1.2, 0.9, 0.7, 0.5, 0.4, 0.3, 0.2, 0.2, 0.2]
+)
+MIGRATION_PROFILE = MIGRATION_PROFILE / MIGRATION_PROFILE.mean()
+
+
+class Scenario:
+    """Fertility, mortality and migration assumptions of one projection"""
+
+    def __init__(
+        self,
+        name,
+        name_nepali="",
+        total_fertility_rate=2.0,
+        mortality_multiplier=1.0,
+        net_migration_rate=0.0,
+        sex_ratio_at_birth=105.0,
+    ):
+        """
+        Args:
+            name: Scenario identifier
+            name_nepali: Display name
+            total_fertility_rate: Children per woman
+            mortality_multiplier: Factor applied to the mortality rates
+            net_migration_rate: Annual net migration as a share of the
+                population (negative for net out-migration)
+            sex_ratio_at_birth: Male births per 100 female births
+        """
+        self.name = name
+        self.name_nepali = name_nepali or name
+        self.total_fertility_rate = total_fertility_rate
+        self.mortality_multiplier = mortality_multiplier
+        self.net_migration_rate = net_migration_rate
+        self.sex_ratio_at_birth = sex_ratio_at_birth
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "name_nepali": self.name_nepali,
+            "total_fertility_rate": self.total_fertility_rate,
+            "mortality_multiplier": self.mortality_multiplier,
+            "net_migration_rate": self.net_migration_rate,
+            "sex_ratio_at_birth": self.sex_ratio_at_birth,
+        }
+
+
+DEFAULT_SCENARIOS = (
+    Scenario("medium", "मध्यम", total_fertility_rate=2.0, net_migration_rate=-0.005),
+    Scenario("high", "उच्च", total_fertility_rate=2.5, mortality_multiplier=0.9),
+    Scenario(
+        "low",
+        "न्यून",
+        total_fertility_rate=1.6,
+        mortality_multiplier=1.1,
+        net_migration_rate=-0.01,
+    ),
+)
+
+
+def load_population(wards=None):
+    """(W, A, G) base population array and the ward numbers it covers"""
+    from ..models import WardAgeWisePopulation
+
+    rows = list(
+        WardAgeWisePopulation.objects.values_list(
+            "ward_number", "age_group", "gender", "population"
+        )
+    )
+    ward_numbers = sorted(set(wards or ()) | {row[0] for row in rows})
+    population = np.zeros((len(ward_numbers), len(AGE_GROUPS), len(GENDERS)))
+    _scatter(population, rows, {ward: i for i, ward in enumerate(ward_numbers)})
+    return population, ward_numbers
+
+
+def load_deaths():
+    """(A, G) registered deaths pooled over all wards"""
+    from ..models import WardAgeGenderWiseDeceasedPopulation
+
+    rows = WardAgeGenderWiseDeceasedPopulation.objects.values_list(
+        "ward_number", "age_group", "gender", "deceased_population"
+    )
+    deaths = np.zeros((1, len(AGE_GROUPS), len(GENDERS)))
+    _scatter(deaths, ((0, age, gender, count) for _, age, gender, count in rows))
+    return deaths[0]
+
+
+def _scatter(array, rows, ward_index=None):
+    """Add (ward, age group, gender, count) rows into a (W, A, G) array"""
+    age_index = {age: i for i, age in enumerate(AGE_GROUPS)}
+    gender_index = {gender: i for i, gender in enumerate(GENDERS)}
+    indices = [
+        (
+            ward_index[ward] if ward_index is not None else ward,
+            age_index[age],
+            gender_index[gender],
+            count or 0,
+        )
+        for ward, age, gender, count in rows
+        if age in age_index and gender in gender_index
+    ]
+    if indices:
+        wards, ages, genders, counts = np.array(indices, dtype=float).T
+        np.add.at(
+            array, (wards.astype(int), ages.astype(int), genders.astype(int)), counts
+        )
+
+
+def mortality_rates(population, deaths):
+    """(A, G) annual mortality rates from pooled deaths and population
+
+    Age groups without population or deaths fall back to the default
+    schedule; OTHER uses the male/female average.
+    """
+    pooled = population.sum(axis=0)
+    rates = np.repeat(DEFAULT_MORTALITY[:, np.newaxis], len(GENDERS), axis=1)
+    observed = (pooled > 0) & (deaths > 0)
+    rates[observed] = deaths[observed] / pooled[observed]
+    rates[:, OTHER] = (rates[:, MALE] + rates[:, FEMALE]) / 2
+    return np.clip(rates, 0.0, 1.0)
+
+
+def fingerprint(population, deaths, scenarios, horizons, ward_numbers=()):
+    """Digest of every projection input"""
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(population, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(deaths, dtype=float).tobytes())
+    digest.update(
+        json.dumps(
+            [
+                [scenario.as_dict() for scenario in scenarios],
+                list(horizons),
+                list(ward_numbers),
+            ],
+            sort_keys=True,
+        ).encode("utf-8")
+    )
+    return digest.hexdigest()[:20]
+
+
+def project(
+    population, deaths, scenarios=DEFAULT_SCENARIOS, horizons=DEFAULT_HORIZONS
+):
+    """Project a (W, A, G) population under every scenario
+
+    Args:
+        population: Base population by ward, age group and gender
+        deaths: Registered deaths by age group and gender (pooled)
+        scenarios: Scenarios to project
+        horizons: Years ahead to report; multiples of five
+
+    Returns:
+        {horizon: (K, W, A, G) array} for the K scenarios
+    """
+    horizons = sorted(set(horizons))
+    if any(horizon <= 0 or horizon % STEP_YEARS for horizon in horizons):
+        raise ValueError(
+            f"Projection horizons must be positive multiples of {STEP_YEARS} years"
+        )
+
+    population = np.asarray(population, dtype=float)
+    base_rates = mortality_rates(population, np.asarray(deaths, dtype=float))
+
+    # Scenario parameters, shaped to broadcast against (K, W, A, G)
+    multipliers = np.array([s.mortality_multiplier for s in scenarios])
+    rates = np.clip(base_rates[np.newaxis] * multipliers[:, None, None], 0.0, 1.0)
+    # Five-year survival ratios: (K, 1, A, G)
+    survival = np.exp(-STEP_YEARS * rates)[:, np.newaxis]
+    # Births survive half a step on average: (K, 1, G)
+    birth_survival = np.exp(-STEP_YEARS / 2 * rates[:, 0])[:, np.newaxis]
+
+    fertility = (
+        np.array([s.total_fertility_rate for s in scenarios])[:, None]
+        * FERTILITY_SCHEDULE
+        / STEP_YEARS
+    )  # (K, fertile ages) annual age-specific fertility rates
+    male_share = np.array(
+        [s.sex_ratio_at_birth / (100 + s.sex_ratio_at_birth) for s in scenarios]
+    )
+    birth_split = np.zeros((len(scenarios), len(GENDERS)))
+    birth_split[:, MALE] = male_share
+    birth_split[:, FEMALE] = 1 - male_share
+
+    migration = 1 + STEP_YEARS * (
+        np.array([s.net_migration_rate for s in scenarios])[:, None]
+        * MIGRATION_PROFILE
+    )  # (K, A)
+    migration = np.clip(migration, 0.0, None)[:, np.newaxis, :, np.newaxis]
+
+    current = np.broadcast_to(population, (len(scenarios),) + population.shape).copy()
+    results = {}
+    for step in range(1, horizons[-1] // STEP_YEARS + 1):
+        survivors = current * survival
+        projected = np.empty_like(current)
+        projected[:, :, 1:] = survivors[:, :, :-1]
+        projected[:, :, -1] += survivors[:, :, -1]
+
+        # Births over the step to the average number of women in each group
+        women = (
+            current[:, :, FERTILE_AGES, FEMALE] + projected[:, :, FERTILE_AGES, FEMALE]
+        ) / 2
+        births = STEP_YEARS * np.einsum("kwa,ka->kw", women, fertility)
+        projected[:, :, 0] = births[:, :, None] * birth_split[:, None] * birth_survival
+
+        current = projected * migration
+        if step * STEP_YEARS in horizons:
+            results[step * STEP_YEARS] = current
+    return results
+
+
+def summarize(projected, base_population, ward_numbers, scenarios, base_year):
+    """JSON-ready summary of projection arrays"""
+    base_total = base_population.sum()
+    summary = {
+        "base_year": base_year,
+        "base_population": int(round(base_total)),
+        "wards": list(ward_numbers),
+        "age_groups": list(AGE_GROUPS),
+        "horizons": sorted(projected),
+        "scenarios": {},
+    }
+    for index, scenario in enumerate(scenarios):
+        horizons = {}
+        for horizon, array in sorted(projected.items()):
+            result = array[index]
+            total = result.sum()
+            by_age_gender = result.sum(axis=0)
+            children = by_age_gender[: AGE_GROUPS.index("AGE_15_19")].sum()
+            elderly = by_age_gender[AGE_GROUPS.index("AGE_60_64") :].sum()
+            working = total - children - elderly
+            horizons[horizon] = {
+                "year": base_year + horizon if base_year else None,
+                "total_population": int(round(total)),
+                "growth_rate": (
+                    round((total / base_total - 1) * 100, 2) if base_total else None
+                ),
+                "dependency_ratio": (
+                    round((children + elderly) / working * 100, 2) if working else None
+                ),
+                "ward_population": {
+                    ward: int(round(value))
+                    for ward, value in zip(ward_numbers, result.sum(axis=(1, 2)))
+                },
+                "age_gender_data": to_age_gender_data(by_age_gender),
+            }
+        summary["scenarios"][scenario.name] = {
+            **scenario.as_dict(),
+            "horizons": horizons,
+        }
+    return summary
+
+
+def to_age_gender_data(population):
+    """(A, G) array in the age_gender_data format of the pyramid generator"""
+    names = dict(AgeGroupChoice.choices)
+    data = {}
+    counts_by_age = np.rint(population).astype(int).tolist()
+    for age_group, counts in zip(AGE_GROUPS, counts_by_age):
+        male, female, other = counts[MALE], counts[FEMALE], counts[OTHER]
+        data[age_group] = {
+            "name_nepali": str(names[age_group]),
+            "male": male,
+            "female": female,
+            "other": other,
+            "total": male + female + other,
+        }
+    return data
+
+
+def get_population_projection(
+    scenarios=DEFAULT_SCENARIOS, horizons=None, base_year=None
+):
+    """Projection summary of the current ward data, cached per input fingerprint
+
+    Returns None when there is no base population.
+    """
+    if horizons is None:
+        horizons = getattr(settings, "REPORT_PROJECTION_HORIZONS", DEFAULT_HORIZONS)
+    population, ward_numbers = load_population()
+    if not population.sum():
+        return None
+    deaths = load_deaths()
+
+    key = fingerprint(population, deaths, scenarios, horizons, ward_numbers)
+
+    def _build():
+        projected = project(population, deaths, scenarios, horizons)
+        summary = summarize(projected, population, ward_numbers, scenarios, base_year)
+        summary["fingerprint"] = key
+        return summary
+
+    return cache.get_or_set(
+        f"population_projection:{key}:{base_year}",
+        _build,
+        timeout=getattr(
+            settings, "REPORT_PROJECTION_CACHE_TIMEOUT", DEFAULT_CACHE_TIMEOUT
+        ),
+    )
@@ -12,13 +12,14 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_number,
     format_nepali_percentage,
 )
+from apps.core.tenancy import get_current_municipality
 
 
 class ReligionReportFormatter:
     """Generates formal report content for religion demographics"""
 
     def __init__(self):
-        self.municipality_name = "गढवा गाउँपालिका"
+        self.municipality_name = get_current_municipality().name
 
     def generate_formal_report(self, religion_data):
         """Generate complete formal report content as coherent analysis"""
@@ -11,6 +11,10 @@ import os
 import subprocess
 from pathlib import Path
 
+from apps.core.singleflight import atomic_path, atomic_write, single_flight
+from apps.demographics.utils.chart_series import ChartMatrix, ChartSeries, as_number
+from apps.reports.utils.profiling import stage
+
 # Default color palette - can be overridden
 DEFAULT_COLORS = {
     "DEFAULT_1": "#1f77b4",  # Blue
@@ -197,32 +201,19 @@ class SVGChartGenerator:
     ):
         """Generate pie chart as SVG with proper font embedding"""
         try:
-            # Filter out entries with zero population
-            filtered_data = {}
-            for k, v in demographic_data.items():
-                if isinstance(v, dict) and v.get("population", 0) > 0:
-                    filtered_data[k] = v
-                elif isinstance(v, (int, float)) and v > 0:
-                    # Handle case where demographic_data contains direct values
-                    filtered_data[k] = {"population": v, "name_nepali": str(k)}
-
-            if not filtered_data:
+            # Positive entries only; processors may pass a ChartSeries
+            series = ChartSeries.coerce(demographic_data)
+            if not series:
                 return None
 
-            # Prepare data
-            labels = []
-            values = []
-            colors = []
-
-            for i, (data_type, data) in enumerate(filtered_data.items()):
-                nepali_name = (
-                    str(data.get("name_nepali", data_type))
-                    if data.get("name_nepali")
-                    else data_type
-                )
-                labels.append(self._get_display_label(data_type, nepali_name))
-                values.append(data["population"])
-                colors.append(self._get_color_for_item(data_type, i))
+            labels = [
+                self._get_display_label(key, name)
+                for key, name in zip(series.keys, series.names)
+            ]
+            values = [as_number(value) for value in series.values]
+            colors = series.colors or [
+                self._get_color_for_item(key, i) for i, key in enumerate(series.keys)
+            ]
 
             # Calculate percentages and angles
             total = sum(values)
@@ -355,68 +346,16 @@ class SVGChartGenerator:
             if not ward_data:
                 return None
 
-            # Prepare data - convert ward numbers to strings for consistent sorting
-            wards = []
-            for ward_key in ward_data.keys():
-                if isinstance(ward_key, (int, float)):
-                    wards.append(str(int(ward_key)))
-                else:
-                    wards.append(str(ward_key))
-            wards = sorted(wards, key=lambda x: int(x) if x.isdigit() else float("inf"))
-
-            # Get all demographic categories present in the data
-            all_categories = set()
-            for ward_key, ward_info in ward_data.items():
-                if isinstance(ward_info, dict) and "demographics" in ward_info:
-                    all_categories.update(ward_info["demographics"].keys())
-                elif isinstance(ward_info, dict):
-                    # Filter out non-demographic keys
-                    for key in ward_info.keys():
-                        if key not in ["ward_name", "total_population"]:
-                            all_categories.add(key)
-
-            # Convert all categories to strings for consistent sorting
-            all_categories = [str(cat) for cat in all_categories]
-
-            # Filter out categories with no data
-            active_categories = []
-            for category in sorted(all_categories):
-                total_pop = 0
-                for ward_key in ward_data.keys():
-                    ward_key_str = str(ward_key)
-                    try:
-                        ward_info = ward_data[ward_key]
-                        if isinstance(ward_info, dict):
-                            if "demographics" in ward_info:
-                                demographics = ward_info["demographics"]
-                                if category in demographics:
-                                    demo_data = demographics[category]
-                                    if (
-                                        isinstance(demo_data, dict)
-                                        and "population" in demo_data
-                                    ):
-                                        total_pop += demo_data["population"]
-                                    elif isinstance(demo_data, (int, float)):
-                                        total_pop += demo_data
-                            else:
-                                # Direct demographic data
-                                if category in ward_info:
-                                    demo_data = ward_info[category]
-                                    if (
-                                        isinstance(demo_data, dict)
-                                        and "population" in demo_data
-                                    ):
-                                        total_pop += demo_data["population"]
-                                    elif isinstance(demo_data, (int, float)):
-                                        total_pop += demo_data
-                    except (TypeError, AttributeError, KeyError):
-                        continue
-
-                if total_pop > 0:
-                    active_categories.append(category)
-
+            # Wards x categories with data; processors may pass a ChartMatrix
+            matrix = ChartMatrix.coerce(ward_data).active()
+            wards = matrix.rows
+            active_categories = matrix.columns
             if not active_categories:
                 return None
+            colors = matrix.colors or [
+                self._get_color_for_item(category, j)
+                for j, category in enumerate(active_categories)
+            ]
 
             # Calculate dynamic height based on number of legend rows
             max_items_per_row = 4
@@ -464,41 +403,9 @@ class SVGChartGenerator:
 
             # Calculate bar positions and max population
             bar_width = chart_width / len(wards)
-            max_population = 0
 
             # Get maximum population for scaling
-            for ward_str in wards:
-                # Find the actual ward key in ward_data
-                ward_key = None
-                for k in ward_data.keys():
-                    if str(k) == ward_str:
-                        ward_key = k
-                        break
-
-                if ward_key is None:
-                    continue
-
-                ward_total = 0
-                ward_info = ward_data[ward_key]
-
-                for category in active_categories:
-                    pop = 0
-                    if isinstance(ward_info, dict):
-                        if "demographics" in ward_info:
-                            demo_data = ward_info["demographics"].get(category, {})
-                            if isinstance(demo_data, dict):
-                                pop = demo_data.get("population", 0)
-                            elif isinstance(demo_data, (int, float)):
-                                pop = demo_data
-                        else:
-                            demo_data = ward_info.get(category, {})
-                            if isinstance(demo_data, dict):
-                                pop = demo_data.get("population", 0)
-                            elif isinstance(demo_data, (int, float)):
-                                pop = demo_data
-                    ward_total += pop
-
-                max_population = max(max_population, ward_total)
+            max_population = max(matrix.row_totals(), default=0)
 
             if max_population == 0:
                 return None
@@ -586,45 +493,19 @@ class SVGChartGenerator:
 
             # Draw bars for each ward
             for i, ward_str in enumerate(wards):
-                # Find the actual ward key in ward_data
-                ward_key = None
-                for k in ward_data.keys():
-                    if str(k) == ward_str:
-                        ward_key = k
-                        break
-
-                if ward_key is None:
-                    continue
-
                 x = margin["left"] + i * bar_width
                 bottom = effective_chart_bottom  # Use elevated baseline
-                ward_info = ward_data[ward_key]
 
                 # Stack categories for this ward
                 current_y = bottom
                 ward_total = 0
 
-                for j, category in enumerate(active_categories):
-                    pop = 0
-                    if isinstance(ward_info, dict):
-                        if "demographics" in ward_info:
-                            demo_data = ward_info["demographics"].get(category, {})
-                            if isinstance(demo_data, dict):
-                                pop = demo_data.get("population", 0)
-                            elif isinstance(demo_data, (int, float)):
-                                pop = demo_data
-                        else:
-                            demo_data = ward_info.get(category, {})
-                            if isinstance(demo_data, dict):
-                                pop = demo_data.get("population", 0)
-                            elif isinstance(demo_data, (int, float)):
-                                pop = demo_data
-
+                for j, pop in enumerate(matrix.row(i)):
                     if pop > 0:
                         bar_height = (
                             pop / max_population
                         ) * effective_chart_height  # Use effective height
-                        color = self._get_color_for_item(category, j)
+                        color = colors[j]
 
                         # Draw bar segment
                         ET.SubElement(
@@ -643,7 +524,9 @@ class SVGChartGenerator:
 
                         # Add value label on bar if significant height
                         if bar_height > 20:
-                            value_text = self._convert_number_to_nepali(pop)
+                            value_text = self._convert_number_to_nepali(
+                                as_number(pop)
+                            )
                             ET.SubElement(
                                 svg,
                                 "text",
@@ -683,7 +566,9 @@ class SVGChartGenerator:
 
                 # Total value label above bar
                 if ward_total > 0:
-                    total_text = self._convert_number_to_nepali(ward_total)
+                    total_text = self._convert_number_to_nepali(
+                        as_number(ward_total)
+                    )
                     ET.SubElement(
                         svg,
                         "text",
@@ -705,29 +590,9 @@ class SVGChartGenerator:
 
             # Prepare legend items with labels
             legend_items = []
-            for i, category in enumerate(active_categories):
-                category_data = None
-                for ward_key in ward_data.keys():
-                    ward_info = ward_data[ward_key]
-                    if isinstance(ward_info, dict):
-                        if (
-                            "demographics" in ward_info
-                            and category in ward_info["demographics"]
-                        ):
-                            category_data = ward_info["demographics"][category]
-                            break
-                        elif category in ward_info:
-                            category_data = ward_info[category]
-                            break
-
-                if (
-                    category_data
-                    and isinstance(category_data, dict)
-                    and "name_nepali" in category_data
-                ):
-                    label = self._get_display_label(
-                        category, category_data["name_nepali"]
-                    )
+            for i, (category, name) in enumerate(zip(active_categories, matrix.names)):
+                if name is not None:
+                    label = self._get_display_label(category, name)
                 else:
                     label = str(category)
 
@@ -763,7 +628,7 @@ class SVGChartGenerator:
                 x_pos = row_start_x + col * 180  # Fixed spacing for cleaner layout
                 y_pos = legend_start_y + row * row_height
 
-                color = self._get_color_for_item(category, color_index)
+                color = colors[color_index]
 
                 # Legend color box
                 ET.SubElement(
@@ -807,7 +672,7 @@ class SVGChartGenerator:
     def save_svg_to_file(self, svg_content, filename):
         """Save SVG content to file"""
         try:
-            with open(filename, "w", encoding="utf-8") as f:
+            with atomic_write(filename) as f:
                 f.write(svg_content)
             return True
         except Exception as e:
@@ -853,7 +718,40 @@ class SVGChartGenerator:
                 print(f"✓ Chart already exists, skipping generation: {png_path}")
                 return True, str(png_path), str(svg_path)
 
-            # Generate SVG
+            # Only one worker builds a chart; the others wait and reuse it
+            with single_flight(f"chart:{png_path.resolve()}"):
+                if png_path.exists():
+                    return True, str(png_path), str(svg_path)
+                return self._build_chart_image(
+                    demographic_data,
+                    svg_path,
+                    png_path,
+                    chart_type,
+                    include_title,
+                    title_nepali,
+                    title_english,
+                )
+
+        except Exception as e:
+            print(f"Error generating chart image: {e}")
+            import traceback
+
+            traceback.print_exc()
+            return False, None, None
+
+    def _build_chart_image(
+        self,
+        demographic_data,
+        svg_path,
+        png_path,
+        chart_type,
+        include_title,
+        title_nepali,
+        title_english,
+    ):
+        """Write a chart's SVG and PNG files, each replaced atomically"""
+        # Generate SVG
+        with stage("chart_svg"):
             if chart_type == "pie":
                 svg_content = self.generate_pie_chart_svg(
                     demographic_data,
@@ -871,71 +769,50 @@ class SVGChartGenerator:
             else:
                 raise ValueError(f"Unsupported chart type: {chart_type}")
 
-            if not svg_content:
-                return False, None, None
+        if not svg_content:
+            return False, None, None
 
-            # Save SVG file only if it doesn't exist
-            if not svg_path.exists():
-                if not self.save_svg_to_file(svg_content, str(svg_path)):
-                    return False, None, None
-
-            # Convert to PNG using Inkscape
-            try:
-                # Try to run Inkscape command with better font handling
-                cmd = [
-                    "inkscape",
-                    str(svg_path),
-                    "--export-type=png",
-                    f"--export-filename={png_path}",
-                    "--export-dpi=600",  # High quality for PDF
-                    "--export-text-to-path",  # Convert text to paths to avoid font issues
-                ]
-
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        # Save SVG file only if it doesn't exist
+        if not svg_path.exists():
+            if not self.save_svg_to_file(svg_content, str(svg_path)):
+                return False, None, None
 
-                if result.returncode == 0:
-                    print(f"✓ Chart generated: {png_path}")
-                    return True, str(png_path), str(svg_path)
-                else:
-                    print(f"Inkscape error: {result.stderr}")
-                    # Try alternative command without text-to-path conversion
-                    cmd_alt = [
+        # Convert to PNG using Inkscape
+        try:
+            # Try to run Inkscape command with better font handling, then
+            # without text-to-path conversion
+            for extra_args in (["--export-text-to-path"], []):
+                with stage("chart_inkscape"), atomic_path(png_path) as tmp_png:
+                    cmd = [
                         "inkscape",
                         str(svg_path),
                         "--export-type=png",
-                        f"--export-filename={png_path}",
-                        "--export-dpi=600",
+                        f"--export-filename={tmp_png}",
+                        "--export-dpi=600",  # High quality for PDF
+                        *extra_args,
                     ]
-
-                    result_alt = subprocess.run(
-                        cmd_alt, capture_output=True, text=True, timeout=30
+                    result = subprocess.run(
+                        cmd, capture_output=True, text=True, timeout=30
                     )
+                    if result.returncode != 0:
+                        # Never publish a partial export
+                        tmp_png.unlink(missing_ok=True)
 
-                    if result_alt.returncode == 0:
-                        print(f"✓ Chart generated (alternative method): {png_path}")
-                        return True, str(png_path), str(svg_path)
-                    else:
-                        print(
-                            f"Alternative Inkscape command also failed: {result_alt.stderr}"
-                        )
-                        return False, None, str(svg_path)
-
-            except subprocess.TimeoutExpired:
-                print("Inkscape conversion timed out")
-                return False, None, str(svg_path)
-            except FileNotFoundError:
-                print("Inkscape not found. Please install Inkscape and add it to PATH")
-                return False, None, str(svg_path)
-            except Exception as e:
-                print(f"Error running Inkscape: {e}")
-                return False, None, str(svg_path)
-
+                if result.returncode == 0:
+                    print(f"✓ Chart generated: {png_path}")
+                    return True, str(png_path), str(svg_path)
+                print(f"Inkscape error: {result.stderr}")
+            return False, None, str(svg_path)
+
+        except subprocess.TimeoutExpired:
+            print("Inkscape conversion timed out")
+            return False, None, str(svg_path)
+        except FileNotFoundError:
+            print("Inkscape not found. Please install Inkscape and add it to PATH")
+            return False, None, str(svg_path)
         except Exception as e:
-            print(f"Error generating chart image: {e}")
-            import traceback
-
-            traceback.print_exc()
-            return False, None, None
+            print(f"Error running Inkscape: {e}")
+            return False, None, str(svg_path)
 
     @staticmethod
     def generate_religion_charts(religion_data, municipality_name=""):
@@ -7,16 +7,22 @@ Common functionality for processing economics data across all categories.
 from abc import ABC, abstractmethod
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from pathlib import Path
+from apps.demographics.utils.chart_series import ChartMatrix, ChartSeries
 from apps.demographics.utils.svg_chart_generator import SVGChartGenerator
+from apps.chart_management.manifest import get_charts_dir
+from apps.core.tenancy import get_current_municipality
 
 
 class BaseEconomicsProcessor(ABC):
     """Base class for all economics data processors"""
 
+    # Processors that must run before this one ("category" or
+    # "domain.category"), see apps.reports.utils.scheduler
+    depends_on = ()
+
     def __init__(self):
         # Use proper static directory path
-        self.static_charts_dir = Path("static/images/charts")
+        self.static_charts_dir = get_charts_dir()
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
 
         self.chart_generator = SVGChartGenerator()
@@ -132,8 +138,8 @@ class BaseEconomicsProcessor(ABC):
             and "ward_data" in data
         ):
             # Standard format with both municipality and ward data
-            pie_data = data["municipality_data"]
-            bar_data = data["ward_data"]
+            pie_data = ChartSeries.from_mapping(data["municipality_data"])
+            bar_data = ChartMatrix.from_ward_mapping(data["ward_data"])
         else:
             # Simple format - use the data as is for pie chart
             pie_data = data
@@ -179,7 +185,7 @@ class BaseEconomicsReportFormatter(ABC):
     """Base report formatter with common functionality"""
 
     def __init__(self):
-        self.municipality_name = "गढवा गाउँपालिका"
+        self.municipality_name = get_current_municipality().name
 
     @abstractmethod
     def generate_formal_report(self, data):
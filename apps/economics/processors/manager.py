@@ -4,6 +4,8 @@ Economics Manager
 Coordinates all economics processors and provides unified interface for PDF generation.
 """
 
+from apps.reports.utils.profiling import instrument_processors, timed
+from apps.reports.utils.scheduler import run_processors
 from .remittance_expenses import RemittanceExpensesProcessor
 from .major_skills import MajorSkillsProcessor
 from .wardwise_house_ownership import WardWiseHouseOwnershipProcessor
@@ -28,17 +30,16 @@ class EconomicsManager:
             "municipality_wide_foreign_employment_countries": MunicipalityWideForeignEmploymentCountriesProcessor(),
             "remittance_amount_group": RemittanceAmountGroupProcessor(),
         }
+        instrument_processors(self.processors, "economics")
 
     def get_processor(self, category):
         """Get processor for specific category"""
         return self.processors.get(category)
 
+    @timed("economics.process_all_for_pdf")
     def process_all_for_pdf(self):
         """Process all economics categories for PDF generation with charts"""
-        results = {}
-        for category, processor in self.processors.items():
-            results[category] = processor.process_for_pdf()
-        return results
+        return run_processors("economics", self.processors)
 
     def process_category_for_pdf(self, category):
         """Process specific category for PDF with charts"""
@@ -47,6 +48,7 @@ class EconomicsManager:
             return processor.process_for_pdf()
         return None
 
+    @timed("economics.generate_all_charts")
     def generate_all_charts(self):
         """Generate and save all charts for all categories"""
         chart_urls = {}
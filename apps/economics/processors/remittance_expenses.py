@@ -11,6 +11,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_number,
     format_nepali_percentage,
 )
+from apps.core.tenancy import ward_numbers
 
 
 class RemittanceExpensesProcessor(BaseEconomicsProcessor):
@@ -66,7 +67,7 @@ class RemittanceExpensesProcessor(BaseEconomicsProcessor):
 
         # Ward-wise data for bar chart and detailed table
         ward_data = {}
-        for ward_num in range(1, 9):  # Wards 1-8 based on new sample data
+        for ward_num in ward_numbers():
             ward_data[ward_num] = {
                 "ward_name": f"वडा नं. {ward_num}",
                 "expense_types": {},
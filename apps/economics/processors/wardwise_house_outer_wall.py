@@ -11,6 +11,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_number,
     format_nepali_percentage,
 )
+from apps.core.tenancy import ward_numbers
 
 
 class WardWiseHouseOuterWallProcessor(BaseEconomicsProcessor):
@@ -47,7 +48,7 @@ class WardWiseHouseOuterWallProcessor(BaseEconomicsProcessor):
         for code, name in wall_types.items():
             municipality_data[code] = {"name": name, "households": 0, "percentage": 0}
         ward_data = {}
-        for ward_num in range(1, 8):
+        for ward_num in ward_numbers():
             ward_data[ward_num] = {
                 code: {"name": name, "households": 0, "percentage": 0}
                 for code, name in wall_types.items()
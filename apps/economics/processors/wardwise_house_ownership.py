@@ -11,6 +11,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_number,
     format_nepali_percentage,
 )
+from apps.core.tenancy import ward_numbers
 
 
 class WardWiseHouseOwnershipProcessor(BaseEconomicsProcessor):
@@ -43,8 +44,7 @@ class WardWiseHouseOwnershipProcessor(BaseEconomicsProcessor):
         for code, name in ownership_types.items():
             municipality_data[code] = {"name": name, "households": 0, "percentage": 0}
         ward_data = {}
-        # Update: support wards 1-8 (not just 1-7)
-        for ward_num in range(1, 9):
+        for ward_num in ward_numbers():
             ward_data[ward_num] = {
                 code: {"name": name, "households": 0, "percentage": 0}
                 for code, name in ownership_types.items()
@@ -7,16 +7,21 @@ Common functionality for processing infrastructure data across all categories.
 from abc import ABC, abstractmethod
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from pathlib import Path
+from apps.demographics.utils.chart_series import ChartMatrix, ChartSeries
 from apps.demographics.utils.svg_chart_generator import SVGChartGenerator
+from apps.chart_management.manifest import get_charts_dir
 
 
 class BaseInfrastructureProcessor(ABC):
     """Base class for all infrastructure data processors"""
 
+    # Processors that must run before this one ("category" or
+    # "domain.category"), see apps.reports.utils.scheduler
+    depends_on = ()
+
     def __init__(self):
         # Use proper static directory path
-        self.static_charts_dir = Path("static/images/charts")
+        self.static_charts_dir = get_charts_dir()
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
 
         # Initialize SVG chart generator
@@ -54,19 +59,7 @@ class BaseInfrastructureProcessor(ABC):
         if not data:
             return None
 
-        # Prepare data for chart in the format expected by SVGChartGenerator
-        chart_data = {}
-        for key, info in data.items():
-            if (
-                isinstance(info, dict)
-                and "households" in info
-                and info["households"] > 0
-            ):
-                chart_data[key] = {
-                    "population": info["households"],
-                    "name_nepali": info.get("name_nepali", key),
-                }
-
+        chart_data = ChartSeries.from_mapping(data, value_fields=("households",))
         if not chart_data:
             return None
 
@@ -82,17 +75,7 @@ class BaseInfrastructureProcessor(ABC):
         if not data or "ward_data" not in data:
             return None
 
-        # Prepare data for ward-wise bar chart in the format expected by SVGChartGenerator
-        ward_data = {}
-        for ward_num, ward_info in data["ward_data"].items():
-            ward_data[f"ward_{ward_num}"] = {
-                "name_nepali": f"वडा {ward_num}",
-                "population": ward_info.get(
-                    "total_population", ward_info.get("total_households", 0)
-                ),
-                "percentage": 0,  # Calculate if needed
-            }
-
+        ward_data = self._get_ward_totals_matrix(data["ward_data"])
         if not ward_data:
             return None
 
@@ -103,6 +86,19 @@ class BaseInfrastructureProcessor(ABC):
             title_english="Ward-wise Distribution",
         )
 
+    def _get_ward_totals_matrix(self, ward_data, positive_only=False):
+        """ChartMatrix of the ward totals (population, else households)"""
+        totals = {}
+        for ward_num, ward_info in ward_data.items():
+            if not isinstance(ward_info, dict):
+                continue
+            total = ward_info.get(
+                "total_population", ward_info.get("total_households", 0)
+            )
+            if total > 0 or not positive_only:
+                totals[ward_num] = {"population": total}
+        return ChartMatrix.from_ward_mapping(totals)
+
     def process_for_pdf(self):
         """Process data for PDF generation"""
         data = self.get_data()
@@ -144,19 +140,9 @@ class BaseInfrastructureProcessor(ABC):
         if not chart_data:
             return charts
 
-        # Convert infrastructure data to format expected by SVGChartGenerator
-        pie_data = {}
-        for key, info in chart_data.items():
-            if isinstance(info, dict) and (
-                "households" in info or "population" in info
-            ):
-                population = info.get("households", info.get("population", 0))
-                if population > 0:
-                    pie_data[key] = {
-                        "population": population,
-                        "name_nepali": info.get("name_nepali", key),
-                        "percentage": info.get("percentage", 0),
-                    }
+        pie_data = ChartSeries.from_mapping(
+            chart_data, value_fields=("households", "population")
+        )
 
         # Generate pie chart using SVGChartGenerator
         if pie_data:
@@ -178,19 +164,7 @@ class BaseInfrastructureProcessor(ABC):
         # Generate bar chart for ward data if available
         ward_data = data.get("ward_data", {})
         if ward_data:
-            # Convert ward data to format expected by SVGChartGenerator
-            bar_data = {}
-            for ward_num, ward_info in ward_data.items():
-                if isinstance(ward_info, dict):
-                    total_pop = ward_info.get(
-                        "total_population", ward_info.get("total_households", 0)
-                    )
-                    if total_pop > 0:
-                        bar_data[f"ward_{ward_num}"] = {
-                            "population": total_pop,
-                            "name_nepali": f"वडा {ward_num}",
-                            "percentage": 0,  # Can be calculated if needed
-                        }
+            bar_data = self._get_ward_totals_matrix(ward_data, positive_only=True)
 
             if bar_data:
                 success, png_path, svg_path = self.chart_generator.generate_chart_image(
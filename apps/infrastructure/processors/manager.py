@@ -4,6 +4,8 @@ Infrastructure Manager
 Coordinates all infrastructure processors and provides unified interface for PDF generation.
 """
 
+from apps.reports.utils.profiling import instrument_processors, timed
+from apps.reports.utils.scheduler import run_processors
 from .public_transport import PublicTransportProcessor
 from .market_center_time import MarketCenterTimeProcessor
 from .road_status import RoadStatusProcessor
@@ -18,17 +20,16 @@ class InfrastructureManager:
             "market_center_time": MarketCenterTimeProcessor(),
             "road_status": RoadStatusProcessor(),
         }
+        instrument_processors(self.processors, "infrastructure")
 
     def get_processor(self, category):
         """Get processor for specific category"""
         return self.processors.get(category)
 
+    @timed("infrastructure.process_all_for_pdf")
     def process_all_for_pdf(self):
         """Process all infrastructure categories for PDF generation with charts"""
-        results = {}
-        for category, processor in self.processors.items():
-            results[category] = processor.process_for_pdf()
-        return results
+        return run_processors("infrastructure", self.processors)
 
     def process_category_for_pdf(self, category):
         """Process specific category for PDF with charts"""
@@ -37,6 +38,7 @@ class InfrastructureManager:
             return processor.process_for_pdf()
         return None
 
+    @timed("infrastructure.generate_all_charts")
     def generate_all_charts(self):
         """Generate and save all charts for all categories"""
         chart_urls = {}
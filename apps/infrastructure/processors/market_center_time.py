@@ -12,6 +12,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_percentage,
     to_nepali_digits,
 )
+from apps.core.tenancy import ward_numbers
 
 
 class MarketCenterTimeProcessor(BaseInfrastructureProcessor):
@@ -76,7 +77,7 @@ class MarketCenterTimeProcessor(BaseInfrastructureProcessor):
 
         # Ward-wise data
         ward_data = {}
-        for ward_num in range(1, 9):  # Wards 1-8
+        for ward_num in ward_numbers():
             ward_households = (
                 WardWiseTimeToMarketCenter.objects.filter(
                     ward_number=ward_num
@@ -12,6 +12,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_percentage,
     to_nepali_digits,
 )
+from apps.core.tenancy import ward_numbers
 
 
 class PublicTransportProcessor(BaseInfrastructureProcessor):
@@ -78,7 +79,7 @@ class PublicTransportProcessor(BaseInfrastructureProcessor):
 
         # Ward-wise data
         ward_data = {}
-        for ward_num in range(1, 9):  # Wards 1-8
+        for ward_num in ward_numbers():
             ward_households = (
                 WardWiseTimeToPublicTransport.objects.filter(
                     ward_number=ward_num
@@ -12,6 +12,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_percentage,
     to_nepali_digits,
 )
+from apps.core.tenancy import ward_numbers
 
 
 class RoadStatusProcessor(BaseInfrastructureProcessor):
@@ -78,9 +79,9 @@ class RoadStatusProcessor(BaseInfrastructureProcessor):
                     road_data[road_code]["population"] / total_households * 100
                 )
 
-        # Ward-wise data (wards 1-8)
+        # Ward-wise data
         ward_data = {}
-        for ward_num in range(1, 9):
+        for ward_num in ward_numbers():
             ward_households = (
                 WardWiseRoadStatus.objects.filter(ward_number=ward_num).aggregate(
                     total=models.Sum("households")
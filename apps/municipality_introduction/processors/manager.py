@@ -4,6 +4,8 @@ Municipality Introduction Manager
 Coordinates all municipality introduction processors and provides unified interface for PDF generation.
 """
 
+from apps.reports.utils.profiling import instrument_processors, timed
+from apps.reports.utils.scheduler import run_processors
 from .political_status import PoliticalStatusProcessor
 
 
@@ -14,17 +16,16 @@ class MunicipalityIntroductionManager:
         self.processors = {
             "political_status": PoliticalStatusProcessor(),
         }
+        instrument_processors(self.processors, "municipality_introduction")
 
     def get_processor(self, category):
         """Get processor for specific category"""
         return self.processors.get(category)
 
+    @timed("municipality_introduction.process_all_for_pdf")
     def process_all_for_pdf(self):
         """Process all economics categories for PDF generation with charts"""
-        results = {}
-        for category, processor in self.processors.items():
-            results[category] = processor.process_for_pdf()
-        return results
+        return run_processors("municipality_introduction", self.processors)
 
     def process_category_for_pdf(self, category):
         """Process specific category for PDF with charts"""
@@ -33,6 +34,7 @@ class MunicipalityIntroductionManager:
             return processor.process_for_pdf()
         return None
 
+    @timed("municipality_introduction.generate_all_charts")
     def generate_all_charts(self):
         """Generate and save all charts for all categories"""
         chart_urls = {}
@@ -5,9 +5,13 @@ Handles political status data processing, chart generation, and report formattin
 """
 
 from pathlib import Path
+
+import numpy as np
+
 from .base import BaseMunicipalityIntroductionProcessor
 from ..models import PoliticalStatus
 from apps.reports.utils.nepali_numbers import format_nepali_number
+from apps.reports.utils.time_series import WardTimeSeries, rank, to_python
 
 
 class PoliticalStatusProcessor(BaseMunicipalityIntroductionProcessor):
@@ -26,29 +30,60 @@ class PoliticalStatusProcessor(BaseMunicipalityIntroductionProcessor):
         return "२.३"
 
     def get_data(self):
-        """Get political status population data with all demographic fields"""
+        """Get political status population data with all demographic fields
+
+        Every row also carries the ward's population change and growth rate
+        since the previous year and its population rank within the year.
+        """
         political_data = {}
 
-        # Get all data from database grouped by year
-        for status_obj in PoliticalStatus.objects.all().order_by("year", "ward_number"):
-            year = str(status_obj.year)
-            if year not in political_data:
-                political_data[year] = []
+        records = list(
+            PoliticalStatus.objects.order_by("year", "ward_number").values(
+                "year", "ward_number", "ward_name", "population"
+            )
+        )
+        if not records:
+            return political_data
+
+        series = WardTimeSeries.from_rows(
+            (
+                (record["year"], record["ward_number"], record["population"])
+                for record in records
+            ),
+            ("population",),
+        )
 
-            political_data[year].append(
+        # Change and growth against the previous year, rank within the year
+        population = series.series("population")
+        changes = np.full(population.shape, np.nan)
+        growth_rates = np.full(population.shape, np.nan)
+        changes[1:] = series.deltas("population")
+        growth_rates[1:] = series.growth_rates("population")
+        ranks = rank(population, axis=1)
+
+        # Group rows by year
+        for record, change, growth_rate, ward_rank in zip(
+            records,
+            to_python(series.row_values(changes)),
+            to_python(series.row_values(growth_rates), 2),
+            series.row_values(ranks).tolist(),
+        ):
+            political_data.setdefault(str(record["year"]), []).append(
                 {
-                    "ward_number": status_obj.ward_number,
-                    "ward_name": status_obj.ward_name,
-                    "total_population": getattr(status_obj, "total_population", None),
-                    "male_population": getattr(status_obj, "male_population", None),
-                    "female_population": getattr(status_obj, "female_population", None),
-                    "other_population": getattr(status_obj, "other_population", None),
-                    "total_households": getattr(status_obj, "total_households", None),
-                    "average_household_size": getattr(
-                        status_obj, "average_household_size", None
-                    ),
-                    "sex_ratio": getattr(status_obj, "sex_ratio", None),
-                    "year": status_obj.year,
+                    "ward_number": record["ward_number"],
+                    "ward_name": record["ward_name"],
+                    "population": record["population"],
+                    "total_population": record["population"],
+                    "male_population": None,
+                    "female_population": None,
+                    "other_population": None,
+                    "total_households": None,
+                    "average_household_size": None,
+                    "sex_ratio": None,
+                    "population_change": change,
+                    "growth_rate": growth_rate,
+                    "rank": ward_rank,
+                    "year": record["year"],
                 }
             )
 
@@ -84,11 +119,11 @@ class PoliticalStatusProcessor(BaseMunicipalityIntroductionProcessor):
         # Generate report content
         report_content = self.generate_report_content(data)
 
-        # Calculate total population across all years and wards
+        # Total population of the latest year
         total_population = 0
-        for year_data in data.values():
-            for ward_data in year_data:
-                total_population += ward_data["population"]
+        if data:
+            latest_rows = data[max(data, key=int)]
+            total_population = sum(row["population"] or 0 for row in latest_rows)
 
         return {
             "data": data,
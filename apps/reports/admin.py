@@ -10,6 +10,7 @@ from .models import (
     PublicationSettings,
     ReportDownload,
 )
+from .utils.renditions import rendition_url
 
 
 @admin.register(ReportCategory)
@@ -29,7 +30,7 @@ class ReportCategoryAdmin(admin.ModelAdmin):
     list_editable = ["order", "is_active"]
 
     def sections_count(self, obj):
-        count = obj.sections.count()
+        count = obj.sections_count
         if count > 0:
             url = (
                 reverse("admin:reports_reportsection_changelist")
@@ -105,7 +106,7 @@ class ReportSectionAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
     def figures_count(self, obj):
-        count = obj.figures.count()
+        count = obj.figures_count
         if count > 0:
             url = (
                 reverse("admin:reports_reportfigure_changelist")
@@ -117,7 +118,7 @@ class ReportSectionAdmin(admin.ModelAdmin):
     figures_count.short_description = "Figures"
 
     def tables_count(self, obj):
-        count = obj.tables.count()
+        count = obj.tables_count
         if count > 0:
             url = (
                 reverse("admin:reports_reporttable_changelist")
@@ -177,7 +178,7 @@ class ReportFigureAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" width="50" height="50" style="object-fit: cover;" />',
-                obj.image.url,
+                rendition_url(obj, "thumb"),
             )
         return "No image"
 
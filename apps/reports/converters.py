@@ -0,0 +1,28 @@
+"""
+URL path converters for the reports app
+"""
+
+from .utils.managers import get_domains
+
+
+class DomainConverter:
+    """Matches a registered processor domain
+
+    Accepts both the registry key and its hyphenated form
+    (``municipality-introduction``), matching the domain apps' URL prefixes.
+    """
+
+    regex = "|".join(
+        sorted(
+            {domain for domain in get_domains()}
+            | {domain.replace("_", "-") for domain in get_domains()},
+            key=len,
+            reverse=True,
+        )
+    )
+
+    def to_python(self, value):
+        return value.replace("-", "_")
+
+    def to_url(self, value):
+        return value.replace("_", "-")
@@ -0,0 +1,136 @@
+"""
+Audit Query Plans Command
+
+Explain every query issued by the report processors and public views and
+rank them by their issues, see apps.reports.utils.query_audit.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.tenancy import get_current_municipality, use_municipality
+from apps.reports.utils.query_audit import QueryPlanAudit, write_index_migrations
+
+
+class Command(BaseCommand):
+    """Flag sequential scans, missing indexes and duplicate queries"""
+
+    help = (
+        "Capture the SQL of every processor and public report view, explain "
+        "it and report sequential scans, missing indexes and duplicates"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--municipality",
+            default=None,
+            help="Municipality code to audit (default: the default municipality)",
+        )
+        parser.add_argument(
+            "--only",
+            action="append",
+            help="Only audit sources whose name contains this text (repeatable)",
+        )
+        parser.add_argument(
+            "--skip-processors", action="store_true", help="Skip processor data"
+        )
+        parser.add_argument(
+            "--skip-views", action="store_true", help="Skip public report views"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Queries listed in the report"
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also list queries without issues",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Write the report as JSON"
+        )
+        parser.add_argument(
+            "--write-migrations",
+            action="store_true",
+            help="Write migrations adding the candidate indexes",
+        )
+
+    def handle(self, *args, **options):
+        municipality = options["municipality"] or get_current_municipality().code
+        try:
+            with use_municipality(municipality):
+                results, errors = self.audit(options)
+        except LookupError as e:
+            raise CommandError(e)
+
+        if not options["all"]:
+            results = [result for result in results if result["issues"]]
+
+        if options["json"]:
+            self.write_json(results[: options["limit"]], errors)
+        else:
+            self.write_report(results[: options["limit"]], errors)
+
+        if options["write_migrations"]:
+            with use_municipality(municipality):
+                paths = write_index_migrations(results)
+            for path in paths:
+                self.stdout.write(self.style.SUCCESS(f"✅ Wrote {path}"))
+            if not paths:
+                self.stdout.write("No candidate indexes to migrate")
+
+    def audit(self, options):
+        audit = QueryPlanAudit()
+        if not options["skip_processors"]:
+            audit.run_processors(only=options["only"])
+        if not options["skip_views"]:
+            audit.run_views(only=options["only"])
+        return audit.analyze(), audit.errors
+
+    def write_report(self, results, errors):
+        for source, error in errors.items():
+            self.stdout.write(self.style.ERROR(f"❌ {source}: {error}"))
+
+        for rank, result in enumerate(results, 1):
+            self.stdout.write(
+                f"\n#{rank} {result['total_ms']:.1f} ms, "
+                f"{result['executions']} executions, "
+                f"{result['duplicates']} duplicates"
+            )
+            for issue in result["issues"]:
+                self.stdout.write(self.style.WARNING(f"  ⚠️ {issue}"))
+            self.stdout.write(f"  Sources: {', '.join(result['sources'])}")
+            self.stdout.write(f"  SQL: {result['sql'][:300]}")
+            for line in result["plan"]:
+                self.stdout.write(f"    {line}")
+            for candidate in result["candidates"]:
+                model = candidate["model"]._meta.label
+                fields = ", ".join(candidate["index"].fields)
+                self.stdout.write(f"  Candidate index: {model}({fields})")
+
+        self.stdout.write(self.style.SUCCESS(f"\nListed {len(results)} queries"))
+
+    def write_json(self, results, errors):
+        report = {
+            "errors": errors,
+            "queries": [
+                {
+                    **{
+                        key: value
+                        for key, value in result.items()
+                        if key != "candidates"
+                    },
+                    "candidates": [
+                        {
+                            "model": candidate["model"]._meta.label,
+                            "fields": list(candidate["index"].fields),
+                            "name": candidate["index"].name,
+                            "reason": candidate["reason"],
+                        }
+                        for candidate in result["candidates"]
+                    ],
+                }
+                for result in results
+            ],
+        }
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2, default=str))
@@ -0,0 +1,138 @@
+"""
+Management command to benchmark report processors, charts and PDF generation
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.reports.utils.benchmarks import BenchmarkHistory, ReportBenchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every processor, chart generator, the full report PDF and "
+        "worker boot against scalable synthetic data"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wards", type=int, default=8, help="Number of wards")
+        parser.add_argument(
+            "--categories",
+            type=int,
+            default=None,
+            help="Values per choice field (default: every defined choice)",
+        )
+        parser.add_argument(
+            "--years", type=int, default=2, help="Census years for time series"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Timed runs per case"
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--only",
+            action="append",
+            help="Only run cases whose name contains this text (repeatable)",
+        )
+        parser.add_argument(
+            "--skip-pdf", action="store_true", help="Skip the full report PDF case"
+        )
+        parser.add_argument(
+            "--history",
+            default=str(settings.BASE_DIR / "benchmarks" / "history.json"),
+            help="JSON file collecting benchmark runs",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=1.25,
+            help="Slowdown ratio reported as a regression",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when a regression is detected",
+        )
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="Benchmark the configured database instead of a throwaway copy",
+        )
+
+    def handle(self, *args, **options):
+        benchmark = ReportBenchmark(
+            wards=options["wards"],
+            categories=options["categories"],
+            years=options["years"],
+            repeat=options["repeat"],
+            seed=options["seed"],
+        )
+
+        old_db_name = None
+        if not options["use_current_db"]:
+            self.stdout.write("🗄️  Creating throwaway benchmark database...")
+            old_db_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+
+        try:
+            if not options["use_current_db"]:
+                counts = benchmark.load_data()
+                self.stdout.write(
+                    f"📦 Generated {sum(counts.values())} synthetic rows "
+                    f"across {len(counts)} models"
+                )
+
+            self.stdout.write("⏱️  Running benchmark cases...")
+            results = benchmark.run(
+                include_pdf=not options["skip_pdf"], only=options["only"]
+            )
+        finally:
+            if old_db_name is not None:
+                connection.creation.destroy_test_db(old_db_name, verbosity=0)
+
+        self.write_results(results)
+
+        history = BenchmarkHistory(options["history"])
+        previous = history.previous_run(benchmark.params)
+        history.append(benchmark.params, results)
+        self.stdout.write(f"📝 Results appended to {history.path}")
+
+        regressions = history.find_regressions(
+            previous, results, threshold=options["threshold"]
+        )
+        for name, metric, before, after in regressions:
+            self.stdout.write(
+                self.style.WARNING(f"⚠️  {name}: {metric} {before} → {after}")
+            )
+
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} performance regressions detected")
+
+        self.stdout.write(self.style.SUCCESS("✅ Benchmark completed!"))
+
+    def write_results(self, results):
+        width = max((len(name) for name in results), default=10)
+        self.stdout.write(
+            f"\n{'case':<{width}}  {'wall ms':>10}  {'median':>10}  "
+            f"{'queries':>8}  {'peak KB':>10}"
+        )
+        for name, result in results.items():
+            line = (
+                f"{name:<{width}}  {result['wall_ms']:>10.2f}  "
+                f"{result['median_ms']:>10.2f}  {result['queries']:>8}  "
+                f"{result['peak_kb']:>10.1f}"
+            )
+            if result["error"]:
+                self.stdout.write(self.style.ERROR(f"{line}  {result['error']}"))
+            else:
+                self.stdout.write(line)
+            if "rss_kb" in result:
+                heavy = ", ".join(result["heavy_modules"]) or "none"
+                self.stdout.write(
+                    f"{'':<{width}}  setup {result['setup_ms']:.2f} ms, "
+                    f"URLs {result['urls_ms']:.2f} ms, RSS {result['rss_kb']} KB, "
+                    f"heavy modules: {heavy}"
+                )
+        self.stdout.write("")
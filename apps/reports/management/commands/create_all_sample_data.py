@@ -8,7 +8,7 @@ This command runs all sample data creation commands from all domains:
 - Social Sample Data (literacy, major subjects, old age, school dropout, solid waste, toilet type)
 """
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management import call_command
 from django.db import transaction
 import time
@@ -33,6 +33,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Continue with other domains even if one domain fails",
         )
+        parser.add_argument(
+            "--warm-caches",
+            action="store_true",
+            help="Run warm_report_caches once the data is created",
+        )
 
     def handle(self, *args, **options):
         # List of all consolidated domain commands
@@ -300,6 +305,14 @@ class Command(BaseCommand):
             except Exception as e:
                 self.stdout.write(f"   (Could not generate detailed overview: {e})")
 
+        # Post-import hook: build the report caches before visitors do
+        if options.get("warm_caches") and success_count > 0:
+            self.stdout.write("\n" + "=" * 80)
+            try:
+                call_command("warm_report_caches", stdout=self.stdout)
+            except CommandError as e:
+                self.stdout.write(self.style.ERROR(f"❌ Cache warm-up: {e}"))
+
         self.stdout.write("\n" + "=" * 80)
         self.stdout.write("💡 Tips:")
         self.stdout.write("   • Use --dry-run to preview what would be executed")
@@ -307,4 +320,5 @@ class Command(BaseCommand):
         self.stdout.write(
             "   • Use --skip-errors to continue if individual domains fail"
         )
+        self.stdout.write("   • Use --warm-caches to build the report caches next")
         self.stdout.write("=" * 80)
@@ -0,0 +1,87 @@
+"""
+Diff Report Snapshots Command
+
+List the indicators that changed between two report data snapshots, per
+report section, see apps.reports.utils.snapshots.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.tenancy import get_current_municipality, use_municipality
+from apps.reports.utils.snapshots import ReportSnapshot, SnapshotError, diff_snapshots
+
+
+class Command(BaseCommand):
+    """Compare the report data of two publication versions"""
+
+    help = "List the indicators that changed between two report data snapshots"
+
+    def add_arguments(self, parser):
+        parser.add_argument("old", help="Publication version to compare from")
+        parser.add_argument("new", help="Publication version to compare to")
+        parser.add_argument(
+            "--municipality",
+            default=None,
+            help="Municipality code (default: the default municipality)",
+        )
+        parser.add_argument(
+            "--section",
+            action="append",
+            help="Only list sections whose key contains this text (repeatable)",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Write the changes as JSON"
+        )
+
+    def handle(self, *args, **options):
+        municipality = options["municipality"] or get_current_municipality().code
+        try:
+            with use_municipality(municipality):
+                old = ReportSnapshot.load(options["old"])
+                new = ReportSnapshot.load(options["new"])
+        except (LookupError, SnapshotError) as e:
+            raise CommandError(e)
+
+        changes = diff_snapshots(old, new)
+        if options["section"]:
+            changes = {
+                section: changed
+                for section, changed in changes.items()
+                if any(text in section for text in options["section"])
+            }
+
+        if options["json"]:
+            self.stdout.write(
+                json.dumps(
+                    {
+                        section: [
+                            {"indicator": path, "old": before, "new": after}
+                            for path, before, after in changed
+                        ]
+                        for section, changed in changes.items()
+                    },
+                    ensure_ascii=False,
+                    indent=2,
+                    default=str,
+                )
+            )
+            return
+
+        for section, changed in changes.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{section}"))
+            for path, before, after in changed:
+                self.stdout.write(f"  {path}: {_format(before)} → {_format(after)}")
+
+        indicators = sum(len(changed) for changed in changes.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{indicators} indicators changed in {len(changes)} sections "
+                f"between {old.version} and {new.version}"
+            )
+        )
+
+
+def _format(value):
+    return "—" if value is None else str(value)
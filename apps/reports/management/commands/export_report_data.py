@@ -0,0 +1,102 @@
+"""
+Export Report Data Command
+
+Write the raw report tables (domain models and processor outputs) as CSV,
+XLSX or Parquet, see apps.reports.utils.exports.
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.singleflight import atomic_write
+from apps.core.tenancy import get_current_municipality, use_municipality
+from apps.reports.utils.exports import (
+    EXPORT_FORMATS,
+    get_table,
+    get_tables,
+    write_bundle,
+    write_table,
+)
+from apps.reports.utils.profiles import parse_domains
+
+
+class Command(BaseCommand):
+    """Export report data tables, zipped or one at a time"""
+
+    help = (
+        "Export the domain tables and processor outputs behind the report as "
+        "a zip of CSV, XLSX or Parquet files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=list(EXPORT_FORMATS), default="csv", dest="fmt"
+        )
+        parser.add_argument(
+            "--domains",
+            default=None,
+            help="Comma separated domains (default: every report domain)",
+        )
+        parser.add_argument(
+            "--table",
+            action="append",
+            help="Write only this table, unzipped (repeatable)",
+        )
+        parser.add_argument(
+            "--output",
+            default="exports",
+            help="Directory the export is written to",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Rows read from the database at a time",
+        )
+        parser.add_argument(
+            "--municipality",
+            default=None,
+            help="Municipality code (default: the default municipality)",
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="List the exported tables"
+        )
+
+    def handle(self, *args, **options):
+        municipality = options["municipality"] or get_current_municipality().code
+        try:
+            with use_municipality(municipality):
+                self.export(municipality, options)
+        except LookupError as e:
+            raise CommandError(e)
+        except ImportError as e:
+            raise CommandError(f"{options['fmt']} export is not available: {e}")
+
+    def export(self, code, options):
+        fmt = options["fmt"]
+        domains = parse_domains(options["domains"])
+        output_dir = Path(options["output"])
+
+        if options["list"]:
+            for table in get_tables(domains):
+                self.stdout.write(table.name)
+            return
+
+        if options["table"]:
+            for name in options["table"]:
+                table = get_table(name)
+                if table is None:
+                    raise CommandError(f"Unknown table '{name}', see --list")
+                path = output_dir / f"{code}_{table.name}.{fmt}"
+                with atomic_write(path, "wb") as f:
+                    rows = write_table(table, fmt, f, options["chunk_size"])
+                self.stdout.write(f"📄 {table.name}: {rows} rows in {path}")
+        else:
+            tables = get_tables(domains)
+            path = output_dir / f"{code}_report_data_{fmt}.zip"
+            with atomic_write(path, "wb") as f:
+                write_bundle(tables, fmt, f, options["chunk_size"])
+            self.stdout.write(f"📦 {len(tables)} tables in {path}")
+
+        self.stdout.write(self.style.SUCCESS("✅ Export completed!"))
@@ -0,0 +1,38 @@
+"""
+Generate Figure Renditions Command
+
+Render the resized WebP and fallback copies of report figure images that
+are missing or were built with older rendition settings.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.reports.models import ReportFigure
+from apps.reports.utils.renditions import generate_for_figure, is_current
+
+
+class Command(BaseCommand):
+    """Render missing or stale report figure renditions"""
+
+    help = "Render resized WebP and fallback copies of report figure images"
+
+    def handle(self, *args, **options):
+        figures = ReportFigure.objects.exclude(image="").exclude(image__isnull=True)
+
+        rendered = failed = 0
+        for figure in figures.iterator():
+            if is_current(figure):
+                continue
+            try:
+                generate_for_figure(figure.pk)
+                rendered += 1
+            except Exception as e:
+                failed += 1
+                self.stdout.write(
+                    self.style.ERROR(f"❌ {figure.figure_number}: {e}")
+                )
+
+        message = f"Rendered {rendered} figures"
+        if failed:
+            message += f", {failed} failed"
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,54 @@
+"""
+Generate Map Assets Command
+
+Build the print and deep-zoom derivatives of the report's landscape maps
+whose source raster changed, see apps.reports.utils.map_assets.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reports.utils.map_assets import MAPS, generate_map_assets
+
+
+class Command(BaseCommand):
+    """Build missing or stale map derivatives"""
+
+    help = "Build print-size images and deep-zoom tiles of the report maps"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--map",
+            action="append",
+            choices=list(MAPS),
+            help="Only this map (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        built = current = missing = failed = 0
+        for name in options["map"] or MAPS:
+            try:
+                manifest, was_built = generate_map_assets(name)
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"❌ {name}: {e}"))
+                continue
+            if manifest is None:
+                missing += 1
+                self.stdout.write(f"⚠️  {name}: no {MAPS[name]}")
+            elif was_built:
+                built += 1
+                self.stdout.write(
+                    f"🗺️  {name}: print {manifest['print']['width']}x"
+                    f"{manifest['print']['height']}, "
+                    f"{manifest['tiles']['levels']} zoom levels"
+                )
+            else:
+                current += 1
+
+        message = f"Built {built} maps, {current} up to date"
+        if missing:
+            message += f", {missing} missing"
+        if failed:
+            message += f", {failed} failed"
+            raise CommandError(message)
+        self.stdout.write(self.style.SUCCESS(message))
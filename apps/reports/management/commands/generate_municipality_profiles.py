@@ -0,0 +1,67 @@
+"""
+Generate Municipality Profiles Command
+
+Render the full digital profile report PDF of several municipalities
+concurrently, see apps.reports.utils.profiles.
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.tenancy import get_municipalities, get_municipality
+from apps.reports.utils.profiles import ProfileRenderer
+
+
+class Command(BaseCommand):
+    """Render municipality profile PDFs in batch"""
+
+    help = "Render the full report PDF of every (or the given) municipality"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "municipalities",
+            nargs="*",
+            help="Municipality codes (default: every configured municipality)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Profiles built concurrently (default: REPORT_PROFILE_WORKERS)",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default=Path(settings.MEDIA_ROOT) / "reports" / "profiles",
+            help="Directory the PDFs are written to",
+        )
+
+    def handle(self, *args, **options):
+        codes = options["municipalities"]
+        try:
+            municipalities = (
+                [get_municipality(code) for code in codes]
+                if codes
+                else list(get_municipalities().values())
+            )
+        except LookupError as e:
+            raise CommandError(e)
+
+        renderer = ProfileRenderer(options["output_dir"])
+        results = renderer.render_all(municipalities, max_workers=options["workers"])
+
+        failed = 0
+        for code, result in results.items():
+            if result["error"]:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"❌ {code}: {result['error']}"))
+            else:
+                self.stdout.write(
+                    f"✅ {code}: {result['path']} ({result['seconds']:.1f}s)"
+                )
+
+        message = f"Rendered {len(results) - failed} profiles"
+        if failed:
+            message += f", {failed} failed"
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,30 @@
+"""
+Render Report Tables Command
+
+Compile ReportTable data into the stored web and PDF HTML fragments.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.reports.utils.table_rendering import render_stale_tables
+
+
+class Command(BaseCommand):
+    """Store pre-rendered HTML for report tables"""
+
+    help = (
+        "Render report tables whose stored HTML is missing or was built by an "
+        "older renderer"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-render every table, not only stale ones",
+        )
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        rendered = render_stale_tables(options["all"], options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} report tables"))
@@ -0,0 +1,50 @@
+"""
+Repair Report Counters Command
+
+Recount the section, figure and table counters stored on report categories
+and sections, e.g. after bulk_create(), queryset.update() or loaddata.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.reports.utils.counters import (
+    find_stale_counters,
+    refresh_category_counters,
+    refresh_section_counters,
+)
+
+
+class Command(BaseCommand):
+    """Recount stored report counters"""
+
+    help = "Recount section, figure and table counters of report categories"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report stale counters; exit with an error if any exist",
+        )
+
+    def handle(self, *args, **options):
+        stale_sections, stale_categories = find_stale_counters()
+        self.stdout.write(
+            f"Stale counters: {stale_sections} sections, "
+            f"{stale_categories} categories"
+        )
+
+        if options["check"]:
+            if stale_sections or stale_categories:
+                raise CommandError("Report counters are out of date")
+            return
+
+        with transaction.atomic():
+            sections = refresh_section_counters()
+            categories = refresh_category_counters()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recounted {sections} sections and {categories} categories"
+            )
+        )
@@ -0,0 +1,69 @@
+"""
+Snapshot Report Data Command
+
+Freeze the processor results of a publication version so the report can be
+rendered from them later, see apps.reports.utils.snapshots.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.tenancy import get_current_municipality, use_municipality
+from apps.reports.utils.snapshots import ReportSnapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    """Write the report data snapshot of a publication version"""
+
+    help = (
+        "Run every report processor and freeze its results in a snapshot of "
+        "the current publication version"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--municipality",
+            default=None,
+            help="Municipality code (default: the default municipality)",
+        )
+        parser.add_argument(
+            "--publication-version",
+            default=None,
+            help="Publication version (default: PublicationSettings.version)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Replace an existing snapshot of the version",
+        )
+
+    def handle(self, *args, **options):
+        municipality = options["municipality"] or get_current_municipality().code
+        version = options["publication_version"]
+        try:
+            with use_municipality(municipality):
+                snapshot = self.take(version, options["force"])
+                path = snapshot.save()
+        except LookupError as e:
+            raise CommandError(e)
+
+        sections = sum(len(results) for results in snapshot.results.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Snapshot {snapshot.version} of {municipality}: {sections} "
+                f"sections, {path.stat().st_size:,} bytes in {path}"
+            )
+        )
+
+    def take(self, version, force):
+        if version is not None and not force:
+            self.check_unused(snapshot_path(version))
+        snapshot = ReportSnapshot.take(version)
+        if not force:
+            self.check_unused(snapshot.path)
+        return snapshot
+
+    def check_unused(self, path):
+        if path.exists():
+            raise CommandError(
+                f"{path} exists; published snapshots are kept unless --force is given"
+            )
@@ -0,0 +1,115 @@
+"""
+Warm Report Caches Command
+
+Build the charts, processor results, table fragments, cached pages and
+full report PDF of a municipality ahead of traffic, after a data import or
+a deploy, see apps.reports.utils.warmup.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.tenancy import get_current_municipality, use_municipality
+from apps.reports.utils.warmup import CacheWarmer, get_warmup_steps
+
+
+class Command(BaseCommand):
+    """Warm every report cache in dependency order"""
+
+    help = (
+        "Build report charts, processor results, table fragments, cached "
+        "pages and the full report PDF before visitors ask for them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--municipality",
+            default=None,
+            help="Municipality code (default: the default municipality)",
+        )
+        parser.add_argument(
+            "--only",
+            action="append",
+            help="Only this step (repeatable), see --list",
+        )
+        parser.add_argument(
+            "--skip",
+            action="append",
+            default=[],
+            help="Skip this step (repeatable), e.g. --skip pdf",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Steps run concurrently (default: REPORT_WARMUP_WORKERS)",
+        )
+        parser.add_argument(
+            "--host",
+            default=None,
+            help="Host name the pages are requested with (default: the "
+            "municipality's first host)",
+        )
+        parser.add_argument(
+            "--list", action="store_true", help="List the warm-up steps"
+        )
+
+    def handle(self, *args, **options):
+        municipality = options["municipality"] or get_current_municipality().code
+        try:
+            with use_municipality(municipality):
+                self.warm(municipality, options)
+        except LookupError as e:
+            raise CommandError(e)
+
+    def warm(self, code, options):
+        steps = get_warmup_steps(options["host"])
+        if options["list"]:
+            for step in steps:
+                line = step.name
+                if step.depends_on:
+                    line += f" (after {', '.join(step.depends_on)})"
+                self.stdout.write(line)
+            return
+
+        names = {step.name for step in steps}
+        unknown = set(options["only"] or ()) | set(options["skip"])
+        if unknown - names:
+            raise CommandError(
+                f"Unknown steps: {', '.join(sorted(unknown - names))}, see --list"
+            )
+        steps = [
+            step
+            for step in steps
+            if (not options["only"] or step.name in options["only"])
+            and step.name not in options["skip"]
+        ]
+
+        self.stdout.write(f"🔥 Warming {len(steps)} report caches of {code}")
+        started = time.monotonic()
+        warmer = CacheWarmer(
+            steps, max_workers=options["workers"], on_progress=self.progress
+        )
+        results = warmer.run()
+
+        failed = [name for name, result in results.items() if result["error"]]
+        message = (
+            f"Warmed {len(results) - len(failed)} of {len(steps)} caches in "
+            f"{time.monotonic() - started:.1f}s"
+        )
+        if failed:
+            raise CommandError(f"{message}; failed: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS(f"✅ {message}"))
+
+    def progress(self, name, result):
+        if result["error"]:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"❌ {name} ({result['seconds']:.1f}s): {result['error']}"
+                )
+            )
+        else:
+            self.stdout.write(
+                f"✅ {name} ({result['seconds']:.1f}s): {result['detail']}"
+            )
@@ -0,0 +1,43 @@
+"""
+Report middleware
+
+Activates a build profile for every request and exposes its stage timings
+through the ``Server-Timing`` response header.
+"""
+
+from django.conf import settings
+from django.db import connection
+
+from .utils.profiling import build_profile, stage
+
+
+class BuildProfileMiddleware:
+    """Profile each request and emit a Server-Timing header"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with build_profile(request.path) as profile:
+            with connection.execute_wrapper(profile.count_query):
+                response = self.get_response(request)
+
+        if profile.stages:
+            profile.log_summary()
+            if getattr(settings, "REPORT_SERVER_TIMING", False):
+                response["Server-Timing"] = profile.server_timing_header()
+
+        return response
+
+    def process_template_response(self, request, response):
+        # Template responses are rendered after the view returns, so time the
+        # deferred render rather than the view call
+        def render_with_timing():
+            # Drop this wrapper first: cache_page pickles the response while
+            # it renders, and a local function cannot be pickled
+            del response.render
+            with stage("template_render"):
+                return response.render()
+
+        response.render = render_with_timing
+        return response
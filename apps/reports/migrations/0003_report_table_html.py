@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reporttable',
+            name='html_pdf',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reporttable',
+            name='html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reporttable',
+            name='html_web',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:48
+
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    from apps.reports.utils.counters import count_of
+
+    ReportCategory = apps.get_model("reports", "ReportCategory")
+    ReportSection = apps.get_model("reports", "ReportSection")
+    ReportFigure = apps.get_model("reports", "ReportFigure")
+    ReportTable = apps.get_model("reports", "ReportTable")
+
+    ReportSection.objects.update(
+        figures_count=count_of(ReportFigure.objects.all(), "section"),
+        tables_count=count_of(ReportTable.objects.all(), "section"),
+    )
+    ReportCategory.objects.update(
+        sections_count=count_of(ReportSection.objects.all(), "category"),
+        published_sections_count=count_of(
+            ReportSection.objects.filter(is_published=True), "category"
+        ),
+        figures_count=count_of(ReportFigure.objects.all(), "section__category"),
+        tables_count=count_of(ReportTable.objects.all(), "section__category"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_report_table_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportcategory',
+            name='figures_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reportcategory',
+            name='published_sections_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reportcategory',
+            name='sections_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reportcategory',
+            name='tables_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reportsection',
+            name='figures_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reportsection',
+            name='tables_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_report_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportfigure',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -1,10 +1,9 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 import uuid
 from ckeditor.fields import RichTextField
-from PIL import Image
 import io
 from django.core.files.base import ContentFile
 import os
@@ -12,6 +11,17 @@ import os
 User = get_user_model()
 
 
+def _write_db(instance, kwargs):
+    """Database alias a save() writes the instance to
+
+    Saves open their transaction there, so the counter updates made by the
+    signals commit or roll back with the row in every municipality database.
+    """
+    return kwargs.get("using") or router.db_for_write(
+        type(instance), instance=instance
+    )
+
+
 class ReportCategory(models.Model):
     """
     Report categories like Demographics, Economics, Social, etc.
@@ -33,6 +43,13 @@ class ReportCategory(models.Model):
     order = models.PositiveIntegerField(default=0, verbose_name="Display Order")
     icon = models.CharField(max_length=50, blank=True, verbose_name="Icon Class")
     is_active = models.BooleanField(default=True)
+    # Maintained by apps.reports.signals, see apps.reports.utils.counters
+    sections_count = models.PositiveIntegerField(default=0, editable=False)
+    published_sections_count = models.PositiveIntegerField(
+        default=0, editable=False
+    )
+    figures_count = models.PositiveIntegerField(default=0, editable=False)
+    tables_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -80,6 +97,9 @@ class ReportSection(models.Model):
         max_length=500, blank=True, verbose_name="SEO Keywords"
     )
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Maintained by apps.reports.signals, see apps.reports.utils.counters
+    figures_count = models.PositiveIntegerField(default=0, editable=False)
+    tables_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
@@ -102,7 +122,9 @@ class ReportSection(models.Model):
     def save(self, *args, **kwargs):
         if self.is_published and not self.published_at:
             self.published_at = timezone.now()
-        super().save(*args, **kwargs)
+        # Counter signals run inside the save's transaction
+        with transaction.atomic(using=_write_db(self, kwargs)):
+            super().save(*args, **kwargs)
 
 
 class ReportFigure(models.Model):
@@ -137,6 +159,8 @@ class ReportFigure(models.Model):
     chart_data = models.JSONField(
         blank=True, null=True, verbose_name="Chart Data (JSON)"
     )
+    # Resized WebP/fallback copies of image, see apps.reports.utils.renditions
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
@@ -152,6 +176,8 @@ class ReportFigure(models.Model):
     def save(self, *args, **kwargs):
         # Optimize image if uploaded
         if self.image:
+            from PIL import Image
+
             img = Image.open(self.image)
             if img.height > 800 or img.width > 1200:
                 output_size = (1200, 800)
@@ -164,7 +190,11 @@ class ReportFigure(models.Model):
 
                 # Replace the original image
                 self.image.save(self.image.name, ContentFile(output.read()), save=False)
-        super().save(*args, **kwargs)
+        from .utils.renditions import schedule_renditions
+
+        with transaction.atomic(using=_write_db(self, kwargs)):
+            super().save(*args, **kwargs)
+            schedule_renditions(self)
 
 
 class ReportTable(models.Model):
@@ -186,6 +216,10 @@ class ReportTable(models.Model):
     data = models.JSONField(verbose_name="Table Data (JSON)")
     data_source = models.TextField(blank=True, verbose_name="Data Source")
     order = models.PositiveIntegerField(default=0)
+    # HTML compiled from data on save, see apps.reports.utils.table_rendering
+    html_web = models.TextField(blank=True, editable=False)
+    html_pdf = models.TextField(blank=True, editable=False)
+    html_version = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -197,6 +231,58 @@ class ReportTable(models.Model):
     def __str__(self):
         return f"{self.table_number} - {self.title}"
 
+    def save(self, *args, **kwargs):
+        self.render_html()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "data" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {
+                "html_web",
+                "html_pdf",
+                "html_version",
+            }
+        with transaction.atomic(using=_write_db(self, kwargs)):
+            super().save(*args, **kwargs)
+
+    def render_html(self):
+        """Compile data into the stored web and PDF HTML fragments"""
+        from .utils.table_rendering import RENDERER_VERSION, render_table_variants
+
+        variants = render_table_variants(self.data)
+        self.html_web = variants["web"]
+        self.html_pdf = variants["pdf"]
+        self.html_version = RENDERER_VERSION
+
+    def get_html(self, variant="web"):
+        """Rendered table HTML, compiled lazily when the stored copy is stale
+
+        Rows updated without save() (queryset.update(), fixtures) or rendered
+        by an older renderer are compiled on access and cached per
+        updated_at until ``render_report_tables`` stores them.
+        """
+        from django.core.cache import cache
+        from django.utils.safestring import mark_safe
+
+        from .utils.table_rendering import RENDERER_VERSION, render_table_html
+
+        if self.html_version == RENDERER_VERSION:
+            return mark_safe(self.html_pdf if variant == "pdf" else self.html_web)
+
+        updated = self.updated_at.timestamp() if self.updated_at else ""
+        cache_key = (
+            f"report_table_html:{self.pk}:{variant}:{updated}:{RENDERER_VERSION}"
+        )
+        return mark_safe(
+            cache.get_or_set(cache_key, lambda: render_table_html(self.data, variant))
+        )
+
+    @property
+    def web_html(self):
+        return self.get_html("web")
+
+    @property
+    def pdf_html(self):
+        return self.get_html("pdf")
+
 
 class PublicationSettings(models.Model):
     """
@@ -86,11 +86,10 @@ class ReportCategoryListSerializer(serializers.ModelSerializer):
         ]
     
     def get_sections_count(self, obj):
-        return obj.sections.filter(is_published=True).count()
+        return obj.published_sections_count
     
     def get_sections_count_nepali(self, obj):
-        count = obj.sections.filter(is_published=True).count()
-        return to_nepali_digits(str(count))
+        return to_nepali_digits(str(obj.published_sections_count))
 
 
 class ReportCategoryDetailSerializer(serializers.ModelSerializer):
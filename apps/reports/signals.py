@@ -0,0 +1,107 @@
+"""
+Report signals
+
+Keep the section, figure and table counters on ReportCategory and
+ReportSection in step with their rows. Parents are recounted inside the
+save's or delete's transaction, so counters commit or roll back with it.
+
+Also drop the report API content version once a content change commits.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import (
+    PublicationSettings,
+    ReportCategory,
+    ReportFigure,
+    ReportSection,
+    ReportTable,
+)
+from .utils.api_cache import invalidate_content_version
+from .utils.counters import refresh_category_counters, refresh_section_counters
+
+# Fields whose change moves a row between counters
+COUNTED_FIELDS = {
+    ReportSection: ("category_id", "is_published"),
+    ReportFigure: ("section_id",),
+    ReportTable: ("section_id",),
+}
+
+
+def _counted_values(instance):
+    return tuple(getattr(instance, field) for field in COUNTED_FIELDS[type(instance)])
+
+
+@receiver(pre_save, sender=ReportSection)
+@receiver(pre_save, sender=ReportFigure)
+@receiver(pre_save, sender=ReportTable)
+def remember_counted_values(sender, instance, raw=False, **kwargs):
+    """Store the counted field values the row had before this save"""
+    instance._counted_values = None
+    if raw or instance._state.adding:
+        return
+    instance._counted_values = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(*COUNTED_FIELDS[sender])
+        .first()
+    )
+
+
+@receiver(post_save, sender=ReportSection)
+def update_category_counters_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_counted_values", None)
+    if previous == _counted_values(instance):
+        return
+    refresh_category_counters({instance.category_id, previous and previous[0]})
+
+
+@receiver(post_delete, sender=ReportSection)
+def update_category_counters_on_delete(sender, instance, **kwargs):
+    refresh_category_counters([instance.category_id])
+
+
+@receiver(post_save, sender=ReportFigure)
+@receiver(post_save, sender=ReportTable)
+def update_section_counters_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_counted_values", None)
+    if previous == _counted_values(instance):
+        return
+    update_section_counters({instance.section_id, previous and previous[0]})
+
+
+@receiver(post_delete, sender=ReportFigure)
+@receiver(post_delete, sender=ReportTable)
+def update_section_counters_on_delete(sender, instance, **kwargs):
+    update_section_counters([instance.section_id])
+
+
+def update_section_counters(section_ids):
+    """Recount the sections and the categories they belong to"""
+    section_ids = [pk for pk in section_ids if pk]
+    refresh_section_counters(section_ids)
+    refresh_category_counters(
+        ReportSection.objects.filter(pk__in=section_ids).values_list(
+            "category_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=ReportCategory)
+@receiver(post_save, sender=ReportSection)
+@receiver(post_save, sender=ReportFigure)
+@receiver(post_save, sender=ReportTable)
+@receiver(post_save, sender=PublicationSettings)
+@receiver(post_delete, sender=ReportCategory)
+@receiver(post_delete, sender=ReportSection)
+@receiver(post_delete, sender=ReportFigure)
+@receiver(post_delete, sender=ReportTable)
+@receiver(post_delete, sender=PublicationSettings)
+def invalidate_api_cache(sender, using, **kwargs):
+    # Hooked to the transaction of the database the row was written to
+    transaction.on_commit(invalidate_content_version, using=using)
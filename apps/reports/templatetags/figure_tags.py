@@ -0,0 +1,78 @@
+"""
+Report Figure Template Tags
+
+Responsive ``<picture>`` markup for report figures built from their resized
+renditions, see apps.reports.utils.renditions.
+"""
+
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from ..utils.renditions import rendition_candidates
+from ..utils.renditions import rendition_url as get_rendition_url
+
+register = template.Library()
+
+
+def _srcset(candidates, key):
+    return ", ".join(
+        f"{default_storage.url(rendition[key])} {rendition['width']}w"
+        for rendition in candidates
+    )
+
+
+@register.simple_tag
+def figure_picture(figure, largest="web", sizes="100vw", **attrs):
+    """
+    WebP and fallback srcsets of a figure, up to the ``largest`` rendition
+
+    Extra keyword arguments become <img> attributes; underscores in their
+    names are written as hyphens. Figures without renditions yet fall back to
+    the original image.
+
+    Usage:
+        {% figure_picture figure "web" "(max-width: 768px) 100vw, 33vw" class="card-img-top" data_bs_toggle="modal" %}
+    """
+    if not figure.image:
+        return ""
+
+    attrs = {name.replace("_", "-"): value for name, value in attrs.items()}
+    attrs.setdefault("alt", figure.title_nepali or figure.title)
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+
+    candidates = rendition_candidates(figure, largest)
+    if not candidates:
+        img_attrs = {"src": figure.image.url, **attrs}
+        return format_html(
+            "<img{} />", format_html_join("", ' {}="{}"', img_attrs.items())
+        )
+
+    largest_rendition = candidates[-1]
+    img_attrs = {
+        "src": default_storage.url(largest_rendition["fallback"]),
+        "srcset": _srcset(candidates, "fallback"),
+        "sizes": sizes,
+        "width": largest_rendition["width"],
+        "height": largest_rendition["height"],
+        **attrs,
+    }
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}" />'
+        "<img{} /></picture>",
+        _srcset(candidates, "webp"),
+        sizes,
+        format_html_join("", ' {}="{}"', img_attrs.items()),
+    )
+
+
+@register.filter
+def rendition_url(figure, name="print"):
+    """
+    Fallback-format URL of one rendition, or of the original image
+
+    Usage:
+        <img src="{{ figure|rendition_url:'print' }}" />
+    """
+    return get_rendition_url(figure, name)
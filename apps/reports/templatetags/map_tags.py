@@ -0,0 +1,55 @@
+"""
+Map Template Tags
+
+Print and deep-zoom derivatives of the report's landscape maps, see
+apps.reports.utils.map_assets.
+"""
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from ..utils.map_assets import MAPS, get_map_assets
+
+register = template.Library()
+
+
+@register.simple_tag
+def map_image(name, **attrs):
+    """
+    <img> of a map's print derivative, or of the original until it is built
+
+    The deep-zoom descriptor of the map is added as ``data-dzi`` for the web
+    viewer. Extra keyword arguments become <img> attributes; underscores in
+    their names are written as hyphens.
+
+    Usage:
+        {% map_image "aspect" alt="Aspect Classification Map" class="landscape-map" %}
+    """
+    attrs = {key.replace("_", "-"): value for key, value in attrs.items()}
+    assets = get_map_assets(name)
+    if assets is None:
+        img_attrs = {"src": static(MAPS[name]), **attrs}
+    else:
+        img_attrs = {
+            "src": assets["print"]["url"],
+            "width": assets["print"]["width"],
+            "height": assets["print"]["height"],
+            "data-dzi": assets["tiles"]["url"],
+            **attrs,
+        }
+    return format_html(
+        "<img{} />", format_html_join("", ' {}="{}"', img_attrs.items())
+    )
+
+
+@register.simple_tag
+def map_tiles_url(name):
+    """
+    URL of a map's Deep Zoom descriptor (.dzi), or "" until it is built
+
+    Usage:
+        {% map_tiles_url "aspect" as tiles_url %}
+    """
+    assets = get_map_assets(name)
+    return assets["tiles"]["url"] if assets else ""
@@ -0,0 +1,1381 @@
+"""
+Report Tests
+
+Tests for report build infrastructure.
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db.models.signals import post_save
+from django.template import Context, Template, engines
+from django.template.loader import render_to_string
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.cache import cache_page
+from PIL import Image
+
+from apps.core.tenancy import (
+    get_current_municipality,
+    get_municipalities,
+    use_municipality,
+)
+from apps.demographics.models import (
+    MunicipalityWideReligionPopulation,
+    WardAgeWisePopulation,
+    WardTimeSeriesPopulation,
+)
+from apps.demographics.processors.religion import ReligionProcessor
+from apps.reports.middleware import BuildProfileMiddleware
+from apps.reports.models import (
+    ReportCategory,
+    ReportFigure,
+    ReportSection,
+    ReportTable,
+)
+from apps.reports.serializers import ReportCategoryListSerializer
+from apps.reports.utils.api_cache import (
+    get_content_version,
+    invalidate_content_version,
+    make_etag,
+)
+from apps.reports.utils.benchmarks import BOOT_CASE, BenchmarkHistory, measure_boot
+from apps.reports.utils.counters import find_stale_counters
+from apps.reports.utils.exports import (
+    ModelTable,
+    ProcessorTable,
+    iter_csv,
+    open_bundle,
+)
+from apps.reports.utils.lazy_context import LazyReportData
+from apps.reports.utils.map_assets import generate_map_assets, get_map_assets
+from apps.reports.utils.pdf_rendering import PDF_CONTEXT, PDFWorkerPool
+from apps.reports.utils.processor_data import (
+    choose_encoding,
+    data_fingerprint,
+    filter_wards,
+    get_source_models,
+    invalidate_processor_data,
+    select_fields,
+)
+from apps.reports.utils.profiles import (
+    FULL_REPORT_TEMPLATE,
+    RENDER_BASE_URL,
+    ProfileRenderer,
+    local_path_for_url,
+)
+from apps.reports.utils.profiling import (
+    build_profile,
+    instrument_processor,
+    stage,
+)
+from apps.reports.utils.query_audit import QueryPlanAudit, filtered_columns
+from apps.reports.utils.scheduler import ProcessorScheduler
+from apps.reports.utils.snapshots import (
+    ReportSnapshot,
+    SnapshotError,
+    diff_snapshots,
+    freeze,
+    freeze_navigation,
+)
+from apps.reports.utils.synthetic_data import SyntheticDataGenerator
+from apps.reports.utils.table_rendering import render_table_html
+from apps.reports.utils.time_series import WardTimeSeries, to_python
+from apps.reports.utils.view_models import localize_row, percentage, ward_blocks
+from apps.reports.utils.warmup import (
+    PAGE_ACCEPT_ENCODING,
+    CacheWarmer,
+    WarmupStep,
+    public_urls,
+    warm_pages,
+)
+
+
+class BuildProfileTestCase(TestCase):
+    """Test build profiling"""
+
+    def test_stage_without_profile_is_noop(self):
+        """Stages outside a profiled build just run the block"""
+        with stage("unprofiled"):
+            value = 1
+        self.assertEqual(value, 1)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+    )
+    def test_cached_template_response_is_picklable(self):
+        """cache_page can store a template response timed by the middleware"""
+        calls = []
+
+        @cache_page(60)
+        def view(request):
+            calls.append(request)
+            return TemplateResponse(request, engines["django"].from_string("ok"))
+
+        middleware = BuildProfileMiddleware(view)
+
+        def get():
+            request = RequestFactory().get("/cached/")
+            response = view(request)
+            if callable(getattr(response, "render", None)):
+                response = middleware.process_template_response(request, response)
+                response.render()
+            return response
+
+        with build_profile("cached") as profile:
+            get()
+        self.assertEqual(len(calls), 1)
+        self.assertIn("template_render", profile.totals())
+
+        self.assertEqual(get().content, b"ok")
+        self.assertEqual(len(calls), 1)
+        cache.clear()
+
+    def test_stage_records_duration_and_queries(self):
+        """Stages record their queries and nesting depth"""
+        with build_profile("test") as profile:
+            with stage("outer"):
+                with stage("inner"):
+                    list(ReportCategory.objects.all())
+
+        names = [entry["name"] for entry in profile.stages]
+        self.assertEqual(names, ["inner", "outer"])
+        self.assertEqual(profile.stages[0]["depth"], 1)
+        self.assertEqual(profile.totals()["outer"]["queries"], 1)
+        self.assertIn("outer;dur=", profile.server_timing_header())
+        self.assertNotIn("inner", profile.server_timing_header())
+
+    def test_instrument_processor(self):
+        """Processor pipeline methods are wrapped once"""
+
+        class DummyProcessor:
+            def get_data(self):
+                return {"value": 1}
+
+        processor = instrument_processor(DummyProcessor(), "dummy")
+        instrument_processor(processor, "dummy")
+
+        with build_profile() as profile:
+            self.assertEqual(processor.get_data(), {"value": 1})
+
+        self.assertEqual(
+            [entry["name"] for entry in profile.stages], ["dummy.get_data"]
+        )
+
+
+class SyntheticDataGeneratorTestCase(TestCase):
+    """Test synthetic benchmark data"""
+
+    def test_generate_scales_wards_and_years(self):
+        """Ward, year and choice fields are enumerated exhaustively"""
+        generator = SyntheticDataGenerator(wards=3, categories=2, years=4)
+        counts = generator.generate(app_labels=["demographics"])
+
+        self.assertEqual(counts["demographics.WardAgeWisePopulation"], 3 * 2 * 2)
+        self.assertEqual(WardAgeWisePopulation.objects.count(), 12)
+        self.assertEqual(
+            WardTimeSeriesPopulation.objects.values("year").distinct().count(), 4
+        )
+
+
+class BootBenchmarkTestCase(SimpleTestCase):
+    """Test the worker boot benchmark"""
+
+    def test_boot_imports_no_heavy_modules(self):
+        """Starting Django loads no PDF, plotting or dataframe library"""
+        result = measure_boot(repeat=1)
+
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["heavy_modules"], [])
+        self.assertGreater(result["setup_ms"], 0)
+
+    def test_new_heavy_module_is_a_regression(self):
+        before = {"wall_ms": 500, "queries": 0, "error": None, "heavy_modules": []}
+        after = {**before, "heavy_modules": ["reportlab"]}
+
+        regressions = BenchmarkHistory.find_regressions(
+            {"results": {BOOT_CASE: before}}, {BOOT_CASE: after}
+        )
+
+        self.assertEqual(
+            regressions, [(BOOT_CASE, "heavy_modules", [], ["reportlab"])]
+        )
+
+
+class DummyProcessor:
+    """Processor stub recording when it ran"""
+
+    def __init__(self, log, name, depends_on=(), delay=0, error=None):
+        self.log = log
+        self.name = name
+        self.depends_on = depends_on
+        self.delay = delay
+        self.error = error
+
+    def process_for_pdf(self):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        self.log.append(self.name)
+        return {"name": self.name}
+
+
+class ProcessorSchedulerTestCase(SimpleTestCase):
+    """Test the concurrent processor scheduler"""
+
+    def test_results_keep_registration_order(self):
+        """Slow processors don't reorder the results"""
+        log = []
+        scheduler = ProcessorScheduler(max_workers=4).add(
+            "demo",
+            {
+                "slow": DummyProcessor(log, "slow", delay=0.05),
+                "fast": DummyProcessor(log, "fast"),
+            },
+        )
+        results = scheduler.run()
+
+        self.assertEqual(log, ["fast", "slow"])
+        self.assertEqual(list(results["demo"]), ["slow", "fast"])
+
+    def test_dependencies_run_first(self):
+        """Dependent processors wait for their dependencies across domains"""
+        log = []
+        scheduler = ProcessorScheduler(max_workers=4)
+        scheduler.add(
+            "social", {"summary": DummyProcessor(log, "summary", ("demo.base",))}
+        )
+        scheduler.add("demo", {"base": DummyProcessor(log, "base", delay=0.05)})
+        results = scheduler.run()
+
+        self.assertEqual(log, ["base", "summary"])
+        self.assertEqual(list(results), ["social", "demo"])
+
+    def test_errors_are_isolated(self):
+        """A failing processor falls back without stopping the others"""
+        for workers in (1, 4):
+            log = []
+            scheduler = ProcessorScheduler(max_workers=workers).add(
+                "demo",
+                {
+                    "broken": DummyProcessor(log, "broken", error=ValueError("x")),
+                    "dependent": DummyProcessor(log, "dependent", ("broken",)),
+                    "other": DummyProcessor(log, "other"),
+                },
+            )
+            results = scheduler.run()["demo"]
+
+            self.assertEqual(log, ["other"])
+            self.assertEqual(results["broken"]["error"], "ValueError: x")
+            self.assertIn("broken", results["dependent"]["error"])
+            self.assertEqual(results["other"], {"name": "other"})
+
+    def test_timeout(self):
+        """Processors running past the timeout get their fallback result"""
+        release = threading.Event()
+
+        class HangingProcessor:
+            def process_for_pdf(self):
+                release.wait(5)
+                return {"name": "hanging"}
+
+        scheduler = ProcessorScheduler(max_workers=2, timeout=0.1).add(
+            "demo", {"hanging": HangingProcessor(), "ok": DummyProcessor([], "ok")}
+        )
+        try:
+            results = scheduler.run()["demo"]
+        finally:
+            release.set()
+
+        self.assertIn("Timed out", results["hanging"]["error"])
+        self.assertEqual(results["ok"], {"name": "ok"})
+
+    def test_circular_dependencies_rejected(self):
+        scheduler = ProcessorScheduler().add(
+            "demo",
+            {
+                "a": DummyProcessor([], "a", ("b",)),
+                "b": DummyProcessor([], "b", ("a",)),
+            },
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            scheduler.run()
+
+
+class DummyManager:
+    def __init__(self, processors):
+        self.processors = processors
+
+
+# No chart directory: there are no charts to publish
+@override_settings(STATICFILES_DIRS=[Path(tempfile.gettempdir()) / "no-static"])
+class LazyReportDataTestCase(SimpleTestCase):
+    """Test lazily computed report template context"""
+
+    def setUp(self):
+        self.log = []
+        self.report = LazyReportData(
+            {
+                "demo": DummyManager(
+                    {
+                        "a": DummyProcessor(self.log, "a"),
+                        "b": DummyProcessor(self.log, "b", ("a",)),
+                        "c": DummyProcessor(self.log, "c"),
+                    }
+                ),
+                "other": DummyManager(
+                    {"broken": DummyProcessor(self.log, "x", error=ValueError())}
+                ),
+            }
+        )
+
+    def test_processors_run_on_first_read(self):
+        data = self.report.domain("demo")
+        html = Template("{% if data.b %}{{ data.b.name }}{{ data.b.name }}{% endif %}")
+
+        self.assertEqual(list(data), ["a", "b", "c"])
+        self.assertEqual(self.log, [])
+        with build_profile() as profile:
+            self.assertEqual(html.render(Context({"data": data})), "bb")
+
+        # Dependencies first, each processor once, "c" never
+        self.assertEqual(self.log, ["a", "b"])
+        counts = self.report.access_counts()
+        self.assertEqual(counts["demo.b"], {"accesses": 2, "computed": True})
+        self.assertEqual(counts["demo.a"], {"accesses": 0, "computed": True})
+        self.assertEqual(counts["demo.c"], {"accesses": 0, "computed": False})
+        self.assertEqual(profile.counters, {"context.demo.b": 2})
+
+    def test_failures_and_prefetch(self):
+        self.assertIsNotNone(self.report.domain("other")["broken"]["error"])
+        self.assertFalse(self.report.domain("missing"))
+
+        self.report.prefetch()
+        self.assertEqual(sorted(self.log), ["a", "b", "c"])
+        self.assertEqual(self.report.domain("demo")["c"]["name"], "c")
+        self.assertEqual(self.log.count("c"), 1)
+
+
+class ProcessorDataTestCase(TestCase):
+    """Test the processor data API helpers"""
+
+    def test_fingerprint_tracks_source_rows(self):
+        """The fingerprint changes when a source model row changes"""
+        processor = ReligionProcessor()
+        self.assertEqual(
+            get_source_models(processor), [MunicipalityWideReligionPopulation]
+        )
+
+        before, _ = data_fingerprint("demographics", "religion", processor)
+        row = MunicipalityWideReligionPopulation.objects.create(
+            religion="HINDU", population=10
+        )
+        after, last_modified = data_fingerprint("demographics", "religion", processor)
+
+        self.assertNotEqual(before, after)
+        self.assertEqual(last_modified, row.updated_at)
+        self.assertEqual(
+            data_fingerprint("demographics", "religion", processor)[0], after
+        )
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+    )
+    def test_fingerprint_changes_after_invalidation(self):
+        """Writes bypassing auto_now are covered by explicit invalidation"""
+        processor = ReligionProcessor()
+        row = MunicipalityWideReligionPopulation.objects.create(
+            religion="HINDU", population=10
+        )
+        before = data_fingerprint("demographics", "religion", processor)[0]
+
+        MunicipalityWideReligionPopulation.objects.filter(pk=row.pk).update(
+            population=20
+        )
+        self.assertEqual(
+            data_fingerprint("demographics", "religion", processor)[0], before
+        )
+
+        invalidate_processor_data()
+        self.assertNotEqual(
+            data_fingerprint("demographics", "religion", processor)[0], before
+        )
+        cache.clear()
+
+    def test_filter_wards(self):
+        data = {
+            "ward_data": {"1": {"total": 5}, "2": {"total": 7}},
+            "municipality_data": {"1": "not ward keyed"},
+            "2080": [{"ward_number": 1}, {"ward_number": 2}],
+        }
+        filtered = filter_wards(data, [2])
+
+        self.assertEqual(filtered["ward_data"], {"2": {"total": 7}})
+        self.assertEqual(filtered["municipality_data"], {"1": "not ward keyed"})
+        self.assertEqual(filtered["2080"], [{"ward_number": 2}])
+
+    def test_select_fields(self):
+        data = {"summary": {"total": 1, "male": 2}, "ward_data": {}, "other": 3}
+
+        self.assertEqual(
+            select_fields(data, ["summary.total", "other", "missing"]),
+            {"summary": {"total": 1}, "other": 3},
+        )
+        self.assertIs(select_fields(data, []), data)
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding("gzip, deflate"), "gzip")
+        self.assertEqual(choose_encoding("gzip;q=0, identity"), None)
+        self.assertIn(choose_encoding("gzip, br"), ("br", "gzip"))
+
+
+class DataExportTestCase(TestCase):
+    """Test report data exports"""
+
+    def setUp(self):
+        export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, export_dir, ignore_errors=True)
+        settings_override = override_settings(REPORT_EXPORT_DIR=export_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for ward in (1, 2, 3):
+            WardAgeWisePopulation.objects.create(
+                ward_number=ward, age_group="AGE_0_4", gender="MALE", population=ward
+            )
+
+    def test_csv_streams_one_piece_per_chunk(self):
+        pieces = list(iter_csv(ModelTable(WardAgeWisePopulation), chunk_size=2))
+        rows = list(csv.reader(io.StringIO(b"".join(pieces).decode("utf-8-sig"))))
+
+        # Header, then chunks of 2 and 1 rows
+        self.assertEqual(len(pieces), 3)
+        self.assertIn("ward_number", rows[0])
+        ward = rows[0].index("ward_number")
+        self.assertEqual(sorted(row[ward] for row in rows[1:]), ["1", "2", "3"])
+
+    def test_processor_table_flattens_values(self):
+        MunicipalityWideReligionPopulation.objects.create(
+            religion="HINDU", population=10
+        )
+        table = ProcessorTable("demographics", "religion", ReligionProcessor())
+        rows = list(table.rows())
+
+        self.assertTrue(rows)
+        self.assertTrue(all(len(row) == 3 for row in rows))
+        self.assertIn(10.0, [number for _, number, _ in rows])
+
+    def test_bundle_built_once_per_fingerprint(self):
+        with open_bundle("csv", ("demographics",)) as bundle:
+            with zipfile.ZipFile(bundle) as archive:
+                manifest = json.loads(archive.read("manifest.json"))
+                names = archive.namelist()
+            first = bundle.name
+
+        tables = {table["name"]: table for table in manifest["tables"]}
+        self.assertEqual(tables["demographics.WardAgeWisePopulation"]["rows"], 3)
+        self.assertIn("demographics.WardAgeWisePopulation.csv", names)
+        self.assertIn("processors.demographics.religion.csv", names)
+
+        with open_bundle("csv", ("demographics",)) as bundle:
+            self.assertEqual(bundle.name, first)
+
+        WardAgeWisePopulation.objects.create(
+            ward_number=4, age_group="AGE_0_4", gender="MALE", population=4
+        )
+        with open_bundle("csv", ("demographics",)) as bundle:
+            self.assertNotEqual(bundle.name, first)
+
+    def test_table_view(self):
+        response = self.client.get(
+            "/export/demographics.WardAgeWisePopulation.csv"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        self.assertEqual(len(content.strip().splitlines()), 4)
+        self.assertEqual(
+            self.client.get("/export/demographics.Missing.csv").status_code, 404
+        )
+        self.assertEqual(
+            self.client.get("/export/bundle.zip?format=pdf").status_code, 400
+        )
+
+
+class WardTimeSeriesTestCase(SimpleTestCase):
+    """Test the vectorized ward time series"""
+
+    def setUp(self):
+        # (year, ward, population, households); ward 3 only reports in 2081
+        self.series = WardTimeSeries.from_rows(
+            [
+                (2071, 1, 100, 20),
+                (2071, 2, 200, None),
+                (2081, 1, 121, 25),
+                (2081, 2, 150, 30),
+                (2081, 3, 80, 10),
+            ],
+            ("population", "households"),
+        )
+
+    def test_layout(self):
+        self.assertEqual(self.series.years.tolist(), [2071, 2081])
+        self.assertEqual(self.series.wards.tolist(), [1, 2, 3])
+        self.assertEqual(
+            self.series.observed.tolist(), [[True, True, False], [True, True, True]]
+        )
+        self.assertEqual(self.series.totals("households").tolist(), [20, 65])
+
+    def test_growth(self):
+        self.assertEqual(
+            to_python(self.series.growth_rates("population"), 2), [[21.0, -25.0, None]]
+        )
+        self.assertEqual(self.series.deltas("population")[0, :2].tolist(), [21, -50])
+        self.assertAlmostEqual(self.series.cagr("population")[0], 1.9245, places=4)
+        self.assertTrue(np.isnan(self.series.cagr("population")[2]))
+
+    def test_rankings_and_ratios(self):
+        self.assertEqual(self.series.ranks("population").tolist(), [2, 1, 3])
+        self.assertEqual(self.series.ranks("population", 2071).tolist(), [2, 1, 3])
+        self.assertEqual(self.series.extremes("population"), (2, 3))
+        self.assertEqual(
+            to_python(self.series.ratio("population", "households"))[0], [5.0, 0.0, 0.0]
+        )
+        self.assertEqual(
+            self.series.ward_trends("population")[1]["growth_rate"], 21.0
+        )
+
+
+class ReportTableRenderingTestCase(TestCase):
+    """Test pre-rendered report table HTML"""
+
+    def setUp(self):
+        category = ReportCategory.objects.create(
+            name="Demographics", name_nepali="जनसांख्यिकी", slug="demographics"
+        )
+        self.section = ReportSection.objects.create(
+            category=category,
+            title="Population",
+            title_nepali="जनसंख्या",
+            slug="population",
+            section_number="3.1",
+        )
+
+    def test_render_table_html(self):
+        html = render_table_html(
+            [["वडा", "जनसंख्या", "प्रतिशत"], [1, 1234567, 12.5], ["<b>", None, 3.0]]
+        )
+
+        self.assertIn('<th scope="col">जनसंख्या</th>', html)
+        self.assertIn('<td class="text-end" data-value="1234567">१२,३४,५६७</td>', html)
+        self.assertIn('<td class="text-end" data-value="12.5">१२.५</td>', html)
+        self.assertIn("<td>&lt;b&gt;</td><td></td>", html)
+        self.assertIn(">३</td>", html)
+
+        pdf = render_table_html({"headers": ["A"], "rows": [[5000]]}, variant="pdf")
+        self.assertEqual(
+            pdf,
+            '<thead><tr><th style="text-align: center;">A</th></tr></thead>'
+            '<tbody><tr><td style="text-align: right;">५,०००</td></tr></tbody>',
+        )
+
+    def test_html_is_stored_on_save(self):
+        table = ReportTable.objects.create(
+            section=self.section,
+            title="Wards",
+            title_nepali="वडा",
+            table_number="3.1.1",
+            data=[["वडा", "जनसंख्या"], [1, 100]],
+        )
+        table.refresh_from_db()
+        self.assertIn("१००", table.html_web)
+        self.assertIn("१००", table.html_pdf)
+        self.assertEqual(table.web_html, table.html_web)
+
+        # Rows written without save() are rendered lazily
+        ReportTable.objects.filter(pk=table.pk).update(
+            data=[["वडा"], [2]], html_version=0
+        )
+        table.refresh_from_db()
+        self.assertIn(">२</td>", table.pdf_html)
+
+
+class ViewModelTestCase(SimpleTestCase):
+    """Test view model row localization"""
+
+    def test_localize_row(self):
+        self.assertEqual(
+            localize_row(("वडा", 1250, 12.0, percentage(1, 3), None), digits={3: 1}),
+            ("वडा", "१२५०", "१२", "३३.३", ""),
+        )
+        self.assertEqual(percentage(5, 0), 0.0)
+
+    def test_ward_blocks(self):
+        blocks = ward_blocks([(10, [("०-४ वर्ष", 3, 4, 7)], (3, 4, 7))])
+        self.assertEqual(blocks[0]["ward_number"], "१०")
+        self.assertEqual(blocks[0]["rows"], [("०-४ वर्ष", "३", "४", "७")])
+        self.assertEqual(blocks[0]["total"], ("३", "४", "७"))
+
+
+class ReportCounterTestCase(TestCase):
+    """Test the maintained section, figure and table counters"""
+
+    def setUp(self):
+        self.category = ReportCategory.objects.create(
+            name="Demographics", name_nepali="जनसांख्यिकी", slug="demographics"
+        )
+        self.other = ReportCategory.objects.create(
+            name="Social", name_nepali="सामाजिक", slug="social"
+        )
+        self.published = self._section(self.category, "a", is_published=True)
+        self.draft = self._section(self.category, "b", is_published=False)
+        ReportFigure.objects.create(
+            section=self.published, title="F", title_nepali="चित्र", figure_number="1"
+        )
+        self.table = ReportTable.objects.create(
+            section=self.published,
+            title="T",
+            title_nepali="तालिका",
+            table_number="1",
+            data=[["a"], [1]],
+        )
+
+    def _section(self, category, slug, is_published):
+        return ReportSection.objects.create(
+            category=category,
+            title=slug,
+            title_nepali=slug,
+            slug=slug,
+            section_number=slug,
+            is_published=is_published,
+        )
+
+    def _counts(self, obj):
+        obj.refresh_from_db()
+        fields = ["figures_count", "tables_count"]
+        if isinstance(obj, ReportCategory):
+            fields = ["sections_count", "published_sections_count"] + fields
+        return [getattr(obj, field) for field in fields]
+
+    def test_signals_maintain_counters(self):
+        self.assertEqual(self._counts(self.category), [2, 1, 1, 1])
+        self.assertEqual(self._counts(self.published), [1, 1])
+
+        self.draft.is_published = True
+        self.draft.save()
+        self.assertEqual(self._counts(self.category), [2, 2, 1, 1])
+
+        # Moving a table updates both sections and their categories
+        moved_to = self._section(self.other, "c", is_published=True)
+        self.table.section = moved_to
+        self.table.save()
+        self.assertEqual(self._counts(self.published), [1, 0])
+        self.assertEqual(self._counts(self.category), [2, 2, 1, 0])
+        self.assertEqual(self._counts(self.other), [1, 1, 0, 1])
+
+        self.published.delete()
+        self.assertEqual(self._counts(self.category), [1, 1, 0, 0])
+        self.assertEqual(find_stale_counters(), (0, 0))
+
+    def test_repair_command(self):
+        ReportSection.objects.filter(pk=self.draft.pk).update(is_published=True)
+        self.assertEqual(find_stale_counters(), (0, 1))
+        with self.assertRaises(CommandError):
+            call_command("repair_report_counters", check=True, stdout=io.StringIO())
+
+        call_command("repair_report_counters", stdout=io.StringIO())
+        self.assertEqual(find_stale_counters(), (0, 0))
+        self.assertEqual(self._counts(self.category), [2, 2, 1, 1])
+
+    def test_category_api_query_count(self):
+        serializer = ReportCategoryListSerializer()
+        with self.assertNumQueries(1):
+            counts = [
+                serializer.get_sections_count(category)
+                for category in ReportCategory.objects.all()
+            ]
+        self.assertEqual(counts, [1, 0])
+
+
+@override_settings(
+    REPORT_MUNICIPALITIES={
+        "gadhawa": {
+            "name": "गढवा गाउँपालिका",
+            "name_english": "Gadhawa Rural Municipality",
+            "charts_namespace": "",
+        },
+        "lamahi": {
+            "name": "लमही नगरपालिका",
+            "name_english": "Lamahi Municipality",
+            "database": "tenant",
+        },
+    },
+    REPORT_DEFAULT_MUNICIPALITY="gadhawa",
+)
+class TenantDatabaseTestCase(TestCase):
+    """Test report content saved in a municipality's own database"""
+
+    databases = {"default", "tenant"}
+
+    def test_counters_roll_back_with_the_row(self):
+        def fail_after_counters(sender, **kwargs):
+            raise RuntimeError("save failed")
+
+        with use_municipality("lamahi"):
+            category = ReportCategory.objects.create(
+                name="Demographics", name_nepali="जनसांख्यिकी", slug="demographics"
+            )
+            self.assertEqual(category._state.db, "tenant")
+
+            post_save.connect(fail_after_counters, sender=ReportSection)
+            self.addCleanup(
+                post_save.disconnect, fail_after_counters, sender=ReportSection
+            )
+            with self.assertRaises(RuntimeError):
+                ReportSection.objects.create(
+                    category=category,
+                    title="a",
+                    title_nepali="a",
+                    slug="a",
+                    section_number="1",
+                    is_published=True,
+                )
+
+            self.assertFalse(ReportSection.objects.exists())
+            category.refresh_from_db()
+            self.assertEqual(category.sections_count, 0)
+
+    def test_api_cache_invalidated_after_tenant_commit(self):
+        with use_municipality("lamahi"):
+            category = ReportCategory.objects.create(
+                name="Demographics", name_nepali="जनसांख्यिकी", slug="demographics"
+            )
+            with self.captureOnCommitCallbacks(using="default") as default_callbacks:
+                with self.captureOnCommitCallbacks(using="tenant") as callbacks:
+                    category.delete()
+
+        self.assertIn(invalidate_content_version, callbacks)
+        self.assertEqual(default_callbacks, [])
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ReportAPICacheTestCase(TestCase):
+    """Test the content version of the report API cache"""
+
+    def setUp(self):
+        self.category = ReportCategory.objects.create(
+            name="Demographics", name_nepali="जनसांख्यिकी", slug="demographics"
+        )
+        self.addCleanup(cache.clear)
+
+    def test_version_is_cached(self):
+        version = get_content_version()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_content_version(), version)
+
+    def test_version_changes_after_commit(self):
+        version = get_content_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            ReportSection.objects.create(
+                category=self.category,
+                title="a",
+                title_nepali="a",
+                slug="a",
+                section_number="1",
+            )
+        self.assertNotEqual(get_content_version(), version)
+
+    def test_etag_varies_by_request(self):
+        self.assertNotEqual(make_etag("v1", "/a/"), make_etag("v1", "/a/?page=2"))
+        self.assertNotEqual(make_etag("v1", "/a/"), make_etag("v2", "/a/"))
+        self.assertTrue(make_etag("v1", "/a/").startswith('W/"'))
+
+    def test_matching_etag_returns_not_modified(self):
+        url = reverse("reports:api_categories")
+        response = self.client.get(url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(
+            url, HTTP_HOST="localhost", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_cursor_pages_return_every_section_once(self):
+        # Tied on every ordering field but the primary key
+        for index in range(5):
+            ReportSection.objects.create(
+                category=self.category,
+                title=f"Section {index}",
+                title_nepali=f"Section {index}",
+                slug=f"section-{index}",
+                section_number="1.1",
+                is_published=True,
+            )
+
+        ids = []
+        url = f"{reverse('reports:api_sections')}?page_size=2"
+        while url:
+            response = self.client.get(url, HTTP_HOST="localhost")
+            self.assertEqual(response.status_code, 200)
+            ids.extend(section["id"] for section in response.json()["results"])
+            url = response.json()["next"]
+
+        expected = ReportSection.objects.values_list("pk", flat=True)
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(set(ids), {str(pk) for pk in expected})
+
+
+class ReportFigureRenditionTestCase(TestCase):
+    """Test resized figure renditions and their responsive markup"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        category = ReportCategory.objects.create(
+            name="Maps", name_nepali="नक्सा", slug="maps"
+        )
+        self.section = ReportSection.objects.create(
+            category=category,
+            title="Ward map",
+            title_nepali="वडा नक्सा",
+            slug="ward-map",
+            section_number="1.1",
+        )
+
+    def _upload(self, size, mode="RGB"):
+        output = io.BytesIO()
+        Image.new(mode, size, "red").save(output, format="PNG")
+        return SimpleUploadedFile("map.png", output.getvalue(), "image/png")
+
+    def test_renditions_generated_after_commit(self):
+        with override_settings(
+            MEDIA_ROOT=self.media_root, REPORT_FIGURE_RENDITIONS_ASYNC=False
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                figure = ReportFigure.objects.create(
+                    section=self.section,
+                    title="Map",
+                    title_nepali="नक्सा",
+                    figure_number="1",
+                    image=self._upload((1000, 500)),
+                )
+            figure.refresh_from_db()
+            renditions = figure.renditions
+
+            self.assertEqual(renditions["source"], figure.image.name)
+            self.assertEqual(renditions["thumb"]["width"], 320)
+            self.assertEqual(renditions["thumb"]["height"], 160)
+            # Never upscaled past the source width
+            self.assertEqual(renditions["print"]["width"], 1000)
+            self.assertTrue(renditions["web"]["webp"].endswith(".webp"))
+            self.assertTrue(renditions["web"]["fallback"].endswith(".jpg"))
+
+            html = Template(
+                '{% load figure_tags %}{% figure_picture figure "web" "50vw" '
+                'class="card-img-top" data_bs_toggle="modal" %}'
+            ).render(Context({"figure": figure}))
+
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn(" 320w, ", html)
+        self.assertNotIn("1000w", html)
+        self.assertIn('data-bs-toggle="modal"', html)
+        self.assertIn('alt="नक्सा"', html)
+
+    def test_transparent_images_fall_back_to_png(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            figure = ReportFigure.objects.create(
+                section=self.section,
+                title="Map",
+                title_nepali="नक्सा",
+                figure_number="1",
+                image=self._upload((200, 100), mode="RGBA"),
+            )
+            html = Template("{% load figure_tags %}{% figure_picture figure %}").render(
+                Context({"figure": figure})
+            )
+            # Without renditions the original image is used
+            self.assertIn(figure.image.url, html)
+            self.assertNotIn("<picture>", html)
+
+            call_command("generate_figure_renditions", stdout=io.StringIO())
+            figure.refresh_from_db()
+
+        self.assertEqual(figure.renditions["thumb"], figure.renditions["print"])
+        self.assertTrue(figure.renditions["thumb"]["fallback"].endswith(".png"))
+
+
+class MapAssetsTestCase(SimpleTestCase):
+    """Test the print and deep-zoom derivatives of the report maps"""
+
+    def setUp(self):
+        static_root = Path(tempfile.mkdtemp())
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.source = static_root / "images" / "maps" / "aspect.png"
+        self.source.parent.mkdir(parents=True)
+        Image.new("RGB", (1200, 700), "green").save(self.source)
+
+        settings_override = override_settings(
+            STATICFILES_DIRS=[static_root],
+            MEDIA_ROOT=self.media_root,
+            REPORT_MAP_PRINT_DPI=100,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_derivatives_fit_the_printed_box(self):
+        self.assertIsNone(get_map_assets("aspect"))
+        manifest, built = generate_map_assets("aspect")
+
+        self.assertTrue(built)
+        # 24.7 x 13.5 cm at 100 DPI is 972 x 531 pixels
+        print_size = (manifest["print"]["width"], manifest["print"]["height"])
+        self.assertEqual(print_size, (910, 531))
+        self.assertEqual(manifest["tiles"]["levels"], 12)
+        (assets_dir,) = Path(self.media_root, "reports", "maps").iterdir()
+        tiles_dir = assets_dir / "aspect_files"
+        self.assertEqual(len(list((tiles_dir / "11").iterdir())), 15)
+        self.assertEqual(len(list((tiles_dir / "0").iterdir())), 1)
+        with Image.open(tiles_dir / "11" / "1_0.jpg") as tile:
+            self.assertEqual(tile.size, (258, 257))
+
+        html = Template(
+            '{% load map_tags %}{% map_image "aspect" class="landscape-map" %}'
+        ).render(Context())
+        self.assertIn(manifest["print"]["url"], html)
+        self.assertIn('data-dzi="/media/reports/maps/aspect.', html)
+        self.assertIn('class="landscape-map"', html)
+
+    def test_rebuilt_only_when_the_source_changes(self):
+        first, _ = generate_map_assets("aspect")
+        self.assertEqual(generate_map_assets("aspect"), (first, False))
+
+        Image.new("RGB", (300, 200), "blue").save(self.source)
+        second, built = generate_map_assets("aspect")
+
+        self.assertTrue(built)
+        self.assertNotEqual(first["print"]["url"], second["print"]["url"])
+        (assets_dir,) = Path(self.media_root, "reports", "maps").iterdir()
+        self.assertTrue(
+            second["print"]["url"].endswith(f"{assets_dir.name}/aspect.print.jpg")
+        )
+        # Smaller than the printed box: never upscaled
+        self.assertEqual(second["print"]["width"], 300)
+
+    def test_lookup_is_memoized_per_source(self):
+        with self.assertLogs("apps.reports.utils.map_assets", "WARNING"):
+            self.assertIsNone(get_map_assets("aspect"))
+        # Reported once, not on every render
+        with self.assertNoLogs("apps.reports.utils.map_assets", "WARNING"):
+            self.assertIsNone(get_map_assets("aspect"))
+
+        manifest, _ = generate_map_assets("aspect")
+        self.assertEqual(get_map_assets("aspect"), manifest)
+        self.assertIs(get_map_assets("aspect"), get_map_assets("aspect"))
+
+        Image.new("RGB", (300, 200), "blue").save(self.source)
+        self.assertIsNone(get_map_assets("aspect"))
+        generate_map_assets("aspect")
+        self.assertEqual(get_map_assets("aspect")["print"]["width"], 300)
+
+    def test_missing_maps_use_the_original(self):
+        html = Template('{% load map_tags %}{% map_image "slope" %}').render(Context())
+
+        self.assertEqual(generate_map_assets("slope"), (None, False))
+        self.assertIn('src="/static/images/maps/slope.png"', html)
+
+
+class CacheWarmerTestCase(SimpleTestCase):
+    """Test the ordering of the cache warm-up steps"""
+
+    def test_steps_run_after_their_dependencies(self):
+        finished = []
+
+        def step(name, depends_on=(), fail=False):
+            def build():
+                time.sleep(0.01)
+                for dependency in depends_on:
+                    self.assertIn(dependency, finished + ["missing"])
+                finished.append(name)
+                if fail:
+                    raise RuntimeError("no inkscape")
+                return f"{name} done"
+
+            return WarmupStep(name, build, depends_on)
+
+        progress = []
+        results = CacheWarmer(
+            [
+                step("charts", fail=True),
+                step("tables"),
+                step("pages", depends_on=("tables", "charts")),
+                step("pdf", depends_on=("pages", "missing")),
+            ],
+            max_workers=2,
+            on_progress=lambda name, result: progress.append(name),
+        ).run()
+
+        self.assertEqual(list(results), ["charts", "tables", "pages", "pdf"])
+        self.assertEqual(results["charts"]["error"], "RuntimeError: no inkscape")
+        # A failed dependency does not hold back the steps after it
+        self.assertEqual(results["pdf"]["detail"], "pdf done")
+        self.assertEqual(progress[-2:], ["pages", "pdf"])
+        self.assertEqual(finished[-2:], ["pages", "pdf"])
+
+    def test_command_lists_and_checks_steps(self):
+        out = io.StringIO()
+        call_command("warm_report_caches", "--list", stdout=out)
+
+        self.assertIn("pdf (after maps, tables, processors)", out.getvalue())
+        with self.assertRaisesMessage(CommandError, "Unknown steps: charts"):
+            call_command("warm_report_caches", "--only", "charts", stdout=out)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class WarmPagesTestCase(TestCase):
+    """Test warming the cached report API responses"""
+
+    def setUp(self):
+        ReportCategory.objects.create(
+            name="Demographics", name_nepali="जनसांख्यिकी", slug="demographics"
+        )
+        self.addCleanup(cache.clear)
+
+    def test_pages_are_served_from_cache_after_warming(self):
+        urls = public_urls()
+        self.assertIn("/api/v1/reports/api/categories/demographics/", urls)
+
+        self.assertEqual(warm_pages(urls, "localhost"), "5 of 5 pages")
+        get_content_version()
+        for url in (reverse("reports:home"), reverse("reports:api_categories")):
+            with self.assertNumQueries(0):
+                response = self.client.get(
+                    url,
+                    HTTP_HOST="localhost",
+                    HTTP_ACCEPT_ENCODING=PAGE_ACCEPT_ENCODING,
+                )
+            self.assertEqual(response.status_code, 200)
+
+
+class RecordingProfileRenderer(ProfileRenderer):
+    def render(self):
+        if get_current_municipality().code == "broken":
+            raise RuntimeError("no data")
+        return (get_current_municipality().code, threading.current_thread().name)
+
+
+@override_settings(
+    REPORT_MUNICIPALITIES={
+        "gadhawa": {"name": "गढवा", "name_english": "Gadhawa"},
+        "lamahi": {"name": "लमही", "name_english": "Lamahi"},
+        "broken": {"name": "-", "name_english": "-"},
+    },
+    REPORT_DEFAULT_MUNICIPALITY="gadhawa",
+)
+class ProfileRendererTestCase(SimpleTestCase):
+    """Test batch rendering of municipality profiles"""
+
+    def test_render_all_activates_each_municipality(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            results = RecordingProfileRenderer(output_dir).render_all(
+                get_municipalities().values(), max_workers=2
+            )
+
+        self.assertEqual(list(results), ["gadhawa", "lamahi", "broken"])
+        self.assertEqual(results["lamahi"]["path"][0], "lamahi")
+        self.assertTrue(results["lamahi"]["path"][1].startswith("profile"))
+        self.assertIsNone(results["broken"]["path"])
+        self.assertEqual(results["broken"]["error"], "no data")
+        self.assertEqual(get_current_municipality().code, "gadhawa")
+
+    def test_local_path_for_url(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            Path(media_root, "logo.png").write_bytes(b"png")
+            with self.settings(MEDIA_ROOT=media_root):
+                self.assertEqual(
+                    local_path_for_url(f"{RENDER_BASE_URL}media/logo.png"),
+                    str(Path(media_root, "logo.png")),
+                )
+                self.assertIsNone(
+                    local_path_for_url(f"{RENDER_BASE_URL}media/../settings.py")
+                )
+                self.assertIsNone(local_path_for_url("https://example.org/logo.png"))
+
+
+class QueryPlanAuditTestCase(TestCase):
+    """Test query capture, plan analysis and index suggestions"""
+
+    def setUp(self):
+        WardAgeWisePopulation.objects.create(
+            ward_number=1, age_group="0_4", gender="male", population=10
+        )
+
+    def audit(self, func):
+        audit = QueryPlanAudit()
+        audit.run_case("test", func)
+        return {result["sql"]: result for result in audit.analyze()}
+
+    def test_seq_scan_and_candidate_index(self):
+        results = self.audit(
+            lambda: list(WardAgeWisePopulation.objects.filter(population=10))
+        )
+        (result,) = results.values()
+
+        self.assertIn(WardAgeWisePopulation._meta.db_table, result["seq_scans"])
+        (candidate,) = result["candidates"]
+        self.assertIs(candidate["model"], WardAgeWisePopulation)
+        self.assertEqual(candidate["index"].fields, ["population"])
+        self.assertEqual(candidate["reason"], "no usable index")
+
+    def test_indexed_filter_and_duplicates(self):
+        def run():
+            for _i in range(3):
+                list(WardAgeWisePopulation.objects.filter(ward_number=1))
+
+        (result,) = self.audit(run).values()
+
+        self.assertEqual(result["executions"], 3)
+        self.assertEqual(result["duplicates"], 2)
+        self.assertEqual(result["seq_scans"], [])
+        self.assertEqual(result["candidates"], [])
+        self.assertIn("2 duplicate executions", result["issues"])
+
+    def test_filtered_columns(self):
+        sql = (
+            'SELECT * FROM "t" WHERE ("t"."a" = %s AND "t"."b" IN (%s, %s) '
+            'AND "t"."c" >= %s) ORDER BY "t"."d"'
+        )
+        self.assertEqual(
+            filtered_columns(sql), {"t": [("a", "="), ("b", "IN"), ("c", ">=")]}
+        )
+
+
+def describe_html(html):
+    return f"{os.getpid()}:{html}".encode()
+
+
+class RecordingPDFWorkerPool(PDFWorkerPool):
+    task = staticmethod(describe_html)
+    warm = False
+
+
+class PDFRenderingTestCase(SimpleTestCase):
+    """Test the warm PDF renderer pool"""
+
+    def test_workers_are_reused(self):
+        pool = RecordingPDFWorkerPool(workers=1)
+        try:
+            pool.start()
+            first = pool.render("<p>1</p>", timeout=60).decode()
+            second = pool.render("<p>2</p>", timeout=60).decode()
+        finally:
+            pool.shutdown()
+
+        first_pid, first_html = first.split(":", 1)
+        second_pid, second_html = second.split(":", 1)
+        self.assertEqual(first_html, "<p>1</p>")
+        self.assertEqual(second_html, "<p>2</p>")
+        self.assertEqual(first_pid, second_pid)
+        self.assertNotEqual(first_pid, str(os.getpid()))
+
+    def test_preloaded_stylesheet_is_not_linked(self):
+        self.assertIn("css/pdf.css", render_to_string("reports/pdf_base.html"))
+        self.assertNotIn(
+            "css/pdf.css", render_to_string("reports/pdf_base.html", PDF_CONTEXT)
+        )
+
+
+class ReportSnapshotTestCase(SimpleTestCase):
+    """Test frozen report data snapshots"""
+
+    def setUp(self):
+        self.snapshot_dir = Path(tempfile.mkdtemp())
+        self.settings_override = override_settings(
+            REPORT_SNAPSHOT_DIR=self.snapshot_dir
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+
+    def make_snapshot(self, version, population):
+        return ReportSnapshot(
+            "gadhawa",
+            version,
+            {
+                "demographics": {
+                    "religion": {
+                        "data": {"HINDU": {"population": population}},
+                        "total_population": population,
+                        "charts": {"pie_chart_png": "images/charts/religion.png"},
+                    }
+                },
+                "social": {
+                    "toilet_type": {
+                        "total_households": 40,
+                        "pdf_charts": {"toilet_type": {"pie_chart_png": "t.png"}},
+                    }
+                },
+            },
+            {"version": version},
+        )
+
+    def test_freeze_keeps_plain_data(self):
+        frozen = freeze(
+            {
+                1: {"rate": np.float64(0.5), "count": np.int64(3)},
+                "wards": {3, 1, 2},
+                "array": np.array([1, 2]),
+                "lazy": _("Religion"),
+                "when": date(2024, 1, 1),
+                "pair": (Decimal("1.5"), None),
+            }
+        )
+
+        self.assertEqual(
+            frozen,
+            {
+                1: {"rate": 0.5, "count": 3},
+                "wards": [1, 2, 3],
+                "array": [1, 2],
+                "lazy": "Religion",
+                "when": date(2024, 1, 1),
+                "pair": (Decimal("1.5"), None),
+            },
+        )
+        self.assertIs(type(frozen[1]["count"]), int)
+
+    def test_round_trip(self):
+        snapshot = self.make_snapshot("1.0", 100)
+        path = snapshot.save()
+
+        self.assertEqual(path.name, "gadhawa_1.0.snapshot")
+        loaded = ReportSnapshot.load("1.0")
+        self.assertEqual(loaded.results, snapshot.results)
+        self.assertEqual(loaded.created_at, snapshot.created_at)
+        self.assertEqual(loaded.fingerprint(), snapshot.fingerprint())
+
+        with self.assertRaises(SnapshotError):
+            ReportSnapshot.load("2.0")
+
+    def test_only_plain_data_loads(self):
+        class Payload:
+            def __reduce__(self):
+                return (os.getcwd, ())
+
+        snapshot = self.make_snapshot("1.0", 100)
+        snapshot.results = {"demographics": {"religion": Payload()}}
+
+        with self.assertRaisesRegex(SnapshotError, "posix.getcwd|nt.getcwd"):
+            ReportSnapshot.loads(snapshot.dumps())
+        with self.assertRaises(SnapshotError):
+            ReportSnapshot.loads(b"%PDF-1.7")
+
+    def test_context_needs_no_queries(self):
+        snapshot = self.make_snapshot("1.0", 100)
+        context = snapshot.build_context(("demographics",))
+
+        self.assertEqual(
+            context["all_demographics_data"]["religion"]["total_population"], 100
+        )
+        self.assertEqual(context["all_social_data"], {})
+        self.assertEqual(
+            context["pdf_charts"],
+            {"religion": {"pie_chart_png": "images/charts/religion.png"}},
+        )
+        self.assertEqual(context["generated_date"], snapshot.created_at)
+        # SimpleTestCase fails on any database query
+        html = render_to_string(FULL_REPORT_TEMPLATE, context)
+        self.assertIn("1.0", html)
+
+    def test_diff_lists_changed_indicators(self):
+        old = self.make_snapshot("1.0", 100)
+        new = self.make_snapshot("1.1", 120)
+        del new.results["social"]["toilet_type"]
+
+        self.assertEqual(
+            diff_snapshots(old, new),
+            {
+                "demographics.religion": [
+                    ("data.HINDU.population", 100, 120),
+                    ("total_population", 100, 120),
+                ],
+                "social.toilet_type": [("total_households", 40, None)],
+            },
+        )
+
+        old.save()
+        new.save()
+        out = io.StringIO()
+        call_command("diff_report_snapshots", "1.0", "1.1", stdout=out)
+        self.assertIn("total_population: 100 → 120", out.getvalue())
+        self.assertIn("3 indicators changed in 2 sections", out.getvalue())
+
+
+class SnapshotReportViewTestCase(TestCase):
+    """Test rendering the full report page from a snapshot"""
+
+    def setUp(self):
+        snapshot_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, snapshot_dir, ignore_errors=True)
+        settings_override = override_settings(REPORT_SNAPSHOT_DIR=snapshot_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        category = ReportCategory.objects.create(
+            name="Demographics", name_nepali="जनसांख्यिकी", slug="demographics"
+        )
+        ReportSection.objects.create(
+            category=category,
+            title="Religion",
+            title_nepali="धर्म",
+            slug="religion",
+            section_number="3.1",
+        )
+        categories = ReportCategory.objects.prefetch_related("sections")
+        ReportSnapshot(
+            "gadhawa",
+            "1.0",
+            {},
+            {"version": "1.0"},
+            navigation=freeze_navigation(categories),
+        ).save()
+
+    def test_snapshot_page_needs_no_queries(self):
+        url = reverse("reports:full_report") + "?snapshot=1.0"
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_HOST="localhost")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "जनसांख्यिकी")
+        self.assertContains(
+            response, reverse("reports:section", args=["demographics", "religion"])
+        )
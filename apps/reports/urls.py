@@ -24,6 +24,18 @@ urlpatterns = [  # Public documentation site
         views.GenerateSectionPDFView.as_view(),
         name="pdf_section",
     ),
+    # Data exports
+    path("export/", views.DataExportIndexView.as_view(), name="export"),
+    path(
+        "export/bundle.zip",
+        views.DataExportBundleView.as_view(),
+        name="export_bundle",
+    ),
+    path(
+        "export/<str:table>.<str:fmt>",
+        views.DataExportTableView.as_view(),
+        name="export_table",
+    ),
     # API endpoints
     path(
         "api/",
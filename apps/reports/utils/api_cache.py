@@ -0,0 +1,80 @@
+"""
+Report API cache
+
+Serialized report API payloads are cached under a content version that
+changes whenever report content changes, so cached payloads never need to be
+invalidated one by one: a new version simply misses the old keys, which then
+expire.
+
+The version is a fingerprint of the report tables (row counts and latest
+``updated_at``), kept in the cache for REPORT_API_VERSION_TIMEOUT seconds.
+Signals in ``apps.reports.signals`` drop it when report content is saved or
+deleted, so the next request recomputes it. Responses carry an ETag built
+from the version, and a client polling with If-None-Match gets a 304 without
+any serialization.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import quote_etag
+
+VERSION_KEY = "report_api:version"
+PAYLOAD_KEY_PREFIX = "report_api:payload"
+
+
+def get_content_models():
+    from ..models import (
+        PublicationSettings,
+        ReportCategory,
+        ReportFigure,
+        ReportSection,
+        ReportTable,
+    )
+
+    return (
+        ReportCategory,
+        ReportSection,
+        ReportFigure,
+        ReportTable,
+        PublicationSettings,
+    )
+
+
+def compute_content_version():
+    """Fingerprint of every report content table"""
+    digest = hashlib.sha1()
+    for model in get_content_models():
+        stats = model.objects.aggregate(count=Count("pk"), latest=Max("updated_at"))
+        digest.update(
+            f"{model._meta.label}:{stats['count']}:{stats['latest']};".encode()
+        )
+    return digest.hexdigest()[:16]
+
+
+def get_content_version():
+    """Current content version, recomputed when missing from the cache"""
+    return cache.get_or_set(
+        VERSION_KEY,
+        compute_content_version,
+        getattr(settings, "REPORT_API_VERSION_TIMEOUT", 60),
+    )
+
+
+def invalidate_content_version():
+    """Drop the cached version; the next request recomputes it"""
+    cache.delete(VERSION_KEY)
+
+
+def make_etag(version, variant):
+    """Weak ETag of one request variant in a content version"""
+    digest = hashlib.sha1(f"{version}:{variant}".encode()).hexdigest()[:24]
+    return "W/" + quote_etag(digest)
+
+
+def payload_key(version, variant):
+    """Cache key of one request variant's payload in a content version"""
+    digest = hashlib.sha1(variant.encode()).hexdigest()
+    return f"{PAYLOAD_KEY_PREFIX}:{version}:{digest}"
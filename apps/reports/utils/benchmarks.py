@@ -0,0 +1,433 @@
+"""
+Report performance benchmarks
+
+Repeatable timings for every processor's ``get_data``, every report partial's
+template render, every chart generator and the full report PDF path. Each
+case records wall time, SQL query count and peak Python memory; runs are
+appended to a JSON history so a run can be compared against the previous run
+with the same parameters.
+
+``boot.django_setup_urls`` measures what every web worker pays before its
+first request: ``django.setup()`` plus loading the URL configuration, in a
+fresh interpreter, with the resident memory it ends with and the heavy
+libraries (``HEAVY_MODULES``) imported by then. PDF, plotting and dataframe
+stacks are imported where they are used, so that list should stay empty.
+"""
+
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.test import RequestFactory, override_settings
+
+from .managers import iter_processors
+from .profiling import build_profile
+from .synthetic_data import SyntheticDataGenerator
+
+AGE_GROUPS = [
+    "AGE_0_4",
+    "AGE_5_9",
+    "AGE_10_14",
+    "AGE_15_19",
+    "AGE_20_24",
+    "AGE_25_29",
+    "AGE_30_34",
+    "AGE_35_39",
+    "AGE_40_44",
+    "AGE_45_49",
+    "AGE_50_54",
+    "AGE_55_59",
+    "AGE_60_64",
+    "AGE_65_69",
+    "AGE_70_74",
+    "AGE_75_AND_ABOVE",
+]
+
+BOOT_CASE = "boot.django_setup_urls"
+
+# Libraries a web worker should not import until a request needs them
+HEAVY_MODULES = (
+    "weasyprint",
+    "reportlab",
+    "pandas",
+    "matplotlib",
+    "seaborn",
+    "numpy",
+    "PIL",
+)
+
+# Run in a fresh interpreter; prints the measurements as JSON
+BOOT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().reverse_dict
+urls_done = time.perf_counter()
+rss_kb = None
+try:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+except OSError:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+heavy = [name for name in sys.argv[1:] if name in sys.modules]
+print(json.dumps({
+    "setup_ms": (setup_done - start) * 1000,
+    "urls_ms": (urls_done - setup_done) * 1000,
+    "rss_kb": rss_kb,
+    "heavy_modules": heavy,
+}))
+"""
+
+
+def measure(func, repeat=3):
+    """Time a callable and return wall time, queries and peak memory"""
+    timings = []
+    queries = 0
+    error = None
+    for _ in range(repeat):
+        with build_profile() as profile:
+            with connection.execute_wrapper(profile.count_query):
+                start = time.perf_counter()
+                try:
+                    func()
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                timings.append((time.perf_counter() - start) * 1000)
+        queries = profile.query_count
+        if error:
+            break
+
+    # Separate pass for memory: tracemalloc would distort the timings
+    tracemalloc.start()
+    try:
+        func()
+    except Exception:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_ms": round(min(timings), 2),
+        "median_ms": round(statistics.median(timings), 2),
+        "queries": queries,
+        "peak_kb": round(peak / 1024, 1),
+        "error": error,
+    }
+
+
+def measure_boot(repeat=3):
+    """Time Django start-up and URL loading in fresh interpreters
+
+    Returns ``measure()``'s keys, with ``peak_kb`` the resident memory of
+    the fastest run, plus its ``setup_ms``, ``urls_ms`` and ``rss_kb`` and
+    the ``HEAVY_MODULES`` any run had imported.
+    """
+    runs = []
+    error = None
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-c", BOOT_SCRIPT, *HEAVY_MODULES],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            lines = process.stderr.strip().splitlines() or ["no output"]
+            error = f"Boot failed: {lines[-1]}"
+            break
+        runs.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    if not runs:
+        return {
+            "wall_ms": 0.0,
+            "median_ms": 0.0,
+            "queries": 0,
+            "peak_kb": 0.0,
+            "error": error,
+        }
+    totals = [run["setup_ms"] + run["urls_ms"] for run in runs]
+    fastest = runs[totals.index(min(totals))]
+    return {
+        "wall_ms": round(min(totals), 2),
+        "median_ms": round(statistics.median(totals), 2),
+        "queries": 0,
+        "peak_kb": float(fastest["rss_kb"] or 0),
+        "error": error,
+        "setup_ms": round(fastest["setup_ms"], 2),
+        "urls_ms": round(fastest["urls_ms"], 2),
+        "rss_kb": fastest["rss_kb"],
+        "heavy_modules": sorted(
+            {name for run in runs for name in run["heavy_modules"]}
+        ),
+    }
+
+
+class ReportBenchmark:
+    """Runs the benchmark cases against synthetic data"""
+
+    def __init__(self, wards=8, categories=None, years=2, repeat=3, seed=42):
+        self.wards = wards
+        self.categories = categories
+        self.years = years
+        self.repeat = repeat
+        self.seed = seed
+
+    @property
+    def params(self):
+        return {
+            "wards": self.wards,
+            "categories": self.categories,
+            "years": self.years,
+            "repeat": self.repeat,
+            "seed": self.seed,
+        }
+
+    def load_data(self):
+        """Populate the current database with synthetic data"""
+        generator = SyntheticDataGenerator(
+            wards=self.wards,
+            categories=self.categories,
+            years=self.years,
+            seed=self.seed,
+        )
+        return generator.generate()
+
+    def get_cases(self, include_pdf=True):
+        """Return {case_name: callable} for every benchmark case"""
+        cases = {}
+        for domain, category, processor in iter_processors():
+            cases[f"processor.{domain}.{category}.get_data"] = processor.get_data
+        cases.update(self.get_template_cases())
+        cases.update(self.get_chart_cases())
+        if include_pdf:
+            cases["view.full_report_pdf"] = self.render_full_report_pdf
+        return cases
+
+    def get_template_cases(self):
+        """Render every report partial with its processor's PDF output"""
+        cases = {}
+        for domain, category, processor in iter_processors():
+            try:
+                template = get_template(
+                    f"{domain}/{category}/{category}_report_partial.html"
+                )
+            except TemplateDoesNotExist:
+                continue
+            cases[f"template.{domain}.{category}.render"] = self._template_case(
+                template, processor
+            )
+        return cases
+
+    @staticmethod
+    def _template_case(template, processor):
+        context = {}
+
+        def render():
+            # Built on the first call only, so the remaining timed runs and
+            # the memory pass measure rendering alone
+            if not context:
+                output = processor.process_for_pdf()
+                context.update(
+                    {"coherent_analysis": output.get("report_content"), **output}
+                )
+            return template.render(context)
+
+        return render
+
+    def get_chart_cases(self):
+        from apps.demographics.utils.chart_series import ChartMatrix, ChartSeries
+        from apps.demographics.utils.death_pyramid_generator import (
+            DeathPyramidGenerator,
+        )
+        from apps.demographics.utils.population_pyramid_generator import (
+            PopulationPyramidGenerator,
+        )
+        from apps.demographics.utils.svg_chart_generator import SVGChartGenerator
+
+        category_count = self.categories or 12
+        pie_data = {
+            f"CAT_{i}": {"population": 100 + i * 7, "name_nepali": f"वर्ग {i}"}
+            for i in range(category_count)
+        }
+        bar_data = {
+            str(ward): {
+                "ward_name": f"वडा नं. {ward}",
+                "total_population": 0,
+                "demographics": {
+                    key: {**value, "population": value["population"] + ward}
+                    for key, value in pie_data.items()
+                },
+            }
+            for ward in range(1, self.wards + 1)
+        }
+        # Processors build these once per chart; the generators read them as is
+        pie_series = ChartSeries.from_mapping(pie_data)
+        bar_matrix = ChartMatrix.from_ward_mapping(bar_data)
+        pyramid_data = {
+            age_group: {"male": 500 - i * 20, "female": 480 - i * 18, "total": 0}
+            for i, age_group in enumerate(AGE_GROUPS)
+        }
+        death_data = {
+            age_group: {"MALE": 20 + i, "FEMALE": 18 + i}
+            for i, age_group in enumerate(AGE_GROUPS)
+        }
+        ward_pyramids = [
+            (
+                f"वडा नं. {ward}",
+                {
+                    age_group: {key: value // ward for key, value in row.items()}
+                    for age_group, row in pyramid_data.items()
+                },
+            )
+            for ward in range(1, self.wards + 1)
+        ]
+
+        svg_generator = SVGChartGenerator()
+        pyramid_generator = PopulationPyramidGenerator()
+        death_generator = DeathPyramidGenerator()
+
+        return {
+            "chart.svg.pie": lambda: svg_generator.generate_pie_chart_svg(pie_data),
+            "chart.svg.bar": lambda: svg_generator.generate_bar_chart_svg(bar_data),
+            "chart.svg.pie.series": lambda: svg_generator.generate_pie_chart_svg(
+                pie_series
+            ),
+            "chart.svg.bar.matrix": lambda: svg_generator.generate_bar_chart_svg(
+                bar_matrix
+            ),
+            "chart.pyramid.population": lambda: pyramid_generator.generate_pyramid_svg(
+                pyramid_data
+            ),
+            "chart.pyramid.death": lambda: death_generator.generate_pyramid_svg(
+                death_data
+            ),
+            # Every ward's pyramid in one figure, against one SVG per ward
+            "chart.pyramid.wards.grid": lambda: (
+                pyramid_generator.generate_pyramid_grid_svg(
+                    ward_pyramids, overview=("municipality", pyramid_data)
+                )
+            ),
+            "chart.pyramid.wards.each": lambda: [
+                pyramid_generator.generate_pyramid_svg(data)
+                for _, data in ward_pyramids
+            ],
+        }
+
+    def render_full_report_pdf(self):
+        # Imported lazily: the PDF stack needs system libraries (Pango)
+        from apps.reports.views.pdf import GenerateFullReportPDFView
+
+        request = RequestFactory().get("/pdf/full/")
+        response = GenerateFullReportPDFView.as_view()(request)
+        if response.status_code != 200:
+            raise RuntimeError(f"Unexpected status {response.status_code}")
+        return response
+
+    def run(self, include_pdf=True, only=None):
+        """Run all cases in an isolated chart directory and return the results"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            static_dir = Path(tmp_dir) / "static"
+            (static_dir / "images" / "charts").mkdir(parents=True)
+            previous_cwd = os.getcwd()
+            # Some processors write charts relative to the working directory
+            os.chdir(tmp_dir)
+            try:
+                with override_settings(STATICFILES_DIRS=[str(static_dir)]):
+                    results = {}
+                    for name, func in self.get_cases(include_pdf).items():
+                        if only and not any(part in name for part in only):
+                            continue
+                        results[name] = measure(func, repeat=self.repeat)
+            finally:
+                os.chdir(previous_cwd)
+        if not only or any(part in BOOT_CASE for part in only):
+            results[BOOT_CASE] = measure_boot(repeat=self.repeat)
+        return results
+
+
+class BenchmarkHistory:
+    """JSON history of benchmark runs"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def load(self):
+        if not self.path.exists():
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def append(self, params, results):
+        runs = self.load()
+        run = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "params": params,
+            "results": results,
+        }
+        runs.append(run)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(runs, f, ensure_ascii=False, indent=2)
+        return run
+
+    def previous_run(self, params):
+        """Latest recorded run with the same parameters"""
+        for run in reversed(self.load()):
+            if run["params"] == params:
+                return run
+        return None
+
+    @staticmethod
+    def find_regressions(previous, results, threshold=1.25):
+        """Cases whose wall time or query count grew beyond the threshold"""
+        regressions = []
+        if not previous:
+            return regressions
+        for name, result in results.items():
+            before = previous["results"].get(name)
+            if not before or result["error"] or before["error"]:
+                continue
+            if before["wall_ms"] > 0 and result["wall_ms"] > before["wall_ms"] * threshold:
+                regressions.append(
+                    (name, "wall_ms", before["wall_ms"], result["wall_ms"])
+                )
+            if result["queries"] > before["queries"]:
+                regressions.append(
+                    (name, "queries", before["queries"], result["queries"])
+                )
+            # Boot case: worker memory and heavy imports
+            rss_before, rss_after = before.get("rss_kb"), result.get("rss_kb")
+            if rss_before and rss_after and rss_after > rss_before * threshold:
+                regressions.append((name, "rss_kb", rss_before, rss_after))
+            new_modules = set(result.get("heavy_modules", ())) - set(
+                before.get("heavy_modules", ())
+            )
+            if new_modules:
+                regressions.append(
+                    (
+                        name,
+                        "heavy_modules",
+                        before.get("heavy_modules", []),
+                        result["heavy_modules"],
+                    )
+                )
+        return regressions
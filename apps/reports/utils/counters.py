@@ -0,0 +1,93 @@
+"""
+Report counters
+
+Section, figure and table counts are stored on ``ReportCategory`` and
+``ReportSection`` so list pages, the admin and the API read them from the
+row instead of running one COUNT query per category or section.
+
+Counters are recomputed from the source rows with a single UPDATE per parent
+(correlated COUNT subqueries), so a refresh is idempotent and repairs any
+drift. Signals in ``apps.reports.signals`` refresh the affected parents on
+every save and delete; ``repair_report_counters`` refreshes all of them after
+bulk operations that bypass signals.
+"""
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_of(queryset, field):
+    """Correlated COUNT of ``queryset`` rows whose ``field`` is the outer pk"""
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def section_counter_values():
+    """{counter field: expression} for ReportSection"""
+    from ..models import ReportFigure, ReportTable
+
+    return {
+        "figures_count": count_of(ReportFigure.objects.all(), "section"),
+        "tables_count": count_of(ReportTable.objects.all(), "section"),
+    }
+
+
+def category_counter_values():
+    """{counter field: expression} for ReportCategory"""
+    from ..models import ReportFigure, ReportSection, ReportTable
+
+    sections = ReportSection.objects.all()
+    return {
+        "sections_count": count_of(sections, "category"),
+        "published_sections_count": count_of(
+            sections.filter(is_published=True), "category"
+        ),
+        "figures_count": count_of(ReportFigure.objects.all(), "section__category"),
+        "tables_count": count_of(ReportTable.objects.all(), "section__category"),
+    }
+
+
+def refresh_section_counters(section_ids=None):
+    """Recount figures and tables of the given sections (default: all)"""
+    from ..models import ReportSection
+
+    sections = ReportSection.objects.all()
+    if section_ids is not None:
+        sections = sections.filter(pk__in=[pk for pk in section_ids if pk])
+    return sections.update(**section_counter_values())
+
+
+def refresh_category_counters(category_ids=None):
+    """Recount sections, figures and tables of the given categories"""
+    from ..models import ReportCategory
+
+    categories = ReportCategory.objects.all()
+    if category_ids is not None:
+        categories = categories.filter(pk__in=[pk for pk in category_ids if pk])
+    return categories.update(**category_counter_values())
+
+
+def stale_counters(queryset, values):
+    """Rows of ``queryset`` whose stored counters differ from ``values``"""
+    actual = {f"actual_{field}": expression for field, expression in values.items()}
+    return queryset.annotate(**actual).exclude(
+        **{field: F(f"actual_{field}") for field in values}
+    )
+
+
+def find_stale_counters():
+    """(stale section count, stale category count)"""
+    from ..models import ReportCategory, ReportSection
+
+    return (
+        stale_counters(ReportSection.objects.all(), section_counter_values()).count(),
+        stale_counters(
+            ReportCategory.objects.all(), category_counter_values()
+        ).count(),
+    )
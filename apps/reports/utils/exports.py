@@ -0,0 +1,428 @@
+"""
+Report data exports
+
+The raw tables behind the report, for partners: every model of the exported
+domains' apps and the ``get_data()`` output of every processor, as CSV, XLSX
+or Parquet.
+
+- ``ModelTable`` reads a model's rows with ``iterator(chunk_size=...)``, so
+  an export holds one chunk of rows in memory however large the table is
+- ``ProcessorTable`` flattens a processor's ``get_data()`` to one row per
+  value: its dotted ``path`` and the value as ``number`` or ``text``
+
+``iter_csv()`` streams a table for ``StreamingHttpResponse``; XLSX (openpyxl
+write-only workbooks) and Parquet (pyarrow, a row group per chunk) are
+written to files. ``open_bundle()`` zips every table of the requested
+domains with a ``manifest.json``, keeping the archive in
+``REPORT_EXPORT_DIR`` under a fingerprint of the source rows: a bundle is
+built once per version of the data, concurrent requests waiting for that
+build.
+
+openpyxl and pyarrow are imported when an XLSX or Parquet file is written.
+"""
+
+import csv
+import datetime
+import hashlib
+import io
+import json
+import logging
+import tempfile
+import time
+import zipfile
+from collections import namedtuple
+from itertools import islice
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from apps.core.singleflight import atomic_write, build_once
+from apps.core.tenancy import get_current_municipality
+
+from .managers import get_shared_manager
+from .processor_data import data_fingerprint, get_processor_data, model_state
+from .profiles import FULL_REPORT_DOMAINS
+
+logger = logging.getLogger("gadhawa_report.exports")
+
+# Domains whose app models and processors are exported: the full report's
+EXPORT_DOMAINS = FULL_REPORT_DOMAINS
+
+# Format -> content type
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Bump when the layout of exported files changes to rebuild cached bundles
+EXPORT_VERSION = 1
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Rows per worksheet including the header; longer tables continue on
+# further sheets
+XLSX_MAX_ROWS = 1048576
+
+# Cached bundles older than this are deleted when a new one is built
+BUNDLE_MAX_AGE = 2 * 24 * 60 * 60
+
+# Django field type -> column kind; other fields are text
+FIELD_KINDS = {
+    "AutoField": "int",
+    "BigAutoField": "int",
+    "SmallAutoField": "int",
+    "IntegerField": "int",
+    "BigIntegerField": "int",
+    "SmallIntegerField": "int",
+    "PositiveIntegerField": "int",
+    "PositiveBigIntegerField": "int",
+    "PositiveSmallIntegerField": "int",
+    "FloatField": "float",
+    "DecimalField": "decimal",
+    "BooleanField": "bool",
+    "DateField": "date",
+    "DateTimeField": "datetime",
+    "JSONField": "json",
+}
+
+Column = namedtuple("Column", "name kind digits places", defaults=(None, None))
+
+
+def get_export_dir():
+    export_dir = getattr(settings, "REPORT_EXPORT_DIR", None)
+    if export_dir:
+        return Path(export_dir)
+    return Path(settings.MEDIA_ROOT) / "reports" / "exports"
+
+
+def get_chunk_size():
+    return getattr(settings, "REPORT_EXPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+
+
+def model_column(field):
+    """Column of a concrete model field; relations take their target's kind"""
+    target = field
+    while target.is_relation:
+        target = target.target_field
+    kind = FIELD_KINDS.get(target.get_internal_type(), "text")
+    if kind == "decimal":
+        return Column(field.attname, kind, target.max_digits, target.decimal_places)
+    return Column(field.attname, kind)
+
+
+def _json_text(value):
+    if value is None:
+        return None
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def _text(value):
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+# Column kind -> conversion of database values to exported cells
+CELL_CONVERTERS = {"json": _json_text, "text": _text}
+
+
+class ModelTable:
+    """Rows of a model, read in chunks"""
+
+    error = None
+
+    def __init__(self, model):
+        self.model = model
+        self.name = model._meta.label
+        self.columns = [model_column(field) for field in model._meta.concrete_fields]
+
+    def rows(self, chunk_size=None):
+        names = [column.name for column in self.columns]
+        converters = [CELL_CONVERTERS.get(column.kind) for column in self.columns]
+        queryset = self.model._default_manager.order_by("pk").values_list(*names)
+        for row in queryset.iterator(chunk_size=chunk_size or get_chunk_size()):
+            yield tuple(
+                convert(value) if convert else value
+                for convert, value in zip(converters, row)
+            )
+
+    def fingerprint(self):
+        count, updated = model_state(self.model)
+        return f"{count}:{updated}"
+
+
+class ProcessorTable:
+    """``get_data()`` of a processor, one row per value"""
+
+    columns = [
+        Column("path", "text"),
+        Column("number", "float"),
+        Column("text", "text"),
+    ]
+
+    def __init__(self, domain, category, processor):
+        self.domain = domain
+        self.category = category
+        self.processor = processor
+        self.name = f"processors.{domain}.{category}"
+        # Set when get_data() fails; the table is exported without rows
+        self.error = None
+
+    def rows(self, chunk_size=None):
+        fingerprint = self.fingerprint()
+        try:
+            data = get_processor_data(
+                self.domain, self.category, self.processor, fingerprint
+            )
+        except Exception as e:
+            logger.exception("Error exporting %s", self.name)
+            self.error = f"{type(e).__name__}: {e}"
+            return
+        for path, value in _leaves(data):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield path, float(value), None
+            else:
+                yield path, None, _text(value)
+
+    def fingerprint(self):
+        fingerprint, _ = data_fingerprint(self.domain, self.category, self.processor)
+        return fingerprint
+
+
+def _leaves(value, path=""):
+    """(dotted path, value) of every scalar in JSON data"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _leaves(item, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _leaves(item, f"{path}.{index}" if path else str(index))
+    elif value is not None:
+        yield path, value
+
+
+def get_tables(domains=EXPORT_DOMAINS):
+    """Model tables, then processor tables, of each domain"""
+    tables = []
+    for domain in domains:
+        models = apps.get_app_config(domain).get_models()
+        tables.extend(ModelTable(model) for model in models)
+        manager = get_shared_manager(domain)
+        for category, processor in manager.processors.items() if manager else ():
+            tables.append(ProcessorTable(domain, category, processor))
+    return tables
+
+
+def get_table(name):
+    """Exported table named ``name``, or None"""
+    for table in get_tables():
+        if table.name == name:
+            return table
+    return None
+
+
+def iter_chunks(table, chunk_size=None):
+    """Lists of at most ``chunk_size`` rows of a table"""
+    chunk_size = chunk_size or get_chunk_size()
+    rows = table.rows(chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def _csv_chunks(table, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Byte order mark: spreadsheets open the file as UTF-8
+    buffer.write("\ufeff")
+    writer.writerow([column.name for column in table.columns])
+    yield buffer.getvalue().encode("utf-8"), 0
+    for chunk in iter_chunks(table, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8"), len(chunk)
+
+
+def iter_csv(table, chunk_size=None):
+    """CSV bytes of a table, one piece per chunk of rows"""
+    for piece, _ in _csv_chunks(table, chunk_size):
+        yield piece
+
+
+def write_csv(table, target, chunk_size=None):
+    """Write a table as CSV to a binary file; returns the number of rows"""
+    rows = 0
+    for piece, count in _csv_chunks(table, chunk_size):
+        target.write(piece)
+        rows += count
+    return rows
+
+
+def _xlsx_cell(value):
+    # Excel has no time zones
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value, datetime.timezone.utc)
+    return value
+
+
+def write_xlsx(table, target, chunk_size=None):
+    """Write a table as an XLSX workbook to a binary file; returns the rows"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    header = [column.name for column in table.columns]
+    title = table.name.rsplit(".", 1)[-1][:25]
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+    sheets = sheet_rows = 1
+    rows = 0
+    for chunk in iter_chunks(table, chunk_size):
+        for row in chunk:
+            if sheet_rows == XLSX_MAX_ROWS:
+                sheets += 1
+                sheet = workbook.create_sheet(f"{title} {sheets}")
+                sheet.append(header)
+                sheet_rows = 1
+            sheet.append([_xlsx_cell(value) for value in row])
+            sheet_rows += 1
+            rows += 1
+    workbook.save(target)
+    return rows
+
+
+def _arrow_type(pa, column):
+    if column.kind == "int":
+        return pa.int64()
+    if column.kind == "float":
+        return pa.float64()
+    if column.kind == "decimal":
+        return pa.decimal128(column.digits, column.places)
+    if column.kind == "bool":
+        return pa.bool_()
+    if column.kind == "date":
+        return pa.date32()
+    if column.kind == "datetime":
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+def write_parquet(table, target, chunk_size=None):
+    """Write a table as Parquet, a row group per chunk; returns the rows"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [pa.field(column.name, _arrow_type(pa, column)) for column in table.columns]
+    )
+    rows = 0
+    with pq.ParquetWriter(target, schema) as writer:
+        for chunk in iter_chunks(table, chunk_size):
+            arrays = [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*chunk), schema)
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+# Format -> writer of a table to a binary file, returning the rows written
+TABLE_WRITERS = {"csv": write_csv, "xlsx": write_xlsx, "parquet": write_parquet}
+
+
+def write_table(table, fmt, target, chunk_size=None):
+    """Write a table to a binary file in an export format; returns the rows"""
+    try:
+        writer = TABLE_WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown export format '{fmt}'") from None
+    return writer(table, target, chunk_size)
+
+
+def write_bundle(tables, fmt, target, chunk_size=None):
+    """Zip of tables in an export format with a ``manifest.json``
+
+    Args:
+        target: Path or binary file to write the zip to
+    """
+    manifest = {
+        "municipality": get_current_municipality().code,
+        "format": fmt,
+        "generated_at": timezone.now().isoformat(),
+        "tables": [],
+    }
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as archive:
+        for table in tables:
+            filename = f"{table.name}.{fmt}"
+            if fmt == "csv":
+                with archive.open(filename, "w", force_zip64=True) as member:
+                    rows = write_csv(table, member, chunk_size)
+            else:
+                # XLSX and Parquet are compressed already
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    path = Path(tmp_dir) / filename
+                    with open(path, "wb") as f:
+                        rows = write_table(table, fmt, f, chunk_size)
+                    archive.write(path, filename, zipfile.ZIP_STORED)
+            manifest["tables"].append(
+                {
+                    "name": table.name,
+                    "file": filename,
+                    "columns": [column.name for column in table.columns],
+                    "rows": rows,
+                    "error": table.error,
+                }
+            )
+        archive.writestr(
+            "manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2)
+        )
+
+
+def bundle_fingerprint(tables, fmt):
+    """Fingerprint of the rows behind a bundle, or None if a source is unknown"""
+    parts = [get_current_municipality().code, fmt, str(EXPORT_VERSION)]
+    for table in tables:
+        fingerprint = table.fingerprint()
+        if fingerprint is None:
+            return None
+        parts.append(f"{table.name}:{fingerprint}")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def open_bundle(fmt, domains=EXPORT_DOMAINS):
+    """Binary file of the zipped export of some domains
+
+    Built once per fingerprint and kept in ``get_export_dir()``; bundles
+    whose fingerprint is unknown are built into a temporary file.
+    """
+    tables = get_tables(domains)
+    fingerprint = bundle_fingerprint(tables, fmt)
+    if fingerprint is None:
+        f = tempfile.TemporaryFile()
+        write_bundle(tables, fmt, f)
+        f.seek(0)
+        return f
+
+    code = get_current_municipality().code
+    path = get_export_dir() / f"{code}_{fmt}_{fingerprint}.zip"
+
+    def build():
+        with atomic_write(path, "wb") as f:
+            write_bundle(tables, fmt, f)
+        prune_bundles(code, fmt, keep=path)
+
+    build_once(f"export:{path}", path.exists, build)
+    return open(path, "rb")
+
+
+def prune_bundles(code, fmt, keep):
+    """Delete a municipality's outdated cached bundles of a format"""
+    cutoff = time.time() - BUNDLE_MAX_AGE
+    for path in keep.parent.glob(f"{code}_{fmt}_*.zip"):
+        try:
+            if path != keep and path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,221 @@
+"""
+Lazy report context
+
+Full report templates read processor results as
+``all_<domain>_data.<category>.<key>`` and charts as ``pdf_charts.<name>``.
+``LazyReportData`` provides those mappings without computing anything up
+front: a processor's ``process_for_pdf()`` runs the first time a template
+reads a key of its result, and the result is kept for the rest of the
+render. Chapter-level or filtered renders therefore only pay for the
+processors they display.
+
+Processors run their ``depends_on`` processors first and fall back to an
+empty result on errors, like ``ProcessorScheduler``. ``prefetch()`` computes
+the remaining processors concurrently with the scheduler when a render is
+known to display everything.
+
+Reads are counted per processor (``access_counts()``) and recorded in the
+active build profile as ``context.<domain>.<category>`` counters.
+"""
+
+import threading
+from collections.abc import Mapping
+
+from apps.chart_management.manifest import chart_file_names, publish_charts
+
+from .profiling import count, stage
+from .scheduler import ProcessorScheduler, fallback_result
+
+
+def processor_charts(key, result):
+    """``pdf_charts`` entries of a processor result ("domain.category" key)"""
+    if key.startswith("demographics."):
+        charts = result.get("charts")
+        return {key.split(".", 1)[1]: charts} if charts is not None else {}
+    return result.get("pdf_charts") or {}
+
+
+class LazyProcessorResult(Mapping):
+    """A processor result computed on first read"""
+
+    def __init__(self, report, key):
+        self._report = report
+        self._key = key
+
+    def __getitem__(self, name):
+        self._report.record_access(self._key)
+        return self._report.resolve(self._key)[name]
+
+    def __iter__(self):
+        return iter(self._report.resolve(self._key))
+
+    def __len__(self):
+        return len(self._report.resolve(self._key))
+
+    def __repr__(self):
+        return f"<LazyProcessorResult {self._key}>"
+
+
+class LazyDomainData(Mapping):
+    """{category: LazyProcessorResult} of one domain"""
+
+    def __init__(self, report, domain, categories):
+        self._report = report
+        self._domain = domain
+        self._categories = list(categories)
+
+    def __getitem__(self, category):
+        if category not in self._categories:
+            raise KeyError(category)
+        return LazyProcessorResult(self._report, f"{self._domain}.{category}")
+
+    def __iter__(self):
+        return iter(self._categories)
+
+    def __len__(self):
+        return len(self._categories)
+
+
+class LazyChartIndex(Mapping):
+    """``pdf_charts``: chart URLs by name, resolving only their processor
+
+    Demographics processors contribute their ``charts`` under their category;
+    other domains merge their ``pdf_charts``, which are keyed by category too.
+    Names matching no category resolve every processor, as the eager index
+    did.
+    """
+
+    def __init__(self, report):
+        self._report = report
+
+    def _charts_of(self, key):
+        return processor_charts(key, self._report.resolve(key))
+
+    def _all_charts(self):
+        charts = {}
+        for key in self._report.keys:
+            charts.update(self._charts_of(key))
+        return charts
+
+    def __getitem__(self, name):
+        for key in self._report.keys:
+            if key.split(".", 1)[1] == name:
+                self._report.record_access(key)
+                charts = self._charts_of(key)
+                if name in charts:
+                    return charts[name]
+        return self._all_charts()[name]
+
+    def __iter__(self):
+        return iter(self._all_charts())
+
+    def __len__(self):
+        return len(self._all_charts())
+
+
+class LazyReportData:
+    """Processor results of several domains, computed as templates read them"""
+
+    def __init__(self, managers, method="process_for_pdf"):
+        """
+        Args:
+            managers: {domain: manager} in template order
+            method: Processor method producing a result
+        """
+        self.method = method
+        self.scheduler = ProcessorScheduler.for_managers(managers)
+        # Rejects circular dependencies up front
+        self.dependencies = self.scheduler.get_dependencies()
+        self.domains = list(managers)
+        self.keys = list(self.scheduler.tasks)
+        self._results = {}
+        self._failed = set()
+        self._accesses = dict.fromkeys(self.keys, 0)
+        self._lock = threading.RLock()
+
+    def domain(self, domain):
+        """LazyDomainData of a domain; empty if it is not part of the report"""
+        categories = [
+            task.category
+            for task in self.scheduler.tasks.values()
+            if task.domain == domain
+        ]
+        return LazyDomainData(self, domain, categories)
+
+    @property
+    def pdf_charts(self):
+        return LazyChartIndex(self)
+
+    def record_access(self, key):
+        with self._lock:
+            self._accesses[key] += 1
+        count(f"context.{key}")
+
+    def resolve(self, key):
+        """Result of a processor, computing it (and its dependencies) once"""
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+
+            task = self.scheduler.tasks[key]
+            failed = [
+                dep for dep in self.dependencies[key] if self._resolve_failed(dep)
+            ]
+            if failed:
+                error = f"Dependency failed: {', '.join(sorted(failed))}"
+                result = fallback_result(task.category, error)
+            else:
+                with stage(f"lazy.{key}"):
+                    result, error = self.scheduler._call(task, self.method)
+                # Charts written by the processor resolve to hashed copies
+                names = chart_file_names(processor_charts(key, result))
+                if names:
+                    with stage("chart_publish"):
+                        publish_charts(names)
+
+            if error is not None:
+                self._failed.add(key)
+            self._results[key] = result
+            return result
+
+    def _resolve_failed(self, key):
+        self.resolve(key)
+        return key in self._failed
+
+    def prefetch(self, keys=None):
+        """Compute processors not computed yet concurrently"""
+        with self._lock:
+            pending = [
+                key for key in (keys or self.keys) if key not in self._results
+            ]
+        if not pending:
+            return
+
+        scheduler = ProcessorScheduler(
+            max_workers=self.scheduler.max_workers, timeout=self.scheduler.timeout
+        )
+        for key in pending:
+            task = self.scheduler.tasks[key]
+            scheduler.add(task.domain, {task.category: task.processor})
+        with stage("process_all_for_pdf"):
+            results = scheduler.run(self.method)
+        with stage("chart_publish"):
+            publish_charts()
+
+        with self._lock:
+            for domain, categories in results.items():
+                for category, result in categories.items():
+                    self._results.setdefault(f"{domain}.{category}", result)
+                    if result.get("error"):
+                        self._failed.add(f"{domain}.{category}")
+
+    def access_counts(self):
+        """{key: {"accesses": int, "computed": bool}} in registration order"""
+        with self._lock:
+            return {
+                key: {
+                    "accesses": self._accesses[key],
+                    "computed": key in self._results,
+                }
+                for key in self.keys
+            }
@@ -0,0 +1,62 @@
+"""
+Processor manager registry
+
+Single place listing the domain managers whose processors feed the report, so
+tooling (benchmarks, APIs, cache warm-up) can walk every processor without
+hard-coding the four manager imports again.
+"""
+
+from functools import lru_cache
+
+from django.utils.module_loading import import_string
+
+from apps.core.tenancy import get_current_municipality, use_municipality
+
+# Domain key -> manager factory, in report order
+MANAGER_FACTORIES = {
+    "municipality_introduction": "apps.municipality_introduction.processors.manager.get_municipality_introduction_manager",
+    "demographics": "apps.demographics.processors.manager.get_demographics_manager",
+    "social": "apps.social.processors.manager.get_social_manager",
+    "economics": "apps.economics.processors.manager.get_economics_manager",
+    "infrastructure": "apps.infrastructure.processors.manager.get_infrastructure_manager",
+}
+
+
+def get_domains():
+    """Return the registered manager domains in report order"""
+    return list(MANAGER_FACTORIES.keys())
+
+
+def get_manager(domain):
+    """Build the manager for a domain, or return None if it is not registered"""
+    factory_path = MANAGER_FACTORIES.get(domain)
+    if factory_path is None:
+        return None
+    return import_string(factory_path)()
+
+
+def get_shared_manager(domain):
+    """Manager instance reused across requests
+
+    Processors keep no per-request state, so read-only callers such as the
+    data API can skip rebuilding the processors (and their chart generators)
+    on every request. Processors write to the chart directory of the
+    municipality they were built for, so every municipality has its own.
+    """
+    return _get_shared_manager(domain, get_current_municipality().code)
+
+
+@lru_cache(maxsize=None)
+def _get_shared_manager(domain, municipality_code):
+    with use_municipality(municipality_code):
+        return get_manager(domain)
+
+
+def iter_processors(domains=None):
+    """Yield (domain, category, processor) for every registered processor"""
+    for domain in domains or get_domains():
+        manager = get_manager(domain)
+        if manager is None:
+            continue
+        for category, processor in manager.processors.items():
+            yield domain, category, processor
@@ -0,0 +1,284 @@
+"""
+Map raster derivatives
+
+The landscape maps of the report (``static/images/maps/*.png``) are large
+rasters. Instead of the originals, pages use two derivatives of each map:
+
+- ``print``: the map resized to the box it is printed in on the A4 landscape
+  map pages of ``reports/maps_section.html``, at ``REPORT_MAP_PRINT_DPI``, so
+  WeasyPrint embeds an image of exactly the printed resolution.
+- ``tiles``: a Deep Zoom image (``.dzi`` descriptor and a pyramid of 256px
+  tiles, the format OpenSeadragon and similar viewers read), so the web
+  viewer only downloads the tiles on screen at the current zoom.
+
+Derivatives are written under ``MEDIA_ROOT/reports/maps`` in a directory
+named after the source content hash and the derivative settings::
+
+    reports/maps/<map>.<hash>/manifest.json
+    reports/maps/<map>.<hash>/<map>.print.jpg
+    reports/maps/<map>.<hash>/<map>.dzi
+    reports/maps/<map>.<hash>/<map>_files/<level>/<column>_<row>.jpg
+
+so they are only regenerated when a source map (or the settings) changes,
+and directories of older sources are removed once the new one is complete.
+``generate_map_assets`` builds them; templates fall back to the original
+map until then.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.files.storage import default_storage
+
+from apps.core.singleflight import atomic_path, build_once
+
+from .renditions import encode, has_alpha
+
+logger = logging.getLogger(__name__)
+
+# Map name -> source raster under the static files
+MAPS = {
+    "aspect": "images/maps/aspect.png",
+    "elevation": "images/maps/elevation.png",
+    "land-use": "images/maps/land-use.png",
+    "slope": "images/maps/slope.png",
+}
+
+# Bump when the derivative format changes to regenerate every map
+MAP_ASSETS_VERSION = 1
+
+MAP_ASSETS_DIR = "reports/maps"
+
+# Box a map is printed in: A4 landscape (29.7 x 21 cm) less the 1.5cm page
+# margins of @page map-landscape and the 1cm .map-page padding, at the 75%
+# height .landscape-map is limited to in print
+PRINT_BOX_CM = (24.7, 13.5)
+DEFAULT_PRINT_DPI = 200
+
+TILE_SIZE = 256
+TILE_OVERLAP = 1
+HASH_LENGTH = 12
+
+_digests = {}
+# Derivatives found, and missing ones reported, per source file version
+_manifests = {}
+_missing = set()
+
+
+def get_map_assets_root():
+    return Path(settings.MEDIA_ROOT) / MAP_ASSETS_DIR
+
+
+def get_print_dpi():
+    return getattr(settings, "REPORT_MAP_PRINT_DPI", None) or DEFAULT_PRINT_DPI
+
+
+def print_box_px(dpi=None):
+    """Width and height in pixels of the printed map box"""
+    dpi = dpi or get_print_dpi()
+    return tuple(round(cm / 2.54 * dpi) for cm in PRINT_BOX_CM)
+
+
+def find_source(name):
+    """Path of a map's source raster, or None"""
+    static_path = MAPS.get(name)
+    return finders.find(static_path) if static_path else None
+
+
+def source_digest(path):
+    """Content hash of a source raster, reread only when the file changes"""
+    stat = os.stat(path)
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    digest = _digests.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+        digest = _digests[key] = sha.hexdigest()
+    return digest
+
+
+def assets_key(path):
+    """Directory name suffix: the source content and derivative settings"""
+    spec = (
+        f"{source_digest(path)}:{MAP_ASSETS_VERSION}:{get_print_dpi()}:"
+        f"{PRINT_BOX_CM}:{TILE_SIZE}:{TILE_OVERLAP}"
+    )
+    return hashlib.sha256(spec.encode()).hexdigest()[:HASH_LENGTH]
+
+
+def assets_dir(name, path):
+    return get_map_assets_root() / f"{name}.{assets_key(path)}"
+
+
+def fit(size, box):
+    """Size scaled down to fit in box, keeping the aspect ratio"""
+    width, height = size
+    ratio = min(1, box[0] / width, box[1] / height)
+    return max(1, round(width * ratio)), max(1, round(height * ratio))
+
+
+def write_print(image, path, box):
+    from PIL import Image
+
+    size = fit(image.size, box)
+    if size != image.size:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    path.write_bytes(encode(image, "PNG" if has_alpha(image) else "JPEG"))
+    return {"width": size[0], "height": size[1]}
+
+
+def write_tiles(image, directory, name, ext):
+    """Deep Zoom pyramid of an image: one level per halving of its size"""
+    from PIL import Image
+
+    image_format = "PNG" if ext == "png" else "JPEG"
+    max_level = math.ceil(math.log2(max(image.size))) if max(image.size) > 1 else 0
+    level_image = image
+    for level in range(max_level, -1, -1):
+        scale = 2 ** (max_level - level)
+        size = (
+            max(1, math.ceil(image.width / scale)),
+            max(1, math.ceil(image.height / scale)),
+        )
+        if size != level_image.size:
+            # Each level from the previous one: cheaper than from the source
+            level_image = level_image.resize(size, Image.Resampling.LANCZOS)
+
+        level_dir = directory / f"{name}_files" / str(level)
+        level_dir.mkdir(parents=True)
+        for column in range(math.ceil(size[0] / TILE_SIZE)):
+            for row in range(math.ceil(size[1] / TILE_SIZE)):
+                left = max(0, column * TILE_SIZE - TILE_OVERLAP)
+                top = max(0, row * TILE_SIZE - TILE_OVERLAP)
+                right = min(size[0], (column + 1) * TILE_SIZE + TILE_OVERLAP)
+                bottom = min(size[1], (row + 1) * TILE_SIZE + TILE_OVERLAP)
+                tile = level_image.crop((left, top, right, bottom))
+                (level_dir / f"{column}_{row}.{ext}").write_bytes(
+                    encode(tile, image_format)
+                )
+
+    (directory / f"{name}.dzi").write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+        f'Format="{ext}" Overlap="{TILE_OVERLAP}" TileSize="{TILE_SIZE}">'
+        f'<Size Width="{image.width}" Height="{image.height}"/></Image>\n',
+        encoding="utf-8",
+    )
+    return {"width": image.width, "height": image.height, "levels": max_level + 1}
+
+
+def build_map_assets(name, source, target):
+    """Write every derivative of a map into the directory ``target``"""
+    from PIL import Image
+
+    with Image.open(source) as opened:
+        image = opened.convert("RGBA" if has_alpha(opened) else "RGB")
+    ext = "png" if has_alpha(image) else "jpg"
+
+    with atomic_path(target) as tmp_dir:
+        tmp_dir.mkdir()
+        print_name = f"{name}.print.{ext}"
+        manifest = {
+            "map": name,
+            "source": MAPS[name],
+            "version": MAP_ASSETS_VERSION,
+            "print": {
+                "path": print_name,
+                "dpi": get_print_dpi(),
+                **write_print(image, tmp_dir / print_name, print_box_px()),
+            },
+            "tiles": {
+                "path": f"{name}.dzi",
+                **write_tiles(image, tmp_dir, name, ext),
+            },
+        }
+        # Written last: the directory is complete once it has a manifest
+        (tmp_dir / "manifest.json").write_text(
+            json.dumps(manifest, indent=2), encoding="utf-8"
+        )
+
+
+def prune_map_assets(name, keep):
+    """Remove the derivatives of a map's older sources"""
+    for path in get_map_assets_root().glob(f"{name}.*"):
+        if path.is_dir() and path != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def generate_map_assets(name):
+    """Derivatives of a map, built unless current
+
+    Returns:
+        (manifest, built), or (None, False) when the source map is missing
+    """
+    source = find_source(name)
+    if source is None:
+        return None, False
+    target = assets_dir(name, source)
+    manifest_path = target / "manifest.json"
+    built = build_once(
+        f"map-assets-{target.name}",
+        manifest_path.exists,
+        lambda: build_map_assets(name, source, target),
+    )
+    if built:
+        prune_map_assets(name, target)
+    return read_manifest(manifest_path), built
+
+
+def read_manifest(manifest_path):
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    base = manifest_path.parent.relative_to(Path(settings.MEDIA_ROOT)).as_posix()
+    for kind in ("print", "tiles"):
+        manifest[kind]["url"] = default_storage.url(
+            f"{base}/{manifest[kind]['path']}"
+        )
+    return manifest
+
+
+def get_map_assets(name):
+    """Current derivatives of a map, or None until generate_map_assets runs
+
+    The manifest is read once per version of the source file, like its
+    digest; renders then only stat the source.
+    """
+    source = find_source(name)
+    if source is None:
+        return None
+    stat = os.stat(source)
+    key = (
+        name,
+        str(source),
+        stat.st_mtime_ns,
+        stat.st_size,
+        str(settings.MEDIA_ROOT),
+        get_print_dpi(),
+    )
+    manifest = _manifests.get(key)
+    if manifest is not None:
+        return manifest
+
+    manifest_path = assets_dir(name, source) / "manifest.json"
+    try:
+        manifest = read_manifest(manifest_path)
+    except FileNotFoundError:
+        # Looked up again on the next render: generate_map_assets may have
+        # run since, in any process
+        if key not in _missing:
+            _missing.add(key)
+            logger.warning("No derivatives of map %s, using the original", name)
+        return None
+    except ValueError as e:
+        logger.error("Unreadable derivatives of map %s: %s", name, e)
+        return None
+    _manifests[key] = manifest
+    return manifest
@@ -19,6 +19,10 @@ NEPALI_DIGITS = {
 # Reverse mapping for converting Nepali to English
 ENGLISH_DIGITS = {v: k for k, v in NEPALI_DIGITS.items()}
 
+# str.translate() tables converting every digit of a string in one call
+NEPALI_DIGITS_TABLE = str.maketrans(NEPALI_DIGITS)
+ENGLISH_DIGITS_TABLE = str.maketrans(ENGLISH_DIGITS)
+
 
 def to_nepali_digits(value):
     """
@@ -33,16 +37,7 @@ def to_nepali_digits(value):
     if value is None:
         return ''
     
-    string_value = str(value)
-    result = ''
-    
-    for char in string_value:
-        if char in NEPALI_DIGITS:
-            result += NEPALI_DIGITS[char]
-        else:
-            result += char
-    
-    return result
+    return str(value).translate(NEPALI_DIGITS_TABLE)
 
 
 def to_english_digits(value):
@@ -58,16 +53,7 @@ def to_english_digits(value):
     if value is None:
         return ''
     
-    string_value = str(value)
-    result = ''
-    
-    for char in string_value:
-        if char in ENGLISH_DIGITS:
-            result += ENGLISH_DIGITS[char]
-        else:
-            result += char
-    
-    return result
+    return str(value).translate(ENGLISH_DIGITS_TABLE)
 
 
 def localize_number(value, locale='ne'):
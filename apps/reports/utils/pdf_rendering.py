@@ -0,0 +1,208 @@
+"""
+Warm PDF rendering
+
+WeasyPrint setup is expensive: parsing ``css/pdf.css``, building a
+FontConfiguration through Pango/fontconfig and resolving the Devanagari
+fonts. It is paid once per process here, not once per PDF:
+
+- ``get_renderer_state()`` builds the FontConfiguration and the parsed report
+  stylesheet on first use and keeps them for the life of the process
+- ``PDFWorkerPool`` keeps ``REPORT_PDF_WORKERS`` long-lived worker processes
+  that build that state as they start; request handlers render the report
+  HTML and hand it to them over the pool's queue, getting the PDF bytes back
+
+Report templates link ``css/pdf.css`` unless ``PDF_CONTEXT`` is part of their
+context, in which case the pre-parsed stylesheet is applied instead. Static
+and media files are read from disk (see ``profiles.local_url_fetcher``), so
+rendering never fetches from the site itself.
+
+With ``REPORT_PDF_WORKERS = 0`` PDFs are written in the calling process,
+still reusing its warm state.
+
+WeasyPrint and ReportLab are imported on first use, not when Django starts:
+web workers that never write a PDF do not load them (see the
+``boot.django_setup_urls`` case of ``benchmark_reports``).
+"""
+
+import atexit
+import io
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template.loader import get_template
+
+from .profiles import RENDER_BASE_URL, local_url_fetcher
+
+PDF_STYLESHEET = "css/pdf.css"
+
+# Templates compiled (and kept by the cached loader) when the pool starts
+PDF_TEMPLATES = (
+    "reports/pdf_full_report.html",
+    "reports/pdf_category.html",
+    "reports/pdf_section.html",
+)
+
+# Template context telling pdf_base.html the stylesheet is applied by the
+# renderer
+PDF_CONTEXT = {"pdf_stylesheet_preloaded": True}
+
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 300
+
+_state = None
+_state_lock = threading.Lock()
+# WeasyPrint is not thread-safe: one layout per process at a time
+_write_lock = threading.Lock()
+
+
+def get_renderer_state():
+    """(FontConfiguration, [CSS]) of this process, built on first use"""
+    global _state
+    with _state_lock:
+        if _state is None:
+            from weasyprint import CSS
+            from weasyprint.text.fonts import FontConfiguration
+
+            font_config = FontConfiguration()
+            stylesheets = [
+                CSS(filename=finders.find(PDF_STYLESHEET), font_config=font_config)
+            ]
+            _state = (font_config, stylesheets)
+        return _state
+
+
+def write_pdf(html, target=None):
+    """Write report HTML as a PDF with this process's warm state
+
+    Returns:
+        The PDF bytes, or None when written to ``target``
+    """
+    from weasyprint import HTML
+
+    font_config, stylesheets = get_renderer_state()
+    document = HTML(
+        string=html, base_url=RENDER_BASE_URL, url_fetcher=local_url_fetcher
+    )
+    with _write_lock:
+        return document.write_pdf(
+            target, stylesheets=stylesheets, font_config=font_config
+        )
+
+
+def write_fallback_pdf(paragraphs):
+    """Plain A4 PDF written with ReportLab when WeasyPrint fails
+
+    Args:
+        paragraphs: (text, ReportLab style name) tuples; None adds a spacer
+
+    Returns:
+        The PDF bytes
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    styles = getSampleStyleSheet()
+    story = [
+        Spacer(1, 12) if item is None else Paragraph(item[0], styles[item[1]])
+        for item in paragraphs
+    ]
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4).build(story)
+    return buffer.getvalue()
+
+
+def init_worker(warm=True):
+    """Worker process initializer: set up Django and build the warm state"""
+    import django
+
+    django.setup()
+    if warm:
+        get_renderer_state()
+
+
+def ping():
+    return True
+
+
+class PDFWorkerPool:
+    """Long-lived worker processes writing PDFs from report HTML"""
+
+    # Called in the worker with the HTML; returns the PDF bytes
+    task = staticmethod(write_pdf)
+    # Build the renderer state as each worker starts
+    warm = True
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start every worker and wait until they are warm"""
+        executor = self._get_executor()
+        for future in [executor.submit(ping) for _ in range(self.workers)]:
+            future.result()
+
+    def render(self, html, timeout=None):
+        """PDF bytes of report HTML, written by a warm worker"""
+        executor = self._get_executor()
+        try:
+            return executor.submit(self.task, html).result(timeout)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start fresh ones next time
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                for template_name in PDF_TEMPLATES:
+                    get_template(template_name)
+                # Spawned workers do not inherit the server's threads or
+                # database connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context("spawn"),
+                    initializer=init_worker,
+                    initargs=(self.warm,),
+                )
+            return self._executor
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pdf_pool():
+    """The process-wide PDF worker pool, or None if REPORT_PDF_WORKERS is 0"""
+    global _pool
+    workers = getattr(settings, "REPORT_PDF_WORKERS", DEFAULT_WORKERS)
+    if not workers:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = PDFWorkerPool(workers)
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def render_pdf(html):
+    """PDF bytes of report HTML rendered with ``PDF_CONTEXT``"""
+    pool = get_pdf_pool()
+    if pool is None:
+        return write_pdf(html)
+    timeout = getattr(settings, "REPORT_PDF_TIMEOUT", DEFAULT_TIMEOUT)
+    return pool.render(html, timeout=timeout)
@@ -0,0 +1,217 @@
+"""
+Processor data for the JSON data API
+
+Helpers behind ``ProcessorDataAPIView``: a cheap fingerprint of the data a
+processor reads (so unchanged data can be answered with 304 Not Modified
+without running ``get_data()``), JSON normalisation of ``get_data()`` output,
+field selection, ward filtering and response compression.
+"""
+
+import gzip
+import hashlib
+import json
+import re
+import sys
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Count, Max
+from django.forms.models import model_to_dict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_LENGTH = 200
+
+DATA_VERSION_KEY = "processor_data:version"
+
+
+class ProcessorDataEncoder(DjangoJSONEncoder):
+    """JSON encoder that also handles model instances and querysets"""
+
+    def default(self, o):
+        if isinstance(o, models.Model):
+            return model_to_dict(o)
+        if isinstance(o, models.QuerySet):
+            return list(o.values())
+        if isinstance(o, (set, frozenset)):
+            return sorted(o, key=str)
+        return super().default(o)
+
+
+def get_source_models(processor):
+    """Models a processor reads
+
+    Uses the processor's ``data_models`` attribute when present, otherwise
+    the concrete models imported by the processor's module.
+    """
+    data_models = getattr(processor, "data_models", None)
+    if data_models is not None:
+        return list(data_models)
+
+    module = sys.modules.get(type(processor).__module__)
+    found = []
+    for value in vars(module).values() if module else ():
+        if (
+            isinstance(value, type)
+            and issubclass(value, models.Model)
+            and not value._meta.abstract
+            and value not in found
+        ):
+            found.append(value)
+    return sorted(found, key=lambda model: model._meta.label)
+
+
+def model_state(model):
+    """(row count, latest ``updated_at`` or None) of a model's table"""
+    field_names = {field.name for field in model._meta.concrete_fields}
+    aggregates = {"count": Count("pk")}
+    if "updated_at" in field_names:
+        aggregates["updated"] = Max("updated_at")
+    values = model._default_manager.aggregate(**aggregates)
+    return values["count"], values.get("updated")
+
+
+def get_data_version():
+    """Token bumped by ``invalidate_processor_data()``"""
+    return cache.get_or_set(DATA_VERSION_KEY, "0", None)
+
+
+def invalidate_processor_data():
+    """Change every processor's data fingerprint
+
+    Call after writes that bypass ``auto_now``, such as ``queryset.update()``
+    or ``bulk_update()`` without ``updated_at``.
+    """
+    cache.set(DATA_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def data_fingerprint(domain, category, processor):
+    """Fingerprint of the rows behind a processor, or None if unknown
+
+    Combines the row count and latest ``updated_at`` of every source model,
+    which changes whenever rows are added, deleted or saved, with the data
+    version. Writes that skip ``auto_now`` (``queryset.update()``,
+    ``bulk_update()``) leave both row stats unchanged, so code making them
+    must call ``invalidate_processor_data()``. Returns
+    ``(fingerprint, last_modified)``.
+    """
+    source_models = get_source_models(processor)
+    if not source_models:
+        return None, None
+
+    parts = [domain, category, type(processor).__qualname__, get_data_version()]
+    last_modified = None
+    for model in source_models:
+        count, updated = model_state(model)
+        if updated and (last_modified is None or updated > last_modified):
+            last_modified = updated
+        parts.append(f"{model._meta.label}:{count}:{updated}")
+
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+    return digest[:20], last_modified
+
+
+def normalize_data(data):
+    """Round-trip data through JSON so keys and values are JSON types"""
+    return json.loads(json.dumps(data, cls=ProcessorDataEncoder))
+
+
+def get_processor_data(domain, category, processor, fingerprint=None):
+    """JSON-ready ``get_data()`` output, cached per data fingerprint"""
+    if fingerprint is None:
+        return normalize_data(processor.get_data())
+
+    cache_key = f"processor_data:{domain}:{category}:{fingerprint}"
+    return cache.get_or_set(
+        cache_key,
+        lambda: normalize_data(processor.get_data()),
+        timeout=getattr(settings, "REPORT_DATA_API_CACHE_TIMEOUT", 3600),
+    )
+
+
+def select_fields(data, fields):
+    """Keep only the requested (optionally dotted) fields of a dict"""
+    if not fields or not isinstance(data, dict):
+        return data
+
+    selected = {}
+    for field in fields:
+        source = data
+        target = selected
+        parts = field.split(".")
+        for index, part in enumerate(parts):
+            if not isinstance(source, dict) or part not in source:
+                break
+            if index == len(parts) - 1:
+                target[part] = source[part]
+            else:
+                source = source[part]
+                target = target.setdefault(part, {})
+    return selected
+
+
+def filter_wards(data, wards):
+    """Restrict ward-keyed dicts and ward rows to the given ward numbers
+
+    Applies to dicts stored under a key mentioning "ward" (``ward_data``,
+    ``ward_populations``, ...) and to lists of rows with a ``ward_number``.
+    """
+    if not wards:
+        return data
+    wards = {str(ward) for ward in wards}
+
+    def _filter(value, key=""):
+        if isinstance(value, dict):
+            if "ward" in str(key).lower() and all(
+                str(k).isdigit() for k in value
+            ):
+                value = {k: v for k, v in value.items() if str(k) in wards}
+            return {k: _filter(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            value = [
+                item
+                for item in value
+                if not (isinstance(item, dict) and "ward_number" in item)
+                or str(item["ward_number"]) in wards
+            ]
+            return [_filter(item) for item in value]
+        return value
+
+    return _filter(data)
+
+
+def choose_encoding(accept_encoding):
+    """Best supported content coding for an Accept-Encoding header"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        match = re.match(r"\s*([\w*-]+)\s*(?:;\s*q=([\d.]+))?", item)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        accepted[match.group(1).lower()] = quality
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    for coding in candidates:
+        quality = accepted.get(coding, accepted.get("*", 0))
+        if quality > 0:
+            return coding
+    return None
+
+
+def compress(content, coding):
+    """Compress bytes with the given content coding"""
+    if coding == "br":
+        return brotli.compress(content)
+    if coding == "gzip":
+        return gzip.compress(content, mtime=0)
+    return content
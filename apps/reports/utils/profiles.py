@@ -0,0 +1,292 @@
+"""
+Municipality profiles
+
+Builds the full digital profile report of the active municipality, and
+renders the profiles of several municipalities concurrently for batch
+publishing (``generate_municipality_profiles``).
+
+Every profile renders in a worker thread with its municipality active (see
+apps.core.tenancy), so it reads that municipality's database, cache entries
+and chart directory. Process-wide state is built once and shared by all of
+them:
+
+- the compiled report template, held by Django's cached template loader
+- one WeasyPrint FontConfiguration and parsed stylesheet, see pdf_rendering
+- the chart manifests, kept per chart directory by chart_management
+"""
+
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import connections
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils._os import safe_join
+
+from apps.core.singleflight import atomic_write, build_once
+from apps.core.tenancy import get_current_municipality, use_municipality
+
+from .lazy_context import LazyReportData
+from .managers import get_manager, get_shared_manager
+from .processor_data import data_fingerprint
+from .profiling import stage
+
+logger = logging.getLogger("gadhawa_report.profiles")
+
+FULL_REPORT_TEMPLATE = "reports/pdf_full_report.html"
+
+# Domains of the full report, in template order
+FULL_REPORT_DOMAINS = ("demographics", "social", "infrastructure", "economics")
+
+# Report HTML is rendered against this base URL; static and media files
+# under it are read from disk by local_url_fetcher()
+RENDER_BASE_URL = "http://localhost/"
+
+DEFAULT_WORKERS = 4
+
+# Cached full report PDFs older than this are deleted when a new one is built
+REPORT_CACHE_MAX_AGE = 2 * 24 * 60 * 60
+
+
+def full_report_filename(municipality, date=None, domains=FULL_REPORT_DOMAINS):
+    date = date or timezone.now()
+    if tuple(domains) != FULL_REPORT_DOMAINS:
+        return f"{municipality.code}_{'_'.join(domains)}_report_{date:%Y%m%d}.pdf"
+    return f"{municipality.code}_digital_profile_report_{date:%Y%m%d}.pdf"
+
+
+def parse_domains(value):
+    """Full report domains named in a comma separated list, in report order
+
+    Returns every domain when ``value`` is empty or names none of them.
+    """
+    names = {name.strip() for name in (value or "").split(",")}
+    domains = tuple(domain for domain in FULL_REPORT_DOMAINS if domain in names)
+    return domains or FULL_REPORT_DOMAINS
+
+
+def build_full_report_context(domains=FULL_REPORT_DOMAINS, prefetch=False):
+    """Template context of the active municipality's full report
+
+    Processor results are computed as the template reads them (see
+    lazy_context); domains left out render as empty chapters.
+
+    Args:
+        domains: Domains included in the report
+        prefetch: Compute every processor up front, concurrently, for
+            renders known to display all of them
+    """
+    from ..models import PublicationSettings
+
+    municipality = get_current_municipality()
+    report = LazyReportData(
+        {
+            domain: get_manager(domain)
+            for domain in FULL_REPORT_DOMAINS
+            if domain in domains
+        }
+    )
+    if prefetch:
+        report.prefetch()
+
+    return {
+        "municipality_name": municipality.name,
+        "municipality_name_english": municipality.name_english,
+        "publication_settings": PublicationSettings.objects.first(),
+        "generated_date": timezone.now(),
+        "all_demographics_data": report.domain("demographics"),
+        "all_social_data": report.domain("social"),
+        "all_infrastructure_data": report.domain("infrastructure"),
+        "all_economics_data": report.domain("economics"),
+        "pdf_charts": report.pdf_charts,
+        "report_data": report,
+    }
+
+
+def render_full_report(domains=FULL_REPORT_DOMAINS, snapshot=None):
+    """PDF bytes of the active municipality's full report
+
+    Rendered from a ``snapshots.ReportSnapshot`` instead of the live data
+    when one is given.
+    """
+    from .pdf_rendering import PDF_CONTEXT, render_pdf
+
+    if snapshot is not None:
+        context = snapshot.build_context(domains)
+    else:
+        context = build_full_report_context(domains)
+    with stage("template_render"):
+        html = get_template(FULL_REPORT_TEMPLATE).render({**context, **PDF_CONTEXT})
+    with stage("pdf_write"):
+        return render_pdf(html)
+
+
+def full_report_fingerprint(domains=FULL_REPORT_DOMAINS, date=None):
+    """Fingerprint of everything a full report is built from, or None
+
+    Covers the municipality, the report date, the report content version and
+    the source rows of every processor; None if a processor's sources are
+    unknown.
+    """
+    from .api_cache import get_content_version
+
+    date = date or timezone.now()
+    parts = [
+        get_current_municipality().code,
+        f"{date:%Y%m%d}",
+        ",".join(domains),
+        get_content_version(),
+    ]
+    for domain in domains:
+        for category, processor in get_shared_manager(domain).processors.items():
+            fingerprint, _ = data_fingerprint(domain, category, processor)
+            if fingerprint is None:
+                return None
+            parts.append(fingerprint)
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def get_report_cache_dir():
+    cache_dir = getattr(settings, "REPORT_PDF_CACHE_DIR", None)
+    if cache_dir:
+        return Path(cache_dir)
+    return Path(settings.MEDIA_ROOT) / "reports" / "cache"
+
+
+def get_or_build_full_report(domains=FULL_REPORT_DOMAINS, snapshot=None):
+    """PDF bytes of the full report, built once per fingerprint
+
+    Concurrent requests for the same report wait for a single build and
+    serve its file; reports whose fingerprint is unknown are always built.
+    Reports of a snapshot are fingerprinted by its content.
+    """
+    if snapshot is not None:
+        fingerprint = hashlib.sha1(
+            f"{snapshot.fingerprint()}|{','.join(domains)}".encode("utf-8")
+        ).hexdigest()[:20]
+    else:
+        fingerprint = full_report_fingerprint(domains)
+    if fingerprint is None:
+        return render_full_report(domains)
+
+    code = get_current_municipality().code
+    path = get_report_cache_dir() / f"{code}_{fingerprint}.pdf"
+
+    def build():
+        pdf = render_full_report(domains, snapshot)
+        with atomic_write(path, "wb") as f:
+            f.write(pdf)
+        prune_report_cache(code, keep=path)
+
+    build_once(f"report:{path}", path.exists, build)
+    return path.read_bytes()
+
+
+def prune_report_cache(code, keep):
+    """Delete a municipality's outdated cached full reports"""
+    cutoff = time.time() - REPORT_CACHE_MAX_AGE
+    for path in keep.parent.glob(f"{code}_*.pdf"):
+        try:
+            if path != keep and path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def local_path_for_url(url):
+    """Local file behind a static or media URL of RENDER_BASE_URL, or None"""
+    if not url.startswith(RENDER_BASE_URL):
+        return None
+    path = unquote(urlsplit(url).path)
+    try:
+        if path.startswith(settings.STATIC_URL):
+            local_path = finders.find(path[len(settings.STATIC_URL) :])
+        elif settings.MEDIA_URL and path.startswith(settings.MEDIA_URL):
+            local_path = safe_join(
+                settings.MEDIA_ROOT, path[len(settings.MEDIA_URL) :]
+            )
+        else:
+            return None
+    except SuspiciousFileOperation:
+        return None
+    if local_path and os.path.isfile(local_path):
+        return local_path
+    return None
+
+
+def local_url_fetcher(url, *args, **kwargs):
+    """WeasyPrint URL fetcher reading static and media files from disk"""
+    from weasyprint import default_url_fetcher
+
+    local_path = local_path_for_url(url)
+    if local_path:
+        url = Path(local_path).resolve().as_uri()
+    return default_url_fetcher(url, *args, **kwargs)
+
+
+class ProfileRenderer:
+    """Full report PDF renderer shared by concurrently built profiles"""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+
+    def render(self):
+        """Write the active municipality's profile and return its path"""
+        from .pdf_rendering import PDF_CONTEXT, write_pdf
+
+        municipality = get_current_municipality()
+        html = get_template(FULL_REPORT_TEMPLATE).render(
+            {**build_full_report_context(prefetch=True), **PDF_CONTEXT}
+        )
+        path = self.output_dir / full_report_filename(municipality)
+        # Layouts run one at a time while other profiles process their data
+        # and charts, see pdf_rendering.write_pdf()
+        with stage("pdf_write"):
+            write_pdf(html, target=path)
+        return path
+
+    def render_all(self, municipalities, max_workers=None):
+        """Render the profiles of several municipalities concurrently
+
+        Returns:
+            {code: {"path": Path or None, "seconds": float, "error": str or None}}
+            in the order of ``municipalities``
+        """
+        if max_workers is None:
+            max_workers = getattr(settings, "REPORT_PROFILE_WORKERS", DEFAULT_WORKERS)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="profile"
+        ) as executor:
+            futures = {
+                municipality.code: executor.submit(self._render_in, municipality)
+                for municipality in municipalities
+            }
+            return {code: future.result() for code, future in futures.items()}
+
+    def _render_in(self, municipality):
+        started = time.perf_counter()
+        path = error = None
+        try:
+            with use_municipality(municipality):
+                path = self.render()
+        except Exception as e:
+            logger.exception("Rendering the %s profile failed", municipality.code)
+            error = str(e)
+        finally:
+            # The worker thread has its own connections; do not leak them
+            connections.close_all()
+        return {
+            "path": path,
+            "seconds": time.perf_counter() - started,
+            "error": error,
+        }
@@ -0,0 +1,246 @@
+"""
+Report build profiling
+
+Per-stage wall-clock timers and query counters for report builds.
+
+A profile is activated per request by ``BuildProfileMiddleware`` (or explicitly
+with ``build_profile()`` from management commands and benchmarks). Code paths
+mark their work with ``stage()`` and tally events with ``count()``; when no
+profile is active either costs a single context-variable lookup, so the
+timers can stay in the hot path.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger("gadhawa_report.build")
+
+_current_profile = ContextVar("report_build_profile", default=None)
+_stage_depth = ContextVar("report_build_stage_depth", default=0)
+
+# Processor methods timed by instrument_processor(), in pipeline order
+PROCESSOR_STAGES = (
+    "get_data",
+    "generate_report_content",
+    "generate_analysis_text",
+    "generate_and_save_charts",
+    "generate_and_track_charts",
+)
+
+
+class BuildProfile:
+    """Collects timed stages and the number of SQL queries of one build"""
+
+    def __init__(self, label=""):
+        self.label = label
+        self.stages = []
+        self.query_count = 0
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._finished = None
+
+    def count_query(self, execute, sql, params, many, context):
+        """Database execute wrapper counting every query of the build"""
+        with self._lock:
+            self.query_count += 1
+        return execute(sql, params, many, context)
+
+    def record(self, name, depth, start, duration, queries):
+        with self._lock:
+            self.stages.append(
+                {
+                    "name": name,
+                    "depth": depth,
+                    "start_ms": round((start - self._started) * 1000, 2),
+                    "duration_ms": round(duration * 1000, 2),
+                    "queries": queries,
+                }
+            )
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self):
+        if self._finished is None:
+            self._finished = time.perf_counter()
+
+    @property
+    def total_ms(self):
+        end = self._finished or time.perf_counter()
+        return round((end - self._started) * 1000, 2)
+
+    def totals(self, max_depth=None):
+        """Aggregate duration and queries per stage name, in first-seen order"""
+        totals = {}
+        for entry in self.stages:
+            if max_depth is not None and entry["depth"] > max_depth:
+                continue
+            total = totals.setdefault(
+                entry["name"], {"duration_ms": 0.0, "queries": 0, "calls": 0}
+            )
+            total["duration_ms"] += entry["duration_ms"]
+            total["queries"] += entry["queries"]
+            total["calls"] += 1
+        return totals
+
+    def server_timing_header(self, max_depth=0):
+        """Format top-level stages as a Server-Timing header value"""
+        metrics = []
+        for name, total in self.totals(max_depth=max_depth).items():
+            metrics.append(
+                f'{name};dur={total["duration_ms"]:.1f};desc="{total["queries"]} queries"'
+            )
+        metrics.append(
+            f'total;dur={self.total_ms:.1f};desc="{self.query_count} queries"'
+        )
+        return ", ".join(metrics)
+
+    def as_dict(self):
+        return {
+            "label": self.label,
+            "total_ms": self.total_ms,
+            "query_count": self.query_count,
+            "stages": list(self.stages),
+            "totals": self.totals(),
+            "counters": dict(self.counters),
+        }
+
+    def save(self, path):
+        """Write the profile as JSON, creating parent directories as needed"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def log_summary(self):
+        if not self.stages:
+            return
+        logger.info(
+            "Build %s finished in %.1f ms with %d queries",
+            self.label or "-",
+            self.total_ms,
+            self.query_count,
+            extra={"build_profile": self.as_dict()},
+        )
+
+
+def get_current_profile():
+    """Return the active BuildProfile, or None outside of a profiled build"""
+    return _current_profile.get()
+
+
+def save_current_profile(artifact_name):
+    """Save the active profile as ``<artifact_name>.profile.json``
+
+    Profiles go to ``settings.REPORT_BUILD_PROFILE_DIR``; nothing is written
+    when that setting is unset or no profile is active.
+    """
+    directory = getattr(settings, "REPORT_BUILD_PROFILE_DIR", None)
+    profile = _current_profile.get()
+    if not directory or profile is None:
+        return None
+    return profile.save(Path(directory) / f"{artifact_name}.profile.json")
+
+
+@contextmanager
+def build_profile(label=""):
+    """Activate a new BuildProfile for the enclosed block"""
+    profile = BuildProfile(label)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        profile.finish()
+        _current_profile.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as a named stage of the active build"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    depth = _stage_depth.get()
+    depth_token = _stage_depth.set(depth + 1)
+
+    # Install the query counter once per thread connection
+    install_wrapper = profile.count_query not in connection.execute_wrappers
+    if install_wrapper:
+        connection.execute_wrappers.append(profile.count_query)
+
+    queries_before = profile.query_count
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        queries = profile.query_count - queries_before
+        if install_wrapper:
+            connection.execute_wrappers.remove(profile.count_query)
+        _stage_depth.reset(depth_token)
+        profile.record(name, depth, start, duration, queries)
+        logger.debug(
+            "Stage %s took %.1f ms (%d queries)",
+            name,
+            duration * 1000,
+            queries,
+            extra={
+                "stage": name,
+                "duration_ms": round(duration * 1000, 2),
+                "queries": queries,
+            },
+        )
+
+
+def count(name, amount=1):
+    """Add to a named counter of the active build"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.increment(name, amount)
+
+
+def timed(name):
+    """Decorator form of stage()"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_processor(processor, prefix):
+    """Wrap the pipeline methods of a processor instance with stage timers"""
+    for method_name in PROCESSOR_STAGES:
+        method = getattr(processor, method_name, None)
+        if method is None or getattr(method, "_build_stage", None):
+            continue
+        wrapped = timed(f"{prefix}.{method_name}")(method)
+        wrapped._build_stage = True
+        setattr(processor, method_name, wrapped)
+    return processor
+
+
+def instrument_processors(processors, prefix):
+    """Instrument every processor of a manager registry in place"""
+    for category, processor in processors.items():
+        instrument_processor(processor, f"{prefix}.{category}")
+    return processors
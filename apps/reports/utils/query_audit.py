@@ -0,0 +1,418 @@
+"""
+Query plan audit
+
+Runs every registered processor's ``get_data`` and every public report view
+while capturing their SQL, then explains each distinct statement and flags:
+
+- sequential (full table) scans in the plan
+- filters no existing index can serve, with a candidate composite index
+- identical statements executed more than once by the same source
+
+On PostgreSQL plans come from ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)``,
+which executes the statement inside a rolled back transaction; on SQLite from
+``EXPLAIN QUERY PLAN``. Only SELECT statements are explained.
+
+Candidate indexes are derived from the columns a statement filters on
+(``WHERE``) and are only suggestions: review them against the plans before
+applying the migrations ``write_index_migrations()`` generates.
+"""
+
+import json
+import re
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import connections, models, transaction
+from django.db.migrations import AddIndex, Migration
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.test import Client, override_settings
+from django.urls import NoReverseMatch, reverse
+
+from apps.core.tenancy import get_current_municipality
+
+from .managers import iter_processors
+
+# Processors run inline so their queries hit the captured connection, and
+# caches are bypassed so every query runs
+AUDIT_SETTINGS = {
+    "REPORT_PROCESSOR_WORKERS": 1,
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+}
+
+# Public report pages: (url name, needs a category, needs a section, query)
+VIEW_CASES = [
+    ("reports:home", False, False, ""),
+    ("reports:toc", False, False, ""),
+    ("reports:figures", False, False, ""),
+    ("reports:tables", False, False, ""),
+    ("reports:search", False, False, "?q=जनसंख्या"),
+    ("reports:sitemap", False, False, ""),
+    ("reports:category", True, False, ""),
+    ("reports:section", False, True, ""),
+    ("reports:full_report", False, False, ""),
+    ("reports:api_categories", False, False, ""),
+    ("reports:api_sections", False, False, ""),
+    ("reports:api_search", False, False, "?q=जनसंख्या"),
+]
+
+# Columns compared in a WHERE clause: "table"."column" <operator>
+FILTER_RE = re.compile(
+    r'"(?P<table>\w+)"\."(?P<column>\w+)"\s*'
+    r"(?P<op>=|IN\b|<=|>=|<|>|BETWEEN\b|IS\b|LIKE\b|ILIKE\b)",
+    re.IGNORECASE,
+)
+WHERE_END_RE = re.compile(r"\b(GROUP BY|ORDER BY|LIMIT|HAVING)\b")
+IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+
+# Leading columns suggested for a candidate index
+MAX_INDEX_COLUMNS = 3
+
+
+def normalize_sql(sql):
+    """Statement text with variable-length IN lists collapsed"""
+    return IN_LIST_RE.sub("IN (...)", sql)
+
+
+def filtered_columns(sql):
+    """{table: [(column, operator)]} compared in the statement's WHERE"""
+    where = sql.split(" WHERE ", 1)
+    if len(where) < 2:
+        return {}
+    clause = WHERE_END_RE.split(where[1], 1)[0]
+    columns = defaultdict(list)
+    for match in FILTER_RE.finditer(clause):
+        entry = (match["column"], match["op"].upper())
+        if entry not in columns[match["table"]]:
+            columns[match["table"]].append(entry)
+    return dict(columns)
+
+
+def get_model_for_table(table):
+    for model in apps.get_models():
+        if model._meta.db_table == table:
+            return model
+    return None
+
+
+def existing_indexes(model):
+    """Column tuples of every index on a model's table"""
+    opts = model._meta
+    columns = {field.name: field.column for field in opts.concrete_fields}
+
+    def to_columns(field_names):
+        return tuple(columns.get(name.lstrip("-"), name) for name in field_names)
+
+    indexes = set()
+    for field in opts.concrete_fields:
+        if field.primary_key or field.unique or field.db_index:
+            indexes.add((field.column,))
+    for fields in opts.unique_together:
+        indexes.add(to_columns(fields))
+    for index in opts.indexes:
+        if index.fields:
+            indexes.add(to_columns(index.fields))
+    for constraint in opts.constraints:
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields:
+            indexes.add(to_columns(constraint.fields))
+    return indexes
+
+
+def usable_prefix(index, columns):
+    """Number of leading index columns the filter constrains"""
+    length = 0
+    for column in index:
+        if column not in columns:
+            break
+        length += 1
+    return length
+
+
+def suggest_index(table, filters):
+    """Candidate index for one table's filter, or None if one already serves it
+
+    Equality columns come first, then at most one range column, as a
+    composite B-tree index can only use the columns up to the first range.
+    """
+    model = get_model_for_table(table)
+    if model is None:
+        return None
+
+    equality = [column for column, op in filters if op in ("=", "IN", "IS")]
+    ranges = [column for column, op in filters if column not in equality]
+    wanted = (equality + ranges[:1])[:MAX_INDEX_COLUMNS]
+    if not wanted:
+        return None
+
+    best = max(
+        (usable_prefix(index, equality) for index in existing_indexes(model)),
+        default=0,
+    )
+    if best >= min(len(equality), MAX_INDEX_COLUMNS) and (best or not ranges):
+        return None
+
+    field_names = {field.column: field.name for field in model._meta.concrete_fields}
+    index = models.Index(fields=[field_names.get(column, column) for column in wanted])
+    index.set_name_with_model(model)
+    return {
+        "model": model,
+        "index": index,
+        "reason": "no usable index" if best == 0 else "partial index",
+    }
+
+
+def explain(connection, sql, params):
+    """(plan rows, seq-scanned tables, execution ms or None) of a SELECT"""
+    if connection.vendor == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+    elif connection.vendor == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        prefix = "EXPLAIN "
+
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+        # ANALYZE executes the statement; never keep its side effects
+        transaction.set_rollback(True, using=connection.alias)
+
+    if connection.vendor == "postgresql":
+        plan = rows[0][0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _postgresql_plan(plan[0])
+    if connection.vendor == "sqlite":
+        return _sqlite_plan(rows)
+    return [" ".join(str(value) for value in row) for row in rows], [], None
+
+
+def _postgresql_plan(plan):
+    lines, seq_scans = [], []
+
+    def walk(node, depth):
+        line = f"{'  ' * depth}{node['Node Type']}"
+        if "Relation Name" in node:
+            line += f" on {node['Relation Name']}"
+        line += f" (rows={node.get('Actual Rows')}"
+        line += f", ms={node.get('Actual Total Time')}"
+        line += f", read={node.get('Shared Read Blocks', 0)}"
+        line += f", hit={node.get('Shared Hit Blocks', 0)})"
+        if "Filter" in node:
+            line += f" filter: {node['Filter']}"
+        lines.append(line)
+        if node["Node Type"] == "Seq Scan":
+            seq_scans.append(node["Relation Name"])
+        for child in node.get("Plans", ()):
+            walk(child, depth + 1)
+
+    walk(plan["Plan"], 0)
+    return lines, seq_scans, plan.get("Execution Time")
+
+
+def _sqlite_plan(rows):
+    lines, seq_scans = [], []
+    for row in rows:
+        detail = row[-1]
+        lines.append(detail)
+        words = detail.split()
+        # "SCAN table" without an index is a full table scan
+        if words[:1] == ["SCAN"] and "INDEX" not in detail and len(words) > 1:
+            seq_scans.append(words[1])
+    return lines, seq_scans, None
+
+
+class QueryCapture:
+    """Execute wrapper recording every statement of the current source"""
+
+    def __init__(self):
+        self.source = None
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "source": self.source,
+                    "sql": sql,
+                    "params": params,
+                    "many": many,
+                    "ms": (time.perf_counter() - started) * 1000,
+                }
+            )
+
+
+class QueryPlanAudit:
+    """Capture, explain and rank the queries of processors and views"""
+
+    def __init__(self, using=None):
+        self.connection = connections[using or get_current_municipality().database]
+        self.capture = QueryCapture()
+        self.errors = {}
+
+    def run_case(self, source, func):
+        """Run a callable with its queries recorded under ``source``"""
+        self.capture.source = source
+        with override_settings(**AUDIT_SETTINGS):
+            with self.connection.execute_wrapper(self.capture):
+                try:
+                    func()
+                except Exception as e:
+                    self.errors[source] = str(e)
+
+    def run_processors(self, only=None):
+        for domain, category, processor in iter_processors():
+            source = f"processor:{domain}.{category}"
+            if only and not any(text in source for text in only):
+                continue
+            self.run_case(source, processor.get_data)
+
+    def run_views(self, only=None):
+        from ..models import ReportCategory, ReportSection
+
+        category = ReportCategory.objects.filter(is_active=True).first()
+        section = (
+            ReportSection.objects.filter(is_published=True)
+            .select_related("category")
+            .first()
+        )
+        municipality = get_current_municipality()
+        host = municipality.hosts[0] if municipality.hosts else "testserver"
+        client = Client(HTTP_HOST=host)
+
+        for name, needs_category, needs_section, query in VIEW_CASES:
+            source = f"view:{name}"
+            if only and not any(text in source for text in only):
+                continue
+            if (needs_category and not category) or (needs_section and not section):
+                continue
+            kwargs = {}
+            if needs_category:
+                kwargs = {"slug": category.slug}
+            if needs_section:
+                kwargs = {
+                    "category_slug": section.category.slug,
+                    "section_slug": section.slug,
+                }
+            try:
+                path = reverse(name, kwargs=kwargs) + query
+            except NoReverseMatch:
+                continue
+            with override_settings(ALLOWED_HOSTS=[host]):
+                self.run_case(source, lambda: client.get(path))
+
+    def analyze(self):
+        """Distinct statements ranked by their issues, then total time"""
+        groups = {}
+        for query in self.capture.queries:
+            key = normalize_sql(query["sql"])
+            group = groups.setdefault(
+                key,
+                {
+                    "sql": query["sql"],
+                    "params": query["params"],
+                    "many": query["many"],
+                    "executions": 0,
+                    "duplicates": 0,
+                    "total_ms": 0.0,
+                    "sources": set(),
+                    "_seen": set(),
+                },
+            )
+            group["executions"] += 1
+            group["total_ms"] += query["ms"]
+            group["sources"].add(query["source"])
+            identity = (query["source"], repr(query["params"]))
+            if identity in group["_seen"]:
+                group["duplicates"] += 1
+            group["_seen"].add(identity)
+
+        results = [self._analyze_group(group) for group in groups.values()]
+        results.sort(key=lambda result: (-len(result["issues"]), -result["total_ms"]))
+        return results
+
+    def _analyze_group(self, group):
+        sql = group["sql"]
+        result = {
+            "sql": sql,
+            "executions": group["executions"],
+            "duplicates": group["duplicates"],
+            "total_ms": round(group["total_ms"], 3),
+            "sources": sorted(group["sources"]),
+            "plan": [],
+            "seq_scans": [],
+            "explain_ms": None,
+            "candidates": [],
+            "issues": [],
+        }
+        if group["many"] or not sql.lstrip().upper().startswith("SELECT"):
+            return result
+
+        try:
+            plan, seq_scans, explain_ms = explain(
+                self.connection, sql, group["params"]
+            )
+        except Exception as e:
+            result["issues"].append(f"explain failed: {e}")
+            return result
+        result.update(plan=plan, seq_scans=seq_scans, explain_ms=explain_ms)
+
+        for table in seq_scans:
+            result["issues"].append(f"seq scan on {table}")
+        for table, filters in filtered_columns(sql).items():
+            candidate = suggest_index(table, filters)
+            if candidate:
+                result["candidates"].append(candidate)
+                result["issues"].append(
+                    f"missing index on {table} ({candidate['reason']})"
+                )
+        if group["duplicates"]:
+            result["issues"].append(f"{group['duplicates']} duplicate executions")
+        return result
+
+
+def collect_candidates(results):
+    """{app_label: [(model name, Index)]} without duplicates"""
+    candidates = defaultdict(dict)
+    for result in results:
+        for candidate in result["candidates"]:
+            model = candidate["model"]
+            index = candidate["index"]
+            key = (model._meta.model_name, tuple(index.fields))
+            candidates[model._meta.app_label].setdefault(key, index)
+    return {
+        app_label: [(model_name, index) for (model_name, _), index in indexes.items()]
+        for app_label, indexes in candidates.items()
+    }
+
+
+def write_index_migrations(results, name="query_plan_indexes"):
+    """Write one AddIndex migration per app for the candidate indexes
+
+    Returns:
+        Paths of the written migration files
+    """
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    paths = []
+    for app_label, indexes in sorted(collect_candidates(results).items()):
+        leaves = loader.graph.leaf_nodes(app_label)
+        if len(leaves) != 1:
+            continue
+        leaf = leaves[0][1]
+        number = int(leaf[:4]) + 1 if leaf[:4].isdigit() else 1
+
+        migration = Migration(f"{number:04d}_{name}", app_label)
+        migration.dependencies = [leaves[0]]
+        migration.operations = [
+            AddIndex(model_name=model_name, index=index)
+            for model_name, index in indexes
+        ]
+        writer = MigrationWriter(migration)
+        with open(writer.path, "w", encoding="utf-8") as f:
+            f.write(writer.as_string())
+        paths.append(writer.path)
+    return paths
@@ -0,0 +1,236 @@
+"""
+Report figure renditions
+
+Resized copies of ``ReportFigure.image`` so pages download an image close to
+the size it is displayed at. Every rendition is written as WebP plus a
+fallback (JPEG, or PNG for images with transparency) under a content-hashed
+name, so files never change once written and can be cached forever:
+
+    reports/figures/renditions/<stem>.<rendition>.<hash>.<ext>
+
+The hash covers the source bytes and the rendition settings. Generated
+renditions are recorded on the figure:
+
+    {
+        "source": "reports/figures/map.jpg",
+        "version": 1,
+        "thumb": {"width": 320, "height": 213,
+                  "webp": "reports/figures/renditions/map.thumb.1a2b...webp",
+                  "fallback": "reports/figures/renditions/map.thumb.9f8e...jpg"},
+        ...
+    }
+
+Uploads are rendered by a background worker after the save commits;
+``generate_figure_renditions`` renders figures that were missed.
+"""
+
+import contextvars
+import hashlib
+import io
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendition settings change to regenerate every figure
+RENDITIONS_VERSION = 1
+
+# Rendition name -> maximum width in pixels, smallest first. Images are never
+# upscaled; ReportFigure.save() already limits uploads to 1200x800.
+RENDITION_WIDTHS = {
+    "thumb": 320,
+    "web": 800,
+    "print": 1200,
+}
+
+RENDITIONS_DIR = "reports/figures/renditions"
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+HASH_LENGTH = 12
+
+
+def has_alpha(image):
+    return image.mode in ("RGBA", "LA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+
+
+def encode(image, image_format):
+    """Encoded bytes of an image in WEBP, JPEG or PNG"""
+    output = io.BytesIO()
+    if image_format == "WEBP":
+        image.save(output, format="WEBP", quality=WEBP_QUALITY, method=6)
+    elif image_format == "JPEG":
+        image.convert("RGB").save(
+            output,
+            format="JPEG",
+            quality=JPEG_QUALITY,
+            optimize=True,
+            progressive=True,
+        )
+    else:
+        image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+def render_renditions(source_bytes, source_name):
+    """Generate and store every rendition of an image
+
+    Returns:
+        The renditions dict stored on ReportFigure.renditions
+    """
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(source_bytes))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if has_alpha(image) else "RGB")
+    fallback_format, fallback_ext = (
+        ("PNG", "png") if has_alpha(image) else ("JPEG", "jpg")
+    )
+
+    source_digest = hashlib.sha256(source_bytes).hexdigest()
+    stem = posixpath.splitext(posixpath.basename(source_name))[0]
+    renditions = {"source": source_name, "version": RENDITIONS_VERSION}
+
+    previous_name = previous_width = None
+    for name, max_width in RENDITION_WIDTHS.items():
+        width = min(max_width, image.width)
+        if width == previous_width:
+            # Source narrower than this rendition: reuse the smaller one
+            renditions[name] = renditions[previous_name]
+            continue
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+
+        rendition = {"width": width, "height": height}
+        for key, image_format, ext in (
+            ("webp", "WEBP", "webp"),
+            ("fallback", fallback_format, fallback_ext),
+        ):
+            spec = f"{source_digest}:{RENDITIONS_VERSION}:{width}:{image_format}"
+            digest = hashlib.sha256(spec.encode()).hexdigest()[:HASH_LENGTH]
+            path = f"{RENDITIONS_DIR}/{stem}.{name}.{digest}.{ext}"
+            if not default_storage.exists(path):
+                path = default_storage.save(
+                    path, ContentFile(encode(resized, image_format))
+                )
+            rendition[key] = path
+        renditions[name] = rendition
+        previous_name, previous_width = name, width
+
+    return renditions
+
+
+def is_current(figure):
+    """Whether the stored renditions belong to the figure's current image"""
+    renditions = figure.renditions or {}
+    return (
+        bool(figure.image)
+        and renditions.get("source") == figure.image.name
+        and renditions.get("version") == RENDITIONS_VERSION
+    )
+
+
+def get_rendition(figure, name):
+    """Stored rendition of the figure's current image, or None"""
+    if not is_current(figure):
+        return None
+    return figure.renditions.get(name)
+
+
+def rendition_candidates(figure, largest="print"):
+    """Current renditions up to ``largest``, smallest first, without duplicates"""
+    if not is_current(figure):
+        return []
+    candidates = []
+    for name in RENDITION_WIDTHS:
+        rendition = figure.renditions.get(name)
+        if rendition and rendition not in candidates:
+            candidates.append(rendition)
+        if name == largest:
+            break
+    return candidates
+
+
+def rendition_url(figure, name, key="fallback"):
+    """URL of a rendition, falling back to the original image"""
+    rendition = get_rendition(figure, name)
+    if rendition:
+        return default_storage.url(rendition[key])
+    return figure.image.url if figure.image else ""
+
+
+def generate_for_figure(figure_id):
+    """Render and record the renditions of one figure's current image"""
+    from ..models import ReportFigure
+
+    figure = ReportFigure.objects.filter(pk=figure_id).first()
+    if figure is None or not figure.image or is_current(figure):
+        return None
+
+    source_name = figure.image.name
+    with figure.image.open("rb") as f:
+        source_bytes = f.read()
+    renditions = render_renditions(source_bytes, source_name)
+
+    # Only record them if the image was not replaced in the meantime; update()
+    # skips save() so updated_at and the save signals stay untouched
+    ReportFigure.objects.filter(pk=figure_id, image=source_name).update(
+        renditions=renditions
+    )
+    return renditions
+
+
+class RenditionWorker:
+    """Single background thread rendering figure images"""
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, figure_id):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="figure-renditions"
+                )
+        # Render in the submitting municipality (see apps.core.tenancy)
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, self._run, figure_id)
+
+    @staticmethod
+    def _run(figure_id):
+        try:
+            return generate_for_figure(figure_id)
+        except Exception:
+            logger.exception("Rendering figure %s failed", figure_id)
+        finally:
+            # The worker thread has its own connection; do not leak it
+            connections.close_all()
+
+
+worker = RenditionWorker()
+
+
+def schedule_renditions(figure):
+    """Render a figure's renditions once the current transaction commits
+
+    Runs in the background worker unless REPORT_FIGURE_RENDITIONS_ASYNC is
+    off, in which case the saving thread renders them right after the commit.
+    """
+    if not figure.image or is_current(figure):
+        return
+    figure_id = figure.pk
+    using = figure._state.db
+    if getattr(settings, "REPORT_FIGURE_RENDITIONS_ASYNC", True):
+        transaction.on_commit(lambda: worker.submit(figure_id), using=using)
+    else:
+        transaction.on_commit(lambda: generate_for_figure(figure_id), using=using)
@@ -0,0 +1,267 @@
+"""
+Processor scheduler
+
+Runs report processors concurrently on a thread pool. Processors spend most
+of their time waiting on the database and on Inkscape, so independent
+processors of all domains can overlap.
+
+A processor may declare the processors it needs to run after with a
+``depends_on`` class attribute: ``"category"`` refers to a processor of the
+same domain, ``"domain.category"`` to one of another domain. Dependencies
+that are not part of the run are ignored.
+
+Every processor runs isolated: an exception or a timeout produces a fallback
+result instead of failing the whole report, and processors depending on it
+fall back as well. Results are always returned in registration order, which
+is the order the templates expect.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+logger = logging.getLogger("gadhawa_report.scheduler")
+
+DEFAULT_WORKERS = 4
+DEFAULT_TIMEOUT = 120
+
+
+def fallback_result(category, error=None):
+    """Empty processor result rendered in place of a failed processor"""
+    return {
+        "data": {},
+        "municipality_data": {},
+        "ward_data": {},
+        "total_population": 0,
+        "report_content": f"Error processing {category} data",
+        "charts": {},
+        "pdf_charts": {},
+        "error": error,
+    }
+
+
+class ProcessorTask:
+    """A single processor call scheduled by ProcessorScheduler"""
+
+    def __init__(self, domain, category, processor):
+        self.domain = domain
+        self.category = category
+        self.processor = processor
+        self.key = f"{domain}.{category}"
+
+    def get_dependency_keys(self):
+        keys = []
+        for dependency in getattr(self.processor, "depends_on", ()) or ():
+            if "." not in dependency:
+                dependency = f"{self.domain}.{dependency}"
+            keys.append(dependency)
+        return keys
+
+
+class ProcessorScheduler:
+    """Dependency-aware concurrent runner for processor registries"""
+
+    def __init__(self, max_workers=None, timeout=None):
+        """
+        Args:
+            max_workers: Worker threads; 1 runs every processor inline in the
+                calling thread (default: settings.REPORT_PROCESSOR_WORKERS)
+            timeout: Seconds a single processor may run before its fallback
+                result is used (default: settings.REPORT_PROCESSOR_TIMEOUT)
+        """
+        if max_workers is None:
+            max_workers = getattr(
+                settings, "REPORT_PROCESSOR_WORKERS", DEFAULT_WORKERS
+            )
+        if timeout is None:
+            timeout = getattr(settings, "REPORT_PROCESSOR_TIMEOUT", DEFAULT_TIMEOUT)
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.tasks = {}
+
+    @classmethod
+    def for_managers(cls, managers, **kwargs):
+        """Build a scheduler for {domain: manager} in the given order"""
+        scheduler = cls(**kwargs)
+        for domain, manager in managers.items():
+            scheduler.add(domain, manager.processors)
+        return scheduler
+
+    def add(self, domain, processors):
+        """Register a {category: processor} registry under a domain"""
+        for category, processor in processors.items():
+            task = ProcessorTask(domain, category, processor)
+            self.tasks[task.key] = task
+        return self
+
+    def get_dependencies(self):
+        """Return {key: set of dependency keys} and reject cycles"""
+        dependencies = {
+            key: {dep for dep in task.get_dependency_keys() if dep in self.tasks}
+            for key, task in self.tasks.items()
+        }
+
+        resolved = set()
+        remaining = dict(dependencies)
+        while remaining:
+            ready = [key for key, deps in remaining.items() if deps <= resolved]
+            if not ready:
+                raise ImproperlyConfigured(
+                    "Circular processor dependencies: " + ", ".join(sorted(remaining))
+                )
+            for key in ready:
+                resolved.add(key)
+                del remaining[key]
+        return dependencies
+
+    def run(self, method="process_for_pdf"):
+        """Call ``method`` on every processor and return {domain: {category: result}}"""
+        dependencies = self.get_dependencies()
+        if self.max_workers == 1:
+            results = self._run_inline(dependencies, method)
+        else:
+            results = self._run_concurrent(dependencies, method)
+
+        grouped = {}
+        for key, task in self.tasks.items():
+            grouped.setdefault(task.domain, {})[task.category] = results[key]
+        return grouped
+
+    def _ready_keys(self, dependencies, done, started):
+        return [
+            key
+            for key, deps in dependencies.items()
+            if key not in started and deps <= done
+        ]
+
+    def _fail_dependents(self, dependencies, results, failed):
+        """Give every task that (indirectly) depends on a failure its fallback"""
+        changed = True
+        while changed:
+            changed = False
+            for key, deps in dependencies.items():
+                if key in results or not deps & failed:
+                    continue
+                task = self.tasks[key]
+                error = f"Dependency failed: {', '.join(sorted(deps & failed))}"
+                logger.warning("Skipping processor %s: %s", key, error)
+                results[key] = fallback_result(task.category, error)
+                failed.add(key)
+                changed = True
+
+    def _call(self, task, method):
+        try:
+            return getattr(task.processor, method)(), None
+        except Exception as e:
+            logger.exception("Error running processor %s.%s", task.key, method)
+            return fallback_result(task.category, f"{type(e).__name__}: {e}"), e
+
+    def _run_inline(self, dependencies, method):
+        results = {}
+        failed = set()
+        done = set()
+        while len(results) < len(self.tasks):
+            for key in self._ready_keys(dependencies, done, set(results)):
+                results[key], error = self._call(self.tasks[key], method)
+                done.add(key)
+                if error is not None:
+                    failed.add(key)
+                    self._fail_dependents(dependencies, results, failed)
+                    done.update(failed)
+        return results
+
+    def _run_in_worker(self, task, method, started_at):
+        started_at[task.key] = time.monotonic()
+        try:
+            return self._call(task, method)
+        finally:
+            # Worker threads open their own connections; don't leak them
+            connections.close_all()
+
+    def _run_concurrent(self, dependencies, method):
+        results = {}
+        failed = set()
+        done = set()
+        started_at = {}
+        running = {}
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="report-processor"
+        )
+        try:
+            while len(results) < len(self.tasks):
+                scheduled = set(results) | set(running.values())
+                for key in self._ready_keys(dependencies, done, scheduled):
+                    # Each task gets a copy of the caller's context so build
+                    # profiling stages are recorded against the active profile
+                    context = contextvars.copy_context()
+                    future = executor.submit(
+                        context.run,
+                        self._run_in_worker,
+                        self.tasks[key],
+                        method,
+                        started_at,
+                    )
+                    running[future] = key
+
+                if not running:
+                    break
+
+                finished, _ = wait(
+                    running,
+                    timeout=self._next_deadline(running, started_at),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in finished:
+                    key = running.pop(future)
+                    results[key], error = future.result()
+                    done.add(key)
+                    if error is not None:
+                        failed.add(key)
+
+                for future, key in list(running.items()):
+                    if self._timed_out(key, started_at):
+                        # The thread cannot be interrupted; abandon its result
+                        del running[future]
+                        future.cancel()
+                        error = f"Timed out after {self.timeout}s"
+                        logger.error("Processor %s: %s", key, error)
+                        results[key] = fallback_result(self.tasks[key].category, error)
+                        failed.add(key)
+
+                self._fail_dependents(dependencies, results, failed)
+                done.update(failed)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def _timed_out(self, key, started_at):
+        if not self.timeout or key not in started_at:
+            return False
+        return time.monotonic() - started_at[key] >= self.timeout
+
+    def _next_deadline(self, running, started_at):
+        """Seconds until the earliest running processor times out"""
+        if not self.timeout:
+            return None
+        now = time.monotonic()
+        remaining = [
+            started_at[key] + self.timeout - now
+            for key in running.values()
+            if key in started_at
+        ]
+        if len(remaining) < len(running):
+            # Some tasks are still queued; re-check once they have started
+            remaining.append(min(self.timeout, 1.0))
+        return max(0.0, min(remaining))
+
+
+def run_processors(domain, processors, method="process_for_pdf", **kwargs):
+    """Run one {category: processor} registry and return {category: result}"""
+    scheduler = ProcessorScheduler(**kwargs).add(domain, processors)
+    return scheduler.run(method).get(domain, {})
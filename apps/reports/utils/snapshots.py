@@ -0,0 +1,367 @@
+"""
+Report data snapshots
+
+A snapshot freezes the ``process_for_pdf()`` results of every registered
+processor, together with the publication settings, when a report version is
+published. The sidebar navigation (active categories and their sections) is
+frozen with them. Reports can later be rendered from it instead of the live
+tables (``?snapshot=<version>`` on the full report views), without running
+any processor or query, and two snapshots can be compared indicator by
+indicator (``diff_report_snapshots``).
+
+Snapshots are files in ``REPORT_SNAPSHOT_DIR`` named after the municipality
+and ``PublicationSettings.version``::
+
+    GRSNAP | format version (2 bytes) | zlib(pickle(payload))
+
+Results are reduced to plain data before pickling (model instances to
+dicts, querysets to lists, lazy translations to strings), and loading only
+accepts those types, so a snapshot file cannot run code when read.
+
+Charts are kept by name: a snapshot renders with the chart files present
+when it is rendered.
+"""
+
+import datetime
+import decimal
+import hashlib
+import io
+import numbers
+import pickle
+import re
+import struct
+import zlib
+from collections.abc import Hashable
+from pathlib import Path
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.functional import Promise
+
+from apps.chart_management.manifest import publish_charts
+from apps.core.singleflight import atomic_write
+from apps.core.tenancy import get_current_municipality
+
+from .lazy_context import processor_charts
+from .managers import get_domains, get_manager
+from .profiles import FULL_REPORT_DOMAINS
+from .profiling import stage
+from .scheduler import ProcessorScheduler
+
+SNAPSHOT_MAGIC = b"GRSNAP"
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+
+_HEADER = struct.Struct(f">{len(SNAPSHOT_MAGIC)}sH")
+
+# Globals a snapshot may reference besides builtin containers
+ALLOWED_GLOBALS = {
+    ("datetime", "date"),
+    ("datetime", "datetime"),
+    ("datetime", "time"),
+    ("datetime", "timedelta"),
+    ("datetime", "timezone"),
+    ("decimal", "Decimal"),
+}
+
+_SCALARS = (decimal.Decimal, datetime.date, datetime.time, datetime.timedelta)
+
+
+class SnapshotError(Exception):
+    """Unreadable or unavailable snapshot"""
+
+
+def get_snapshot_dir():
+    snapshot_dir = getattr(settings, "REPORT_SNAPSHOT_DIR", None)
+    if snapshot_dir:
+        return Path(snapshot_dir)
+    return Path(settings.MEDIA_ROOT) / "reports" / "snapshots"
+
+
+def snapshot_path(version, code=None):
+    """Snapshot file of a publication version of a municipality"""
+    code = code or get_current_municipality().code
+    name = re.sub(r"[^0-9A-Za-z._-]", "_", str(version))
+    return get_snapshot_dir() / f"{code}_{name}{SNAPSHOT_SUFFIX}"
+
+
+def freeze(value):
+    """Plain-data copy of a processor result
+
+    Keeps dicts, lists, tuples, numbers, strings, decimals and dates; model
+    instances and named tuples become dicts, querysets and sets lists, NumPy
+    values Python numbers and anything else its string.
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, dict):
+        return {_freeze_key(key): freeze(item) for key, item in value.items()}
+    if hasattr(value, "_asdict"):
+        return freeze(value._asdict())
+    if type(value) is tuple:
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return [freeze(item) for item in sorted(value, key=str)]
+    if isinstance(value, (list, tuple)):
+        return [freeze(item) for item in value]
+    if isinstance(value, models.Model):
+        return {
+            field.attname: freeze(getattr(value, field.attname))
+            for field in value._meta.concrete_fields
+        }
+    if isinstance(value, models.QuerySet):
+        return [freeze(item) for item in value]
+    # Plain str / int: subclasses such as model choices need their class
+    if isinstance(value, (str, Promise)):
+        return str(value)
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, _SCALARS):
+        return value
+    if hasattr(value, "tolist"):
+        # NumPy arrays
+        return freeze(value.tolist())
+    return str(value)
+
+
+def freeze_navigation(categories):
+    """Plain-data copy of the sidebar categories and their sections
+
+    Sections are kept under ``"all"`` so templates read them as
+    ``category.sections.all``, like the model relation.
+    """
+    return [
+        {
+            "slug": category.slug,
+            "name": category.name,
+            "name_nepali": category.name_nepali,
+            "sections": {
+                "all": [
+                    {
+                        "slug": section.slug,
+                        "title": section.title,
+                        "title_nepali": section.title_nepali,
+                    }
+                    for section in category.sections.all()
+                ]
+            },
+        }
+        for category in categories
+    ]
+
+
+def _freeze_key(key):
+    frozen = freeze(key)
+    return frozen if isinstance(frozen, Hashable) else str(key)
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if (module, name) not in ALLOWED_GLOBALS:
+            raise pickle.UnpicklingError(f"{module}.{name} is not snapshot data")
+        return super().find_class(module, name)
+
+
+class ReportSnapshot:
+    """Frozen processor results of one publication version"""
+
+    def __init__(
+        self,
+        municipality,
+        version,
+        results,
+        publication=None,
+        created_at=None,
+        navigation=None,
+    ):
+        """
+        Args:
+            municipality: Municipality code
+            version: Publication version
+            results: {domain: {category: process_for_pdf() result}}
+            publication: PublicationSettings fields
+            created_at: When the data was read
+            navigation: freeze_navigation() of the sidebar categories, None
+                if the snapshot predates it (the live navigation is used)
+        """
+        self.municipality = municipality
+        self.version = str(version)
+        self.results = results
+        self.publication = publication or {}
+        self.created_at = created_at or timezone.now()
+        self.navigation = navigation
+
+    @classmethod
+    def take(cls, version=None, domains=None):
+        """Snapshot of the active municipality's processors
+
+        Args:
+            version: Publication version (default: PublicationSettings.version)
+            domains: Domains to include (default: every registered domain)
+        """
+        from ..models import PublicationSettings, ReportCategory
+
+        publication = PublicationSettings.objects.first()
+        categories = (
+            ReportCategory.objects.filter(is_active=True)
+            .prefetch_related("sections")
+            .order_by("order")
+        )
+        if version is None:
+            version = publication.version if publication else "1.0"
+
+        scheduler = ProcessorScheduler.for_managers(
+            {domain: get_manager(domain) for domain in domains or get_domains()}
+        )
+        with stage("process_all_for_pdf"):
+            results = scheduler.run("process_for_pdf")
+        with stage("chart_publish"):
+            publish_charts()
+
+        return cls(
+            get_current_municipality().code,
+            version,
+            freeze(results),
+            freeze(publication) if publication else None,
+            navigation=freeze_navigation(categories),
+        )
+
+    def dumps(self):
+        payload = {
+            "municipality": self.municipality,
+            "version": self.version,
+            "created_at": self.created_at,
+            "publication": self.publication,
+            "results": self.results,
+            "navigation": self.navigation,
+        }
+        body = zlib.compress(pickle.dumps(payload, protocol=5), 9)
+        return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT) + body
+
+    @classmethod
+    def loads(cls, data):
+        try:
+            magic, file_format = _HEADER.unpack_from(data)
+        except struct.error:
+            raise SnapshotError("Not a report snapshot") from None
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("Not a report snapshot")
+        if file_format != SNAPSHOT_FORMAT:
+            raise SnapshotError(f"Unsupported snapshot format {file_format}")
+        try:
+            body = zlib.decompress(data[_HEADER.size :])
+            payload = _SnapshotUnpickler(io.BytesIO(body)).load()
+        except (zlib.error, pickle.UnpicklingError, EOFError) as e:
+            raise SnapshotError(f"Corrupt snapshot: {e}") from e
+        return cls(
+            payload["municipality"],
+            payload["version"],
+            payload["results"],
+            payload["publication"],
+            payload["created_at"],
+            payload.get("navigation"),
+        )
+
+    @property
+    def path(self):
+        return snapshot_path(self.version, self.municipality)
+
+    def save(self, path=None):
+        path = Path(path or self.path)
+        data = self.dumps()
+        with atomic_write(path, "wb") as f:
+            f.write(data)
+        return path
+
+    @classmethod
+    def load(cls, version, code=None):
+        """Snapshot of a publication version of the active municipality"""
+        path = snapshot_path(version, code)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            raise SnapshotError(f"No snapshot of version {version}") from None
+        return cls.loads(data)
+
+    def fingerprint(self):
+        """Identifies the snapshot: retaking a version changes created_at"""
+        key = f"{self.municipality}|{self.version}|{self.created_at.isoformat()}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+    def build_context(self, domains=FULL_REPORT_DOMAINS):
+        """Full report template context of the snapshot (no queries)
+
+        Matches ``profiles.build_full_report_context()``; the report is dated
+        when the snapshot was taken.
+        """
+        municipality = get_current_municipality()
+        context = {
+            "municipality_name": municipality.name,
+            "municipality_name_english": municipality.name_english,
+            "publication_settings": self.publication or None,
+            "generated_date": self.created_at,
+            "report_snapshot": self,
+        }
+        pdf_charts = {}
+        for domain in FULL_REPORT_DOMAINS:
+            data = self.results.get(domain, {}) if domain in domains else {}
+            context[f"all_{domain}_data"] = data
+            for category, result in data.items():
+                pdf_charts.update(processor_charts(f"{domain}.{category}", result))
+        context["pdf_charts"] = pdf_charts
+        return context
+
+    def indicators(self):
+        """{"domain.category": {path: number}} of every numeric value"""
+        return {
+            f"{domain}.{category}": dict(_numeric_leaves(result))
+            for domain, categories in self.results.items()
+            for category, result in categories.items()
+        }
+
+    def __repr__(self):
+        return f"<ReportSnapshot {self.municipality} {self.version}>"
+
+
+def _numeric_leaves(value, path=""):
+    if isinstance(value, bool):
+        return
+    if isinstance(value, (int, float, decimal.Decimal)):
+        yield path, value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _numeric_leaves(item, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, (list, tuple)):
+        for index, item in enumerate(value):
+            yield from _numeric_leaves(item, f"{path}.{index}" if path else str(index))
+
+
+def diff_snapshots(old, new):
+    """Indicators that differ between two snapshots
+
+    Returns:
+        {"domain.category": [(path, old value, new value)]} of the changed
+        sections, in ``new``'s order; missing values are None
+    """
+    old_indicators = old.indicators()
+    new_indicators = new.indicators()
+    sections = list(new_indicators) + [
+        section for section in old_indicators if section not in new_indicators
+    ]
+
+    changes = {}
+    for section in sections:
+        before = old_indicators.get(section, {})
+        after = new_indicators.get(section, {})
+        paths = list(after) + [path for path in before if path not in after]
+        changed = [
+            (path, before.get(path), after.get(path))
+            for path in paths
+            if before.get(path) != after.get(path)
+        ]
+        if changed:
+            changes[section] = changed
+    return changes
@@ -0,0 +1,208 @@
+"""
+Synthetic profile data generator
+
+Fills the ward-wise and municipality-wide data models with reproducible
+synthetic rows for benchmarks. Rows are derived from each model's fields:
+ward numbers, census years and choice fields form a cartesian product (which
+also satisfies the models' ``unique_together`` constraints), and the remaining
+fields get random values of the right type.
+"""
+
+import datetime
+import itertools
+import random
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import models, transaction
+
+# Apps whose models hold profile data
+DATA_APPS = [
+    "demographics",
+    "municipality_introduction",
+    "economics",
+    "social",
+    "environment",
+    "infrastructure",
+    "governance",
+]
+
+WARD_FIELD = "ward_number"
+YEAR_FIELDS = ("year", "fiscal_year")
+LATEST_YEAR = 2081
+
+
+class SyntheticDataGenerator:
+    """Generates synthetic rows for every profile data model"""
+
+    def __init__(
+        self,
+        wards=8,
+        categories=None,
+        years=2,
+        seed=42,
+        max_rows_per_model=50000,
+        batch_size=1000,
+    ):
+        """
+        Args:
+            wards: Number of wards to generate (1..wards)
+            categories: Values per choice field; None uses every defined choice,
+                larger values add synthetic codes beyond the defined choices
+            years: Number of census years for time-series models
+            seed: Random seed so runs are reproducible
+            max_rows_per_model: Safety cap on the cartesian product
+            batch_size: bulk_create batch size
+        """
+        self.wards = wards
+        self.categories = categories
+        self.years = years
+        self.random = random.Random(seed)
+        self.max_rows_per_model = max_rows_per_model
+        self.batch_size = batch_size
+        self._related_pks = {}
+
+    def get_models(self, app_labels=None):
+        """Return data models ordered so foreign key targets come first"""
+        candidates = []
+        for app_label in app_labels or DATA_APPS:
+            try:
+                app_config = apps.get_app_config(app_label)
+            except LookupError:
+                continue
+            candidates.extend(
+                model
+                for model in app_config.get_models()
+                if not model._meta.abstract and not model._meta.proxy
+            )
+
+        ordered = []
+        remaining = list(candidates)
+        while remaining:
+            progressed = False
+            for model in list(remaining):
+                targets = {
+                    field.related_model
+                    for field in model._meta.concrete_fields
+                    if field.is_relation and field.related_model in candidates
+                }
+                targets.discard(model)
+                if targets.issubset(ordered):
+                    ordered.append(model)
+                    remaining.remove(model)
+                    progressed = True
+            if not progressed:
+                # Circular references - keep declaration order for the rest
+                ordered.extend(remaining)
+                break
+        return ordered
+
+    def generate(self, app_labels=None, clear=True):
+        """Generate rows for all data models and return {model_label: count}"""
+        counts = {}
+        with transaction.atomic():
+            for model in self.get_models(app_labels):
+                if clear:
+                    model.objects.all().delete()
+                self._related_pks.pop(model, None)
+                counts[model._meta.label] = self.generate_for_model(model)
+        return counts
+
+    def generate_for_model(self, model):
+        """Generate and bulk insert rows for a single model"""
+        axes = self._get_axes(model)
+        names = [name for name, _ in axes]
+        combinations = itertools.product(*[values for _, values in axes])
+
+        objects = []
+        for index, combination in enumerate(combinations):
+            if index >= self.max_rows_per_model:
+                break
+            values = dict(zip(names, combination))
+            for field in model._meta.concrete_fields:
+                if field.attname in values or field.primary_key:
+                    continue
+                value = self._value_for_field(model, field, index)
+                if value is not None or field.null:
+                    values[field.attname] = value
+            objects.append(model(**values))
+
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        return len(objects)
+
+    def _get_axes(self, model):
+        """Fields enumerated exhaustively: ward, year, choice and unique fields"""
+        unique_fields = {
+            name for group in model._meta.unique_together for name in group
+        }
+        axes = []
+        for field in model._meta.concrete_fields:
+            # With a unique constraint only its fields may be enumerated,
+            # otherwise repeated combinations would violate it
+            if unique_fields and field.name not in unique_fields:
+                continue
+            if field.is_relation:
+                axes.append((field.attname, self._get_related_pks(field)))
+            elif field.name == WARD_FIELD:
+                axes.append((field.name, list(range(1, self.wards + 1))))
+            elif field.name in YEAR_FIELDS and isinstance(
+                field, (models.IntegerField, models.CharField)
+            ):
+                years = list(range(LATEST_YEAR - self.years + 1, LATEST_YEAR + 1))
+                if isinstance(field, models.CharField):
+                    years = [str(year) for year in years]
+                axes.append((field.name, years))
+            elif field.choices:
+                axes.append((field.name, self._choice_values(field)))
+        return axes
+
+    def _choice_values(self, field):
+        values = [value for value, _ in field.flatchoices]
+        if self.categories is None:
+            return values
+        if self.categories <= len(values):
+            return values[: self.categories]
+        extra = self.categories - len(values)
+        max_length = getattr(field, "max_length", None) or 20
+        return values + [f"SYN_{i}"[:max_length] for i in range(extra)]
+
+    def _get_related_pks(self, field):
+        related_model = field.related_model
+        if related_model not in self._related_pks:
+            self._related_pks[related_model] = list(
+                related_model.objects.values_list("pk", flat=True)
+            )
+        return self._related_pks[related_model]
+
+    def _value_for_field(self, model, field, index):
+        """Random value matching the field type"""
+        if field.is_relation:
+            pks = self._get_related_pks(field)
+            return self.random.choice(pks) if pks else None
+        if field.choices:
+            return self.random.choice(self._choice_values(field))
+        if isinstance(field, models.DateTimeField):
+            if field.auto_now or field.auto_now_add:
+                return None
+            return datetime.datetime.now(datetime.timezone.utc)
+        if isinstance(field, models.DateField):
+            return datetime.date.today()
+        if isinstance(field, models.BooleanField):
+            return self.random.random() < 0.5
+        if isinstance(field, models.DecimalField):
+            limit = min(10 ** (field.max_digits - field.decimal_places) - 1, 100)
+            value = round(self.random.uniform(0, limit), field.decimal_places)
+            return Decimal(str(value))
+        if isinstance(field, models.FloatField):
+            return round(self.random.uniform(0, 100), 2)
+        if isinstance(field, models.IntegerField):
+            return self.random.randint(0, 1000)
+        if isinstance(field, models.JSONField):
+            return field.get_default()
+        if isinstance(field, (models.CharField, models.TextField)):
+            text = f"{model.__name__} {index}"
+            max_length = getattr(field, "max_length", None)
+            return text[-max_length:] if max_length else text
+        if field.has_default():
+            return field.get_default()
+        return None
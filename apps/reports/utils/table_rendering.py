@@ -0,0 +1,173 @@
+"""
+Report table rendering
+
+Compiles ``ReportTable.data`` into finished ``<thead>``/``<tbody>`` HTML so
+templates emit a stored fragment instead of looping over rows and filtering
+every cell. Numbers get Nepali digits and Nepali (lakh) digit grouping in a
+single pass over the table.
+
+Table data may be:
+    [["Header", ...], [cell, ...], ...]           first row is the header
+    {"headers": [...], "rows": [[...], ...]}
+    [{"Header": cell, ...}, ...]                  keys of the first row
+"""
+
+from decimal import Decimal
+
+from django.utils.html import escape
+
+from .nepali_numbers import NEPALI_DIGITS_TABLE
+
+# Bump to re-render tables whose stored HTML was built by an older renderer
+RENDERER_VERSION = 1
+
+WEB = "web"
+PDF = "pdf"
+VARIANTS = (WEB, PDF)
+
+# Markup per variant: header row, header cell, text cell, numeric cell.
+# Web numeric cells keep the raw value in data-value for client-side sorting.
+VARIANT_MARKUP = {
+    WEB: {
+        "thead": '<thead class="table-dark">',
+        "th": '<th scope="col">',
+        "td": "<td>",
+        "td_number": '<td class="text-end" data-value="{value}">',
+    },
+    PDF: {
+        "thead": "<thead>",
+        "th": '<th style="text-align: center;">',
+        "td": '<td style="text-align: left;">',
+        "td_number": '<td style="text-align: right;">',
+    },
+}
+
+
+def normalize_table_data(data):
+    """Return (headers, rows) for any supported table data layout"""
+    if not data:
+        return [], []
+    if isinstance(data, dict):
+        return list(data.get("headers") or []), [
+            list(row) for row in data.get("rows") or []
+        ]
+    if isinstance(data, list):
+        if all(isinstance(row, dict) for row in data):
+            headers = list(data[0])
+            return headers, [[row.get(header) for header in headers] for row in data]
+        rows = [row if isinstance(row, (list, tuple)) else [row] for row in data]
+        return list(rows[0]), [list(row) for row in rows[1:]]
+    return [], [[data]]
+
+
+def group_digits(integer_part):
+    """Nepali digit grouping: 1234567 -> 12,34,567"""
+    sign = "-" if integer_part.startswith("-") else ""
+    digits = integer_part.lstrip("-")
+    if len(digits) <= 3:
+        return sign + digits
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return sign + ",".join(groups + [tail])
+
+
+def format_number(value):
+    """Group an int/float/Decimal; whole floats lose their decimal part"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value)
+    if "e" in text.lower():
+        text = f"{value:f}"
+    integer_part, dot, fraction = text.partition(".")
+    return group_digits(integer_part) + dot + fraction
+
+
+def format_cell(value):
+    """(HTML text, raw number or None) of one cell, digits still ASCII"""
+    if value is None:
+        return "", None
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return format_number(value), value
+    # NUL separates cells during digit conversion and is not valid HTML anyway
+    return escape(str(value).replace("\x00", "")), None
+
+
+def render_table_html(data, variant=WEB, max_rows=None):
+    """Compile table data into a thead/tbody HTML fragment
+
+    Digits of the whole fragment's cell text are converted to Nepali at once;
+    markup is added afterwards so attribute values keep ASCII digits.
+    """
+    markup = VARIANT_MARKUP[variant]
+    headers, rows = normalize_table_data(data)
+    if max_rows is not None:
+        rows = rows[:max_rows]
+
+    header_cells = [format_cell(header)[0] for header in headers]
+    body_cells = [[format_cell(cell) for cell in row] for row in rows]
+
+    # One translate() call over all cell texts joined by NUL
+    texts = header_cells + [text for row in body_cells for text, _ in row]
+    translated = "\x00".join(texts).translate(NEPALI_DIGITS_TABLE).split("\x00")
+    header_texts = translated[: len(header_cells)]
+    body_texts = iter(translated[len(header_cells) :])
+
+    parts = []
+    if header_texts:
+        parts.append(markup["thead"])
+        parts.append("<tr>")
+        parts.extend(f"{markup['th']}{text}</th>" for text in header_texts)
+        parts.append("</tr></thead>")
+    parts.append("<tbody>")
+    for row in body_cells:
+        parts.append("<tr>")
+        for _, number in row:
+            if number is None:
+                cell = markup["td"]
+            else:
+                cell = markup["td_number"].format(value=number)
+            parts.append(f"{cell}{next(body_texts)}</td>")
+        parts.append("</tr>")
+    parts.append("</tbody>")
+    return "".join(parts)
+
+
+def render_table_variants(data):
+    """{variant: HTML} for every variant"""
+    return {variant: render_table_html(data, variant) for variant in VARIANTS}
+
+
+def render_stale_tables(rerender_all=False, batch_size=200):
+    """Store the HTML of tables rendered by an older renderer (or every table)
+
+    Returns:
+        Number of tables rendered
+    """
+    from ..models import ReportTable
+
+    tables = ReportTable.objects.all()
+    if not rerender_all:
+        tables = tables.exclude(html_version=RENDERER_VERSION)
+
+    batch = []
+    rendered = 0
+    for table in tables.iterator(chunk_size=batch_size):
+        table.render_html()
+        batch.append(table)
+        if len(batch) >= batch_size:
+            rendered += _save_rendered(batch)
+            batch = []
+    return rendered + _save_rendered(batch)
+
+
+def _save_rendered(tables):
+    from ..models import ReportTable
+
+    # bulk_update leaves updated_at alone: the table data did not change
+    ReportTable.objects.bulk_update(tables, ["html_web", "html_pdf", "html_version"])
+    return len(tables)
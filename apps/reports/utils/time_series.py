@@ -0,0 +1,235 @@
+"""
+Ward time series
+
+Multi-year ward data loaded once into a (year, ward, metric) NumPy array.
+Growth rates, compound annual growth, year-over-year deltas, rankings and
+ratios are computed for all wards and years in single array operations, so
+adding census years or wards does not add Python-level loops.
+
+Missing (year, ward) combinations and NULL values are NaN and are ignored by
+totals, rankings and growth calculations.
+"""
+
+import numpy as np
+
+
+def percent_change(values, axis=0):
+    """Percentage change between consecutive entries along ``axis``
+
+    Entries whose previous value is missing or not positive are NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    previous = np.take(values, np.arange(values.shape[axis] - 1), axis=axis)
+    current = np.take(values, np.arange(1, values.shape[axis]), axis=axis)
+    return safe_divide(current - previous, previous, scale=100.0, fill=np.nan)
+
+
+def safe_divide(numerator, denominator, scale=1.0, fill=0.0):
+    """Element-wise ``numerator / denominator * scale``
+
+    Entries with a missing or non-positive denominator get ``fill``.
+    """
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    valid = np.isfinite(denominator) & (denominator > 0)
+    result = np.full(np.broadcast(numerator, denominator).shape, fill, dtype=float)
+    np.divide(numerator * scale, denominator, out=result, where=valid)
+    return result
+
+
+def rank(values, descending=True, axis=-1):
+    """1-based ranks along ``axis``; missing values rank last"""
+    values = np.asarray(values, dtype=float)
+    missing = -np.inf if descending else np.inf
+    keys = np.where(np.isnan(values), missing, values)
+    order = np.argsort(-keys if descending else keys, axis=axis, kind="stable")
+    ranks = np.empty(values.shape, dtype=int)
+    positions = np.broadcast_to(
+        np.expand_dims(
+            np.arange(1, values.shape[axis] + 1),
+            tuple(i for i in range(values.ndim) if i != axis % values.ndim),
+        ),
+        values.shape,
+    )
+    np.put_along_axis(ranks, order, positions, axis=axis)
+    return ranks
+
+
+def to_python(values, digits=None):
+    """Array to nested lists of Python floats with NaN as None"""
+    values = np.asarray(values, dtype=float)
+    if digits is not None:
+        values = np.round(values, digits)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+class WardTimeSeries:
+    """Numeric ward data indexed by year, ward and metric"""
+
+    def __init__(self, years, wards, metrics, values):
+        """
+        Args:
+            years: Sorted years, length Y
+            wards: Sorted ward numbers, length W
+            metrics: Metric names, length M
+            values: Float array of shape (Y, W, M), NaN where missing
+        """
+        self.years = np.asarray(years)
+        self.wards = np.asarray(wards)
+        self.metrics = tuple(metrics)
+        self.values = np.asarray(values, dtype=float)
+        self._metric_index = {name: i for i, name in enumerate(self.metrics)}
+        # (Y, W) mask of the (year, ward) pairs that have a source row
+        self.observed = ~np.all(np.isnan(self.values), axis=2)
+        # Position of every source row in the cube, set by from_rows()
+        self.row_years = np.empty(0, dtype=int)
+        self.row_wards = np.empty(0, dtype=int)
+
+    @classmethod
+    def from_rows(cls, rows, metrics):
+        """Build from ``(year, ward_number, *metric values)`` rows
+
+        Later rows win when a (year, ward) pair occurs more than once.
+        """
+        rows = np.array(list(rows), dtype=float).reshape(-1, 2 + len(metrics))
+        years, row_years = np.unique(rows[:, 0], return_inverse=True)
+        wards, row_wards = np.unique(rows[:, 1], return_inverse=True)
+
+        values = np.full((len(years), len(wards), len(metrics)), np.nan)
+        values[row_years, row_wards] = rows[:, 2:]
+
+        series = cls(years.astype(int), wards.astype(int), metrics, values)
+        series.observed[:] = False
+        series.observed[row_years, row_wards] = True
+        series.row_years = row_years
+        series.row_wards = row_wards
+        return series
+
+    @classmethod
+    def from_queryset(
+        cls, queryset, metrics, year_field="year", ward_field="ward_number"
+    ):
+        """Build from a queryset with a single ``values_list()`` query"""
+        return cls.from_rows(
+            queryset.values_list(year_field, ward_field, *metrics), metrics
+        )
+
+    def __bool__(self):
+        return bool(self.values.size)
+
+    @property
+    def latest_year(self):
+        return int(self.years[-1]) if len(self.years) else None
+
+    def series(self, metric):
+        """(Y, W) array of one metric"""
+        return self.values[:, :, self._metric_index[metric]]
+
+    def at_year(self, metric, year=None):
+        """(W,) array of one metric in a year (default: latest)"""
+        series = self.series(metric)
+        if year is None:
+            return series[-1]
+        return series[int(np.searchsorted(self.years, year))]
+
+    def row_values(self, array):
+        """Values of a (Y, W) array for every source row, in row order"""
+        return np.asarray(array)[self.row_years, self.row_wards]
+
+    def totals(self, metric):
+        """(Y,) sum over wards; years without any value are NaN"""
+        series = self.series(metric)
+        totals = np.nansum(series, axis=1)
+        totals[np.all(np.isnan(series), axis=1)] = np.nan
+        return totals
+
+    def ratio(self, numerator, denominator, scale=1.0, fill=0.0):
+        """(Y, W) ratio of two metrics, e.g. sex ratio or density"""
+        return safe_divide(
+            self.series(numerator), self.series(denominator), scale, fill
+        )
+
+    def deltas(self, metric):
+        """(Y-1, W) change between consecutive years"""
+        return np.diff(self.series(metric), axis=0)
+
+    def growth_rates(self, metric):
+        """(Y-1, W) percentage change between consecutive years"""
+        return percent_change(self.series(metric), axis=0)
+
+    def total_growth_rates(self, metric):
+        """(Y-1,) percentage change of the ward total"""
+        return percent_change(self.totals(metric))
+
+    def cagr(self, metric):
+        """(W,) compound annual growth rate (%) from the first to the last year
+
+        Uses the first and last year each ward has a positive value for, and
+        the actual number of years between them.
+        """
+        series = self.series(metric)
+        valid = np.isfinite(series) & (series > 0)
+        year_count = len(self.years)
+
+        has_data = valid.any(axis=0)
+        first = np.argmax(valid, axis=0)
+        last = year_count - 1 - np.argmax(valid[::-1], axis=0)
+        columns = np.arange(series.shape[1])
+
+        periods = (self.years[last] - self.years[first]).astype(float)
+        ratio = safe_divide(series[last, columns], series[first, columns], fill=np.nan)
+        rate = np.full(series.shape[1], np.nan)
+        growing = has_data & (periods > 0)
+        rate[growing] = (np.power(ratio[growing], 1.0 / periods[growing]) - 1) * 100
+        return rate
+
+    def ranks(self, metric, year=None, descending=True):
+        """(W,) 1-based rank of every ward in a year; missing wards rank last"""
+        return rank(self.at_year(metric, year), descending)
+
+    def extremes(self, metric, year=None):
+        """Ward numbers with the highest and lowest value in a year
+
+        ``metric`` is a metric name or a (W,) array of values for the year.
+        """
+        if isinstance(metric, str):
+            values = self.at_year(metric, year)
+        else:
+            values = np.asarray(metric, dtype=float)
+        if np.all(np.isnan(values)):
+            return None, None
+        return (
+            int(self.wards[np.nanargmax(values)]),
+            int(self.wards[np.nanargmin(values)]),
+        )
+
+    def ward_trends(self, metric, digits=2):
+        """{ward: change, growth rate, CAGR and rank} for the latest year"""
+        if not self:
+            return {}
+        latest = self.at_year(metric)
+        if len(self.years) > 1:
+            change = self.deltas(metric)[-1]
+            growth = self.growth_rates(metric)[-1]
+        else:
+            change = growth = np.full(len(self.wards), np.nan)
+        cagr = self.cagr(metric)
+        ranks = self.ranks(metric)
+
+        return {
+            int(ward): {
+                "value": value,
+                "change": change_value,
+                "growth_rate": growth_value,
+                "cagr": cagr_value,
+                "rank": int(rank),
+            }
+            for ward, value, change_value, growth_value, cagr_value, rank in zip(
+                self.wards,
+                to_python(latest),
+                to_python(change),
+                to_python(growth, digits),
+                to_python(cagr, digits),
+                ranks,
+            )
+        }
@@ -0,0 +1,62 @@
+"""
+Report view models
+
+Display-ready rows built by processors in one pass over their data: numbers
+are converted to Nepali digits and percentages are computed up front, so
+template table loops print strings instead of resolving lookups and running
+``nepali_number``/``floatformat`` filters for every cell.
+
+Cells are formatted with ``format_nepali_number``, the function behind the
+report templates' ``nepali_number`` filter, so switching a table to a view
+model does not change its output.
+"""
+
+from .nepali_numbers import format_nepali_number
+
+
+def localize(value, digits=None):
+    """Display text of a cell with Nepali digits; ``digits`` fixes decimals"""
+    if isinstance(value, str):
+        return format_nepali_number(value) if value.isdigit() else value
+    return format_nepali_number(value, digits)
+
+
+def localize_row(values, digits=None):
+    """Tuple of localized cells
+
+    Args:
+        values: Cell values of one row
+        digits: Optional {column index: decimal places}
+    """
+    digits = digits or {}
+    return tuple(
+        localize(value, digits.get(index)) for index, value in enumerate(values)
+    )
+
+
+def percentage(part, whole, digits=1):
+    """``part`` as a rounded percentage of ``whole``; 0.0 for an empty whole"""
+    if not whole:
+        return 0.0
+    return round(part / whole * 100, digits)
+
+
+def ward_blocks(wards, digits=None):
+    """Localize a table grouped into one block of rows per ward
+
+    Args:
+        wards: Iterable of (ward_number, rows, total_row) where every row is
+            a tuple of cell values
+        digits: Optional {column index: decimal places} for every row
+
+    Returns:
+        [{"ward_number": str, "rows": [tuple, ...], "total": tuple}, ...]
+    """
+    return [
+        {
+            "ward_number": localize(ward_number),
+            "rows": [localize_row(row, digits) for row in rows],
+            "total": localize_row(total, digits),
+        }
+        for ward_number, rows, total in wards
+    ]
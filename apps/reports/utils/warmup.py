@@ -0,0 +1,283 @@
+"""
+Report cache warm-up
+
+After a data import or a deploy every report cache is cold: the first
+visitor of ``/full-report/`` or ``/pdf/full/`` would build every chart,
+processor result, table fragment and PDF. ``CacheWarmer`` builds them ahead
+of traffic, in dependency order:
+
+    renditions   resized report figure images (renditions)
+    maps         print and deep-zoom map derivatives (map_assets)
+    tables       stored ReportTable HTML fragments (table_rendering)
+    processors   every processor's process_for_pdf(), which draws its charts
+    data         data API payloads, cached per data fingerprint
+    pages        cached public pages and report API responses
+    pdf          the full report PDF, cached per data fingerprint
+
+Independent steps run concurrently; a step runs once the steps it depends
+on finished, even if one of them failed. Every artifact is written
+atomically under a single-flight lock and nothing is deleted beyond what a
+regular build prunes, so warming is safe while the site serves traffic.
+Pages are requested like a visitor would (through the middleware, by host
+name), but PDF and export URLs are not requested, so warming does not show
+up in the download statistics.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connections
+from django.urls import reverse
+
+from apps.chart_management.manifest import publish_charts
+from apps.core.tenancy import get_current_municipality
+
+from .managers import get_domains, get_manager
+from .processor_data import data_fingerprint, get_processor_data
+from .profiles import FULL_REPORT_DOMAINS, get_or_build_full_report
+from .scheduler import ProcessorScheduler
+
+logger = logging.getLogger("gadhawa_report.warmup")
+
+DEFAULT_WORKERS = 2
+
+# Accept-Encoding of the page requests: cached pages vary on it
+PAGE_ACCEPT_ENCODING = "gzip, deflate, br"
+
+
+class WarmupStep:
+    """One cache to build, after the steps named in ``depends_on``"""
+
+    def __init__(self, name, build, depends_on=()):
+        self.name = name
+        self.build = build
+        self.depends_on = tuple(depends_on)
+
+
+def warm_renditions():
+    from ..models import ReportFigure
+    from .renditions import generate_for_figure, is_current
+
+    rendered = 0
+    figures = ReportFigure.objects.exclude(image="").exclude(image__isnull=True)
+    for figure in figures.iterator():
+        if not is_current(figure):
+            generate_for_figure(figure.pk)
+            rendered += 1
+    return f"{rendered} figures rendered"
+
+
+def warm_maps():
+    from .map_assets import MAPS, generate_map_assets
+
+    built = missing = 0
+    for name in MAPS:
+        manifest, was_built = generate_map_assets(name)
+        missing += manifest is None
+        built += was_built
+    return f"{built} maps built, {missing} missing"
+
+
+def warm_tables():
+    from .table_rendering import render_stale_tables
+
+    return f"{render_stale_tables()} tables rendered"
+
+
+def warm_processors():
+    scheduler = ProcessorScheduler.for_managers(
+        {domain: get_manager(domain) for domain in get_domains()}
+    )
+    results = scheduler.run("process_for_pdf")
+    publish_charts()
+
+    failed = [
+        f"{domain}.{category}"
+        for domain, categories in results.items()
+        for category, result in categories.items()
+        if isinstance(result, dict) and result.get("error")
+    ]
+    detail = f"{len(scheduler.tasks)} processors"
+    if failed:
+        detail += f", failed: {', '.join(failed)}"
+    return detail
+
+
+def warm_processor_data():
+    cached = 0
+    failed = []
+    for domain in get_domains():
+        for category, processor in get_manager(domain).processors.items():
+            try:
+                fingerprint, _ = data_fingerprint(domain, category, processor)
+                if fingerprint:
+                    get_processor_data(domain, category, processor, fingerprint)
+                    cached += 1
+            except Exception:
+                logger.exception("Warming data of %s.%s failed", domain, category)
+                failed.append(f"{domain}.{category}")
+    detail = f"{cached} payloads cached"
+    if failed:
+        detail += f", failed: {', '.join(failed)}"
+    return detail
+
+
+def public_urls():
+    """Cached public pages and report API responses of the report"""
+    from ..models import ReportCategory, ReportSection
+
+    urls = [
+        reverse("reports:home"),
+        reverse("reports:api_categories"),
+        reverse("reports:api_sections"),
+    ]
+    for slug in ReportCategory.objects.filter(is_active=True).values_list(
+        "slug", flat=True
+    ):
+        urls.append(reverse("reports:category", kwargs={"slug": slug}))
+        urls.append(reverse("reports:api_category_detail", kwargs={"slug": slug}))
+    sections = ReportSection.objects.filter(
+        is_published=True, category__is_active=True
+    ).values_list("category__slug", "slug")
+    for category_slug, section_slug in sections:
+        urls.append(
+            reverse(
+                "reports:section",
+                kwargs={"category_slug": category_slug, "section_slug": section_slug},
+            )
+        )
+    return urls
+
+
+def get_warmup_host():
+    """Host name visitors reach the active municipality by
+
+    Cached pages are keyed by their absolute URL, so pages are only warmed
+    for the host they are requested with.
+    """
+    municipality = get_current_municipality()
+    if municipality.hosts:
+        return municipality.hosts[0]
+    for host in settings.ALLOWED_HOSTS:
+        if host and "*" not in host and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def warm_pages(urls=None, host=None):
+    from django.test import Client
+
+    client = Client(
+        HTTP_HOST=host or get_warmup_host(),
+        HTTP_ACCEPT_ENCODING=PAGE_ACCEPT_ENCODING,
+        raise_request_exception=False,
+    )
+    secure = getattr(settings, "SECURE_SSL_REDIRECT", False)
+
+    urls = public_urls() if urls is None else urls
+    failed = []
+    for url in urls:
+        response = client.get(url, secure=secure)
+        if response.status_code != 200:
+            failed.append(f"{url} ({response.status_code})")
+    detail = f"{len(urls) - len(failed)} of {len(urls)} pages"
+    if failed:
+        detail += f", failed: {', '.join(failed)}"
+    return detail
+
+
+def warm_pdf():
+    pdf = get_or_build_full_report(FULL_REPORT_DOMAINS)
+    return f"{len(pdf) / 1024:.0f} KB"
+
+
+def get_warmup_steps(host=None):
+    """Every warm-up step, in report build order"""
+    return [
+        WarmupStep("renditions", warm_renditions),
+        WarmupStep("maps", warm_maps),
+        WarmupStep("tables", warm_tables),
+        WarmupStep("processors", warm_processors),
+        WarmupStep("data", warm_processor_data),
+        WarmupStep(
+            "pages",
+            lambda: warm_pages(host=host),
+            depends_on=("renditions", "tables", "processors"),
+        ),
+        WarmupStep("pdf", warm_pdf, depends_on=("maps", "tables", "processors")),
+    ]
+
+
+class CacheWarmer:
+    """Runs warm-up steps concurrently in dependency order"""
+
+    def __init__(self, steps=None, max_workers=None, on_progress=None):
+        """
+        Args:
+            steps: WarmupSteps to run (default: get_warmup_steps())
+            max_workers: Steps run concurrently
+                (default: settings.REPORT_WARMUP_WORKERS)
+            on_progress: Called with (step name, result) as steps finish
+        """
+        if max_workers is None:
+            max_workers = getattr(settings, "REPORT_WARMUP_WORKERS", DEFAULT_WORKERS)
+        self.steps = {step.name: step for step in steps or get_warmup_steps()}
+        self.max_workers = max(1, max_workers)
+        self.on_progress = on_progress
+
+    def get_dependencies(self):
+        # Steps left out of the run are not waited for
+        return {
+            name: {dep for dep in step.depends_on if dep in self.steps}
+            for name, step in self.steps.items()
+        }
+
+    def _run_step(self, step):
+        started = time.monotonic()
+        try:
+            detail, error = step.build(), None
+        except Exception as e:
+            logger.exception("Warming %s failed", step.name)
+            detail, error = None, f"{type(e).__name__}: {e}"
+        finally:
+            # Worker threads open their own connections; don't leak them
+            connections.close_all()
+        return {
+            "seconds": time.monotonic() - started,
+            "detail": detail,
+            "error": error,
+        }
+
+    def run(self):
+        """Run every step; returns {step name: {seconds, detail, error}}"""
+        dependencies = self.get_dependencies()
+        results = {}
+        running = {}
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="report-warmup"
+        ) as executor:
+            while len(results) < len(self.steps):
+                scheduled = set(results) | set(running.values())
+                for name, deps in dependencies.items():
+                    if name not in scheduled and deps <= set(results):
+                        # Run in the caller's municipality (apps.core.tenancy)
+                        context = contextvars.copy_context()
+                        future = executor.submit(
+                            context.run, self._run_step, self.steps[name]
+                        )
+                        running[future] = name
+                if not running:
+                    # Unsatisfiable dependencies: nothing left can start
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    if self.on_progress:
+                        self.on_progress(name, results[name])
+
+        return {name: results[name] for name in self.steps if name in results}
@@ -23,6 +23,8 @@ from .api import (
     ReportSearchAPIView,
     DownloadStatsAPIView,
 )
+from .data_api import ProcessorDataAPIView
+from .exports import DataExportBundleView, DataExportIndexView, DataExportTableView
 from .utils import ReportSitemapView, RobotsView
 
 __all__ = [
@@ -46,6 +48,10 @@ __all__ = [
     "SectionDetailAPIView",
     "ReportSearchAPIView",
     "DownloadStatsAPIView",
+    "ProcessorDataAPIView",
+    "DataExportIndexView",
+    "DataExportBundleView",
+    "DataExportTableView",
     "ReportSitemapView",
     "RobotsView",
 ]
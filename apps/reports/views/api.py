@@ -1,8 +1,12 @@
-from django.db.models import Q, Count
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Count, F
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from datetime import timedelta
 
 from rest_framework import generics
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
@@ -13,17 +17,78 @@ from ..serializers import (
     ReportSectionListSerializer, ReportSectionDetailSerializer,
     SearchResultSerializer
 )
+from ..utils.api_cache import get_content_version, make_etag, payload_key
 
 
-class CategoryListAPIView(generics.ListAPIView):
+class ReportCursorPagination(CursorPagination):
+    """Stable pages for polling clients; views set ``ordering``"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class VersionedCacheMixin:
+    """Serve GET responses from the content-versioned report API cache
+
+    Payloads are cached per request path and query string under the current
+    content version (see apps.reports.utils.api_cache). Requests whose
+    If-None-Match matches the version's ETag get a 304 without any query
+    beyond the version lookup.
+    """
+
+    def get(self, request, *args, **kwargs):
+        version = get_content_version()
+        variant = request.get_full_path()
+        etag = make_etag(version, variant)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = payload_key(version, variant)
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = super().get(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(
+                    key,
+                    response.data,
+                    getattr(settings, 'REPORT_API_CACHE_TIMEOUT', 24 * 60 * 60),
+                )
+
+        response['ETag'] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=getattr(settings, 'REPORT_API_MAX_AGE', 60),
+        )
+        return response
+
+
+# Cursor orderings end in pk: rows tied on every other field would otherwise
+# be skipped or repeated across pages
+
+
+class CategoryPagination(ReportCursorPagination):
+    ordering = ('order', 'slug', 'pk')
+
+
+class SectionPagination(ReportCursorPagination):
+    # category_order is annotated by SectionListAPIView
+    ordering = ('category_order', 'order', 'section_number', 'pk')
+
+
+class CategoryListAPIView(VersionedCacheMixin, generics.ListAPIView):
     serializer_class = ReportCategoryListSerializer
     permission_classes = [AllowAny]
+    pagination_class = CategoryPagination
     
     def get_queryset(self):
-        return ReportCategory.objects.filter(is_active=True).order_by('order')
+        return ReportCategory.objects.filter(is_active=True)
 
 
-class CategoryDetailAPIView(generics.RetrieveAPIView):
+class CategoryDetailAPIView(VersionedCacheMixin, generics.RetrieveAPIView):
     serializer_class = ReportCategoryDetailSerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
@@ -35,12 +100,15 @@ class CategoryDetailAPIView(generics.RetrieveAPIView):
         )
 
 
-class SectionListAPIView(generics.ListAPIView):
+class SectionListAPIView(VersionedCacheMixin, generics.ListAPIView):
     serializer_class = ReportSectionListSerializer
     permission_classes = [AllowAny]
+    pagination_class = SectionPagination
     
     def get_queryset(self):
-        queryset = ReportSection.objects.filter(is_published=True).select_related('category')
+        queryset = ReportSection.objects.filter(is_published=True).select_related(
+            'category'
+        ).annotate(category_order=F('category__order'))
         
         # Filter by category
         category_slug = self.request.query_params.get('category', None)
@@ -52,10 +120,10 @@ class SectionListAPIView(generics.ListAPIView):
         if featured and featured.lower() == 'true':
             queryset = queryset.filter(is_featured=True)
         
-        return queryset.order_by('category__order', 'order', 'section_number')
+        return queryset
 
 
-class SectionDetailAPIView(generics.RetrieveAPIView):
+class SectionDetailAPIView(VersionedCacheMixin, generics.RetrieveAPIView):
     serializer_class = ReportSectionDetailSerializer
     permission_classes = [AllowAny]
     lookup_field = 'id'
@@ -1,6 +1,9 @@
+from django.http import Http404
 from django.utils import timezone
 from ..models import ReportCategory, ReportSection, ReportDownload, PublicationSettings
 from ..utils.nepali_numbers import to_nepali_digits
+from ..utils.snapshots import ReportSnapshot, SnapshotError
+from apps.core.tenancy import get_current_municipality
 
 
 def track_download(request, download_type, section=None):
@@ -16,19 +19,35 @@ def track_download(request, download_type, section=None):
         pass  # Don't fail if tracking fails
 
 
+def get_request_snapshot(request):
+    """ReportSnapshot named by ?snapshot=<version>, or None for live data"""
+    version = request.GET.get("snapshot")
+    if not version:
+        return None
+    try:
+        return ReportSnapshot.load(version)
+    except SnapshotError as e:
+        raise Http404(str(e))
+
+
 class ReportContextMixin:
     """Mixin to provide common context for all report views"""
 
+    def get_navigation_context(self):
+        """Sidebar categories and publication settings of the page"""
+        return {
+            # All categories with their sections for sidebar navigation
+            "categories": (
+                ReportCategory.objects.filter(is_active=True)
+                .prefetch_related("sections")
+                .order_by("order")
+            ),
+            "publication_settings": PublicationSettings.objects.first(),
+        }
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Get all categories with their sections for sidebar navigation
-        categories = (
-            ReportCategory.objects.filter(is_active=True)
-            .prefetch_related("sections")
-            .order_by("order")
-        )
-
         # Add current page context
         current_category = None
         current_section = None
@@ -60,21 +79,17 @@ class ReportContextMixin:
             except ReportSection.DoesNotExist:
                 pass
 
-        # Municipality name - make dynamic
-        municipality_name = "गढवा गाउँपालिका"
-        municipality_name_english = "gadhawa Rural Municipality"
-
-        # Get publication settings
-        publication_settings = PublicationSettings.objects.first()
+        municipality = get_current_municipality()
+        municipality_name = municipality.name
+        municipality_name_english = municipality.name_english
 
+        context.update(self.get_navigation_context())
         context.update(
             {
-                "categories": categories,
                 "current_category": current_category,
                 "current_section": current_section,
                 "municipality_name": municipality_name,
                 "municipality_name_english": municipality_name_english,
-                "publication_settings": publication_settings,
             }
         )
 
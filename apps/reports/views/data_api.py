@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+    quote_etag,
+)
+from django.utils.http import http_date
+from django.views import View
+
+from ..utils.managers import get_domains, get_shared_manager
+from ..utils.processor_data import (
+    MIN_COMPRESS_LENGTH,
+    ProcessorDataEncoder,
+    choose_encoding,
+    compress,
+    data_fingerprint,
+    filter_wards,
+    get_processor_data,
+    select_fields,
+)
+from ..utils.profiling import stage
+
+logger = logging.getLogger("gadhawa_report.api")
+
+
+class ProcessorDataAPIView(View):
+    """JSON data of a single processor: /api/v1/data/<domain>/<processor>/
+
+    Query parameters:
+        fields: Comma separated (dotted) fields to return
+        ward: Comma separated ward numbers to keep in ward-wise data
+
+    Responses carry a weak ETag derived from the underlying rows, so clients
+    polling with If-None-Match get a 304 without the data being rebuilt.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request, domain, processor):
+        manager = get_shared_manager(domain)
+        data_processor = manager.get_processor(processor) if manager else None
+        if data_processor is None:
+            return JsonResponse(
+                {
+                    "error": f"Unknown processor '{domain}/{processor}'",
+                    "domains": get_domains(),
+                },
+                status=404,
+            )
+
+        try:
+            fields = self._get_list(request, "fields")
+            wards = [int(ward) for ward in self._get_list(request, "ward")]
+        except ValueError:
+            return JsonResponse({"error": "ward must be a ward number"}, status=400)
+
+        with stage("api.fingerprint"):
+            fingerprint, last_modified = data_fingerprint(
+                domain, processor, data_processor
+            )
+
+        etag = None
+        if fingerprint:
+            variant = json.dumps([sorted(fields), sorted(wards)])
+            etag = self._make_etag(fingerprint, variant)
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=last_modified.timestamp() if last_modified else None,
+            )
+            if response is not None:
+                return self._finalize(response, etag, last_modified)
+
+        try:
+            with stage("api.get_data"):
+                data = get_processor_data(
+                    domain, processor, data_processor, fingerprint
+                )
+        except Exception as e:
+            logger.exception("Error building data for %s/%s", domain, processor)
+            return JsonResponse(
+                {"error": f"Error processing {processor} data: {e}"}, status=500
+            )
+
+        data = select_fields(filter_wards(data, wards), fields)
+        content = json.dumps(
+            {"domain": domain, "processor": processor, "data": data},
+            cls=ProcessorDataEncoder,
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        if etag is None:
+            # No known source models: fall back to hashing the payload
+            etag = self._make_etag(content)
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                return self._finalize(response, etag, last_modified)
+
+        response = HttpResponse(content_type="application/json; charset=utf-8")
+        coding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if coding and len(content) >= MIN_COMPRESS_LENGTH:
+            content = compress(content, coding)
+            response.headers["Content-Encoding"] = coding
+        response.content = content
+        response.headers["Content-Length"] = str(len(content))
+        return self._finalize(response, etag, last_modified)
+
+    @staticmethod
+    def _get_list(request, name):
+        values = []
+        for value in request.GET.getlist(name):
+            values.extend(part.strip() for part in value.split(",") if part.strip())
+        return values
+
+    @staticmethod
+    def _make_etag(*parts):
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else part.encode("utf-8"))
+        return "W/" + quote_etag(digest.hexdigest()[:24])
+
+    @staticmethod
+    def _finalize(response, etag, last_modified):
+        response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=getattr(settings, "REPORT_DATA_API_MAX_AGE", 60),
+        )
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
@@ -0,0 +1,111 @@
+import logging
+import tempfile
+
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from ..utils.exports import (
+    EXPORT_FORMATS,
+    get_table,
+    get_tables,
+    iter_csv,
+    open_bundle,
+    write_table,
+)
+from ..utils.profiles import parse_domains
+from apps.core.tenancy import get_current_municipality
+
+logger = logging.getLogger("gadhawa_report.api")
+
+
+def _unavailable(fmt, error):
+    # openpyxl / pyarrow missing from the deployment
+    logger.error("Cannot export %s: %s", fmt, error)
+    return JsonResponse({"error": f"{fmt} export is not available"}, status=501)
+
+
+class DataExportIndexView(View):
+    """Exported tables of the report data: /export/
+
+    Tables download from ``/export/<table>.<format>`` and all of them, zipped
+    with a manifest, from ``/export/bundle.zip?format=<format>``; both accept
+    ``domains=demographics,social`` to restrict the export to some domains.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request):
+        domains = parse_domains(request.GET.get("domains"))
+        return JsonResponse(
+            {
+                "municipality": get_current_municipality().code,
+                "formats": list(EXPORT_FORMATS),
+                "tables": [
+                    {
+                        "name": table.name,
+                        "columns": [column.name for column in table.columns],
+                    }
+                    for table in get_tables(domains)
+                ],
+            },
+            json_dumps_params={"ensure_ascii": False},
+        )
+
+
+class DataExportTableView(View):
+    """One table as CSV (streamed), XLSX or Parquet"""
+
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request, table, fmt):
+        export_table = get_table(table) if fmt in EXPORT_FORMATS else None
+        if export_table is None:
+            return JsonResponse(
+                {"error": f"Unknown export '{table}.{fmt}'"}, status=404
+            )
+
+        filename = f"{get_current_municipality().code}_{table}.{fmt}"
+        if fmt == "csv":
+            response = StreamingHttpResponse(
+                iter_csv(export_table), content_type=EXPORT_FORMATS[fmt]
+            )
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+
+        f = tempfile.TemporaryFile()
+        try:
+            write_table(export_table, fmt, f)
+        except ImportError as e:
+            f.close()
+            return _unavailable(fmt, e)
+        f.seek(0)
+        return FileResponse(
+            f, as_attachment=True, filename=filename, content_type=EXPORT_FORMATS[fmt]
+        )
+
+
+class DataExportBundleView(View):
+    """Every table of some domains in one zip, cached per data fingerprint"""
+
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request):
+        fmt = request.GET.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            return JsonResponse(
+                {"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"},
+                status=400,
+            )
+        domains = parse_domains(request.GET.get("domains"))
+
+        try:
+            bundle = open_bundle(fmt, domains)
+        except ImportError as e:
+            return _unavailable(fmt, e)
+        filename = f"{get_current_municipality().code}_report_data_{fmt}.zip"
+        return FileResponse(
+            bundle,
+            as_attachment=True,
+            filename=filename,
+            content_type="application/zip",
+        )
@@ -3,14 +3,16 @@ from django.views.generic import TemplateView
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.utils import timezone
-import io
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from weasyprint import HTML
-
-from .base import track_download
+from .base import get_request_snapshot, track_download
+from ..utils.profiles import (
+    FULL_REPORT_TEMPLATE,
+    full_report_filename,
+    get_or_build_full_report,
+    parse_domains,
+)
+from ..utils.pdf_rendering import PDF_CONTEXT, render_pdf, write_fallback_pdf
+from ..utils.profiling import save_current_profile, stage
 from ..models import (
     ReportCategory,
     ReportSection,
@@ -18,10 +20,7 @@ from ..models import (
     ReportTable,
     PublicationSettings,
 )
-from apps.demographics.processors.manager import get_demographics_manager
-from apps.social.processors.manager import get_social_manager
-from apps.infrastructure.processors.manager import get_infrastructure_manager
-from apps.economics.processors.manager import get_economics_manager
+from apps.core.tenancy import get_current_municipality
 
 
 class PDFGeneratorMixin:
@@ -36,16 +35,20 @@ class PDFGeneratorMixin:
     def generate_pdf_with_weasyprint(self, template_name, context, filename):
         """Generate PDF using WeasyPrint for better styling"""
         try:
-            html_content = render_to_string(template_name, context)
+            with stage("template_render"):
+                html_content = render_to_string(
+                    template_name, {**context, **PDF_CONTEXT}
+                )
 
             # Create PDF
             response = HttpResponse(content_type="application/pdf")
             response["Content-Disposition"] = f'attachment; filename="{filename}"'
 
-            # Generate PDF with WeasyPrint
-            base_url = self.request.build_absolute_uri("/")
-            HTML(string=html_content, base_url=base_url).write_pdf(response)
+            # Generate PDF with WeasyPrint in a warm renderer worker
+            with stage("pdf_write"):
+                response.write(render_pdf(html_content))
 
+            save_current_profile(filename)
             return response
 
         except Exception as e:
@@ -57,52 +60,30 @@ class PDFGeneratorMixin:
         response = HttpResponse(content_type="application/pdf")
         response["Content-Disposition"] = f'attachment; filename="{filename}"'
 
-        # Create PDF document
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = []
+        paragraphs = []
 
         # Add title
         if "municipality_name" in context:
-            title = Paragraph(context["municipality_name"], styles["Title"])
-            story.append(title)
-            story.append(Spacer(1, 12))
+            paragraphs += [(context["municipality_name"], "Title"), None]
 
         # Add content based on context
         if "category" in context and context["category"]:
-            category_title = Paragraph(
-                f"Category: {context['category'].name}", styles["Heading1"]
-            )
-            story.append(category_title)
-            story.append(Spacer(1, 12))
+            paragraphs += [(f"Category: {context['category'].name}", "Heading1"), None]
 
             if (
                 hasattr(context["category"], "description")
                 and context["category"].description
             ):
-                desc = Paragraph(context["category"].description, styles["Normal"])
-                story.append(desc)
-                story.append(Spacer(1, 12))
+                paragraphs += [(context["category"].description, "Normal"), None]
 
         if "section" in context and context["section"]:
-            section_title = Paragraph(
-                f"Section: {context['section'].title}", styles["Heading1"]
-            )
-            story.append(section_title)
-            story.append(Spacer(1, 12))
+            paragraphs += [(f"Section: {context['section'].title}", "Heading1"), None]
 
             if context["section"].content:
-                content = Paragraph(
-                    context["section"].content[:1000] + "...", styles["Normal"]
-                )
-                story.append(content)
+                paragraphs.append((context["section"].content[:1000] + "...", "Normal"))
 
         # Build PDF
-        doc.build(story)
-        pdf = buffer.getvalue()
-        buffer.close()
-        response.write(pdf)
+        response.write(write_fallback_pdf(paragraphs))
 
         return response
 
@@ -112,68 +93,32 @@ class GenerateFullReportPDFView(PDFGeneratorMixin, TemplateView):
         # Track download
         track_download(request, "full_report")
 
-        # Municipality name - make dynamic
-        municipality_name = "गढवा गाउँपालिका"
-        municipality_name_english = "Gadhawa Rural Municipality"
-
-        # Get publication settings (optional)
-        publication_settings = (
-            self.get_publication_settings()
-        )  # Get all data using new processor system
-        demographics_manager = get_demographics_manager()
-        social_manager = get_social_manager()
-        infrastructure_manager = get_infrastructure_manager()
-        economics_manager = get_economics_manager()
-
-        # Generate all charts before processing data
-        demographics_manager.generate_all_charts()
-        social_manager.generate_all_charts()
-        infrastructure_manager.generate_all_charts()
-        economics_manager.generate_all_charts()
-
-        # Get processed data with charts
-        all_demographics_data = demographics_manager.process_all_for_pdf()
-        all_social_data = social_manager.process_all_for_pdf()
-        all_infrastructure_data = infrastructure_manager.process_all_for_pdf()
-        all_economics_data = economics_manager.process_all_for_pdf()
-
-        # Extract chart URLs for template use
-        pdf_charts = {}
-        for category, data in all_demographics_data.items():
-            if "charts" in data:
-                pdf_charts[category] = data["charts"]
-
-        for category, data in all_social_data.items():
-            if "pdf_charts" in data and data["pdf_charts"]:
-                pdf_charts.update(data["pdf_charts"])
-
-        for category, data in all_infrastructure_data.items():
-            if "pdf_charts" in data and data["pdf_charts"]:
-                pdf_charts.update(data["pdf_charts"])
-
-        for category, data in all_economics_data.items():
-            if "pdf_charts" in data and data["pdf_charts"]:
-                pdf_charts.update(
-                    data["pdf_charts"]
-                )  # Use hardcoded content plus dynamic data
-        context = {
-            "municipality_name": municipality_name,
-            "municipality_name_english": municipality_name_english,
-            "publication_settings": publication_settings,
-            "generated_date": timezone.now(),
-            "all_demographics_data": all_demographics_data,
-            "all_social_data": all_social_data,
-            "all_infrastructure_data": all_infrastructure_data,
-            "all_economics_data": all_economics_data,
-            "pdf_charts": pdf_charts,
-        }
-
-        filename = (
-            f"gadhawa_digital_profile_report_{timezone.now().strftime('%Y%m%d')}.pdf"
-        )
-        return self.generate_pdf_with_weasyprint(
-            "reports/pdf_full_report.html", context, filename
+        # ?domains=demographics,social builds a chapter-level PDF, computing
+        # only the processors of those chapters
+        municipality = get_current_municipality()
+        domains = parse_domains(request.GET.get("domains"))
+        # ?snapshot=<version> renders the data frozen for that publication
+        snapshot = get_request_snapshot(request)
+        filename = full_report_filename(
+            municipality,
+            date=snapshot.created_at if snapshot else None,
+            domains=domains,
         )
+        try:
+            # Concurrent downloads of the same report data share one build
+            pdf = get_or_build_full_report(domains, snapshot)
+        except Exception:
+            # Fallback to ReportLab if WeasyPrint fails
+            return self.generate_pdf_with_reportlab(
+                FULL_REPORT_TEMPLATE,
+                {"municipality_name": municipality.name},
+                filename,
+            )
+
+        response = HttpResponse(pdf, content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        save_current_profile(filename)
+        return response
 
 
 class GenerateCategoryPDFView(PDFGeneratorMixin, TemplateView):
@@ -183,9 +128,9 @@ class GenerateCategoryPDFView(PDFGeneratorMixin, TemplateView):
         # Track download
         track_download(request, "pdf")
 
-        # Municipality name - make dynamic
-        municipality_name = "गढवा गाउँपालिका"
-        municipality_name_english = "GadhawaRural Municipality"
+        municipality = get_current_municipality()
+        municipality_name = municipality.name
+        municipality_name_english = municipality.name_english
 
         publication_settings = self.get_publication_settings()
         sections = category.sections.filter(is_published=True).prefetch_related(
@@ -208,7 +153,7 @@ class GenerateCategoryPDFView(PDFGeneratorMixin, TemplateView):
         }
 
         filename = (
-            f"gadhawa_{category.slug}_report_{timezone.now().strftime('%Y%m%d')}.pdf"
+            f"{municipality.code}_{category.slug}_report_{timezone.now().strftime('%Y%m%d')}.pdf"
         )
         return self.generate_pdf_with_weasyprint(
             "reports/pdf_category.html", context, filename
@@ -227,9 +172,9 @@ class GenerateSectionPDFView(PDFGeneratorMixin, TemplateView):
         # Track download
         track_download(request, "section", section)
 
-        # Municipality name - make dynamic
-        municipality_name = "गढवा गाउँपालिका"
-        municipality_name_english = "GadhawaRural Municipality"
+        municipality = get_current_municipality()
+        municipality_name = municipality.name
+        municipality_name_english = municipality.name_english
 
         publication_settings = self.get_publication_settings()
 
@@ -242,7 +187,7 @@ class GenerateSectionPDFView(PDFGeneratorMixin, TemplateView):
             "generated_date": timezone.now(),
         }
 
-        filename = f"gadhawa_{section.category.slug}_{section.slug}_{timezone.now().strftime('%Y%m%d')}.pdf"
+        filename = f"{municipality.code}_{section.category.slug}_{section.slug}_{timezone.now().strftime('%Y%m%d')}.pdf"
         return self.generate_pdf_with_weasyprint(
             "reports/pdf_section.html", context, filename
         )
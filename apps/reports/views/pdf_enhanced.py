@@ -7,15 +7,11 @@ from django.views.generic import TemplateView
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.utils import timezone
-import io
 import re
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from weasyprint import HTML
-
 from .base import track_download
+from ..utils.pdf_rendering import PDF_CONTEXT, render_pdf, write_fallback_pdf
+from ..utils.profiling import save_current_profile, stage
 from ..models import (
     ReportCategory,
     ReportSection,
@@ -24,6 +20,7 @@ from ..models import (
     PublicationSettings,
 )
 from ..utils.nepali_numbers import to_nepali_digits
+from apps.core.tenancy import get_current_municipality
 
 
 class NepaliPDFProcessor:
@@ -52,7 +49,10 @@ class PDFGeneratorMixin:
     def generate_pdf_with_weasyprint(self, template_name, context, filename):
         """Generate PDF using WeasyPrint with exact page references"""
         try:
-            html_content = render_to_string(template_name, context)
+            with stage("template_render"):
+                html_content = render_to_string(
+                    template_name, {**context, **PDF_CONTEXT}
+                )
 
             # Post-process for Nepali digits if needed
             processor = NepaliPDFProcessor()
@@ -62,10 +62,11 @@ class PDFGeneratorMixin:
             response = HttpResponse(content_type="application/pdf")
             response["Content-Disposition"] = f'attachment; filename="{filename}"'
 
-            # Generate PDF with WeasyPrint
-            base_url = self.request.build_absolute_uri("/")
-            HTML(string=html_content, base_url=base_url).write_pdf(response)
+            # Generate PDF with WeasyPrint in a warm renderer worker
+            with stage("pdf_write"):
+                response.write(render_pdf(html_content))
 
+            save_current_profile(filename)
             return response
 
         except Exception as e:
@@ -77,21 +78,15 @@ class PDFGeneratorMixin:
         response = HttpResponse(content_type="application/pdf")
         response["Content-Disposition"] = f'attachment; filename="{filename}"'
 
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        styles = getSampleStyleSheet()
-
-        # Build content
-        content = []
-        content.append(Paragraph("गढवा गाउँपालिका - पूर्ण प्रतिवेदन", styles["Title"]))
-        content.append(Spacer(1, 12))
-
-        # Add basic content
-        content.append(Paragraph("यो ReportLab फलब्याक संस्करण हो।", styles["Normal"]))
-
-        doc.build(content)
-        pdf = buffer.getvalue()
-        buffer.close()
+        municipality_name = get_current_municipality().name
+        pdf = write_fallback_pdf(
+            [
+                (f"{municipality_name} - पूर्ण प्रतिवेदन", "Title"),
+                None,
+                # Add basic content
+                ("यो ReportLab फलब्याक संस्करण हो।", "Normal"),
+            ]
+        )
         response.write(pdf)
 
         return response
@@ -104,9 +99,9 @@ class GenerateFullPDFView(PDFGeneratorMixin, TemplateView):
         # Track download
         track_download(request, "pdf")
 
-        # Municipality name - make dynamic
-        municipality_name = "गढवा गाउँपालिका"
-        municipality_name_english = "gadhawa Rural Municipality"
+        municipality = get_current_municipality()
+        municipality_name = municipality.name
+        municipality_name_english = municipality.name_english
 
         # Get all data
         publication_settings = self.get_publication_settings()
@@ -139,7 +134,7 @@ class GenerateFullPDFView(PDFGeneratorMixin, TemplateView):
         }
 
         filename = (
-            f"gadhawa_digital_profile_report_{timezone.now().strftime('%Y%m%d')}.pdf"
+            f"{municipality.code}_digital_profile_report_{timezone.now().strftime('%Y%m%d')}.pdf"
         )
         return self.generate_pdf_with_weasyprint(
             "reports/pdf_full_report.html", context, filename
@@ -153,9 +148,9 @@ class GenerateCategoryPDFView(PDFGeneratorMixin, TemplateView):
         # Track download
         track_download(request, "pdf")
 
-        # Municipality name - make dynamic
-        municipality_name = "गढवा गाउँपालिका"
-        municipality_name_english = "GadhawaRural Municipality"
+        municipality = get_current_municipality()
+        municipality_name = municipality.name
+        municipality_name_english = municipality.name_english
 
         publication_settings = self.get_publication_settings()
         sections = category.sections.filter(is_published=True).prefetch_related(
@@ -183,7 +178,7 @@ class GenerateCategoryPDFView(PDFGeneratorMixin, TemplateView):
         }
 
         filename = (
-            f"gadhawa_{category.slug}_report_{timezone.now().strftime('%Y%m%d')}.pdf"
+            f"{municipality.code}_{category.slug}_report_{timezone.now().strftime('%Y%m%d')}.pdf"
         )
         return self.generate_pdf_with_weasyprint(
             "reports/pdf_category.html", context, filename
@@ -200,9 +195,9 @@ class GenerateSectionPDFView(PDFGeneratorMixin, TemplateView):
         # Track download
         track_download(request, "pdf")
 
-        # Municipality name - make dynamic
-        municipality_name = "गढवा गाउँपालिका"
-        municipality_name_english = "GadhawaRural Municipality"
+        municipality = get_current_municipality()
+        municipality_name = municipality.name
+        municipality_name_english = municipality.name_english
 
         publication_settings = self.get_publication_settings()
 
@@ -218,7 +213,7 @@ class GenerateSectionPDFView(PDFGeneratorMixin, TemplateView):
             "use_exact_pages": True,
         }
 
-        filename = f"gadhawa_{category.slug}_{section.slug}_{timezone.now().strftime('%Y%m%d')}.pdf"
+        filename = f"{municipality.code}_{category.slug}_{section.slug}_{timezone.now().strftime('%Y%m%d')}.pdf"
         return self.generate_pdf_with_weasyprint(
             "reports/pdf_section.html", context, filename
         )
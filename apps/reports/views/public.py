@@ -2,25 +2,21 @@ from django.shortcuts import get_object_or_404
 from django.views.generic import DetailView, TemplateView
 from django.http import Http404
 from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
 from django.views.decorators.cache import cache_page
 from django.views.decorators.gzip import gzip_page
 from django.db.models import Q
 from django.core.paginator import Paginator
-import datetime
 
-from .base import ReportContextMixin
+from .base import ReportContextMixin, get_request_snapshot
 from ..models import (
     ReportCategory,
     ReportSection,
     ReportFigure,
     ReportTable,
-    PublicationSettings,
 )
 from ..utils.nepali_numbers import to_nepali_digits
-from apps.demographics.processors.manager import get_demographics_manager
-from apps.social.processors.manager import get_social_manager
-from apps.infrastructure.processors.manager import get_infrastructure_manager
-from apps.economics.processors.manager import get_economics_manager
+from ..utils.profiles import build_full_report_context, parse_domains
 
 
 @method_decorator([cache_page(60 * 15), gzip_page], name="dispatch")
@@ -61,10 +57,8 @@ class ReportHomeView(ReportContextMixin, TemplateView):
             },
         ]
 
-        total_categories = categories.count()
-        total_sections = sum(
-            cat.sections.filter(is_published=True).count() for cat in categories
-        )
+        total_categories = len(categories)
+        total_sections = sum(cat.published_sections_count for cat in categories)
 
         context.update(
             {
@@ -210,13 +204,10 @@ class TableOfContentsView(ReportContextMixin, TemplateView):
             context["categories"]
             .filter(sections__is_published=True)
             .distinct()
-            .prefetch_related("sections__figures", "sections__tables")
         )
 
         # Statistics
-        total_sections = sum(
-            cat.sections.filter(is_published=True).count() for cat in categories
-        )
+        total_sections = sum(cat.published_sections_count for cat in categories)
         total_figures = ReportFigure.objects.count()
         total_tables = ReportTable.objects.count()
 
@@ -383,71 +374,28 @@ class ReportSearchView(ReportContextMixin, TemplateView):
 class FullReportView(ReportContextMixin, TemplateView):
     template_name = "reports/web_full_report.html"
 
-    def get_publication_settings(self):
-        """Get publication settings from the database"""
-        try:
-            return PublicationSettings.objects.first()
-        except PublicationSettings.DoesNotExist:
-            return None
+    @cached_property
+    def snapshot(self):
+        return get_request_snapshot(self.request)
+
+    def get_navigation_context(self):
+        # Snapshot renders use the navigation frozen with the data
+        if self.snapshot is None or self.snapshot.navigation is None:
+            return super().get_navigation_context()
+        return {
+            "categories": self.snapshot.navigation,
+            "publication_settings": self.snapshot.publication or None,
+        }
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-
-        # Municipality name - make dynamic
-        municipality_name = "गढवा गाउँपालिका"
-        municipality_name_english = "Gadhawa Rural Municipality"
-
-        # Get publication settings (optional)
-        publication_settings = self.get_publication_settings()
-
-        # Get all data using processor system
-        demographics_manager = get_demographics_manager()
-        social_manager = get_social_manager()
-        infrastructure_manager = get_infrastructure_manager()
-        economics_manager = get_economics_manager()
-
-        # Generate all charts before processing data
-        demographics_manager.generate_all_charts()
-        social_manager.generate_all_charts()
-        infrastructure_manager.generate_all_charts()
-        economics_manager.generate_all_charts()
-
-        # Get processed data with charts
-        all_demographics_data = demographics_manager.process_all_for_pdf()
-        all_social_data = social_manager.process_all_for_pdf()
-        all_infrastructure_data = infrastructure_manager.process_all_for_pdf()
-        all_economics_data = economics_manager.process_all_for_pdf()
-
-        # Extract chart URLs for template use
-        pdf_charts = {}
-        for category, data in all_demographics_data.items():
-            if "charts" in data:
-                pdf_charts[category] = data["charts"]
-
-        for category, data in all_social_data.items():
-            if "pdf_charts" in data and data["pdf_charts"]:
-                pdf_charts.update(data["pdf_charts"])
-
-        for category, data in all_infrastructure_data.items():
-            if "pdf_charts" in data and data["pdf_charts"]:
-                pdf_charts.update(data["pdf_charts"])
-
-        for category, data in all_economics_data.items():
-            if "pdf_charts" in data and data["pdf_charts"]:
-                pdf_charts.update(data["pdf_charts"])
-
-        context.update(
-            {
-                "municipality_name": municipality_name,
-                "municipality_name_english": municipality_name_english,
-                "publication_settings": publication_settings,
-                "generated_date": datetime.datetime.now(),
-                "all_demographics_data": all_demographics_data,
-                "all_social_data": all_social_data,
-                "all_infrastructure_data": all_infrastructure_data,
-                "all_economics_data": all_economics_data,
-                "pdf_charts": pdf_charts,
-            }
-        )
-
+        # Processor results are computed as the template reads them; e.g.
+        # ?domains=demographics renders (and computes) only that chapter.
+        # ?snapshot=<version> renders the data frozen for that publication.
+        domains = parse_domains(self.request.GET.get("domains"))
+        snapshot = self.snapshot
+        if snapshot is not None:
+            context.update(snapshot.build_context(domains))
+        else:
+            context.update(build_full_report_context(domains))
         return context
@@ -1,6 +1,7 @@
 from django.views.generic import TemplateView
 
 from ..models import ReportCategory, ReportSection
+from apps.core.tenancy import get_current_municipality
 
 
 class ReportSitemapView(TemplateView):
@@ -10,9 +11,9 @@ class ReportSitemapView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Municipality name - make dynamic
-        municipality_name = "गढवा गाउँपालिका"
-        municipality_name_english = "Gadhawa Rural Municipality"
+        municipality = get_current_municipality()
+        municipality_name = municipality.name
+        municipality_name_english = municipality.name_english
 
         # Get all published content
         categories = ReportCategory.objects.filter(is_active=True)
@@ -13,6 +13,7 @@ from apps.social.models import (
     SchoolLevelChoice,
 )
 from apps.reports.utils.nepali_numbers import to_nepali_digits
+from apps.reports.utils.processor_data import invalidate_processor_data
 import os
 import glob
 import json
@@ -124,6 +125,8 @@ class Command(BaseCommand):
                     "is_operational",
                 ],
             )
+            # bulk_update() leaves updated_at untouched
+            transaction.on_commit(invalidate_processor_data)
         self.stdout.write(
             self.style.SUCCESS(
                 f"Created: {len(to_create)}, Updated: {len(to_update)} records."
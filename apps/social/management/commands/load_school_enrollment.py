@@ -0,0 +1,41 @@
+"""
+Management command to load school enrollment facts (५.१.२)
+
+Loads every educational_institution_<year>.json fixture that is not in the
+fact table yet. Add a new year by adding its fixture and re-running.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.social.utils.school_enrollment import load_enrollment_facts
+
+
+class Command(BaseCommand):
+    help = "Load school enrollment fixtures into the enrollment fact table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year",
+            action="append",
+            dest="years",
+            help="Only load this year (repeatable)",
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Reload years that are already loaded",
+        )
+
+    def handle(self, *args, **options):
+        counts = load_enrollment_facts(
+            years=options["years"], replace=options["replace"]
+        )
+        if not counts:
+            self.stdout.write("✓ Enrollment facts are up to date")
+            return
+
+        for year, rows in counts.items():
+            self.stdout.write(f"📥 {year}: {rows} enrollment facts")
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Loaded {sum(counts.values())} enrollment facts")
+        )
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='school',
+            name='address',
+            field=models.CharField(blank=True, max_length=255, null=True, verbose_name='ठेगाना'),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='contact_number',
+            field=models.CharField(blank=True, max_length=30, null=True, verbose_name='सम्पर्क नम्बर'),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='established_year',
+            field=models.CharField(blank=True, max_length=10, null=True, verbose_name='स्थापना वर्ष'),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='headmaster_name',
+            field=models.CharField(blank=True, max_length=100, null=True, verbose_name='प्रधानाध्यापकको नाम'),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='operational_status',
+            field=models.CharField(choices=[('OPERATIONAL', 'सञ्चालनमा'), ('CLOSED', 'बन्द'), ('OTHER', 'अन्य')], default='OPERATIONAL', max_length=15, verbose_name='सञ्चालन अवस्था'),
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='remarks',
+            field=models.TextField(blank=True, null=True, verbose_name='कैफियत'),
+        ),
+        migrations.AddField(
+            model_name='schoolstudentdata',
+            name='is_operational',
+            field=models.BooleanField(default=True, verbose_name='सञ्चालनमा छ/छैन'),
+        ),
+        migrations.AddField(
+            model_name='schoolstudentdata',
+            name='level',
+            field=models.CharField(blank=True, choices=[('CHILD_DEVELOPMENT_CENTER', 'बाल विकास केन्द्र'), ('NURSERY', 'नर्सरी'), ('GRADE_1', 'कक्षा १'), ('GRADE_2', 'कक्षा २'), ('GRADE_3', 'कक्षा ३'), ('GRADE_4', 'कक्षा ४'), ('GRADE_5', 'कक्षा ५'), ('GRADE_6', 'कक्षा ६'), ('GRADE_7', 'कक्षा ७'), ('GRADE_8', 'कक्षा ८'), ('GRADE_9', 'कक्षा ९'), ('GRADE_10', 'कक्षा १०'), ('SLC_LEVEL', 'एसएलसी तह'), ('CLASS_12_LEVEL', 'कक्षा १२ तह'), ('BACHELOR_LEVEL', 'स्नातक तह'), ('MASTERS_LEVEL', 'स्नातकोत्तर तह'), ('PHD_LEVEL', 'पीएचडी तह'), ('INFORMAL_EDUCATION', 'अनौपचारिक शिक्षा'), ('OTHER', 'अन्य'), ('EDUCATED', 'शिक्षित'), ('UNKNOWN', 'अज्ञात')], max_length=30, null=True, verbose_name='शैक्षिक तह'),
+        ),
+        migrations.AddField(
+            model_name='schoolstudentdata',
+            name='remarks',
+            field=models.TextField(blank=True, null=True, verbose_name='कैफियत (वर्षगत)'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:32
+
+import django.core.validators
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0002_school_details'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchoolEnrollmentFact',
+            fields=[
+                ('id', models.CharField(default=uuid.uuid4, editable=False, max_length=36, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('data_year', models.CharField(max_length=10, verbose_name='डेटा वर्ष')),
+                ('ward_number', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(9)], verbose_name='वडा नं.')),
+                ('institution_name', models.CharField(max_length=255, verbose_name='शैक्षिक संस्थाको नाम')),
+                ('school_code', models.CharField(blank=True, max_length=20, verbose_name='विद्यालय कोड')),
+                ('school_level', models.CharField(choices=[('PRIMARY', 'प्राथमिक'), ('LOWER_SECONDARY', 'निम्न माध्यमिक'), ('SECONDARY', 'माध्यमिक'), ('HIGHER_SECONDARY', 'उच्च माध्यमिक'), ('EARLY_CHILDHOOD', 'बाल विकास केन्द्र'), ('OTHER', 'अन्य')], default='OTHER', max_length=50, verbose_name='विद्यालयको तह')),
+                ('school_type', models.CharField(max_length=50, verbose_name='विद्यालयको प्रकार')),
+                ('grade', models.CharField(max_length=20, verbose_name='कक्षा')),
+                ('gender', models.CharField(choices=[('MALE', 'पुरुष'), ('FEMALE', 'महिला'), ('OTHER', 'अन्य')], max_length=10, verbose_name='लिङ्ग')),
+                ('student_count', models.PositiveIntegerField(default=0, verbose_name='विद्यार्थी संख्या')),
+            ],
+            options={
+                'verbose_name': 'विद्यालय भर्ना तथ्यांक',
+                'verbose_name_plural': 'विद्यालय भर्ना तथ्यांक',
+                'indexes': [models.Index(fields=['data_year', 'ward_number'], name='social_scho_data_ye_d86e0c_idx'), models.Index(fields=['data_year', 'school_level'], name='social_scho_data_ye_209648_idx'), models.Index(fields=['data_year', 'grade'], name='social_scho_data_ye_f09c51_idx')],
+                'unique_together': {('data_year', 'ward_number', 'institution_name', 'grade', 'gender')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def load_school_enrollment(apps, schema_editor):
+    from apps.social.utils.school_enrollment import load_enrollment_facts
+
+    load_enrollment_facts(model=apps.get_model("social", "SchoolEnrollmentFact"))
+
+
+def unload_school_enrollment(apps, schema_editor):
+    apps.get_model("social", "SchoolEnrollmentFact").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("social", "0003_school_enrollment_fact"),
+    ]
+
+    operations = [
+        migrations.RunPython(load_school_enrollment, unload_school_enrollment),
+    ]
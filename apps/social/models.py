@@ -989,6 +989,63 @@ class WardWiseEducationalInstitution(BaseModel):
         super().save(*args, **kwargs)
 
 
+class SchoolEnrollmentFact(BaseModel):
+    """School enrollment fact table (5.1.2)
+
+    One row per year, school, grade and gender, loaded in bulk from the
+    ``educational_institution_<year>.json`` fixtures by the
+    ``load_school_enrollment`` command.
+    """
+
+    data_year = models.CharField(max_length=10, verbose_name=_("डेटा वर्ष"))
+    ward_number = models.PositiveIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(9)],
+        verbose_name=_("वडा नं."),
+    )
+    institution_name = models.CharField(
+        max_length=255, verbose_name=_("शैक्षिक संस्थाको नाम")
+    )
+    school_code = models.CharField(
+        max_length=20, blank=True, verbose_name=_("विद्यालय कोड")
+    )
+    school_level = models.CharField(
+        max_length=50,
+        choices=SchoolLevelChoice.choices,
+        default=SchoolLevelChoice.OTHER,
+        verbose_name=_("विद्यालयको तह"),
+    )
+    school_type = models.CharField(max_length=50, verbose_name=_("विद्यालयको प्रकार"))
+    grade = models.CharField(max_length=20, verbose_name=_("कक्षा"))
+    gender = models.CharField(
+        max_length=10, choices=GenderChoice.choices, verbose_name=_("लिङ्ग")
+    )
+    student_count = models.PositiveIntegerField(
+        default=0, verbose_name=_("विद्यार्थी संख्या")
+    )
+
+    class Meta:
+        verbose_name = _("विद्यालय भर्ना तथ्यांक")
+        verbose_name_plural = _("विद्यालय भर्ना तथ्यांक")
+        unique_together = [
+            "data_year",
+            "ward_number",
+            "institution_name",
+            "grade",
+            "gender",
+        ]
+        indexes = [
+            models.Index(fields=["data_year", "ward_number"]),
+            models.Index(fields=["data_year", "school_level"]),
+            models.Index(fields=["data_year", "grade"]),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.data_year} वडा {self.ward_number} - {self.institution_name} "
+            f"{self.grade} {self.gender}: {self.student_count}"
+        )
+
+
 # Teacher Position Types for 5.1.5
 class TeacherPositionTypeChoice(models.TextChoices):
     APPROVED_QUOTA = "APPROVED_QUOTA", _("स्वीकृत दरबन्दी")
@@ -7,16 +7,41 @@ Common functionality for processing social data across all categories.
 from abc import ABC, abstractmethod
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from pathlib import Path
+from apps.demographics.utils.chart_series import ChartMatrix, ChartSeries
 from apps.demographics.utils.svg_chart_generator import SVGChartGenerator
+from apps.chart_management.manifest import get_charts_dir
+from apps.core.singleflight import atomic_path, atomic_write, single_flight
+from apps.core.tenancy import get_current_municipality
+
+# Ward info keys holding totals rather than a breakdown category
+WARD_TOTAL_FIELDS = (
+    "ward_number",
+    "ward_name",
+    "total_population",
+    "total_households",
+)
 
 
 class BaseSocialProcessor(ABC):
     """Base class for all social data processors"""
 
+    # Processors that must run before this one ("category" or
+    # "domain.category"), see apps.reports.utils.scheduler
+    depends_on = ()
+
+    # Ward info keys holding the ward breakdown of a category, checked in order
+    ward_breakdown_fields = (
+        "toilet_types",
+        "waste_methods",
+        "subjects",
+        "dropout_causes",
+        "literacy_types",
+        "old_age_data",
+    )
+
     def __init__(self):
         # Use proper static directory path
-        self.static_charts_dir = Path("static/images/charts")
+        self.static_charts_dir = get_charts_dir()
         self.static_charts_dir.mkdir(parents=True, exist_ok=True)
 
         # Initialize SVG chart generator
@@ -74,127 +99,57 @@ class BaseSocialProcessor(ABC):
         return None
 
     def _format_municipality_data_for_pie_chart(self, municipality_data):
-        """Format municipality data for pie chart generation"""
-        if not municipality_data:
-            return {}
-
-        formatted_data = {}
-        for key, value in municipality_data.items():
-            if isinstance(value, dict):
-                # If value is already properly formatted with name_nepali and population
-                if "name_nepali" in value and "population" in value:
-                    formatted_data[key] = value
-                else:
-                    # Try to extract population from various possible fields
-                    population = (
-                        value.get("population", 0)
-                        or value.get("households", 0)
-                        or value.get("total", 0)
-                    )
-                    if population > 0:
-                        formatted_data[key] = {
-                            "name_nepali": value.get("name_nepali", key),
-                            "population": population,
-                            "percentage": value.get("percentage", 0),
-                        }
-            elif isinstance(value, (int, float)) and value > 0:
-                # If value is just a number
-                formatted_data[key] = {
-                    "name_nepali": key,
-                    "population": value,
-                    "percentage": 0,
-                }
-
-        return formatted_data
+        """ChartSeries of the municipality data for pie chart generation"""
+        return ChartSeries.from_mapping(
+            municipality_data, value_fields=("population", "households", "total")
+        )
 
     def _format_ward_data_for_bar_chart(self, ward_data):
-        """Format ward data for bar chart generation"""
-        if not ward_data:
-            return {}
-
-        formatted_data = {}
-        for ward_key, ward_info in ward_data.items():
+        """ChartMatrix of the ward data for bar chart generation"""
+        breakdowns = {}
+        for ward_key, ward_info in (ward_data or {}).items():
             if isinstance(ward_info, dict):
-                ward_num = str(ward_key)
                 total_population = ward_info.get(
                     "total_population", 0
                 ) or ward_info.get("total_households", 0)
 
                 if total_population > 0:
-                    formatted_data[ward_num] = {
-                        "ward_name": f"वडा नं. {ward_num}",
-                        "total_population": total_population,
-                        "demographics": self._extract_demographics_from_ward(ward_info),
+                    breakdowns[str(ward_key)] = {
+                        "demographics": self._get_ward_breakdown(ward_info)
                     }
 
-        return formatted_data
+        return ChartMatrix.from_ward_mapping(
+            breakdowns, value_fields=("population", "households")
+        )
+
+    def _get_ward_breakdown(self, ward_info):
+        """{category: {"name_nepali", "population", ...}} of a ward
+
+        The breakdown is the first of ``ward_breakdown_fields`` present in the
+        ward info, or else its entries that have a population or households.
+        """
+        for field in self.ward_breakdown_fields:
+            if field in ward_info:
+                return ward_info[field]
+
+        return {
+            key: value
+            for key, value in ward_info.items()
+            if key not in WARD_TOTAL_FIELDS
+            and isinstance(value, dict)
+            and (value.get("population", 0) or value.get("households", 0)) > 0
+        }
 
     def _extract_demographics_from_ward(self, ward_info):
         """Extract demographic breakdown from ward info"""
-        demographics = {}
-
-        # Look for various possible demographic data structures
-        if "toilet_types" in ward_info:
-            for toilet_type, toilet_data in ward_info["toilet_types"].items():
-                demographics[toilet_type] = {
-                    "name_nepali": toilet_data.get("name_nepali", toilet_type),
-                    "population": toilet_data.get("population", 0),
-                    "percentage": toilet_data.get("percentage", 0),
-                }
-        elif "waste_methods" in ward_info:
-            for method, method_data in ward_info["waste_methods"].items():
-                demographics[method] = {
-                    "name_nepali": method_data.get("name_nepali", method),
-                    "population": method_data.get("population", 0),
-                    "percentage": method_data.get("percentage", 0),
-                }
-        elif "subjects" in ward_info:
-            for subject, subject_data in ward_info["subjects"].items():
-                demographics[subject] = {
-                    "name_nepali": subject_data.get("name_nepali", subject),
-                    "population": subject_data.get("population", 0),
-                    "percentage": subject_data.get("percentage", 0),
-                }
-        elif "dropout_causes" in ward_info:
-            for cause, cause_data in ward_info["dropout_causes"].items():
-                demographics[cause] = {
-                    "name_nepali": cause_data.get("name_nepali", cause),
-                    "population": cause_data.get("population", 0),
-                    "percentage": cause_data.get("percentage", 0),
-                }
-        elif "literacy_types" in ward_info:
-            for literacy_type, literacy_data in ward_info["literacy_types"].items():
-                demographics[literacy_type] = {
-                    "name_nepali": literacy_data.get("name_nepali", literacy_type),
-                    "population": literacy_data.get("population", 0),
-                    "percentage": literacy_data.get("percentage", 0),
-                }
-        elif "old_age_data" in ward_info:
-            for age_type, age_data in ward_info["old_age_data"].items():
-                demographics[age_type] = {
-                    "name_nepali": age_data.get("name_nepali", age_type),
-                    "population": age_data.get("population", 0),
-                    "percentage": age_data.get("percentage", 0),
-                }
-        else:
-            # Generic extraction - look for any field that looks like demographic data
-            for key, value in ward_info.items():
-                if key not in [
-                    "ward_number",
-                    "ward_name",
-                    "total_population",
-                    "total_households",
-                ] and isinstance(value, dict):
-                    if "population" in value or "households" in value:
-                        pop = value.get("population", 0) or value.get("households", 0)
-                        if pop > 0:
-                            demographics[key] = {
-                                "name_nepali": value.get("name_nepali", key),
-                                "population": pop,
-                                "percentage": value.get("percentage", 0),
-                            }
-
-        return demographics
+        return {
+            key: {
+                "name_nepali": value.get("name_nepali", key),
+                "population": value.get("population", 0) or value.get("households", 0),
+                "percentage": value.get("percentage", 0),
+            }
+            for key, value in self._get_ward_breakdown(ward_info).items()
+        }
 
     def generate_report_content(self, data):
         """Generate report content - can be overridden by subclasses"""
@@ -265,116 +220,68 @@ class BaseSocialProcessor(ABC):
 
     def generate_and_save_charts(self, data):
         """Generate and save both pie and bar charts"""
-        import subprocess
-        import os
-
         charts_info = {}
         category_name = self.get_category_name()
 
         try:
-            # Generate pie chart for municipality-wide data
-            pie_svg_path = self.static_charts_dir / f"{category_name}_pie_chart.svg"
-            pie_png_path = self.static_charts_dir / f"{category_name}_pie_chart.png"
-
-            # Only generate if PNG doesn't exist
-            if not pie_png_path.exists():
-                pie_svg = self.generate_chart_svg(data, chart_type="pie")
-                if pie_svg:
-                    with open(pie_svg_path, "w", encoding="utf-8") as f:
-                        f.write(pie_svg)
-                    charts_info["pie_chart_svg"] = (
-                        f"images/charts/{category_name}_pie_chart.svg"
-                    )
-
-                    # Try to convert to PNG using subprocess
-                    try:
-                        subprocess.run(
-                            [
-                                "inkscape",
-                                "--export-filename",
-                                str(pie_png_path),
-                                "--export-dpi=600",
-                                str(pie_svg_path),
-                            ],
-                            check=True,
-                            timeout=30,
-                        )
-                        if pie_png_path.exists():
-                            charts_info["pie_chart_png"] = (
-                                f"images/charts/{category_name}_pie_chart.png"
-                            )
-                    except:
-                        pass  # Use SVG fallback
-            else:
-                # PNG exists, just add paths to charts_info
-                charts_info["pie_chart_png"] = (
-                    f"images/charts/{category_name}_pie_chart.png"
-                )
-                if pie_svg_path.exists():
-                    charts_info["pie_chart_svg"] = (
-                        f"images/charts/{category_name}_pie_chart.svg"
-                    )
-
-            # Generate bar chart for ward-wise data
-            print(category_name)
-            if data.get("ward_data"):
-                bar_svg_path = self.static_charts_dir / f"{category_name}_bar_chart.svg"
-                bar_png_path = self.static_charts_dir / f"{category_name}_bar_chart.png"
+            # Pie chart for municipality-wide data, bar chart for ward-wise data
+            chart_types = ["pie", "bar"] if data.get("ward_data") else ["pie"]
+            for chart_type in chart_types:
+                name = f"{category_name}_{chart_type}_chart"
+                svg_path = self.static_charts_dir / f"{name}.svg"
+                png_path = self.static_charts_dir / f"{name}.png"
 
                 # Only generate if PNG doesn't exist
-                if not bar_png_path.exists():
-                    bar_svg = self.generate_chart_svg(data, chart_type="bar")
-                    if category_name == "majorsubject" or category_name == "toilettype":
-                        print(bar_svg)
-                        print(data)
-                    if bar_svg:
-                        with open(bar_svg_path, "w", encoding="utf-8") as f:
-                            f.write(bar_svg)
-                        charts_info["bar_chart_svg"] = (
-                            f"images/charts/{category_name}_bar_chart.svg"
-                        )
-
-                        # Try to convert to PNG using subprocess
-                        try:
-                            subprocess.run(
-                                [
-                                    "inkscape",
-                                    "--export-filename",
-                                    str(bar_png_path),
-                                    "--export-dpi=600",
-                                    str(bar_svg_path),
-                                ],
-                                check=True,
-                                timeout=30,
-                            )
-                            if bar_png_path.exists():
-                                charts_info["bar_chart_png"] = (
-                                    f"images/charts/{category_name}_bar_chart.png"
-                                )
-                        except:
-                            pass  # Use SVG fallback
-                else:
-                    # PNG exists, just add paths to charts_info
-                    charts_info["bar_chart_png"] = (
-                        f"images/charts/{category_name}_bar_chart.png"
-                    )
-                    if bar_svg_path.exists():
-                        charts_info["bar_chart_svg"] = (
-                            f"images/charts/{category_name}_bar_chart.svg"
-                        )
+                if not png_path.exists():
+                    self._write_chart(data, chart_type, svg_path, png_path)
+
+                if png_path.exists():
+                    charts_info[f"{chart_type}_chart_png"] = f"images/charts/{name}.png"
+                if svg_path.exists():
+                    charts_info[f"{chart_type}_chart_svg"] = f"images/charts/{name}.svg"
 
         except Exception as e:
             print(f"Error generating {category_name} charts: {e}")
 
         return charts_info
 
+    def _write_chart(self, data, chart_type, svg_path, png_path):
+        """Write a chart's SVG and PNG once, even with concurrent workers"""
+        import subprocess
+
+        with single_flight(f"chart:{png_path.resolve()}"):
+            if png_path.exists():
+                return
+            svg = self.generate_chart_svg(data, chart_type=chart_type)
+            if not svg:
+                return
+            with atomic_write(svg_path) as f:
+                f.write(svg)
+
+            # Try to convert to PNG using subprocess
+            try:
+                with atomic_path(png_path) as tmp_png:
+                    subprocess.run(
+                        [
+                            "inkscape",
+                            "--export-filename",
+                            str(tmp_png),
+                            "--export-dpi=600",
+                            str(svg_path),
+                        ],
+                        check=True,
+                        timeout=30,
+                    )
+            except (subprocess.SubprocessError, OSError):
+                pass  # Use SVG fallback
+
 
 class BaseSocialReportFormatter(ABC):
     """Base report formatter for social categories with common functionality"""
 
     def __init__(self, processor_data):
         self.data = processor_data
-        self.municipality_name = "गढवा गाउँपालिका"
+        self.municipality_name = get_current_municipality().name
 
     @abstractmethod
     def format_for_html(self):
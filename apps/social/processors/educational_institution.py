@@ -8,14 +8,12 @@ This processor handles Ward Wise Educational Institution data (५.१.२) prov
 - Educational trends and institution type analysis
 """
 
-from collections import defaultdict
 from typing import Dict, Any
 from django.db import models
 from django.db.models import Sum, Count, Q
-import os
-import json
 
-from apps.social.models import WardWiseEducationalInstitution, SchoolLevelChoice
+from apps.reports.utils.time_series import percent_change, to_python
+from apps.social.models import GenderChoice, SchoolEnrollmentFact, SchoolLevelChoice
 from .base import BaseSocialProcessor
 
 
@@ -56,45 +54,44 @@ class EducationalInstitutionProcessor(BaseSocialProcessor):
         return "educational_institution"
 
     def get_data(self) -> Dict[str, Any]:
-        """Get educational institution data aggregated from new JSON fixtures (per-year, per-school, per-grade, per-gender)"""
+        """Get educational institution data from the school enrollment fact store
+
+        Each pivot (school x grade, ward, level, grade, year) is a single
+        grouped query over the indexed fact table.
+        """
         try:
-            fixtures_dir = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)), "fixtures"
+            years = list(
+                SchoolEnrollmentFact.objects.order_by("data_year")
+                .values_list("data_year", flat=True)
+                .distinct()
             )
-            years = ["2079", "2080", "2081"]
-            all_years_data = {}
-            for year in years:
-                file_path = os.path.join(
-                    fixtures_dir, f"educational_institution_{year}.json"
-                )
-                if os.path.exists(file_path):
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        all_years_data[year] = json.load(f)
-                else:
-                    all_years_data[year] = []
+            if not years:
+                return self._empty_data_structure()
 
-            # Aggregate data
-            municipality_data = {}
+            latest_year = years[-1]
+            latest = SchoolEnrollmentFact.objects.filter(data_year=latest_year)
+
+            # --- Per-school, per-grade enrollment ---
             ward_data = {}
-            total_institutions = 0
-            total_male_students = 0
-            total_female_students = 0
-            per_grade_data = {}
             per_school_data = {}
-
-            latest_year = years[-1]
-            latest_data = all_years_data[latest_year]
-
-            # --- Municipality-wide and ward-wise aggregation ---
-            for entry in latest_data:
-                ward = entry.get("ward_number")
-                school_level = entry.get("school_level")
-                school_type = entry.get("school_type", "OTHER")
-                institution_name = entry.get("institution_name")
-                student_counts = entry.get("student_counts", {})
-                if not ward:
-                    continue
-                # Per-school aggregation
+            school_rows = self._pivot(
+                latest,
+                "ward_number",
+                "institution_name",
+                "school_level",
+                "school_type",
+                "grade",
+            ).order_by("ward_number", "institution_name")
+            for row in sorted(
+                school_rows,
+                key=lambda r: (
+                    r["ward_number"],
+                    r["institution_name"],
+                    self._grade_sort_key(r["grade"]),
+                ),
+            ):
+                ward = row["ward_number"]
+                name = row["institution_name"]
                 if ward not in ward_data:
                     ward_data[ward] = {
                         "institution_count": 0,
@@ -105,115 +102,90 @@ class EducationalInstitutionProcessor(BaseSocialProcessor):
                         "institutions": [],
                         "per_grade": {},
                     }
-                ward_data[ward]["institution_count"] += 1
-                school_male = 0
-                school_female = 0
-                school_total = 0
-                school_per_grade = {}
-                for grade, gdata in student_counts.items():
-                    boys = gdata.get("boys", 0)
-                    girls = gdata.get("girls", 0)
-                    total = gdata.get("total", boys + girls)
-                    school_male += boys
-                    school_female += girls
-                    school_total += total
-                    # Per-grade aggregation (municipality)
-                    if grade not in per_grade_data:
-                        per_grade_data[grade] = {"male": 0, "female": 0, "total": 0}
-                    per_grade_data[grade]["male"] += boys
-                    per_grade_data[grade]["female"] += girls
-                    per_grade_data[grade]["total"] += total
-                    # Per-grade per-school
-                    school_per_grade[grade] = {
-                        "male": boys,
-                        "female": girls,
-                        "total": total,
-                    }
-                ward_data[ward]["male_students"] += school_male
-                ward_data[ward]["female_students"] += school_female
-                ward_data[ward]["total_students"] += school_total
-                # Per-school data
-                school_info = {
-                    "name": institution_name,
-                    "level": school_level,
-                    "type": school_type,
-                    "male_students": school_male,
-                    "female_students": school_female,
-                    "total_students": school_total,
-                    "per_grade": school_per_grade,
-                }
-                ward_data[ward]["institutions"].append(school_info)
-                # Per-school (municipality)
-                per_school_data[institution_name] = school_info
-                # Municipality-wide by level
-                if school_level not in municipality_data:
-                    municipality_data[school_level] = {
-                        "institution_count": 0,
+                school_info = per_school_data.get(name)
+                if school_info is None or school_info["ward_number"] != ward:
+                    school_info = {
+                        "name": name,
+                        "ward_number": ward,
+                        "level": row["school_level"],
+                        "type": row["school_type"],
                         "male_students": 0,
                         "female_students": 0,
                         "total_students": 0,
-                        "name_nepali": self._get_level_name_nepali(school_level),
+                        "per_grade": {},
                     }
-                municipality_data[school_level]["institution_count"] += 1
-                municipality_data[school_level]["male_students"] += school_male
-                municipality_data[school_level]["female_students"] += school_female
-                municipality_data[school_level]["total_students"] += school_total
-                total_institutions += 1
-                total_male_students += school_male
-                total_female_students += school_female
-
-            # Calculate gender ratios and percentages
-            total_students = total_male_students + total_female_students
-            for ward in ward_data:
-                w = ward_data[ward]
-                if w["total_students"] > 0:
-                    w["gender_ratio"] = round(
-                        (w["female_students"] / w["total_students"]) * 100, 1
-                    )
-            for level in municipality_data:
-                l = municipality_data[level]
-                if total_students > 0:
-                    l["percentage"] = round(
-                        (l["total_students"] / total_students) * 100, 1
-                    )
-                else:
-                    l["percentage"] = 0
-                l["gender_ratio"] = (
-                    round((l["female_students"] / l["total_students"]) * 100, 1)
-                    if l["total_students"] > 0
-                    else 0
+                    per_school_data[name] = school_info
+                    ward_data[ward]["institutions"].append(school_info)
+                grade_counts = self._counts(row)
+                school_info["per_grade"][row["grade"]] = grade_counts
+                school_info["male_students"] += grade_counts["male"]
+                school_info["female_students"] += grade_counts["female"]
+                school_info["total_students"] += grade_counts["total"]
+
+            # --- Ward totals ---
+            for row in self._pivot(latest, "ward_number", institutions=True):
+                counts = self._counts(row)
+                ward_data[row["ward_number"]].update(
+                    {
+                        "institution_count": row["institutions"],
+                        "male_students": counts["male"],
+                        "female_students": counts["female"],
+                        "total_students": counts["total"],
+                        "gender_ratio": self._female_share(counts),
+                    }
+                )
+            for row in self._pivot(latest, "ward_number", "grade"):
+                ward_data[row["ward_number"]]["per_grade"][row["grade"]] = (
+                    self._counts(row)
                 )
 
-            # Historical data for trend analysis
-            historical_data = {}
-            for year in years:
-                ydata = all_years_data[year]
-                y_male = 0
-                y_female = 0
-                y_institutions = 0
-                for entry in ydata:
-                    grades = entry.get("grades", {})
-                    for g in grades.values():
-                        y_male += g.get("male", 0)
-                        y_female += g.get("female", 0)
-                    y_institutions += 1
-                y_total = y_male + y_female
-                historical_data[year] = {
-                    "male_students": y_male,
-                    "female_students": y_female,
-                    "total_students": y_total,
-                    "total_institutions": y_institutions,
-                    "gender_ratio": (
-                        round((y_female / y_total) * 100, 1) if y_total > 0 else 0
-                    ),
+            # --- Municipality-wide by level ---
+            municipality_data = {}
+            for row in self._pivot(latest, "school_level", institutions=True):
+                counts = self._counts(row)
+                municipality_data[row["school_level"]] = {
+                    "institution_count": row["institutions"],
+                    "male_students": counts["male"],
+                    "female_students": counts["female"],
+                    "total_students": counts["total"],
+                    "name_nepali": self._get_level_name_nepali(row["school_level"]),
+                    "gender_ratio": self._female_share(counts),
                 }
 
+            # --- Municipality-wide by grade ---
+            per_grade_data = {
+                row["grade"]: self._counts(row)
+                for row in sorted(
+                    self._pivot(latest, "grade"),
+                    key=lambda r: self._grade_sort_key(r["grade"]),
+                )
+            }
+
+            total_institutions = sum(
+                level["institution_count"] for level in municipality_data.values()
+            )
+            total_male_students = sum(
+                level["male_students"] for level in municipality_data.values()
+            )
+            total_female_students = sum(
+                level["female_students"] for level in municipality_data.values()
+            )
+            total_students = sum(
+                level["total_students"] for level in municipality_data.values()
+            )
+            for level in municipality_data.values():
+                level["percentage"] = (
+                    round((level["total_students"] / total_students) * 100, 1)
+                    if total_students > 0
+                    else 0
+                )
+
             return {
                 "municipality_data": municipality_data,
                 "ward_data": ward_data,
                 "per_grade_data": per_grade_data,
                 "per_school_data": per_school_data,
-                "historical_data": historical_data,
+                "historical_data": self._get_historical_trends(),
                 "total_institutions": total_institutions,
                 "total_students": total_students,
                 "total_male_students": total_male_students,
@@ -230,6 +202,35 @@ class EducationalInstitutionProcessor(BaseSocialProcessor):
             print(f"Error in educational institution data processing: {e}")
             return self._empty_data_structure()
 
+    @staticmethod
+    def _pivot(queryset, *fields, institutions=False):
+        """Student counts per gender grouped by the given fields"""
+        aggregates = {
+            gender.lower(): Sum("student_count", filter=Q(gender=gender), default=0)
+            for gender in GenderChoice.values
+        }
+        if institutions:
+            aggregates["institutions"] = Count("institution_name", distinct=True)
+        return queryset.values(*fields).annotate(**aggregates).order_by(*fields)
+
+    @staticmethod
+    def _counts(row):
+        male = row["male"]
+        female = row["female"]
+        return {"male": male, "female": female, "total": male + female + row["other"]}
+
+    @staticmethod
+    def _female_share(counts):
+        if counts["total"] <= 0:
+            return 0
+        return round((counts["female"] / counts["total"]) * 100, 1)
+
+    @staticmethod
+    def _grade_sort_key(grade):
+        """Pre-primary grades first, then grades in numeric order"""
+        number = "".join(ch for ch in grade if ch.isdigit())
+        return (1, int(number), grade) if number else (0, 0, grade)
+
     def _empty_data_structure(self) -> Dict[str, Any]:
         """Return empty data structure when no data available"""
         return {
@@ -248,6 +249,7 @@ class EducationalInstitutionProcessor(BaseSocialProcessor):
     def _get_level_name_nepali(self, level_code):
         """Get Nepali name for school level"""
         level_names = {
+            SchoolLevelChoice.HIGHER_SECONDARY: "उच्च माध्यमिक विद्यालय",
             SchoolLevelChoice.SECONDARY: "माध्यमिक विद्यालय",
             SchoolLevelChoice.PRIMARY: "प्राथमिक विद्यालय",
             SchoolLevelChoice.LOWER_SECONDARY: "निम्न माध्यमिक विद्यालय",
@@ -257,32 +259,25 @@ class EducationalInstitutionProcessor(BaseSocialProcessor):
         return level_names.get(level_code, "अज्ञात")
 
     def _get_historical_trends(self):
-        """Get historical enrollment trends"""
+        """Get historical enrollment trends for every loaded year"""
         historical = {}
-        years = ["2079", "2080", "2081"]
-
-        for year in years:
-            year_stats = WardWiseEducationalInstitution.objects.filter(
-                data_year=year
-            ).aggregate(
-                total_male=Sum("male_students"),
-                total_female=Sum("female_students"),
-                total_institutions=Count("institution_name", distinct=True),
+        rows = list(
+            self._pivot(
+                SchoolEnrollmentFact.objects.all(), "data_year", institutions=True
             )
-
-            male = year_stats["total_male"] or 0
-            female = year_stats["total_female"] or 0
-            total = male + female
-            institutions = year_stats["total_institutions"] or 0
-
-            historical[year] = {
-                "male_students": male,
-                "female_students": female,
-                "total_students": total,
-                "total_institutions": institutions,
-                "gender_ratio": round((female / total) * 100, 1) if total > 0 else 0,
+        )
+        totals = [self._counts(row)["total"] for row in rows]
+        growth_rates = [None] + to_python(percent_change(totals), 1) if rows else []
+        for row, growth_rate in zip(rows, growth_rates):
+            counts = self._counts(row)
+            historical[row["data_year"]] = {
+                "male_students": counts["male"],
+                "female_students": counts["female"],
+                "total_students": counts["total"],
+                "total_institutions": row["institutions"],
+                "gender_ratio": self._female_share(counts),
+                "growth_rate": growth_rate,
             }
-
         return historical
 
     def generate_analysis_text(self, data: Dict[str, Any]) -> str:
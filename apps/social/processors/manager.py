@@ -4,6 +4,8 @@ Social Manager
 Coordinates all social processors and provides unified interface for PDF generation.
 """
 
+from apps.reports.utils.profiling import instrument_processors, timed
+from apps.reports.utils.scheduler import run_processors
 from .toilet_type import ToiletTypeProcessor
 from .solid_waste_management import SolidWasteManagementProcessor
 from .old_age_and_single_women import OldAgeAndSingleWomenProcessor
@@ -28,28 +30,16 @@ class SocialManager:
             "solid_waste_management": SolidWasteManagementProcessor(),
             "old_age_and_single_women": OldAgeAndSingleWomenProcessor(),
         }
+        instrument_processors(self.processors, "social")
 
     def get_processor(self, category):
         """Get processor for specific category"""
         return self.processors.get(category)
 
+    @timed("social.process_all_for_pdf")
     def process_all_for_pdf(self):
         """Process all social categories for PDF generation with charts"""
-        results = {}
-        for category, processor in self.processors.items():
-            try:
-                results[category] = processor.process_for_pdf()
-            except Exception as e:
-                print(f"Error processing {category} for PDF: {e}")
-                results[category] = {
-                    "data": {},
-                    "municipality_data": {},
-                    "ward_data": {},
-                    "total_population": 0,
-                    "report_content": f"Error processing {category} data",
-                    "charts": {},
-                }
-        return results
+        return run_processors("social", self.processors)
 
     def process_category_for_pdf(self, category):
         """Process specific category for PDF with charts"""
@@ -69,6 +59,7 @@ class SocialManager:
                 }
         return None
 
+    @timed("social.generate_all_charts")
     def generate_all_charts(self):
         """Generate and save all charts for all categories"""
         chart_urls = {}
@@ -12,6 +12,7 @@ from apps.reports.utils.nepali_numbers import (
     format_nepali_percentage,
     to_nepali_digits,
 )
+from apps.core.tenancy import ward_numbers
 
 
 class OldAgeAndSingleWomenProcessor(BaseSocialProcessor):
@@ -48,7 +49,7 @@ class OldAgeAndSingleWomenProcessor(BaseSocialProcessor):
         total_female_old_age = 0
         total_single_women = 0
 
-        for ward_num in range(1, 9):  # Wards 1-8
+        for ward_num in ward_numbers():
             try:
                 ward_obj = WardWiseOldAgePopulationAndSingleWomen.objects.get(
                     ward_number=ward_num
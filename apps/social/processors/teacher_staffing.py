@@ -28,6 +28,7 @@ from apps.social.models import (
     TeacherLevelChoice,
     TeacherPositionTypeChoice,
 )
+from apps.core.tenancy import ward_numbers
 from .base import BaseSocialProcessor
 
 
@@ -129,7 +130,7 @@ class TeacherStaffingProcessor(BaseSocialProcessor):
 
             # Ward-wise data
             ward_data = {}
-            for ward_num in range(1, 8):
+            for ward_num in ward_numbers():
                 ward_teachers = WardWiseTeacherStaffing.objects.filter(
                     ward_number=ward_num
                 )
@@ -0,0 +1,107 @@
+"""
+Social Tests
+
+Tests for the school enrollment fact store.
+"""
+
+from django.test import TestCase
+
+from apps.social.models import SchoolEnrollmentFact
+from apps.social.processors.educational_institution import (
+    EducationalInstitutionProcessor,
+)
+from apps.social.utils.school_enrollment import (
+    find_fixtures,
+    iter_fact_rows,
+    load_enrollment_facts,
+)
+
+
+class SchoolEnrollmentFactTestCase(TestCase):
+    """Test loading and aggregating school enrollment facts"""
+
+    def setUp(self):
+        SchoolEnrollmentFact.objects.all().delete()
+
+    def _school(self, ward, name, grades):
+        return {
+            "ward_number": ward,
+            "institution_name": name,
+            "school_type": "COMMUNITY",
+            "levels_offered": {"grades_1_to_5": True},
+            "student_counts": {
+                "all": {"boys": 999, "girls": 999, "others": 0},
+                **grades,
+            },
+        }
+
+    def test_fact_rows_skip_summary_grade(self):
+        """Grade totals are not stored and levels are derived"""
+        rows = list(
+            iter_fact_rows(
+                [self._school(1, "A", {"grade_1": {"boys": 3, "girls": 4}})],
+                "2080",
+            )
+        )
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row["grade"] for row in rows}, {"grade_1"})
+        self.assertEqual(rows[0]["school_level"], "PRIMARY")
+        self.assertEqual(sum(row["student_count"] for row in rows), 7)
+
+    def test_load_is_incremental(self):
+        """Loaded years are skipped unless replaced"""
+        years = list(find_fixtures())
+        self.assertTrue(years)
+
+        first = load_enrollment_facts(years=years[:1])
+        self.assertEqual(list(first), years[:1])
+        self.assertEqual(load_enrollment_facts(years=years[:1]), {})
+        self.assertEqual(
+            load_enrollment_facts(years=years[:1], replace=True), first
+        )
+        self.assertEqual(
+            SchoolEnrollmentFact.objects.filter(data_year=years[0]).count(),
+            first[years[0]],
+        )
+
+    def test_processor_aggregates_latest_year(self):
+        """Processor pivots come from grouped fact queries"""
+        rows = list(
+            iter_fact_rows(
+                [
+                    self._school(
+                        1,
+                        "A",
+                        {
+                            "grade_10": {"boys": 1, "girls": 2},
+                            "grade_2": {"boys": 3, "girls": 4, "others": 1},
+                        },
+                    ),
+                    self._school(2, "B", {"ecd": {"boys": 5, "girls": 5}}),
+                ],
+                "2081",
+            )
+        )
+        rows += list(
+            iter_fact_rows(
+                [self._school(1, "A", {"grade_1": {"boys": 1, "girls": 1}})],
+                "2080",
+            )
+        )
+        SchoolEnrollmentFact.objects.bulk_create(
+            SchoolEnrollmentFact(**fields) for fields in rows
+        )
+
+        data = EducationalInstitutionProcessor().get_data()
+
+        self.assertEqual(data["years_available"], ["2080", "2081"])
+        self.assertEqual(data["latest_year"], "2081")
+        self.assertEqual(data["total_institutions"], 2)
+        self.assertEqual(data["total_students"], 21)
+        self.assertEqual(data["ward_data"][1]["total_students"], 11)
+        self.assertEqual(
+            list(data["ward_data"][1]["institutions"][0]["per_grade"]),
+            ["grade_2", "grade_10"],
+        )
+        self.assertEqual(list(data["per_grade_data"])[0], "ecd")
+        self.assertEqual(data["historical_data"]["2080"]["total_students"], 2)
@@ -0,0 +1 @@
+# Social utilities package
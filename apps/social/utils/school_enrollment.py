@@ -0,0 +1,120 @@
+"""
+School enrollment fact loader
+
+Normalises the ``educational_institution_<year>.json`` fixtures into
+``SchoolEnrollmentFact`` rows: one row per year, school, grade and gender.
+The year is taken from the file name, so a new year's data is added by
+dropping in its fixture and running ``load_school_enrollment``.
+"""
+
+import glob
+import json
+import os
+import re
+
+from django.db import transaction
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures"
+)
+FIXTURE_PATTERN = "educational_institution_*.json"
+FIXTURE_YEAR_RE = re.compile(r"educational_institution_(\d+)\.json$")
+
+# Fixture gender keys -> GenderChoice values
+GENDER_KEYS = {"boys": "MALE", "girls": "FEMALE", "others": "OTHER"}
+
+# Summary row present in the fixtures, not a grade
+SKIPPED_GRADES = {"all"}
+
+
+def find_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Return {year: fixture path} for every enrollment fixture"""
+    fixtures = {}
+    for path in glob.glob(os.path.join(fixtures_dir, FIXTURE_PATTERN)):
+        match = FIXTURE_YEAR_RE.search(os.path.basename(path))
+        if match:
+            fixtures[match.group(1)] = path
+    return dict(sorted(fixtures.items()))
+
+
+def derive_school_level(entry):
+    """School level from the fixture, or from the highest grades offered"""
+    if entry.get("school_level"):
+        return entry["school_level"]
+
+    offered = entry.get("levels_offered") or {}
+    if offered.get("grades_9_to_10") or offered.get("grades_11_to_12"):
+        return "SECONDARY"
+    if offered.get("grades_6_to_8"):
+        return "LOWER_SECONDARY"
+    if offered.get("grades_1_to_5"):
+        return "PRIMARY"
+    if offered.get("ecd"):
+        return "EARLY_CHILDHOOD"
+    return "OTHER"
+
+
+def iter_fact_rows(entries, year):
+    """Yield fact field dicts for the schools of one fixture"""
+    for entry in entries:
+        ward_number = entry.get("ward_number")
+        institution_name = entry.get("institution_name")
+        if not ward_number or not institution_name:
+            continue
+
+        school = {
+            "data_year": year,
+            "ward_number": ward_number,
+            "institution_name": institution_name,
+            "school_code": entry.get("school_code") or "",
+            "school_level": derive_school_level(entry),
+            "school_type": entry.get("school_type") or "OTHER",
+        }
+        for grade, counts in (entry.get("student_counts") or {}).items():
+            if grade in SKIPPED_GRADES or not isinstance(counts, dict):
+                continue
+            for key, gender in GENDER_KEYS.items():
+                yield {
+                    **school,
+                    "grade": grade,
+                    "gender": gender,
+                    "student_count": counts.get(key) or 0,
+                }
+
+
+def load_enrollment_facts(years=None, replace=False, model=None, batch_size=2000):
+    """Bulk load enrollment fixtures into the fact table
+
+    Years that are already loaded are skipped unless ``replace`` is set, so
+    repeated runs only add new years.
+
+    Args:
+        years: Years to load (default: every fixture found)
+        replace: Reload years that already have facts
+        model: Fact model (historical model when called from a migration)
+
+    Returns:
+        {year: rows loaded}
+    """
+    if model is None:
+        from apps.social.models import SchoolEnrollmentFact as model
+
+    fixtures = find_fixtures()
+    if years:
+        fixtures = {year: path for year, path in fixtures.items() if year in years}
+
+    loaded_years = set(
+        model.objects.values_list("data_year", flat=True).distinct()
+    )
+    counts = {}
+    for year, path in fixtures.items():
+        if year in loaded_years and not replace:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        rows = [model(**fields) for fields in iter_fact_rows(entries, year)]
+        with transaction.atomic():
+            model.objects.filter(data_year=year).delete()
+            model.objects.bulk_create(rows, batch_size=batch_size)
+        counts[year] = len(rows)
+    return counts
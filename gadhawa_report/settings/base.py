@@ -58,12 +58,14 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "apps.core.middleware.MunicipalityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.reports.middleware.BuildProfileMiddleware",
 ]
 
 ROOT_URLCONF = "gadhawa_report.urls"
@@ -79,6 +81,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "apps.core.context_processors.municipality",
             ],
         },
     },
@@ -94,6 +97,9 @@ DATABASES = {
     }
 }
 
+# Queries go to the active municipality's database (see apps.core.tenancy)
+DATABASE_ROUTERS = ["apps.core.tenancy.MunicipalityRouter"]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -123,6 +129,16 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Chart files resolve to their content-hashed copies (see chart_management)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "apps.chart_management.storage.ChartManifestStaticFilesStorage",
+    },
+}
+
 # Media files
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
@@ -193,6 +209,70 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = "DENY"
 
+# Report build profiling
+# Emit per-stage timings of report builds in a Server-Timing response header
+REPORT_SERVER_TIMING = False
+# Directory for JSON build profiles written next to generated PDFs (None disables)
+REPORT_BUILD_PROFILE_DIR = None
+# Worker threads running report processors concurrently (1 runs them inline)
+REPORT_PROCESSOR_WORKERS = 4
+# Seconds a single processor may run before its fallback result is used
+REPORT_PROCESSOR_TIMEOUT = 120
+# Processor data API: client max-age and server-side cache of get_data() output
+REPORT_DATA_API_MAX_AGE = 60
+REPORT_DATA_API_CACHE_TIMEOUT = 60 * 60
+# Population projection horizons (years, multiples of 5) and result cache timeout
+REPORT_PROJECTION_HORIZONS = (5, 10, 20)
+REPORT_PROJECTION_CACHE_TIMEOUT = 24 * 60 * 60
+# Render report figure renditions in a background thread after upload
+REPORT_FIGURE_RENDITIONS_ASYNC = True
+# Report REST API: client max-age, payload cache and content version lifetimes
+REPORT_API_MAX_AGE = 60
+REPORT_API_CACHE_TIMEOUT = 24 * 60 * 60
+REPORT_API_VERSION_TIMEOUT = 60
+# Long-lived worker processes writing PDFs with preloaded fonts and stylesheet
+# (0 writes them in the request process) and seconds a PDF may take
+REPORT_PDF_WORKERS = 2
+REPORT_PDF_TIMEOUT = 300
+# Single-flight locks around chart and report builds: "file" locks in
+# REPORT_LOCK_DIR (default: the system temp directory) or "redis" locks in the
+# default cache server, and seconds to wait for a concurrent build
+REPORT_LOCK_BACKEND = "file"
+REPORT_LOCK_DIR = None
+REPORT_LOCK_TIMEOUT = 300
+# Built full report PDFs, reused until their data changes (default:
+# MEDIA_ROOT/reports/cache)
+REPORT_PDF_CACHE_DIR = None
+# Report data frozen per publication version by snapshot_report_data (default:
+# MEDIA_ROOT/reports/snapshots)
+REPORT_SNAPSHOT_DIR = None
+# Data exports: zipped bundles kept per data fingerprint (default:
+# MEDIA_ROOT/reports/exports) and rows read from the database at a time
+REPORT_EXPORT_DIR = None
+REPORT_EXPORT_CHUNK_SIZE = 2000
+# Resolution of the print-size map derivatives embedded in the PDF (see
+# apps.reports.utils.map_assets)
+REPORT_MAP_PRINT_DPI = 200
+# Caches built concurrently by warm_report_caches (see apps.reports.utils.warmup)
+REPORT_WARMUP_WORKERS = 2
+
+# Municipalities served by this deployment (see apps.core.tenancy). Each one
+# reads from its own database alias, is selected by request host name and
+# writes its charts under images/charts/<charts_namespace>/ (default: its code)
+REPORT_MUNICIPALITIES = {
+    "gadhawa": {
+        "name": "गढवा गाउँपालिका",
+        "name_english": "Gadhawa Rural Municipality",
+        "ward_count": 8,
+        "database": "default",
+        "hosts": [],
+        "charts_namespace": "",
+    },
+}
+REPORT_DEFAULT_MUNICIPALITY = "gadhawa"
+# Municipality profiles built concurrently by generate_municipality_profiles
+REPORT_PROFILE_WORKERS = 4
+
 # Logging
 LOGGING = {
     "version": 1,
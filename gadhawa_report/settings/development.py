@@ -14,7 +14,13 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    },
+    # Second municipality database (see REPORT_MUNICIPALITIES), used by the
+    # multi-database tenancy tests
+    "tenant": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db_tenant.sqlite3",
+    },
 }
 
 # Static files for development
@@ -54,9 +60,14 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+        "KEY_FUNCTION": "apps.core.tenancy.make_cache_key",
     }
 }
 
+# Expose report build timings to the browser devtools
+REPORT_SERVER_TIMING = True
+REPORT_BUILD_PROFILE_DIR = BASE_DIR / "logs" / "build_profiles"
+
 # Logging for development
 LOGGING["handlers"]["console"]["level"] = "DEBUG"
 LOGGING["loggers"]["gadhawa_report"]["level"] = "DEBUG"
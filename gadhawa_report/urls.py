@@ -6,7 +6,7 @@ The `urlpatterns` list routes URLs to views. For more information please see:
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, register_converter
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import (
@@ -15,6 +15,11 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from apps.reports.converters import DomainConverter
+from apps.reports.views import ProcessorDataAPIView
+
+register_converter(DomainConverter, "domain")
+
 # Main URL patterns
 urlpatterns = [
     # Admin interface
@@ -33,6 +38,12 @@ urlpatterns = [
     path("api/v1/infrastructure/", include("apps.infrastructure.urls")),
     path("api/v1/governance/", include("apps.governance.urls")),
     path("api/v1/reports/", include("apps.reports.urls")),
+    # Processor data API
+    path(
+        "api/v1/data/<domain:domain>/<slug:processor>/",
+        ProcessorDataAPIView.as_view(),
+        name="processor-data",
+    ),
     # API Documentation
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(